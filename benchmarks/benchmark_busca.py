@@ -0,0 +1,124 @@
+"""
+Compara as buscas de `pesquisar_produto`: por trecho com varredura sequencial, por trecho com o
+índice de trigramas e por palavras com o índice invertido (modulos/indice_produtos.py).
+Compara também as buscas só com filtros de categoria e marca, pelo índice de facetas, com a varredura dos filtros.
+Confere que os índices retornam exatamente os resultados da varredura.
+Mede o autocompletar de `completar_produto`, em ordem alfabética e pelo volume de vendas.
+Por fim, compara a busca por relevância (BM25) limitada aos 20 primeiros, selecionados por heap, com a ordenação completa.
+
+Uso, a partir da raiz do projeto:
+    python -m benchmarks.benchmark_busca [--produtos N] [--repeticoes N]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from modulos import produto
+from modulos.produto import Produto, _todos_produtos, pesquisar_produto, completar_produto, definir_indice_trigramas, \
+    definir_volume_vendas
+from benchmarks.benchmark_snapshot import CATEGORIAS, MARCAS, medir
+
+
+TIPOS = ["Leite", "Iogurte", "Queijo", "Café", "Arroz", "Feijão", "Macarrão", "Biscoito", "Sabão", "Detergente",
+         "Refrigerante", "Suco", "Pão", "Manteiga", "Chocolate", "Azeite", "Molho", "Cerveja", "Água", "Shampoo"]
+VARIANTES = ["Integral", "Desnatado", "Light", "Zero", "Tradicional", "Premium", "Orgânico", "Natural", "Morango",
+             "Baunilha", "Limão", "Uva", "Laranja", "Coco", "Extra", "Especial", "Caseiro", "Família"]
+CONSULTAS = ["leite", "gurt", "integral", "morango", "ão", "nestlé", "produto 4242", "xyz"]
+PREFIXOS = ["l", "le", "iog", "café tr", "nestle"]
+CONSULTAS_RELEVANCIA = ["leite", "leite integral", "morango light", "nestlé"]
+FILTROS = [{"categoria": CATEGORIAS[0]}, {"marca": MARCAS[0]}, {"categoria": CATEGORIAS[1], "marca": MARCAS[1]}]
+
+
+def gerar_produtos(n_produtos: int, semente: int = 42):
+    """Preenche `_todos_produtos` com nomes compostos de tipo, variante e número."""
+    aleatorio = random.Random(semente)
+    _todos_produtos.clear()
+    for i in range(n_produtos):
+        codigo = f"789{i:010d}"
+        nome = f"{aleatorio.choice(TIPOS)} {aleatorio.choice(VARIANTES)} {aleatorio.choice(VARIANTES)} Produto {i}"
+        _todos_produtos[codigo] = Produto(nome, aleatorio.choice(MARCAS), aleatorio.choice(CATEGORIAS), codigo,
+                                          1.0, round(aleatorio.uniform(1.0, 100.0), 2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    gerar_produtos(args.produtos)
+    definir_indice_trigramas(False)
+    sequencial = {c: pesquisar_produto(c)["dados"] for c in CONSULTAS}
+
+    definir_indice_trigramas(True)
+    inicio = time.perf_counter()
+    produto._sincronizar_indice(produto._indice_trigramas)
+    construcao_trigramas = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    produto._sincronizar_indice(produto._indice_palavras)
+    construcao_palavras = time.perf_counter() - inicio
+
+    for consulta, esperado in sequencial.items():
+        obtido = pesquisar_produto(consulta)["dados"]
+        assert obtido == esperado, f"índice de trigramas divergiu da varredura em {consulta!r}"
+
+    print(f"{args.produtos} produtos (melhor de {args.repeticoes}); resultados idênticos à varredura")
+    print(f"construção: trigramas {construcao_trigramas:.2f} s, palavras {construcao_palavras:.2f} s")
+    print(f"{'consulta':<16}{'resultados':>11}{'varredura':>12}{'trigramas':>12}{'palavras':>12}")
+    for consulta in CONSULTAS:
+        definir_indice_trigramas(False)
+        varredura = medir(lambda: pesquisar_produto(consulta), args.repeticoes)
+        definir_indice_trigramas(True)
+        produto._sincronizar_indice(produto._indice_trigramas)
+        trigramas = medir(lambda: pesquisar_produto(consulta), args.repeticoes)
+        palavras = medir(lambda: pesquisar_produto(consulta, modo="palavras"), args.repeticoes)
+        print(f"{consulta!r:<16}{len(sequencial[consulta]):>11}{varredura * 1000:>9.2f} ms"
+              f"{trigramas * 1000:>9.2f} ms{palavras * 1000:>9.2f} ms")
+
+    print(f"{'filtros':<48}{'resultados':>11}{'varredura':>12}{'facetas':>12}")
+    for filtros in FILTROS:
+        esperado = [p for p in _todos_produtos.values() if produto._atende_filtros(p, filtros)]
+        assert pesquisar_produto("", filtros)["dados"] == esperado, f"índice de facetas divergiu em {filtros!r}"
+        varredura = medir(lambda: [p for p in _todos_produtos.values() if produto._atende_filtros(p, filtros)],
+                          args.repeticoes)
+        facetas = medir(lambda: pesquisar_produto("", filtros), args.repeticoes)
+        print(f"{str(filtros):<48}{len(esperado):>11}{varredura * 1000:>9.2f} ms{facetas * 1000:>9.2f} ms")
+
+    inicio = time.perf_counter()
+    produto._sincronizar_indice(produto._indice_prefixos)
+    construcao_prefixos = time.perf_counter() - inicio
+    aleatorio = random.Random(7)
+    definir_volume_vendas({codigo: aleatorio.randint(0, 1000) for codigo in _todos_produtos})
+    print(f"autocompletar (10 sugestões); construção do índice de prefixos: {construcao_prefixos:.2f} s")
+    print(f"{'prefixo':<16}{'alfabética':>12}{'por vendas':>12}")
+    for prefixo in PREFIXOS:
+        alfabetica = medir(lambda: completar_produto(prefixo), args.repeticoes)
+        por_vendas = medir(lambda: completar_produto(prefixo, por_vendas=True), args.repeticoes)
+        print(f"{prefixo!r:<16}{alfabetica * 1000:>9.3f} ms{por_vendas * 1000:>9.3f} ms")
+
+    inicio = time.perf_counter()
+    produto._sincronizar_indice(produto._indice_relevancia)
+    construcao_relevancia = time.perf_counter() - inicio
+    print(f"relevância (20 primeiros); construção do índice de relevância: {construcao_relevancia:.2f} s")
+    print(f"{'consulta':<18}{'resultados':>11}{'completa':>12}{'heap':>12}{'heap+vendas':>13}")
+    for consulta in CONSULTAS_RELEVANCIA:
+        completa = pesquisar_produto(consulta, modo="relevancia")["dados"]
+        assert pesquisar_produto(consulta, modo="relevancia", limite=20)["dados"] == completa[:20], \
+            f"seleção por heap divergiu da ordenação completa em {consulta!r}"
+        ordenacao = medir(lambda: pesquisar_produto(consulta, modo="relevancia"), args.repeticoes)
+        heap = medir(lambda: pesquisar_produto(consulta, modo="relevancia", limite=20), args.repeticoes)
+        vendas = medir(lambda: pesquisar_produto(consulta, modo="relevancia", limite=20, por_vendas=True),
+                       args.repeticoes)
+        print(f"{consulta!r:<18}{len(completa):>11}{ordenacao * 1000:>9.2f} ms{heap * 1000:>9.2f} ms"
+              f"{vendas * 1000:>10.2f} ms")
+
+    tracemalloc.start()
+    produto._indice_trigramas.reconstruir(_todos_produtos.values())
+    trigramas_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"memória do índice de trigramas: {trigramas_bytes / 2 ** 20:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compara a resolução de referências na carga do histórico de vendas: uma consulta por item
+(`consultar_produto_por_codigo` / `consultar_funcionario`, como antes de modulos/contexto_carga.py)
+contra a consulta direta feita pelo `ContextoCarga`.
+
+Uso, a partir da raiz do projeto:
+    python -m benchmarks.benchmark_carga_referencias [--linhas N] [--repeticoes N]
+"""
+import argparse
+import gc
+import time
+
+from modulos.produto import consultar_produto_por_codigo
+from modulos.funcionario import consultar_funcionario
+from modulos.carrinho import Carrinho, _todos_carrinhos, carregar_carrinhos
+from benchmarks.benchmark_snapshot import gerar_dados
+
+
+def carrinho_por_consulta(data: dict):
+    """Reconstrói um carrinho consultando cada referência, como o `Carrinho.from_json()` anterior."""
+    itens = {}
+    for cod, qtd in data["itens"].items():
+        res = consultar_produto_por_codigo(cod)
+        if res["retorno"] != 0:
+            raise ValueError(f"Produto {cod} não encontrado. Inicialize antes de carregar o carrinho.")
+        itens[res["dados"]] = qtd
+
+    funcionario = None
+    if data.get("funcionario"):
+        res = consultar_funcionario(data["funcionario"], incluir_inativos=True)
+        if res["retorno"] != 0:
+            raise ValueError(f"Funcionário {data['funcionario']} não encontrado.")
+        funcionario = res["dados"]
+
+    return Carrinho(id=data["id"], data_hora=data.get("data_hora"), itens=itens, total=data.get("total"),
+                    funcionario=funcionario)
+
+
+def medir_carga(funcao, repeticoes: int):
+    """Retorna o menor tempo de `funcao`, partindo sempre de `_todos_carrinhos` vazio e da memória já coletada."""
+    melhor = None
+    for _ in range(repeticoes):
+        _todos_carrinhos.clear()
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=1_000_000, help="itens de venda no histórico (aproximado)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    # gerar_dados() sorteia de 1 a 6 produtos por carrinho: 3,5 linhas em média
+    gerar_dados(5000, int(args.linhas / 3.5), n_unidades=1)
+    registros = {str(id): c.to_json() for id, c in _todos_carrinhos.items()}
+    linhas = sum(len(c["itens"]) for c in registros.values())
+
+    def por_consulta():
+        for id, c_json in registros.items():
+            _todos_carrinhos[int(id)] = carrinho_por_consulta(c_json)
+
+    def por_contexto():
+        carregar_carrinhos(registros=registros)
+
+    antes = medir_carga(por_consulta, args.repeticoes)
+    depois = medir_carga(por_contexto, args.repeticoes)
+
+    print(f"{len(registros)} carrinhos, {linhas} linhas de venda (melhor de {args.repeticoes})")
+    print(f"{'consulta por item':<20}{antes:>8.3f} s")
+    print(f"{'ContextoCarga':<20}{depois:>8.3f} s   (x{antes / depois:.2f})")
+
+
+if __name__ == "__main__":
+    main()
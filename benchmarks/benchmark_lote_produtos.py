@@ -0,0 +1,85 @@
+"""
+Compara o cadastro de um catálogo de fornecedor com uma chamada de `registrar_produto` por linha
+contra `registrar_produtos_em_lote`, que verifica os códigos de barras e as duplicidades de uma vez.
+Mede também só a verificação dos dígitos: `_valida_codigo_barras` por código contra `_codigos_invalidos`.
+Uma fração das linhas tem dígito verificador errado ou código repetido, para exercitar o relatório de erros.
+
+Uso, a partir da raiz do projeto:
+    python -m benchmarks.benchmark_lote_produtos [--linhas N] [--repeticoes N]
+"""
+import argparse
+import gc
+import random
+
+from modulos import produto
+from modulos.produto import _todos_produtos, registrar_produto, registrar_produtos_em_lote
+from modulos.rastreamento import limpar_modificados
+from benchmarks.benchmark_snapshot import CATEGORIAS, MARCAS, medir
+
+
+def ean13(numero: int):
+    """Gera um EAN-13 válido com o prefixo 789."""
+    base = f"789{numero:09d}"
+    soma = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(base))
+    return base + str((10 - soma % 10) % 10)
+
+
+def gerar_linhas(n_linhas: int, semente: int = 42):
+    """Gera as linhas do catálogo; cerca de 1% tem dígito errado e 1% repete um código anterior."""
+    aleatorio = random.Random(semente)
+    linhas = []
+    for i in range(n_linhas):
+        codigo = ean13(i)
+        sorteio = aleatorio.random()
+        if sorteio < 0.01:
+            codigo = codigo[:-1] + str((int(codigo[-1]) + 1) % 10)
+        elif sorteio < 0.02 and i:
+            codigo = linhas[aleatorio.randrange(i)][3]
+        linhas.append((f"Produto {i}", aleatorio.choice(MARCAS), aleatorio.choice(CATEGORIAS), codigo, 1.0,
+                       round(aleatorio.uniform(1.0, 100.0), 2)))
+    return linhas
+
+
+def limpar():
+    """Esvazia o registro e os índices de busca e coleta a memória antes de cada medição."""
+    _todos_produtos.clear()
+    for indice in produto._indices_ativos():
+        indice.reconstruir(())
+    limpar_modificados()
+    gc.collect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    linhas = gerar_linhas(args.linhas)
+    codigos = [linha[3] for linha in linhas]
+
+    um_a_um = medir(lambda: [produto._valida_codigo_barras(c) for c in codigos], args.repeticoes)
+    em_lote = medir(lambda: produto._codigos_invalidos(codigos), args.repeticoes)
+    print(f"{args.linhas} linhas (melhor de {args.repeticoes}); NumPy: {'sim' if produto.numpy else 'não'}")
+    print(f"verificação dos dígitos: por código {um_a_um:.2f} s, em lote {em_lote:.2f} s")
+
+    def por_linha():
+        limpar()
+        for linha in linhas:
+            registrar_produto(*linha)
+
+    def lote():
+        limpar()
+        return registrar_produtos_em_lote(linhas)
+
+    tempo_por_linha = medir(por_linha, 1)
+    esperado = dict(_todos_produtos)
+    tempo_lote = medir(lote, args.repeticoes)
+    resultado = lote()["dados"]
+    assert list(_todos_produtos) == list(esperado), "o lote registrou produtos diferentes do cadastro por linha"
+    print(f"cadastro: por linha {tempo_por_linha:.2f} s, em lote {tempo_lote:.2f} s "
+          f"({resultado['registrados']} registrados, {resultado['rejeitados']} rejeitados)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compara o cálculo dos preços de um histórico de vendas item a item, com `Produto.calcula_preco` (como faz
+`Carrinho.calcula_total`), contra `calcula_precos`, produto a produto e com o catálogo colunar ativado.
+Cerca de um quarto dos produtos tem preço por peso.
+
+Uso, a partir da raiz do projeto:
+    python -m benchmarks.benchmark_precos [--produtos N] [--itens N] [--repeticoes N]
+"""
+import argparse
+import random
+
+from modulos import catalogo_colunar
+from modulos.produto import _todos_produtos, calcula_precos, definir_catalogo_colunar, registrar_produtos_em_lote
+from benchmarks.benchmark_lote_produtos import ean13
+from benchmarks.benchmark_snapshot import CATEGORIAS, MARCAS, medir
+
+
+def gerar_produtos(n_produtos: int, aleatorio: random.Random):
+    """Gera as linhas do catálogo de produtos."""
+    linhas = []
+    for i in range(n_produtos):
+        preco = round(aleatorio.uniform(1.0, 100.0), 2)
+        preco_por_peso = round(preco * 4, 2) if aleatorio.random() < 0.25 else None
+        linhas.append((f"Produto {i}", aleatorio.choice(MARCAS), aleatorio.choice(CATEGORIAS), ean13(i), 1.0, preco,
+                       preco_por_peso))
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=10_000)
+    parser.add_argument("--itens", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    aleatorio = random.Random(42)
+    registrar_produtos_em_lote(gerar_produtos(args.produtos, aleatorio))
+    produtos = list(_todos_produtos.values())
+    itens = [(aleatorio.choice(produtos), aleatorio.randint(1, 5)) for _ in range(args.itens)]
+    codigos = [p.codigo for p, _ in itens]
+    quantidades = [q for _, q in itens]
+
+    esperado = [p.calcula_preco(q)["dados"] for p, q in itens]
+    item_a_item = medir(lambda: [p.calcula_preco(q)["dados"] for p, q in itens], args.repeticoes)
+    produto_a_produto = medir(lambda: calcula_precos(codigos, quantidades), args.repeticoes)
+
+    definir_catalogo_colunar(True)
+    calcula_precos(codigos[:1], quantidades[:1])
+    assert calcula_precos(codigos, quantidades)["dados"] == esperado, "o catálogo colunar calculou preços diferentes"
+    colunar = medir(lambda: calcula_precos(codigos, quantidades), args.repeticoes)
+
+    print(f"{args.produtos} produtos, {args.itens} itens (melhor de {args.repeticoes}); "
+          f"NumPy: {'sim' if catalogo_colunar.numpy else 'não'}")
+    print(f"calcula_preco item a item {item_a_item:.2f} s, calcula_precos produto a produto {produto_a_produto:.2f} s, "
+          f"com catálogo colunar {colunar:.2f} s")
+    definir_catalogo_colunar(False)
+    _todos_produtos.clear()
+
+
+if __name__ == "__main__":
+    main()
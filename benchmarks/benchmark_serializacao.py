@@ -0,0 +1,78 @@
+"""
+Compara os modos de serialização (modulos/serializacao.py) e as compressões
+(modulos/compressao.py) na gravação e na carga de todas as entidades em arquivos JSON:
+tamanho em disco e tempo.
+
+Uso, a partir da raiz do projeto:
+    python -m benchmarks.benchmark_serializacao [--produtos N] [--carrinhos N] [--repeticoes N]
+"""
+import argparse
+import os
+import tempfile
+
+from modulos import armazenamento
+from modulos.serializacao import criar_serializador, orjson
+from modulos.compressao import COMPRESSOES
+from modulos.produto import _todos_produtos
+from modulos.funcionario import _todos_funcionarios
+from modulos.estoque import _todos_estoques
+from modulos.carrinho import _todos_carrinhos
+from modulos.unidades import _unidades
+from benchmarks.benchmark_snapshot import gerar_dados, limpar_registros, medir
+
+
+def medir_modo(modo: str, registros: dict, pasta: str, repeticoes: int, compressao: str = None):
+    """Mede a gravação e a leitura de todas as entidades com o serializador do modo e a compressão informados."""
+    arquivos = {entidade: os.path.join(pasta, f"{modo}-{compressao}-{entidade}.json")
+                for entidade in armazenamento.ENTIDADES}
+    destino = armazenamento.ArmazenamentoJSON(arquivos, serializador=criar_serializador(modo), compressao=compressao)
+
+    def salvar():
+        for entidade, dados in registros.items():
+            destino.salvar(entidade, dados)
+
+    def carregar():
+        for entidade in registros:
+            destino.carregar(entidade)
+
+    tempo_gravacao = medir(salvar, repeticoes)
+    tamanho = sum(os.path.getsize(caminho + (COMPRESSOES[compressao][1] if compressao else ""))
+                  for caminho in arquivos.values())
+    tempo_carga = medir(carregar, repeticoes)
+    return tamanho, tempo_gravacao, tempo_carga
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=5000)
+    parser.add_argument("--carrinhos", type=int, default=50000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    gerar_dados(args.produtos, args.carrinhos)
+    # Serializa os objetos uma única vez: o benchmark mede apenas o formato, não o to_json() das classes
+    registros = {entidade: {str(k): obj.to_json() for k, obj in registro.items()}
+                 for entidade, registro in (("produtos", _todos_produtos), ("funcionarios", _todos_funcionarios),
+                                            ("estoques", _todos_estoques), ("carrinhos", _todos_carrinhos),
+                                            ("unidades", _unidades))}
+    limpar_registros()
+
+    modos = ["legivel", "compacto"] + (["orjson"] if orjson is not None else [])
+    with tempfile.TemporaryDirectory() as pasta:
+        resultados = {modo: medir_modo(modo, registros, pasta, args.repeticoes) for modo in modos}
+        # Compressões sobre o serializador escolhido automaticamente
+        for compressao in COMPRESSOES:
+            resultados[f"auto+{compressao}"] = medir_modo("auto", registros, pasta, args.repeticoes, compressao)
+
+    print(f"{args.produtos} produtos, {args.carrinhos} carrinhos (melhor de {args.repeticoes})")
+    if orjson is None:
+        print("orjson não instalado: modo omitido")
+    print(f"{'modo':<14}{'tamanho (KiB)':>15}{'gravação (s)':>15}{'carga (s)':>12}")
+    base = resultados["legivel"]
+    for modo, (tamanho, gravacao, carga) in resultados.items():
+        print(f"{modo:<14}{tamanho / 1024:>15.1f}{gravacao:>15.3f}{carga:>12.3f}"
+              f"   (x{base[0] / tamanho:.2f} menor, x{base[1] / gravacao:.2f} gravação, x{base[2] / carga:.2f} carga)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Compara o snapshot binário (modulos/snapshot_binario.py) com a persistência JSON atual
+em tamanho em disco e tempo de gravação e de carga.
+
+Uso, a partir da raiz do projeto:
+    python -m benchmarks.benchmark_snapshot [--produtos N] [--carrinhos N] [--repeticoes N]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from modulos import armazenamento
+from modulos import rastreamento
+from modulos.produto import Produto, _todos_produtos, carregar_produtos
+from modulos.funcionario import Funcionario, _todos_funcionarios, carregar_funcionarios
+from modulos.estoque import Estoque, _todos_estoques, carregar_estoques
+from modulos.carrinho import Carrinho, _todos_carrinhos, carregar_carrinhos
+from modulos.unidades import Localidade, _unidades, carregar_unidades
+from modulos.snapshot_binario import salvar_snapshot, carregar_snapshot
+
+
+CATEGORIAS = ["Grãos", "Bebidas", "Laticínios", "Limpeza", "Higiene", "Padaria", "Hortifruti", "Congelados"]
+MARCAS = ["Tio João", "Nestlé", "Ypê", "Coca-Cola", "Sadia", "Piracanjuba", "Camil", "Seara", "Colgate", "Omo"]
+
+
+def limpar_registros():
+    """Esvazia todos os registros globais e as marcações de modificação."""
+    for registro in (_todos_produtos, _todos_funcionarios, _todos_estoques, _todos_carrinhos, _unidades):
+        registro.clear()
+    rastreamento.limpar_modificados()
+
+
+def gerar_dados(n_produtos: int, n_carrinhos: int, n_unidades: int = 3, semente: int = 42):
+    """Popula os registros globais com um conjunto de dados sintético e reprodutível."""
+    aleatorio = random.Random(semente)
+    limpar_registros()
+
+    produtos = []
+    for i in range(n_produtos):
+        codigo = f"789{i:010d}"
+        p = Produto(f"Produto {i}", aleatorio.choice(MARCAS), aleatorio.choice(CATEGORIAS), codigo,
+                    round(aleatorio.uniform(0.1, 5.0), 2), round(aleatorio.uniform(1.0, 100.0), 2))
+        _todos_produtos[codigo] = p
+        produtos.append(p)
+
+    funcionarios = []
+    for i in range(10 * n_unidades):
+        f = Funcionario(f"Funcionário {i}", 1000 + i, aleatorio.choice(["Caixa", "Gerente", "Repositor"]),
+                        "2023/01/10")
+        _todos_funcionarios[f.codigo] = f
+        funcionarios.append(f)
+
+    inicio = date(2024, 1, 1)
+    for i in range(1, n_carrinhos + 1):
+        itens = {p: aleatorio.randint(1, 5) for p in aleatorio.sample(produtos, min(len(produtos), aleatorio.randint(1, 6)))}
+        data_venda = inicio + timedelta(days=i * 365 // max(n_carrinhos, 1))
+        c = Carrinho(i, data_venda.strftime("%Y/%m/%d"), itens, None, aleatorio.choice(funcionarios))
+        c.total = round(sum(p.preco * q for p, q in itens.items()), 2)
+        _todos_carrinhos[i] = c
+
+    ids = list(_todos_carrinhos)
+    for u in range(n_unidades):
+        e = Estoque(f"EST{u}")
+        for p in produtos:
+            e.capacidades[p] = {"estoque": 100, "exposicao": 20}
+            e.estoque[p] = aleatorio.randint(0, 100)
+            e.exposicao[p] = aleatorio.randint(0, 20)
+        _todos_estoques[e.codigo] = e
+        vendas = [_todos_carrinhos[i] for i in ids[u::n_unidades]]
+        _unidades[u] = Localidade(f"Unidade {u}", u, e, (-23.5 + u * 0.01, -46.6 + u * 0.01),
+                                  funcionarios[u * 10:(u + 1) * 10], vendas)
+
+
+def medir(funcao, repeticoes: int):
+    """Executa `funcao` algumas vezes e retorna o menor tempo, em segundos."""
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor
+
+
+def medir_json(pasta: str, repeticoes: int):
+    """Mede a gravação e a carga com o ArmazenamentoJSON, o formato atual do sistema."""
+    arquivos = {entidade: os.path.join(pasta, f"{entidade}.json") for entidade in armazenamento.ENTIDADES}
+    json_atual = armazenamento.ArmazenamentoJSON(arquivos)
+    registros = {"produtos": _todos_produtos, "funcionarios": _todos_funcionarios, "estoques": _todos_estoques,
+                 "carrinhos": _todos_carrinhos, "unidades": _unidades}
+
+    def salvar():
+        for entidade, registro in registros.items():
+            json_atual.salvar(entidade, {str(k): obj.to_json() for k, obj in registro.items()})
+
+    def carregar():
+        limpar_registros()
+        carregar_produtos()
+        carregar_funcionarios()
+        carregar_estoques()
+        carregar_carrinhos()
+        carregar_unidades()
+
+    tempo_gravacao = medir(salvar, repeticoes)
+    tamanho = sum(os.path.getsize(caminho) for caminho in arquivos.values())
+    armazenamento.definir_armazenamento(json_atual)
+    try:
+        tempo_carga = medir(carregar, repeticoes)
+    finally:
+        armazenamento.definir_armazenamento(None)
+    return tamanho, tempo_gravacao, tempo_carga
+
+
+def medir_binario(pasta: str, repeticoes: int):
+    """Mede a gravação e a carga com o snapshot binário."""
+    caminho = os.path.join(pasta, "mercado.snap")
+
+    def carregar():
+        limpar_registros()
+        resultado = carregar_snapshot(caminho)
+        if resultado["retorno"] != 0:
+            raise RuntimeError(resultado["mensagem"])
+
+    tempo_gravacao = medir(lambda: salvar_snapshot(caminho), repeticoes)
+    tamanho = os.path.getsize(caminho)
+    tempo_carga = medir(carregar, repeticoes)
+    return tamanho, tempo_gravacao, tempo_carga
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=5000)
+    parser.add_argument("--carrinhos", type=int, default=50000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    gerar_dados(args.produtos, args.carrinhos)
+    with tempfile.TemporaryDirectory() as pasta:
+        json_atual = medir_json(pasta, args.repeticoes)
+        # A carga JSON substitui os objetos; regera o mesmo conjunto para o snapshot
+        gerar_dados(args.produtos, args.carrinhos)
+        binario = medir_binario(pasta, args.repeticoes)
+    limpar_registros()
+
+    print(f"{args.produtos} produtos, {args.carrinhos} carrinhos (melhor de {args.repeticoes})")
+    print(f"{'formato':<10}{'tamanho (KiB)':>15}{'gravação (s)':>15}{'carga (s)':>12}")
+    for nome, (tamanho, gravacao, carga) in (("json", json_atual), ("binário", binario)):
+        print(f"{nome:<10}{tamanho / 1024:>15.1f}{gravacao:>15.3f}{carga:>12.3f}")
+    print(f"{'razão':<10}{json_atual[0] / binario[0]:>15.2f}{json_atual[1] / binario[1]:>15.2f}"
+          f"{json_atual[2] / binario[2]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Exporta e importa os registros do sistema em CSV ou JSONL, em fluxo.
+
+Uso, a partir da raiz do projeto:
+    python exporta_dados.py exportar <entidade|todas> <destino> [--formato csv|jsonl]
+    python exporta_dados.py importar <entidade> <arquivo> [--formato csv|jsonl] [--lote N]
+
+Na exportação de "todas", <destino> é uma pasta e cada entidade vai para <destino>/<entidade>.<formato>.
+Na importação, importe na ordem de dependência: produtos e funcionarios, depois estoques e carrinhos, por fim unidades.
+O mecanismo de armazenamento, o formato JSON e a compressão são os configurados em main.py.
+"""
+import argparse
+import os
+import sys
+
+from modulos.armazenamento import ENTIDADES, criar_armazenamento, definir_armazenamento
+from modulos.serializacao import criar_serializador, definir_serializador
+from modulos.carga_paralela import carregar_em_paralelo
+from modulos.exportacao import FORMATOS, exportar, importar
+from main import TIPO_ARMAZENAMENTO, FORMATO_JSON, COMPRESSAO_DADOS, salvar_dados
+
+
+def executar_exportacao(args):
+    """Exporta uma entidade, ou todas para uma pasta, a partir do que está gravado."""
+    if args.entidade == "todas":
+        os.makedirs(args.caminho, exist_ok=True)
+        destinos = [(e, os.path.join(args.caminho, f"{e}.{args.formato}")) for e in ENTIDADES]
+    else:
+        destinos = [(args.entidade, args.caminho)]
+
+    for entidade, caminho in destinos:
+        resultado = exportar(entidade, caminho, args.formato or "csv", args.lote)
+        if resultado["retorno"] != 0:
+            print(f"{entidade}: {resultado['mensagem']}")
+            return 1
+        print(f"{entidade}: {resultado['dados']} linha(s) em {caminho}")
+    return 0
+
+
+def executar_importacao(args, armazenamento):
+    """Carrega os registros existentes, importa o arquivo em lotes e grava o resultado."""
+    carga = carregar_em_paralelo(manter_carrinhos=not armazenamento.suporta_parcial)
+    if carga["retorno"] != 0:
+        print(carga["mensagem"])
+        return 1
+
+    # Com gravação parcial, cada lote é gravado ao ser concluído; em JSON o arquivo é reescrito uma única vez no fim
+    resultado = importar(args.entidade, args.caminho, args.formato, args.lote,
+                         ao_concluir_lote=salvar_dados if armazenamento.suporta_parcial else None)
+    if resultado["retorno"] != 0:
+        print(resultado["mensagem"])
+        return 1
+    salvar_dados()
+
+    dados = resultado["dados"]
+    print(f"{args.entidade}: {dados['importados']} importado(s), {dados['rejeitados']} rejeitado(s)")
+    for erro in dados["erros"]:
+        print(f"  linha {erro['linha']}: {erro['mensagem']}")
+    if dados["rejeitados"] > len(dados["erros"]):
+        print(f"  ... e mais {dados['rejeitados'] - len(dados['erros'])} erro(s)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("comando", choices=["exportar", "importar"])
+    parser.add_argument("entidade", choices=list(ENTIDADES) + ["todas"])
+    parser.add_argument("caminho")
+    parser.add_argument("--formato", choices=FORMATOS, help="padrão: csv na exportação; extensão do arquivo na importação")
+    parser.add_argument("--lote", type=int, default=1000, help="linhas por escrita / registros por lote de importação")
+    args = parser.parse_args()
+    if args.comando == "importar" and args.entidade == "todas":
+        parser.error("a importação é feita uma entidade por vez, na ordem de dependência")
+
+    definir_serializador(criar_serializador(FORMATO_JSON))
+    armazenamento = criar_armazenamento(TIPO_ARMAZENAMENTO, compressao=COMPRESSAO_DADOS)
+    definir_armazenamento(armazenamento)
+    try:
+        if args.comando == "exportar":
+            return executar_exportacao(args)
+        return executar_importacao(args, armazenamento)
+    finally:
+        armazenamento.fechar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
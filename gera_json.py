@@ -1,6 +1,7 @@
 from random import randint, choice, uniform, random, sample
 from datetime import datetime, timedelta
-import json
+
+from modulos.armazenamento import ArmazenamentoJSON
 
 # Geradores utilitários para dados simulados
 
@@ -190,9 +191,10 @@ def gera_dados_teste():
             "nome": f"Unidade {i+1}",
             "codigo": codigo,
             "localizacao": [-23.5 + i * 0.01, -46.6 + i * 0.01],
-            "estoque": list(estoques.values())[i],            # dicionário completo já gerado antes
-            "funcionarios": funcionarios_divididos[i],  # lista de dicts completos
-            "vendas": list(carrinhos.values())[inicio:fim],  # fatia variável conforme i1, i2
+            "estoque": list(estoques)[i],                           # código do estoque gerado antes
+            "funcionarios": [f["codigo"] for f in funcionarios_divididos[i]],  # códigos dos funcionários
+            "vendas": list(carrinhos)[inicio:fim],                  # IDs dos carrinhos, fatia variável conforme i1, i2
+            "datas_vendas": [c["data_hora"] for c in list(carrinhos.values())[inicio:fim]],  # datas das vendas, para filtrar sem ler os carrinhos
             "ativo": False if i == 2 else True
         }
 
@@ -212,11 +214,12 @@ def gera_dados_teste():
     for nome, novos_dados in jsons.items():
         caminho_arquivo = f"dados/{nome}.json"
         
-        # 1. LER: Tenta carregar os dados existentes do arquivo.
+        arquivo = ArmazenamentoJSON({nome: caminho_arquivo})
+
+        # 1. LER: Tenta carregar os dados existentes do arquivo (com ou sem compressão).
         try:
-            with open(caminho_arquivo, "r", encoding="utf-8") as f:
-                dados_existentes = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+            dados_existentes = arquivo.carregar(nome)
+        except (OSError, ValueError):
             # Se o arquivo não existe ou está vazio/corrompido, começa com um dicionário vazio.
             dados_existentes = {}
 
@@ -225,8 +228,7 @@ def gera_dados_teste():
         dados_existentes.update(novos_dados)
 
         # 3. ESCREVER: Salva o conteúdo completo e atualizado, sobrescrevendo o arquivo.
-        with open(caminho_arquivo, "w", encoding="utf-8") as f:
-            json.dump(dados_existentes, f, indent=4, ensure_ascii=False)
+        arquivo.salvar(nome, dados_existentes)
         
         print(f"Arquivo '{caminho_arquivo}' atualizado com sucesso.")
     
@@ -1,29 +1,79 @@
+import builtins
+import os
+import time
+
 from modulos.carrinho import *
 from modulos.estoque import *
 from modulos.funcionario import * # consultar_funcionario
 from modulos.produto import *
 from modulos.unidades import * # listar_Unidades, consulta_Unidade
+from modulos.armazenamento import *
+from modulos.diario_estoque import *
+from modulos.arquivo_vendas import *
+from modulos.carga_paralela import *
+from modulos.serializacao import *
+from modulos.salvamento_automatico import *
+from modulos.copia_seguranca import *
+from modulos.rastreamento import trava_registros
+from modulos.paginacao import iterar_registro, paginar
 from gera_json import gera_dados_teste
 
+# Mecanismo de persistência: 'json' (um arquivo por entidade em dados/) ou 'sqlite' (dados/mercado.db)
+TIPO_ARMAZENAMENTO = 'json'
+# Gravação em segundo plano das alterações: no máximo a cada INTERVALO_SALVAMENTO segundos ou após LIMITE_ALTERACOES
+SALVAMENTO_AUTOMATICO = False
+INTERVALO_SALVAMENTO = 30.0
+LIMITE_ALTERACOES = 100
+# Leitura dos arquivos na carga inicial: 'thread' ou 'processo'
+MODO_CARGA = 'thread'
+# Formato dos arquivos JSON: 'auto' (orjson, se instalado, ou compacto), 'compacto' ou 'legivel' (indentado, para depuração)
+FORMATO_JSON = 'auto'
+# Compressão dos arquivos JSON ao gravar: None, 'gzip', 'bz2' ou 'lzma' (a leitura reconhece qualquer uma)
+COMPRESSAO_DADOS = None
+# Pasta das cópias de segurança geradas pelo menu da unidade, uma subpasta por cópia
+PASTA_COPIAS = 'dados/copias'
+# Número de sugestões do autocompletar de produtos, ordenadas pelo volume de vendas da unidade ativa
+SUGESTOES_AUTOCOMPLETAR = 5
+# Número de itens exibidos por tela nas listagens; a página seguinte é obtida pelo cursor da anterior
+TAMANHO_PAGINA_TELA = 20
+
 unidade_ativa = None
 usuario_atual = None
 carrinho_atual = None
+copia_atual = None
+
+
+def input(mensagem: str = ""):
+    """Lê uma linha do usuário liberando, durante a espera, a trava dos registros que o programa mantém nas operações,
+    para que o salvamento automático grave apenas entre operações."""
+    trava_registros.release()
+    try:
+        return builtins.input(mensagem)
+    finally:
+        trava_registros.acquire()
 
 def carregar_dados():
-    """Carrega todos os dados dos arquivos JSON para a memória."""
-    carregar_produtos()
-    carregar_funcionarios()
-    carregar_estoques()
-    carregar_carrinhos()
-    carregar_unidades()
+    """Carrega todos os dados para a memória, lendo os arquivos em paralelo, e exibe o tempo de cada etapa.
+    Retorna False se algum registro referencia produtos ou funcionários inexistentes."""
+    # Com gravação parcial (SQLite), o histórico de vendas fica no disco e é lido em páginas sob demanda;
+    # em JSON o arquivo é reescrito por inteiro a cada gravação, então todos os carrinhos precisam estar na memória
+    resultado = carregar_em_paralelo(modo=MODO_CARGA, manter_carrinhos=not obter_armazenamento().suporta_parcial)
+    print("\nTempos de carga:")
+    print(formatar_tempos(resultado['dados']))
+    if resultado['retorno'] != 0:
+        print(f"\n{resultado['mensagem']}")
+        return False
+    return True
 
 def salvar_dados():
-    """Salva todos os dados da memória para os arquivos JSON."""
-    salvar_produtos()
-    salvar_funcionarios()
-    salvar_estoques()
-    salvar_carrinhos()
-    salvar_unidades()
+    """Salva apenas os registros alterados na sessão e retorna quantos foram gravados por entidade."""
+    return {
+        "produtos": salvar_produtos(),
+        "funcionarios": salvar_funcionarios(),
+        "estoques": salvar_estoques(),
+        "carrinhos": salvar_carrinhos(),
+        "unidades": salvar_unidades()
+    }
 
 
 def selecionar_unidade():
@@ -59,6 +109,7 @@ def selecionar_unidade():
             resultado = consulta_Unidade(codigo)
             if resultado['retorno'] == 0:
                 unidade_escolhida = resultado['dados']
+                carregar_volume_vendas(unidade_escolhida)
                 print(f"Unidade '{unidade_escolhida.nome}' selecionada com sucesso.")
                 return unidade_escolhida
             else:
@@ -66,6 +117,30 @@ def selecionar_unidade():
         else:
             print("Opção inválida. Tente novamente.")
 
+def carregar_volume_vendas(unidade):
+    """Carrega no autocompletar as quantidades vendidas de cada produto na unidade, que ordenam as sugestões."""
+    definir_volume_vendas(unidade.volume_vendas())
+
+def exibir_paginas(listar, exibir, primeira=None, **parametros):
+    """Exibe uma listagem paginada uma tela por vez, seguindo os cursores, até o fim ou até o usuário parar.
+    `primeira` é a primeira página, se já tiver sido obtida por quem chama."""
+    resultado = primeira
+    cursor = None
+    while True:
+        if resultado is None:
+            resultado = listar(limite=TAMANHO_PAGINA_TELA, cursor=cursor, **parametros)
+        if resultado['retorno'] != 0:
+            print(resultado['mensagem'])
+            return
+        for item in resultado['dados']:
+            exibir(item)
+        cursor = resultado['cursor']
+        if cursor is None:
+            return
+        if input("Enter para a próxima página, 0 para parar: ") == '0':
+            return
+        resultado = None
+
 def identificar_usuario():
     """Permite a identificação como funcionário ou cliente."""
     print("\nIdentificação de Usuário")
@@ -200,36 +275,83 @@ def menu_cliente():
 def main():
     """Função principal que executa o loop do programa."""
     global unidade_ativa, usuario_atual
-    print("Bem-vindo ao sistema de gestão de unidades!")
-
-    while True:
-        resp = input("Você gostaria de adicionar dados para teste? (s/n): ")
-        if resp == "s":
-            gera_dados_teste()
-            break
-        elif resp == "n":
-            break
-        else:
-            print("Insira uma resposta válida")
-    carregar_dados()
-    while True:
-        if unidade_ativa is None:
-            unidade_ativa = selecionar_unidade()
-            if unidade_ativa == 'sair':
+    # As operações mantêm a trava dos registros; `input()` a libera enquanto aguarda o usuário, e só então
+    # o salvamento automático pode gravar. Ela é liberada ao sair do laço, para a gravação final da thread
+    with trava_registros:
+        print("Bem-vindo ao sistema de gestão de unidades!")
+
+        definir_serializador(criar_serializador(FORMATO_JSON))
+        armazenamento = criar_armazenamento(TIPO_ARMAZENAMENTO, compressao=COMPRESSAO_DADOS)
+        definir_armazenamento(armazenamento)
+
+        while True:
+            resp = input("Você gostaria de adicionar dados para teste? (s/n): ")
+            if resp == "s":
+                gera_dados_teste()
+                if TIPO_ARMAZENAMENTO != 'json':
+                    # Os dados de teste são gerados em JSON; copia-os para o mecanismo escolhido
+                    migrar_armazenamento(ArmazenamentoJSON(), armazenamento)
+                break
+            elif resp == "n":
                 break
-            continue
+            else:
+                print("Insira uma resposta válida")
+        if not carregar_dados():
+            # Gravar agora descartaria os itens não resolvidos; os arquivos ficam intactos para correção
+            print("Carga interrompida: corrija os dados antes de usar o sistema.")
+            return
 
-        if usuario_atual is None:
-            usuario_atual = identificar_usuario()
-            continue
+        # Mudanças de preço agendadas que passaram a vigorar desde a última execução
+        precos = aplicar_precos_agendados()
+        if precos['dados']:
+            print(precos['mensagem'])
+
+        # Refaz as operações de estoque de uma sessão interrompida e passa a registrar as novas
+        diario = DiarioEstoque()
+        diario.recuperar()
+        definir_diario(diario)
+
+        # Vendas arquivadas por unidade e mês, para que os relatórios leiam apenas os meses do período
+        arquivo_vendas = ArquivoVendas()
+        arquivo_vendas.sincronizar(listar_Unidades(incluir_inativas=True)['dados'])
+        definir_arquivo_vendas(arquivo_vendas)
+
+        salvamento = None
+        if SALVAMENTO_AUTOMATICO:
+            salvamento = SalvamentoAutomatico(salvar_dados, INTERVALO_SALVAMENTO, LIMITE_ALTERACOES)
+            salvamento.iniciar()
+
+        while True:
+            if unidade_ativa is None:
+                unidade_ativa = selecionar_unidade()
+                if unidade_ativa == 'sair':
+                    break
+                continue
 
-        if usuario_atual == 'cliente':
-            menu_cliente()
-        elif hasattr(usuario_atual, 'nome'):  # Funcionário
-            menu_funcionario()
+            if usuario_atual is None:
+                usuario_atual = identificar_usuario()
+                continue
+
+            if usuario_atual == 'cliente':
+                menu_cliente()
+            elif hasattr(usuario_atual, 'nome'):  # Funcionário
+                menu_funcionario()
 
+    if copia_atual is not None and not copia_atual.aguardar():
+        print(f"Aviso: falha na cópia de segurança ({copia_atual.ultimo_erro}).")
     print("\nSalvando dados...")
-    salvar_dados()
+    if salvamento is not None:
+        # Grava o que estiver pendente e encerra a thread antes da gravação final, que não pode concorrer com ela
+        salvamento.parar()
+        if salvamento.ultimo_erro is not None:
+            print(f"Aviso: falha na gravação automática ({salvamento.ultimo_erro}).")
+    gravados = salvar_dados()
+    print(f"{sum(gravados.values())} registro(s) gravado(s): " + ", ".join(f"{nome}={qtd}" for nome, qtd in gravados.items()))
+    diario.compactar()
+    diario.fechar()
+    definir_diario(None)
+    definir_arquivo_vendas(None)
+    armazenamento.fechar()
     print("Obrigado por usar o sistema!")
 
 
@@ -241,6 +363,7 @@ def menu_gerenciar_produtos():
         print("1 - Registrar novo produto")
         print("2 - Atualizar produto existente")
         print("3 - Catálogo de produtos")
+        print("4 - Agendar mudança de preço")
         print("0 - Voltar")
         opcao = input("Escolha uma opção: ")
 
@@ -250,6 +373,8 @@ def menu_gerenciar_produtos():
             opcao_atualizar_produto_existente()
         elif opcao == "3":
             menu_produtos_disponiveis()
+        elif opcao == "4":
+            opcao_agendar_preco()
         elif opcao == "0":
             return
         else:
@@ -306,6 +431,7 @@ def menu_gerenciar_funcionarios():
         print("4 - Consultar funcionário por código")
         print("5 - Consultar funcionário por nome")
         print("6 - Listar todos os funcionários da unidade")
+        print("7 - Listar funcionários de todas as unidades")
         print("0 - Voltar")
         opcao = input("Escolha uma opção: ")
 
@@ -321,6 +447,8 @@ def menu_gerenciar_funcionarios():
             opcao_consultar_funcionario_por_nome()
         elif opcao == "6":
             opcao_listar_funcionarios_unidade()
+        elif opcao == "7":
+            opcao_listar_todos_funcionarios()
         elif opcao == "0":
             return
         else:
@@ -369,6 +497,8 @@ def menu_gerenciar_unidade():
         print("1 - Gerar relatório de movimentações e vendas por período")
         print("2 - Consultar dados da unidade atual")
         print("3 - Atualizar atributos da unidade")
+        print("4 - Gerar cópia de segurança")
+        print("5 - Listar carrinhos registrados")
         print("0 - Voltar")
         opcao = input("Escolha uma opção: ")
 
@@ -378,6 +508,10 @@ def menu_gerenciar_unidade():
             opcao_consultar_dados_unidade()
         elif opcao == "3":
             opcao_atualizar_atributos_unidade()
+        elif opcao == "4":
+            opcao_gerar_copia_seguranca()
+        elif opcao == "5":
+            opcao_listar_todos_carrinhos()
         elif opcao == "0":
             return
         else:
@@ -391,6 +525,8 @@ def menu_produtos_disponiveis():
         print("1 - Listar todos os produtos")
         print("2 - Pesquisar produto por nome ou categoria")
         print("3 - Verificar produto por código")
+        print("4 - Sugerir produtos pelo início do nome ou marca")
+        print("5 - Pesquisar produtos mais relevantes")
         print("0 - Voltar")
         opcao = input("Escolha uma opção: ")
 
@@ -400,6 +536,10 @@ def menu_produtos_disponiveis():
             opcao_pesquisar_produto_nome_ou_categoria()
         elif opcao == "3":
             opcao_verificar_produto_por_codigo()
+        elif opcao == "4":
+            opcao_sugerir_produtos()
+        elif opcao == "5":
+            opcao_pesquisar_produto_relevancia()
         elif opcao == "0":
             return
         else:
@@ -493,6 +633,27 @@ def opcao_atualizar_produto_existente():
     print(resultado['mensagem'])
 
 
+def opcao_agendar_preco():
+    print("\n--- Agendar Mudança de Preço ---")
+    codigo = input("Digite o código do produto: ")
+    data = input("Data de início do novo preço (AAAA/MM/DD): ")
+    try:
+        preco = float(input("Novo preço: "))
+        preco_por_peso = input("Novo preço por peso (ou pressione Enter se não houver): ")
+        preco_por_peso = float(preco_por_peso) if preco_por_peso else None
+    except ValueError:
+        print("Valor inválido.")
+        return
+
+    resultado = agendar_preco(codigo, data, preco, preco_por_peso)
+    print(resultado['mensagem'])
+    if resultado['retorno'] == 0:
+        # A mudança pode já estar vigente (data de hoje ou passada)
+        aplicados = aplicar_precos_agendados()
+        if aplicados['dados']:
+            print(aplicados['mensagem'])
+
+
 def opcao_registrar_produto_no_estoque():
     global unidade_ativa
     print("\n--- Registrar Produto no Estoque da Unidade ---")
@@ -631,13 +792,14 @@ def opcao_excluir_produto_estoque():
 def opcao_listar_todos_produtos_estoque():
     global unidade_ativa
     print(f"\n--- Produtos no Estoque da Unidade '{unidade_ativa.nome}' ---")
-    resultado = unidade_ativa.estoque.listar_produtos(detalhado=True)
+    resultado = unidade_ativa.estoque.listar_produtos(detalhado=True, limite=TAMANHO_PAGINA_TELA)
     if not resultado['dados']:
         print("Nenhum produto registrado neste estoque.")
         return
-        
-    for item in resultado['dados']:
-        print(f"Cód: {item['codigo']} | Estoque: {item['estoque']}/{item['capacidade_estoque']} | Exposição: {item['exposicao']}/{item['capacidade_exposicao']}")
+
+    exibir_paginas(unidade_ativa.estoque.listar_produtos,
+                   lambda item: print(f"Cód: {item['codigo']} | Estoque: {item['estoque']}/{item['capacidade_estoque']} | Exposição: {item['exposicao']}/{item['capacidade_exposicao']}"),
+                   primeira=resultado, detalhado=True)
 
 
 def opcao_listar_todos_produtos_exibicao():
@@ -703,7 +865,7 @@ def opcao_admitir_novo_funcionario():
         consulta = consultar_funcionario(codigo)
         if consulta['retorno'] == 0:
             novo_func_obj = consulta['dados']
-            unidade_ativa.funcionarios.append(novo_func_obj)
+            unidade_ativa.adicionar_funcionario(novo_func_obj)
             print(f"Funcionário '{nome}' adicionado à unidade '{unidade_ativa.nome}'.")
         else:
             print("Erro ao recuperar funcionário para adicionar à unidade.")
@@ -792,17 +954,26 @@ def opcao_listar_funcionarios_unidade():
     print(f"\n--- Funcionários da Unidade '{unidade_ativa.nome}' ---")
     
     incluir_inativos = input("Incluir funcionários inativos? (s/n): ").lower() == 's'
-    
-    lista_filtrada = [
-        f for f in unidade_ativa.funcionarios if incluir_inativos or f.ativo()
-    ]
-    
-    if not lista_filtrada:
+
+    def listar(limite, cursor):
+        """Pagina os funcionários da unidade, como `listar_todos_funcionarios()` faz com o registro global."""
+        funcionarios = {f.codigo: f for f in unidade_ativa.funcionarios}
+        pares = ((c, f) for c, f in iterar_registro(funcionarios, cursor) if incluir_inativos or f.ativo())
+        dados, proximo = paginar(pares, limite)
+        return {'retorno': 0, 'dados': dados, 'cursor': proximo}
+
+    resultado = listar(TAMANHO_PAGINA_TELA, None)
+    if not resultado['dados']:
         print("Nenhum funcionário para exibir.")
         return
 
-    for func in lista_filtrada:
-        print(func.__str__())
+    exibir_paginas(listar, lambda func: print(func.__str__()), primeira=resultado)
+
+
+def opcao_listar_todos_funcionarios():
+    print("\n--- Funcionários de Todas as Unidades ---")
+    incluir_inativos = input("Incluir funcionários inativos? (s/n): ").lower() == 's'
+    exibir_paginas(listar_todos_funcionarios, lambda func: print(func.__str__()), incluir_inativos=incluir_inativos)
 
 
 def opcao_criar_novo_carrinho():
@@ -823,12 +994,17 @@ def opcao_adicionar_item_ao_carrinho():
         print("Nenhum carrinho ativo. Crie um novo primeiro.")
         return
     
-    codigo = input("Digite o código do produto para adicionar: ")
-    res_prod = consultar_produto_por_codigo(codigo)
-    if res_prod['retorno'] != 0:
-        print(res_prod['mensagem'])
-        return
-    produto = res_prod['dados']
+    entrada = input("Digite o código do produto ou o início do nome/marca para adicionar: ")
+    if entrada.isdigit():
+        res_prod = consultar_produto_por_codigo(entrada)
+        if res_prod['retorno'] != 0:
+            print(res_prod['mensagem'])
+            return
+        produto = res_prod['dados']
+    else:
+        produto = escolher_sugestao(entrada)
+        if produto is None:
+            return
 
     # Verifica se o produto está na exposição da unidade
     if produto not in unidade_ativa.estoque.exposicao or unidade_ativa.estoque.exposicao[produto] <= 0:
@@ -922,7 +1098,8 @@ def _finalizar_compra_logica():
     carrinho_atual.finaliza_carrinho(funcionario=funcionario_responsavel)
     
     # Adiciona à lista de vendas da unidade
-    unidade_ativa.vendas.append(carrinho_atual)
+    unidade_ativa.registrar_venda(carrinho_atual)
+    somar_volume_vendas({produto.codigo: qtd for produto, qtd in carrinho_atual.itens.items()})
     
     print("\nCompra finalizada com sucesso!")
     
@@ -980,6 +1157,18 @@ def opcao_gerar_relatorio_movimentacoes():
             print(f"Total arrecadado no período: R$ {total_vendas:.2f}")
 
 
+def opcao_listar_todos_carrinhos():
+    print("\n--- Carrinhos Registrados ---")
+
+    def exibir(c):
+        if c.data_hora is None:
+            print(f"Carrinho ID: {c.id} | Em aberto")
+        else:
+            print(f"Carrinho ID: {c.id} | Data: {c.data_hora} | Total: R$ {totalizar_vendas([c])[0]:.2f}")
+
+    exibir_paginas(listar_todos_carrinhos, exibir)
+
+
 def opcao_consultar_dados_unidade():
     global unidade_ativa
     print("\n--- Dados da Unidade Atual ---")
@@ -1021,26 +1210,71 @@ def opcao_atualizar_atributos_unidade():
             print("Opção inválida.")
 
 
+def opcao_gerar_copia_seguranca():
+    """Congela o estado atual e grava a cópia em segundo plano, sem interromper as vendas."""
+    global copia_atual
+    if copia_atual is not None and not copia_atual.aguardar(0):
+        if copia_atual.ultimo_erro is None:
+            print("Uma cópia de segurança ainda está sendo gravada.")
+            return
+        print(f"Aviso: a cópia anterior falhou ({copia_atual.ultimo_erro}).")
+
+    pasta = os.path.join(PASTA_COPIAS, time.strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(pasta, exist_ok=True)
+    arquivos = {entidade: os.path.join(pasta, f"{entidade}.json") for entidade in ENTIDADES}
+    copia_atual = CopiaSeguranca(ArmazenamentoJSON(arquivos, compressao=COMPRESSAO_DADOS))
+    copia_atual.iniciar()
+    print(f"Cópia de segurança iniciada em {pasta}.")
+
+
 def opcao_listar_todos_produtos():
     print("\n--- Catálogo Completo de Produtos ---")
-    resultado = listar_todos_produtos()
-    if resultado['retorno'] != 0:
-        print(resultado['mensagem'])
-        return
-    
-    for produto in resultado['dados']:
-        print(produto)
+    exibir_paginas(listar_todos_produtos, print)
 
 
 def opcao_pesquisar_produto_nome_ou_categoria():
     print("\n--- Pesquisar Produto ---")
     texto = input("Digite o nome, marca ou categoria para pesquisar: ")
-    resultado = pesquisar_produto(texto)
-    
-    print(resultado['mensagem'])
-    if resultado['retorno'] == 0 and resultado['dados']:
-        for produto in resultado['dados']:
-            print(f"- {produto}")
+    resultado = pesquisar_produto(texto, facetas=True, limite=TAMANHO_PAGINA_TELA)
+    if resultado['retorno'] != 0:
+        print(resultado['mensagem'])
+        return
+
+    print(f"{sum(resultado['facetas']['categoria'].values())} produto(s) encontrado(s)")
+    for campo, contagens in resultado['facetas'].items():
+        if contagens:
+            print(f"{campo.capitalize()}: " + ", ".join(f"{valor} ({n})" for valor, n in contagens.items()))
+    exibir_paginas(pesquisar_produto, lambda produto: print(f"- {produto}"), primeira=resultado, texto=texto)
+
+
+def opcao_pesquisar_produto_relevancia():
+    print("\n--- Pesquisar Produtos Mais Relevantes ---")
+    texto = input("Digite as palavras a pesquisar: ")
+    exibir_paginas(pesquisar_produto, lambda produto: print(f"- {produto}"),
+                   texto=texto, modo="relevancia", por_vendas=True)
+
+
+def escolher_sugestao(prefixo):
+    """Lista as sugestões do autocompletar para o prefixo e retorna o produto escolhido, ou None."""
+    resultado = completar_produto(prefixo, k=SUGESTOES_AUTOCOMPLETAR, por_vendas=True)
+    if resultado['retorno'] != 0 or not resultado['dados']:
+        print("Nenhum produto começa com esse texto.")
+        return None
+
+    for i, produto in enumerate(resultado['dados'], start=1):
+        print(f"{i} - {produto.nome} ({produto.marca}) [{produto.codigo}]")
+    escolha = input("Escolha o produto (0 para cancelar): ")
+    if not escolha.isdigit() or not 1 <= int(escolha) <= len(resultado['dados']):
+        return None
+    return resultado['dados'][int(escolha) - 1]
+
+
+def opcao_sugerir_produtos():
+    print("\n--- Sugerir Produtos ---")
+    prefixo = input("Digite o início do nome ou da marca: ")
+    produto = escolher_sugestao(prefixo)
+    if produto is not None:
+        print(produto)
 
 
 def opcao_verificar_produto_por_codigo():
@@ -1,5 +1,23 @@
+from .agenda_precos import *
+from .carga_paralela import *
 from .carrinho import *
+from .catalogo_colunar import *
+from .catalogo_produtos import *
+from .compressao import *
+from .contexto_carga import *
+from .copia_seguranca import *
 from .estoque import *
+from .exportacao import *
 from .funcionario import *
+from .indice_produtos import *
+from .paginacao import *
 from .produto import *
-from .unidades import *
\ No newline at end of file
+from .unidades import *
+from .armazenamento import *
+from .arquivo_vendas import *
+from .diario_estoque import *
+from .rastreamento import *
+from .salvamento_automatico import *
+from .serializacao import *
+from .snapshot_binario import *
+from .vendas_paginadas import *
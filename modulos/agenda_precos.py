@@ -0,0 +1,196 @@
+from bisect import bisect_left, bisect_right
+
+
+__all__ = [
+    "AgendaPrecos"
+]
+
+
+# Data da entrada inicial de uma agenda: anterior, na ordem das strings, a qualquer data "AAAA/MM/DD"
+_INICIO = ""
+
+
+class AgendaPrecos:
+
+    def __init__(self, preco: float, preco_por_peso: float = None):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Criar a agenda de preços de um produto, com datas de vigência em ordem crescente, a partir do preço praticado antes de qualquer mudança agendada.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: preco (float)
+        Preço por unidade em vigor antes da primeira mudança.
+        PARÂMETRO 2: preco_por_peso (float, opcional)
+        Preço por unidade de peso em vigor antes da primeira mudança, se aplicável.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - A agenda contém apenas a entrada inicial, já aplicada.
+
+        E) DESCRIÇÃO:
+        1. Inicializa a lista ordenada de datas de vigência com a data inicial (a string vazia, anterior a qualquer data) e a lista paralela de preços.
+        2. Registra a entrada inicial como a última aplicada ao produto.
+
+        F) HIPÓTESES:
+        - As datas usam o formato "AAAA/MM/DD", cuja ordem de string é a ordem cronológica.
+
+        G) RESTRIÇÕES:
+        - Datas e preços ficam em listas separadas para que `bisect` opere diretamente sobre as datas.
+        """
+        self.datas = [_INICIO]
+        self.precos = [(preco, preco_por_peso)]
+        self.aplicada = 0
+
+    def __len__(self):
+        """Retorna o número de mudanças agendadas, sem contar a entrada inicial."""
+        return len(self.datas) - 1
+
+    def agendar(self, data: str, preco: float, preco_por_peso: float = None):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: agendar()
+
+        B) OBJETIVO:
+        Incluir uma mudança de preço que passa a vigorar em uma data, ou substituir a mudança já agendada para essa data.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: data (string)
+        Data de início da vigência, no formato "AAAA/MM/DD".
+        PARÂMETRO 2: preco (float)
+        Preço por unidade a partir da data.
+        PARÂMETRO 3: preco_por_peso (float, opcional)
+        Preço por unidade de peso a partir da data, se aplicável.
+
+        RETORNO 1: Posição (inteiro) da mudança na agenda.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `data` está no formato "AAAA/MM/DD".
+
+        Assertiva(s) de saída:
+        - As datas continuam em ordem crescente, sem repetição.
+
+        E) DESCRIÇÃO:
+        1. Localiza a posição da data com `bisect_left`.
+        2. Se a data já está na agenda, substitui o preço; se essa era a última entrada aplicada, recua a marcação para que a mudança seja aplicada novamente.
+        3. Caso contrário, insere a data e o preço nessa posição; se ela fica antes da última entrada aplicada, avança a marcação, e a mudança passa a valer apenas para consultas de datas passadas.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - A localização é O(log n); a inserção desloca as entradas posteriores, o que é barato para as poucas mudanças de um produto.
+        """
+        posicao = bisect_left(self.datas, data)
+        if posicao < len(self.datas) and self.datas[posicao] == data:
+            self.precos[posicao] = (preco, preco_por_peso)
+            if posicao == self.aplicada:
+                self.aplicada -= 1
+        else:
+            self.datas.insert(posicao, data)
+            self.precos.insert(posicao, (preco, preco_por_peso))
+            if posicao <= self.aplicada:
+                self.aplicada += 1
+        return posicao
+
+    def registrar(self, data: str, preco: float, preco_por_peso: float = None):
+        """Inclui na agenda, como já aplicada, uma mudança de preço feita diretamente no produto na data informada."""
+        self.aplicada = self.agendar(data, preco, preco_por_peso)
+
+    def vigente(self, data: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: vigente()
+
+        B) OBJETIVO:
+        Consultar o preço em vigor em uma data.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: data (string)
+        Data da consulta, no formato "AAAA/MM/DD".
+
+        RETORNO 1: Tupla (<preço>, <preço por peso>) da última mudança com vigência até a data, inclusive; antes da primeira mudança, o preço inicial.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `data` está no formato "AAAA/MM/DD".
+
+        Assertiva(s) de saída:
+        - A agenda não é alterada.
+
+        E) DESCRIÇÃO:
+        1. Localiza com `bisect_right` a primeira data posterior à consultada; a entrada anterior a ela é a vigente.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é O(log n) no número de mudanças do produto.
+        """
+        return self.precos[bisect_right(self.datas, data) - 1]
+
+    def pendente(self, data: str):
+        """Indica, sem alterar a agenda, se `aplicar()` retornaria uma mudança na data informada."""
+        return bisect_right(self.datas, data) - 1 > self.aplicada
+
+    def aplicar(self, data: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: aplicar()
+
+        B) OBJETIVO:
+        Obter a mudança de preço que vigora em uma data e ainda não foi aplicada ao produto, marcando-a como aplicada.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: data (string)
+        Data de referência (normalmente a de hoje), no formato "AAAA/MM/DD".
+
+        RETORNO 1: Tupla (<preço>, <preço por peso>) a aplicar ao produto, ou `None` se não houver mudança pendente.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `data` está no formato "AAAA/MM/DD".
+
+        Assertiva(s) de saída:
+        - Se houve retorno, a mudança consta como aplicada e não é retornada de novo.
+
+        E) DESCRIÇÃO:
+        1. Localiza com `bisect_right` a entrada vigente na data.
+        2. Se ela é posterior à última aplicada, marca-a como aplicada e retorna o seu preço; as mudanças intermediárias, já vencidas, são saltadas.
+        3. Caso contrário, retorna `None`.
+
+        F) HIPÓTESES:
+        - Quem chama atribui o preço retornado ao produto.
+
+        G) RESTRIÇÕES:
+        - Alterações manuais do preço só deixam de ser sobrescritas se forem informadas com `registrar()`.
+        """
+        posicao = bisect_right(self.datas, data) - 1
+        if posicao <= self.aplicada:
+            return None
+        self.aplicada = posicao
+        return self.precos[posicao]
+
+    def to_json(self):
+        """Serializa a agenda como {"precos": [[<data>, <preço>, <preço por peso>], ...], "aplicada": <posição>}."""
+        return {
+            "precos": [[data, preco, preco_por_peso] for data, (preco, preco_por_peso) in zip(self.datas, self.precos)],
+            "aplicada": self.aplicada
+        }
+
+    @classmethod
+    def from_json(cls, dados: dict):
+        """Recria uma agenda a partir do dicionário gerado por `to_json()`."""
+        agenda = cls.__new__(cls)
+        agenda.datas = [data for data, _, _ in dados["precos"]]
+        agenda.precos = [(preco, preco_por_peso) for _, preco, preco_por_peso in dados["precos"]]
+        agenda.aplicada = dados["aplicada"]
+        return agenda
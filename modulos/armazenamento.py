@@ -0,0 +1,1062 @@
+import io
+import json
+import os
+import sqlite3
+
+from .serializacao import obter_serializador
+from .compressao import COMPRESSOES, caminho_comprimido, localizar_arquivo, abrir_leitura, abrir_escrita
+
+
+__all__ = [
+    "ArmazenamentoJSON",
+    "ArmazenamentoSQLite",
+    "criar_armazenamento",
+    "definir_armazenamento",
+    "obter_armazenamento",
+    "migrar_armazenamento"
+]
+
+
+SQLITE_DB = 'dados/mercado.db'
+
+ENTIDADES = ("produtos", "funcionarios", "estoques", "carrinhos", "unidades")
+
+_armazenamento_atual = None
+
+
+def _arquivos_padrao():
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _arquivos_padrao()
+
+    B) OBJETIVO:
+    Montar o mapeamento entre o nome de cada entidade e o caminho do arquivo JSON definido no módulo correspondente.
+
+    C) ACOPLAMENTO:
+    PARÂMETROS: Nenhum.
+
+    RETORNO 1: DICIONÁRIO {<nome da entidade>: <caminho do arquivo>}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Os módulos de domínio definem as constantes `*_JSON`.
+
+    Assertiva(s) de saída:
+    - O dicionário contém uma entrada para cada entidade de `ENTIDADES`.
+
+    E) DESCRIÇÃO:
+    1. Importa localmente os módulos de domínio para evitar importações circulares.
+    2. Lê as constantes de caminho no momento da chamada, respeitando eventuais alterações feitas em tempo de execução.
+    3. Retorna o dicionário montado.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Função de uso interno deste módulo.
+    """
+    from modulos import produto, funcionario, estoque, carrinho, unidades
+
+    return {
+        "produtos": produto.PRODUTOS_JSON,
+        "funcionarios": funcionario.FUNCIONARIOS_JSON,
+        "estoques": estoque.ESTOQUES_JSON,
+        "carrinhos": carrinho.CARRINHOS_JSON,
+        "unidades": unidades.UNIDADES_JSON
+    }
+
+
+class _LeitorObjetoJSON:
+    """
+    Leitor incremental de um arquivo JSON cujo valor de topo é um objeto.
+    Mantém em memória apenas um bloco do arquivo e o registro sendo decodificado.
+    """
+
+    def __init__(self, arquivo, tamanho_bloco: int):
+        self.arquivo = arquivo
+        self.tamanho_bloco = tamanho_bloco
+        self.decodificador = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.fim = False
+
+    def _ler_bloco(self):
+        """Descarta o trecho já consumido e acrescenta o próximo bloco do arquivo ao buffer."""
+        bloco = self.arquivo.read(self.tamanho_bloco)
+        if not bloco:
+            self.fim = True
+            return False
+        self.buffer = self.buffer[self.pos:] + bloco
+        self.pos = 0
+        return True
+
+    def proximo_caractere(self):
+        """Pula espaços em branco e retorna o próximo caractere sem consumi-lo ('' no fim do arquivo)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._ler_bloco():
+                return ""
+
+    def consumir(self, esperado: str):
+        """Consome o caractere estrutural esperado, ou lança `ValueError`."""
+        encontrado = self.proximo_caractere()
+        if encontrado != esperado:
+            raise ValueError(f"JSON inválido: esperado '{esperado}', encontrado '{encontrado or 'fim do arquivo'}'.")
+        self.pos += 1
+
+    def valor(self):
+        """Decodifica o próximo valor JSON completo, lendo mais blocos enquanto ele estiver incompleto."""
+        self.proximo_caractere()
+        while True:
+            try:
+                valor, fim = self.decodificador.raw_decode(self.buffer, self.pos)
+                # Um valor que termina exatamente no fim do buffer pode estar truncado (ex: números)
+                if fim < len(self.buffer) or self.fim:
+                    self.pos = fim
+                    return valor
+            except json.JSONDecodeError:
+                if self.fim:
+                    raise
+            self._ler_bloco()
+
+
+def _iterar_objeto_json(arquivo, tamanho_bloco: int = 65536):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _iterar_objeto_json()
+
+    B) OBJETIVO:
+    Percorrer os pares chave-valor do objeto de topo de um arquivo JSON sem carregar o documento inteiro na memória.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: arquivo (arquivo de texto aberto para leitura)
+    Arquivo cujo conteúdo é um objeto JSON, como os gravados por `ArmazenamentoJSON.salvar()`.
+    PARÂMETRO 2: tamanho_bloco (inteiro, opcional)
+    Número de caracteres lidos do arquivo por vez.
+
+    RETORNO 1: GERADOR de tuplas (<chave em string>, <valor desserializado>), na ordem do arquivo.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - O conteúdo do arquivo é um objeto JSON (ou está vazio).
+
+    Assertiva(s) de saída:
+    - Cada registro é entregue assim que termina de ser lido.
+
+    E) DESCRIÇÃO:
+    1. Se o arquivo estiver vazio, não produz nenhum par.
+    2. Consome a chave de abertura do objeto de topo.
+    3. Para cada membro, decodifica a chave e o valor com `json.JSONDecoder.raw_decode`, lendo mais blocos do arquivo sempre que o registro atual estiver incompleto.
+    4. Entrega o par e consome a vírgula seguinte, até encontrar a chave de fechamento.
+
+    F) HIPÓTESES:
+    - Cada registro individual cabe na memória.
+
+    G) RESTRIÇÕES:
+    - Lança `ValueError` (ou `json.JSONDecodeError`) se o conteúdo não for um objeto JSON válido.
+    - Função de uso interno deste módulo.
+    """
+    leitor = _LeitorObjetoJSON(arquivo, tamanho_bloco)
+    if leitor.proximo_caractere() == "":
+        return
+    leitor.consumir("{")
+    if leitor.proximo_caractere() == "}":
+        return
+
+    while True:
+        chave = leitor.valor()
+        if not isinstance(chave, str):
+            raise ValueError("JSON inválido: chave de objeto deve ser string.")
+        leitor.consumir(":")
+        yield chave, leitor.valor()
+
+        if leitor.proximo_caractere() == "}":
+            return
+        leitor.consumir(",")
+
+
+class ArmazenamentoJSON:
+    suporta_parcial = False
+
+    def __init__(self, arquivos: dict = None, serializador=None, compressao: str = None):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Inicializar o mecanismo de armazenamento baseado em arquivos JSON, um arquivo por entidade.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: arquivos (dicionário, opcional)
+        Mapeamento {<entidade>: <caminho do arquivo>}. Se omitido, são usadas as constantes `*_JSON` dos módulos.
+        PARÂMETRO 2: serializador (objeto serializador, opcional)
+        Serializador usado para gravar e ler os arquivos (ver `serializacao.py`). Se omitido, usa o de `obter_serializador()` no momento de cada operação.
+        PARÂMETRO 3: compressao (string, opcional)
+        "gzip", "bz2" ou "lzma" para gravar os arquivos comprimidos (ver `compressao.py`). Se omitido, grava sem compressão. A leitura aceita qualquer formato.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `arquivos`, se fornecido, é um dicionário de strings.
+
+        Assertiva(s) de saída:
+        - Uma nova instância de `ArmazenamentoJSON` é criada.
+
+        E) DESCRIÇÃO:
+        1. Guarda o mapeamento de arquivos recebido (ou `None`, para usar o padrão).
+        2. Guarda o serializador recebido (ou `None`, para usar o atual) e a compressão de gravação.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Cada gravação reescreve o arquivo inteiro da entidade; por isso `suporta_parcial` é `False`.
+        - Lança `ValueError` para compressões desconhecidas.
+        """
+        if compressao is not None and compressao not in COMPRESSOES:
+            raise ValueError(f"Compressão desconhecida: {compressao}")
+        self.arquivos = arquivos
+        self.serializador = serializador
+        self.compressao = compressao
+
+    def _caminho(self, entidade: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _caminho()
+
+        B) OBJETIVO:
+        Obter o caminho do arquivo JSON associado a uma entidade.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade (ex: "produtos").
+
+        RETORNO 1: Caminho do arquivo (string).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `entidade` existe no mapeamento de arquivos.
+
+        Assertiva(s) de saída:
+        - Retorna uma string com o caminho.
+
+        E) DESCRIÇÃO:
+        1. Usa o mapeamento da instância ou, na sua ausência, o mapeamento padrão.
+        2. Retorna o caminho da entidade.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lança `KeyError` para entidades desconhecidas.
+        """
+        arquivos = self.arquivos if self.arquivos is not None else _arquivos_padrao()
+        return arquivos[entidade]
+
+    def salvar(self, entidade: str, registros: dict):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: salvar()
+
+        B) OBJETIVO:
+        Persistir todos os registros de uma entidade no seu arquivo JSON.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+        PARÂMETRO 2: registros (dicionário)
+        Dicionário {<chave>: <dicionário serializável>} com o registro completo da entidade.
+
+        RETORNO 1: Quantidade de registros gravados (inteiro).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `registros` contém todos os registros da entidade, pois o arquivo é reescrito.
+
+        Assertiva(s) de saída:
+        - O arquivo da entidade é criado ou substituído por inteiro; uma queda durante a escrita mantém a versão anterior.
+
+        E) DESCRIÇÃO:
+        1. Obtém o caminho do arquivo da entidade e acrescenta a extensão da compressão configurada, se houver.
+        2. Escreve o dicionário com o serializador (compacto por padrão; indentado apenas no modo "legivel"), registro a registro, através do compressor, em um arquivo temporário no mesmo diretório.
+        3. Força a gravação do temporário em disco com `os.fsync()` e troca-o pelo definitivo com `os.replace`, de forma atômica.
+        4. Remove as versões do mesmo arquivo gravadas com outra compressão (ou sem compressão), que ficaram obsoletas.
+        5. Retorna a quantidade de registros escritos.
+
+        F) HIPÓTESES:
+        - O diretório de destino existe e tem permissão de escrita.
+
+        G) RESTRIÇÕES:
+        - Possíveis erros de I/O não são tratados internamente.
+        """
+        caminho = self._caminho(entidade)
+        destino = caminho_comprimido(caminho, self.compressao)
+        temporario = destino + '.tmp'
+        with abrir_escrita(temporario, self.compressao) as f:
+            (self.serializador or obter_serializador()).escrever(f, registros)
+        # O compressor só termina o fluxo ao ser fechado; a sincronização é feita depois, pelo descritor do arquivo
+        descritor = os.open(temporario, os.O_RDONLY)
+        try:
+            os.fsync(descritor)
+        finally:
+            os.close(descritor)
+        os.replace(temporario, destino)
+        for outro in [caminho] + [caminho + extensao for _, extensao, _ in COMPRESSOES.values()]:
+            if outro != destino and os.path.exists(outro):
+                os.remove(outro)
+        return len(registros)
+
+    def carregar(self, entidade: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: carregar()
+
+        B) OBJETIVO:
+        Ler todos os registros de uma entidade a partir do seu arquivo JSON.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+
+        RETORNO 1: DICIONÁRIO {<chave em string>: <dicionário do registro>}
+        Vazio se o arquivo ainda não existir.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O arquivo, se existir, contém um JSON válido.
+
+        Assertiva(s) de saída:
+        - Retorna um dicionário (possivelmente vazio).
+
+        E) DESCRIÇÃO:
+        1. Localiza o arquivo da entidade, comprimido ou não, com `localizar_arquivo()`.
+        2. Lê e desserializa o arquivo com o serializador, descomprimindo-o se necessário; qualquer formatação é aceita.
+        3. Se nenhuma versão do arquivo existir, retorna um dicionário vazio.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Não trata `JSONDecodeError`.
+        """
+        caminho = localizar_arquivo(self._caminho(entidade))
+        if caminho is None:
+            return {}
+        with abrir_leitura(caminho) as f:
+            return (self.serializador or obter_serializador()).ler_arquivo(f)
+
+    def iterar(self, entidade: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: iterar()
+
+        B) OBJETIVO:
+        Percorrer os registros de uma entidade um a um, sem carregar o arquivo inteiro na memória.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+
+        RETORNO 1: GERADOR de tuplas (<chave em string>, <dicionário do registro>).
+        Não produz nada se o arquivo ainda não existir.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O arquivo, se existir, contém um objeto JSON válido.
+
+        Assertiva(s) de saída:
+        - Os registros são entregues na ordem do arquivo.
+
+        E) DESCRIÇÃO:
+        1. Localiza o arquivo da entidade, comprimido ou não; se não existir, encerra sem produzir registros.
+        2. Abre-o com `abrir_leitura()`, que descomprime em fluxo, e decodifica o texto em UTF-8.
+        3. Delega a leitura incremental a `_iterar_objeto_json()`.
+        4. Fecha o arquivo ao final (ou quando o gerador é descartado).
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O arquivo permanece aberto enquanto o gerador não for esgotado ou descartado.
+        """
+        caminho = localizar_arquivo(self._caminho(entidade))
+        if caminho is None:
+            return
+        with io.TextIOWrapper(abrir_leitura(caminho), encoding="utf-8") as arquivo:
+            yield from _iterar_objeto_json(arquivo)
+
+    def maior_chave_inteira(self, entidade: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: maior_chave_inteira()
+
+        B) OBJETIVO:
+        Obter a maior chave numérica gravada de uma entidade (ex: o último ID de carrinho), sem montar os objetos.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+
+        RETORNO 1: A maior chave convertida em inteiro, ou 0 se não houver registros.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - As chaves da entidade são inteiros gravados como string.
+
+        Assertiva(s) de saída:
+        - Nenhum registro é alterado.
+
+        E) DESCRIÇÃO:
+        1. Percorre os registros com `iterar()` e guarda a maior chave.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - No formato JSON não há índice: o arquivo é lido por inteiro, embora um registro por vez.
+        """
+        return max((int(chave) for chave, _ in self.iterar(entidade)), default=0)
+
+    def consultar(self, entidade: str, chave):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: consultar()
+
+        B) OBJETIVO:
+        Ler um único registro de uma entidade pela sua chave.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+        PARÂMETRO 2: chave (qualquer)
+        Chave do registro; é comparada na forma de string.
+
+        RETORNO 1: Dicionário do registro, ou `None` se não existir.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Retorna um dicionário ou `None`.
+
+        E) DESCRIÇÃO:
+        1. Delega para `consultar_varios()` com uma única chave.
+        2. Retorna o registro encontrado, se houver.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - No formato JSON não há índice: a consulta lê o arquivo inteiro.
+        """
+        return self.consultar_varios(entidade, [chave]).get(str(chave))
+
+    def consultar_varios(self, entidade: str, chaves):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: consultar_varios()
+
+        B) OBJETIVO:
+        Ler um conjunto de registros de uma entidade a partir de suas chaves.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+        PARÂMETRO 2: chaves (iterável)
+        Chaves dos registros desejados.
+
+        RETORNO 1: DICIONÁRIO {<chave em string>: <dicionário do registro>}
+        Contém apenas as chaves encontradas.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Retorna um dicionário (possivelmente vazio).
+
+        E) DESCRIÇÃO:
+        1. Converte as chaves pedidas para string.
+        2. Percorre o arquivo da entidade com `iterar()`, guardando apenas os registros pedidos.
+        3. Interrompe a leitura assim que todas as chaves forem encontradas.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - No formato JSON não há índice: no pior caso, a consulta lê o arquivo inteiro (mas nunca o mantém inteiro na memória).
+        """
+        procuradas = {str(c) for c in chaves}
+        encontrados = {}
+        if not procuradas:
+            return encontrados
+        for chave, dados in self.iterar(entidade):
+            if chave in procuradas:
+                encontrados[chave] = dados
+                if len(encontrados) == len(procuradas):
+                    break
+        return encontrados
+
+    def fechar(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: fechar()
+
+        B) OBJETIVO:
+        Liberar recursos do mecanismo de armazenamento.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Nenhuma.
+
+        E) DESCRIÇÃO:
+        1. O armazenamento em JSON não mantém recursos abertos; o método existe apenas para manter a interface comum.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        return None
+
+
+class ArmazenamentoSQLite:
+    suporta_parcial = True
+
+    def __init__(self, caminho: str = SQLITE_DB, serializador=None):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Abrir (ou criar) um banco SQLite que guarda todas as entidades, com um registro por linha e índice pela chave.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: caminho (string, opcional)
+        Caminho do arquivo do banco. Padrão: `SQLITE_DB`. Aceita ":memory:".
+        PARÂMETRO 2: serializador (objeto serializador, opcional)
+        Serializador usado para converter cada registro em texto (ver `serializacao.py`). Se omitido, usa o de `obter_serializador()` no momento de cada operação.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O diretório do arquivo existe e tem permissão de escrita.
+
+        Assertiva(s) de saída:
+        - A conexão fica aberta e a tabela `registros` existe.
+
+        E) DESCRIÇÃO:
+        1. Abre a conexão, permitindo uso por outras threads (o acesso é serializado pelo próprio objeto de conexão).
+        2. Ativa o modo WAL, que torna cada confirmação de transação mais barata.
+        3. Cria a tabela `registros(entidade, chave, dados)` cuja chave primária composta serve de índice para leituras pontuais.
+        4. Guarda o serializador recebido (ou `None`, para usar o atual).
+
+        F) HIPÓTESES:
+        - A versão do SQLite suporta `ON CONFLICT ... DO UPDATE` (3.24 ou superior).
+
+        G) RESTRIÇÕES:
+        - Os registros são guardados como texto JSON; não há colunas por atributo.
+        """
+        self.caminho = caminho
+        self.serializador = serializador
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.execute(
+            "CREATE TABLE IF NOT EXISTS registros ("
+            " entidade TEXT NOT NULL,"
+            " chave TEXT NOT NULL,"
+            " dados TEXT NOT NULL,"
+            " PRIMARY KEY (entidade, chave))"
+        )
+        self.conexao.commit()
+
+    def salvar(self, entidade: str, registros: dict):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: salvar()
+
+        B) OBJETIVO:
+        Inserir ou atualizar (upsert) os registros informados de uma entidade, em uma única transação.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+        PARÂMETRO 2: registros (dicionário)
+        Dicionário {<chave>: <dicionário serializável>}. Pode conter apenas os registros alterados.
+
+        RETORNO 1: Quantidade de linhas efetivamente inseridas ou alteradas no banco (inteiro).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Os valores de `registros` são serializáveis em JSON.
+
+        Assertiva(s) de saída:
+        - Cada registro informado está gravado no banco; os demais permanecem intactos.
+
+        E) DESCRIÇÃO:
+        1. Serializa cada registro com o serializador.
+        2. Executa um `INSERT ... ON CONFLICT DO UPDATE` por registro; a cláusula `WHERE` evita reescrever linhas cujo conteúdo não mudou.
+        3. Confirma a transação e retorna o número de linhas modificadas.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Registros ausentes do dicionário não são removidos do banco (ver `remover()`).
+        """
+        codificar = (self.serializador or obter_serializador()).codificar
+        antes = self.conexao.total_changes
+        with self.conexao:
+            self.conexao.executemany(
+                "INSERT INTO registros (entidade, chave, dados) VALUES (?, ?, ?) "
+                "ON CONFLICT (entidade, chave) DO UPDATE SET dados = excluded.dados "
+                "WHERE registros.dados <> excluded.dados",
+                (
+                    (entidade, str(chave), codificar(dados))
+                    for chave, dados in registros.items()
+                )
+            )
+        return self.conexao.total_changes - antes
+
+    def remover(self, entidade: str, chaves):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: remover()
+
+        B) OBJETIVO:
+        Apagar do banco os registros de uma entidade com as chaves informadas.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+        PARÂMETRO 2: chaves (iterável)
+        Chaves dos registros a apagar.
+
+        RETORNO 1: Quantidade de linhas removidas (inteiro).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Nenhum dos registros informados permanece no banco.
+
+        E) DESCRIÇÃO:
+        1. Executa um `DELETE` por chave dentro de uma transação.
+        2. Retorna o número de linhas afetadas.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        antes = self.conexao.total_changes
+        with self.conexao:
+            self.conexao.executemany(
+                "DELETE FROM registros WHERE entidade = ? AND chave = ?",
+                ((entidade, str(chave)) for chave in chaves)
+            )
+        return self.conexao.total_changes - antes
+
+    def carregar(self, entidade: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: carregar()
+
+        B) OBJETIVO:
+        Ler todos os registros de uma entidade, na ordem em que foram inseridos.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+
+        RETORNO 1: DICIONÁRIO {<chave em string>: <dicionário do registro>}
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Retorna um dicionário no mesmo formato produzido por `json.load()` sobre os arquivos JSON.
+
+        E) DESCRIÇÃO:
+        1. Seleciona as linhas da entidade ordenadas por `rowid` (ordem de inserção).
+        2. Desserializa cada linha e monta o dicionário de retorno.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        cursor = self.conexao.execute(
+            "SELECT chave, dados FROM registros WHERE entidade = ? ORDER BY rowid",
+            (entidade,)
+        )
+        decodificar = (self.serializador or obter_serializador()).decodificar
+        return {chave: decodificar(dados) for chave, dados in cursor}
+
+    def iterar(self, entidade: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: iterar()
+
+        B) OBJETIVO:
+        Percorrer os registros de uma entidade um a um, sem montar um dicionário com todos eles.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+
+        RETORNO 1: GERADOR de tuplas (<chave em string>, <dicionário do registro>).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Os registros são entregues na ordem de inserção.
+
+        E) DESCRIÇÃO:
+        1. Executa a mesma consulta de `carregar()`, ordenada por `rowid`.
+        2. Desserializa e entrega cada linha à medida que o cursor a devolve.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        cursor = self.conexao.execute(
+            "SELECT chave, dados FROM registros WHERE entidade = ? ORDER BY rowid",
+            (entidade,)
+        )
+        decodificar = (self.serializador or obter_serializador()).decodificar
+        for chave, dados in cursor:
+            yield chave, decodificar(dados)
+
+    def maior_chave_inteira(self, entidade: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: maior_chave_inteira()
+
+        B) OBJETIVO:
+        Obter a maior chave numérica gravada de uma entidade (ex: o último ID de carrinho), sem ler os registros.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+
+        RETORNO 1: A maior chave convertida em inteiro, ou 0 se não houver registros.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - As chaves da entidade são inteiros gravados como string.
+
+        Assertiva(s) de saída:
+        - Nenhum registro é alterado.
+
+        E) DESCRIÇÃO:
+        1. Executa um `SELECT MAX(CAST(chave AS INTEGER))` restrito à entidade.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - A consulta percorre apenas as chaves no índice da chave primária; a coluna `dados` não é lida nem desserializada.
+        """
+        linha = self.conexao.execute(
+            "SELECT MAX(CAST(chave AS INTEGER)) FROM registros WHERE entidade = ?",
+            (entidade,)
+        ).fetchone()
+        return linha[0] or 0
+
+    def consultar(self, entidade: str, chave):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: consultar()
+
+        B) OBJETIVO:
+        Ler um único registro de uma entidade usando o índice da chave primária.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+        PARÂMETRO 2: chave (qualquer)
+        Chave do registro; é comparada na forma de string.
+
+        RETORNO 1: Dicionário do registro, ou `None` se não existir.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Retorna um dicionário ou `None`.
+
+        E) DESCRIÇÃO:
+        1. Executa um `SELECT` pela chave primária composta.
+        2. Desserializa e retorna a linha encontrada.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        linha = self.conexao.execute(
+            "SELECT dados FROM registros WHERE entidade = ? AND chave = ?",
+            (entidade, str(chave))
+        ).fetchone()
+        return (self.serializador or obter_serializador()).decodificar(linha[0]) if linha else None
+
+    def consultar_varios(self, entidade: str, chaves):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: consultar_varios()
+
+        B) OBJETIVO:
+        Ler um conjunto de registros de uma entidade a partir de suas chaves, usando o índice.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Nome da entidade.
+        PARÂMETRO 2: chaves (iterável)
+        Chaves dos registros desejados.
+
+        RETORNO 1: DICIONÁRIO {<chave em string>: <dicionário do registro>}
+        Contém apenas as chaves encontradas.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Retorna um dicionário (possivelmente vazio).
+
+        E) DESCRIÇÃO:
+        1. Divide as chaves em lotes que respeitam o limite de parâmetros do SQLite.
+        2. Executa um `SELECT ... IN (...)` por lote e acumula os resultados.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - A ordem do dicionário retornado segue a ordem do banco, não a das chaves pedidas.
+        """
+        chaves = [str(c) for c in chaves]
+        decodificar = (self.serializador or obter_serializador()).decodificar
+        encontrados = {}
+        for inicio in range(0, len(chaves), 500):
+            lote = chaves[inicio:inicio + 500]
+            marcadores = ",".join("?" * len(lote))
+            cursor = self.conexao.execute(
+                f"SELECT chave, dados FROM registros WHERE entidade = ? AND chave IN ({marcadores})",
+                (entidade, *lote)
+            )
+            for chave, dados in cursor:
+                encontrados[chave] = decodificar(dados)
+        return encontrados
+
+    def fechar(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: fechar()
+
+        B) OBJETIVO:
+        Fechar a conexão com o banco SQLite.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - A conexão é encerrada; a instância não deve mais ser usada.
+
+        E) DESCRIÇÃO:
+        1. Invoca `close()` na conexão.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        self.conexao.close()
+
+
+def criar_armazenamento(tipo: str = "json", caminho: str = None, compressao: str = None):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: criar_armazenamento()
+
+    B) OBJETIVO:
+    Construir um mecanismo de armazenamento a partir do seu nome.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: tipo (string, opcional)
+    "json" (padrão) ou "sqlite".
+    PARÂMETRO 2: caminho (string, opcional)
+    Caminho do banco, usado apenas pelo tipo "sqlite".
+    PARÂMETRO 3: compressao (string, opcional)
+    Compressão dos arquivos ("gzip", "bz2" ou "lzma"), usada apenas pelo tipo "json".
+
+    RETORNO 1: Instância de `ArmazenamentoJSON` ou `ArmazenamentoSQLite`.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `tipo` é "json" ou "sqlite".
+
+    Assertiva(s) de saída:
+    - Retorna um objeto com a interface `salvar`/`carregar`/`consultar`/`consultar_varios`/`fechar`.
+
+    E) DESCRIÇÃO:
+    1. Compara o `tipo` recebido com os tipos conhecidos.
+    2. Instancia e retorna o mecanismo correspondente.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Lança `ValueError` para tipos desconhecidos.
+    """
+    if tipo == "json":
+        return ArmazenamentoJSON(compressao=compressao)
+    if tipo == "sqlite":
+        return ArmazenamentoSQLite(caminho or SQLITE_DB)
+    raise ValueError(f"Tipo de armazenamento desconhecido: {tipo}")
+
+
+def definir_armazenamento(armazenamento):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: definir_armazenamento()
+
+    B) OBJETIVO:
+    Escolher o mecanismo de armazenamento usado pelas funções `salvar_*` e `carregar_*` de todos os módulos.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: armazenamento (objeto de armazenamento ou None)
+    Mecanismo a ser usado. `None` restaura o padrão (arquivos JSON).
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `armazenamento` implementa a interface comum ou é `None`.
+
+    Assertiva(s) de saída:
+    - As próximas chamadas a `obter_armazenamento()` retornam o mecanismo informado.
+
+    E) DESCRIÇÃO:
+    1. Atualiza a variável global `_armazenamento_atual`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - O mecanismo anterior não é fechado automaticamente.
+    """
+    global _armazenamento_atual
+    _armazenamento_atual = armazenamento
+
+
+def obter_armazenamento():
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: obter_armazenamento()
+
+    B) OBJETIVO:
+    Retornar o mecanismo de armazenamento em uso.
+
+    C) ACOPLAMENTO:
+    PARÂMETROS: Nenhum.
+
+    RETORNO 1: O mecanismo definido por `definir_armazenamento()` ou, na ausência dele, um `ArmazenamentoJSON`.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Nunca retorna `None`.
+
+    E) DESCRIÇÃO:
+    1. Se nenhum mecanismo foi definido, cria e guarda um `ArmazenamentoJSON`.
+    2. Retorna o mecanismo atual.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Nenhuma.
+    """
+    global _armazenamento_atual
+    if _armazenamento_atual is None:
+        _armazenamento_atual = ArmazenamentoJSON()
+    return _armazenamento_atual
+
+
+def migrar_armazenamento(origem, destino, entidades=ENTIDADES):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: migrar_armazenamento()
+
+    B) OBJETIVO:
+    Copiar os registros de um mecanismo de armazenamento para outro (ex: dos arquivos JSON para o SQLite).
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: origem (objeto de armazenamento)
+    Mecanismo de onde os registros são lidos.
+    PARÂMETRO 2: destino (objeto de armazenamento)
+    Mecanismo onde os registros são gravados.
+    PARÂMETRO 3: entidades (iterável de strings, opcional)
+    Entidades a copiar. Padrão: todas.
+
+    RETORNO 1: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Migração concluída", "dados": {<entidade>: <registros gravados>}}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Ambos os mecanismos implementam a interface comum.
+
+    Assertiva(s) de saída:
+    - O destino contém todos os registros da origem para as entidades informadas.
+
+    E) DESCRIÇÃO:
+    1. Para cada entidade, carrega os registros da origem.
+    2. Grava-os no destino e acumula a contagem por entidade.
+    3. Retorna um dicionário de sucesso com as contagens.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Registros que existam apenas no destino não são removidos.
+    """
+    contagem = {}
+    for entidade in entidades:
+        contagem[entidade] = destino.salvar(entidade, origem.carregar(entidade))
+    return {"retorno": 0, "mensagem": "Migração concluída", "dados": contagem}
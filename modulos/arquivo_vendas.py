@@ -0,0 +1,742 @@
+import json
+import os
+import shutil
+import threading
+from itertools import islice
+from .carrinho import totalizar_vendas
+from .vendas_paginadas import TAMANHO_PAGINA
+
+
+__all__ = [
+    "ArquivoVendas"
+]
+
+
+PASTA_ARQUIVO_VENDAS = 'dados/vendas'
+MANIFESTO = 'manifesto.json'
+
+
+def _chave_mes(data: str):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _chave_mes()
+
+    B) OBJETIVO:
+    Obter a chave da partição mensal ("AAAA-MM") de uma data no formato do sistema.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: data (string)
+    Data no formato "AAAA/MM/DD".
+
+    RETORNO 1: String "AAAA-MM".
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `data` está no formato "AAAA/MM/DD".
+
+    Assertiva(s) de saída:
+    - A chave também é o nome do arquivo da partição (sem a extensão).
+
+    E) DESCRIÇÃO:
+    1. Troca a primeira barra por hífen nos sete primeiros caracteres.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Função de uso interno deste módulo; não valida a data.
+    """
+    return data[:7].replace('/', '-')
+
+
+def _truncar_linha_incompleta(arquivo):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _truncar_linha_incompleta()
+
+    B) OBJETIVO:
+    Remover do fim de uma partição a linha deixada pela metade por uma escrita interrompida, antes que outra venda seja anexada depois dela.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: arquivo (arquivo binário)
+    Partição aberta para leitura e escrita (ex: modo 'ab+').
+
+    RETORNO 1: Número de bytes removidos (inteiro); 0 se o arquivo estiver vazio ou terminar em uma quebra de linha.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - O arquivo está vazio ou termina em uma quebra de linha.
+
+    E) DESCRIÇÃO:
+    1. Lê o último byte do arquivo; se for uma quebra de linha (ou o arquivo estiver vazio), não há o que reparar.
+    2. Procura a última quebra de linha lendo blocos a partir do fim.
+    3. Trunca o arquivo logo depois dela (ou no início, se não houver nenhuma).
+
+    F) HIPÓTESES:
+    - Cada venda é gravada em uma única linha terminada por quebra de linha, como em `ArquivoVendas.arquivar()`.
+
+    G) RESTRIÇÕES:
+    - Lê apenas o fim do arquivo, e não a partição inteira; no caso comum, um único byte.
+    - A truncagem vai para o disco junto com a próxima escrita, no `os.fsync()` de quem chama.
+    """
+    fim = arquivo.seek(0, os.SEEK_END)
+    if fim == 0:
+        return 0
+    arquivo.seek(fim - 1)
+    if arquivo.read(1) == b'\n':
+        return 0
+    corte = 0
+    posicao = fim
+    while posicao > 0:
+        inicio = max(0, posicao - 4096)
+        arquivo.seek(inicio)
+        quebra = arquivo.read(posicao - inicio).rfind(b'\n')
+        if quebra >= 0:
+            corte = inicio + quebra + 1
+            break
+        posicao = inicio
+    arquivo.truncate(corte)
+    return fim - corte
+
+
+class ArquivoVendas:
+
+    def __init__(self, pasta: str = PASTA_ARQUIVO_VENDAS):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Inicializar o arquivo de vendas finalizadas, particionado por unidade e por mês.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: pasta (string, opcional)
+        Pasta raiz do arquivo. Cada unidade tem uma subpasta com um arquivo por mês ("AAAA-MM.jsonl") e um manifesto.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Uma nova instância de `ArquivoVendas` é criada. As pastas só são criadas na primeira venda arquivada.
+
+        E) DESCRIÇÃO:
+        1. Armazena a pasta raiz.
+        2. Inicializa o cache dos manifestos já lidos e o conjunto das unidades cujo manifesto ainda não foi gravado.
+        3. Cria a trava que protege os manifestos quando `gravar_manifestos()` é chamada por outra thread (ex: salvamento automático).
+
+        F) HIPÓTESES:
+        - Apenas um processo usa a pasta do arquivo por vez.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        self.pasta = pasta
+        self._manifestos = {}
+        self._pendentes = set()
+        self._trava = threading.Lock()
+
+    def manifesto(self, codigo_unidade: int):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: manifesto()
+
+        B) OBJETIVO:
+        Obter o manifesto das partições de uma unidade.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo_unidade (inteiro)
+        Código da unidade.
+
+        RETORNO 1: DICIONÁRIO
+        {"meses": {"AAAA-MM": {"quantidade": int, "total": float, "data_min": str, "data_max": str}}, "ignoradas": int}
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Uma unidade sem vendas arquivadas tem um manifesto vazio.
+
+        E) DESCRIÇÃO:
+        1. Se o manifesto já estiver em cache, retorna-o.
+        2. Caso contrário, lê o arquivo de manifesto da unidade (ou cria um vazio) e guarda-o em cache.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O dicionário retornado é o próprio cache; não deve ser alterado por quem o recebe.
+        """
+        if codigo_unidade not in self._manifestos:
+            caminho = os.path.join(self._pasta_unidade(codigo_unidade), MANIFESTO)
+            if os.path.exists(caminho):
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    self._manifestos[codigo_unidade] = json.load(f)
+            else:
+                self._manifestos[codigo_unidade] = {"meses": {}, "ignoradas": 0}
+        return self._manifestos[codigo_unidade]
+
+    def arquivar(self, codigo_unidade: int, carrinho):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: arquivar()
+
+        B) OBJETIVO:
+        Anexar uma venda finalizada à partição do seu mês e atualizar o manifesto da unidade.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo_unidade (inteiro)
+        Código da unidade em que a venda foi registrada.
+        PARÂMETRO 2: carrinho (Carrinho)
+        O carrinho finalizado.
+
+        RETORNO 1: DICIONÁRIO DE VENDA SEM DATA:
+        {"retorno": 1, "mensagem": "Venda sem data não arquivada"}
+
+        RETORNO 2: DICIONÁRIO DE SUCESSO:
+        {"retorno": 0, "mensagem": "Venda arquivada", "dados": "AAAA-MM"}
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O carrinho foi finalizado (`data_hora` definido).
+
+        Assertiva(s) de saída:
+        - A venda é a última linha da partição do seu mês, gravada em disco, e o manifesto em cache reflete a nova contagem, o total e as datas extremas.
+
+        E) DESCRIÇÃO:
+        1. Se o carrinho não tiver data, apenas conta-o como ignorado no manifesto em cache.
+        2. Serializa o carrinho com `to_json()`; se o total ainda não foi calculado, preenche-o no registro com `totalizar_vendas()`, pelos preços vigentes na data da venda, sem alterar o carrinho.
+        3. Abre a partição do mês e remove uma linha incompleta deixada no fim dela por uma escrita interrompida, com `_truncar_linha_incompleta()`.
+        4. Anexa a linha JSON e força a gravação em disco com `os.fsync()`.
+        5. Atualiza a entrada do mês no manifesto em cache e marca-o como pendente; ele é gravado por `gravar_manifestos()`.
+
+        F) HIPÓTESES:
+        - `gravar_manifestos()` é chamada nos pontos de gravação do sistema (ex: por `salvar_unidades()`).
+
+        G) RESTRIÇÕES:
+        - O manifesto não é regravado a cada venda: se o programa for interrompido antes de `gravar_manifestos()`, ele fica atrás das partições e do histórico, e `sincronizar()` refaz o arquivo da unidade na próxima execução.
+        """
+        manifesto = self.manifesto(codigo_unidade)
+        if carrinho.data_hora is None:
+            with self._trava:
+                manifesto["ignoradas"] += 1
+                self._pendentes.add(codigo_unidade)
+            return {"retorno": 1, "mensagem": "Venda sem data não arquivada"}
+
+        registro = carrinho.to_json()
+        if registro["total"] is None:
+            registro["total"] = totalizar_vendas([carrinho])[0]
+        mes = _chave_mes(carrinho.data_hora)
+
+        pasta = self._pasta_unidade(codigo_unidade)
+        os.makedirs(pasta, exist_ok=True)
+        with open(os.path.join(pasta, mes + '.jsonl'), 'ab+') as f:
+            _truncar_linha_incompleta(f)
+            f.write((json.dumps(registro, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+        with self._trava:
+            self._acumular(manifesto, mes, registro)
+            self._pendentes.add(codigo_unidade)
+        return {"retorno": 0, "mensagem": "Venda arquivada", "dados": mes}
+
+    def gravar_manifestos(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: gravar_manifestos()
+
+        B) OBJETIVO:
+        Gravar os manifestos alterados por `arquivar()` desde a última gravação.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: Número de manifestos gravados (inteiro).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Nenhum manifesto fica pendente.
+
+        E) DESCRIÇÃO:
+        1. Com a trava, grava o manifesto de cada unidade pendente com `_gravar_manifesto()` e esvazia o conjunto de pendentes.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Pode ser chamada por outra thread enquanto vendas são arquivadas; a trava impede que um manifesto seja gravado no meio de uma atualização.
+        """
+        with self._trava:
+            for codigo_unidade in self._pendentes:
+                self._gravar_manifesto(codigo_unidade)
+            gravados = len(self._pendentes)
+            self._pendentes.clear()
+        return gravados
+
+    def reconstruir(self, unidade):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: reconstruir()
+
+        B) OBJETIVO:
+        Refazer as partições e o manifesto de uma unidade a partir do seu histórico de vendas.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: unidade (Localidade)
+        A unidade cujo arquivo será refeito.
+
+        RETORNO 1: Número de vendas arquivadas (inteiro).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O histórico `unidade.vendas` pode ser percorrido (carrinhos em memória ou no armazenamento).
+
+        Assertiva(s) de saída:
+        - O arquivo da unidade contém exatamente as vendas com data do histórico, na ordem do histórico.
+
+        E) DESCRIÇÃO:
+        1. Remove a pasta da unidade, se existir, e recria-a.
+        2. Percorre o histórico em blocos de `TAMANHO_PAGINA` vendas; conta as sem data como ignoradas e obtém os totais das demais com uma chamada a `totalizar_vendas()` por bloco, pelos preços vigentes na data de cada venda e sem alterar os carrinhos.
+        3. Anexa cada venda com data à partição do seu mês (mantendo abertos os arquivos já usados).
+        4. Força a gravação das partições em disco com `os.fsync()`; só então acumula o manifesto em memória e grava-o, retirando a unidade dos pendentes.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lê o histórico inteiro da unidade; destina-se à migração e à recuperação, não ao uso corrente.
+        """
+        pasta = self._pasta_unidade(unidade.codigo)
+        shutil.rmtree(pasta, ignore_errors=True)
+        os.makedirs(pasta, exist_ok=True)
+
+        manifesto = {"meses": {}, "ignoradas": 0}
+        arquivos = {}
+        arquivadas = 0
+        vendas = iter(unidade.vendas)
+        try:
+            while True:
+                pagina = list(islice(vendas, TAMANHO_PAGINA))
+                if not pagina:
+                    break
+                datadas = [carrinho for carrinho in pagina if carrinho.data_hora is not None]
+                manifesto["ignoradas"] += len(pagina) - len(datadas)
+                for carrinho, total in zip(datadas, totalizar_vendas(datadas)):
+                    registro = carrinho.to_json()
+                    registro["total"] = total
+                    mes = _chave_mes(carrinho.data_hora)
+                    if mes not in arquivos:
+                        arquivos[mes] = open(os.path.join(pasta, mes + '.jsonl'), 'w', encoding='utf-8')
+                    arquivos[mes].write(json.dumps(registro, ensure_ascii=False, separators=(',', ':')) + '\n')
+                    self._acumular(manifesto, mes, registro)
+                    arquivadas += 1
+            for arquivo in arquivos.values():
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+        finally:
+            for arquivo in arquivos.values():
+                arquivo.close()
+
+        with self._trava:
+            self._manifestos[unidade.codigo] = manifesto
+            self._gravar_manifesto(unidade.codigo)
+            self._pendentes.discard(unidade.codigo)
+        return arquivadas
+
+    def sincronizar(self, unidades):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: sincronizar()
+
+        B) OBJETIVO:
+        Garantir que o arquivo de cada unidade corresponda ao seu histórico de vendas, refazendo os que divergirem.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: unidades (iterável de Localidade)
+        Unidades a verificar.
+
+        RETORNO 1: Lista com os códigos das unidades cujo arquivo foi refeito.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - As unidades já foram carregadas.
+
+        Assertiva(s) de saída:
+        - Para cada unidade, o manifesto contabiliza o mesmo número de vendas do histórico, a última data arquivada é a última do histórico e a partição do último mês tem exatamente as vendas, o total e a data máxima do manifesto.
+
+        E) DESCRIÇÃO:
+        1. Para cada unidade, verifica com `_divergente()` se o arquivo diverge do histórico.
+        2. Se divergir, refaz o arquivo com `reconstruir()`.
+
+        F) HIPÓTESES:
+        - As vendas só entram no histórico por `Localidade.registrar_venda()`, que também as arquiva.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        refeitas = []
+        for unidade in unidades:
+            if self._divergente(unidade):
+                self.reconstruir(unidade)
+                refeitas.append(unidade.codigo)
+        return refeitas
+
+    def _divergente(self, unidade):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _divergente()
+
+        B) OBJETIVO:
+        Verificar, sem ler o histórico inteiro, se o arquivo de uma unidade deixou de corresponder ao seu histórico de vendas.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: unidade (Localidade)
+        A unidade a verificar.
+
+        RETORNO 1: `True` se o arquivo precisa ser refeito; `False` caso contrário.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O histórico `unidade.vendas` é um `VendasPaginadas`.
+
+        Assertiva(s) de saída:
+        - Nenhum arquivo é alterado.
+
+        E) DESCRIÇÃO:
+        1. Compara a soma das vendas do manifesto (arquivadas e ignoradas) com o tamanho do histórico.
+        2. Se todas as datas do histórico forem conhecidas, compara a maior delas com a maior `data_max` do manifesto.
+        3. Lê a partição do último mês do manifesto e compara a sua contagem, o seu total e a sua data máxima com os da entrada do mês; uma linha corrompida também torna o arquivo divergente.
+
+        F) HIPÓTESES:
+        - As vendas são registradas com a data do dia, de modo que as gravações interrompidas afetam o último mês.
+
+        G) RESTRIÇÕES:
+        - Os totais das vendas não são comparados com os do histórico, o que exigiria carregar todos os carrinhos; a verificação do último mês detecta as vendas anexadas à partição cujo manifesto e cuja unidade não chegaram a ser gravados.
+        - Método de uso interno da classe.
+        """
+        manifesto = self.manifesto(unidade.codigo)
+        meses = manifesto["meses"]
+        if sum(mes["quantidade"] for mes in meses.values()) + manifesto["ignoradas"] != len(unidade.vendas):
+            return True
+        if not meses:
+            return False
+
+        datas = unidade.vendas.datas()
+        if None not in datas:
+            if max(datas, default=None) != max(mes["data_max"] for mes in meses.values()):
+                return True
+
+        ultimo = max(meses)
+        resumo = meses[ultimo]
+        quantidade, total, data_max = 0, 0, None
+        try:
+            for registro in self._ler_particao(unidade.codigo, ultimo):
+                quantidade += 1
+                total = round(total + registro["total"], 2)
+                data_max = registro["data_hora"] if data_max is None else max(data_max, registro["data_hora"])
+        except (OSError, ValueError):
+            return True
+        return (quantidade, total, data_max) != (resumo["quantidade"], resumo["total"], resumo["data_max"])
+
+    def particoes(self, codigo_unidade: int, inicio: str, fim: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: particoes()
+
+        B) OBJETIVO:
+        Listar as partições de uma unidade cujas vendas podem estar dentro de um período.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo_unidade (inteiro)
+        Código da unidade.
+        PARÂMETRO 2: inicio (string)
+        Data inicial ("AAAA/MM/DD"), inclusiva.
+        PARÂMETRO 3: fim (string)
+        Data final ("AAAA/MM/DD"), inclusiva.
+
+        RETORNO 1: Lista de chaves "AAAA-MM", em ordem cronológica.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - As datas estão no formato "AAAA/MM/DD".
+
+        Assertiva(s) de saída:
+        - Nenhuma partição fora da lista contém vendas do período.
+
+        E) DESCRIÇÃO:
+        1. Seleciona, no manifesto, os meses cujo intervalo [data_min, data_max] se sobrepõe ao período.
+        2. Retorna as chaves ordenadas.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Compara as datas como texto, o que é válido para o formato "AAAA/MM/DD".
+        """
+        meses = self.manifesto(codigo_unidade)["meses"]
+        return sorted(mes for mes, resumo in meses.items()
+                      if resumo["data_min"] <= fim and resumo["data_max"] >= inicio)
+
+    def iterar_periodo(self, codigo_unidade: int, inicio: str, fim: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: iterar_periodo()
+
+        B) OBJETIVO:
+        Percorrer as vendas arquivadas de uma unidade dentro de um período, lendo apenas as partições necessárias.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo_unidade (inteiro)
+        Código da unidade.
+        PARÂMETRO 2: inicio (string)
+        Data inicial ("AAAA/MM/DD"), inclusiva.
+        PARÂMETRO 3: fim (string)
+        Data final ("AAAA/MM/DD"), inclusiva.
+
+        RETORNO 1: Gerador de dicionários no formato de `Carrinho.to_json()`, com o total preenchido.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - As datas estão no formato "AAAA/MM/DD".
+
+        Assertiva(s) de saída:
+        - Cada venda do período é produzida uma vez, em ordem cronológica de mês e, dentro do mês, na ordem em que foi arquivada.
+
+        E) DESCRIÇÃO:
+        1. Obtém as partições que se sobrepõem ao período com `particoes()`.
+        2. Se a partição estiver inteiramente dentro do período, produz todas as suas vendas sem comparar datas.
+        3. Caso contrário, produz apenas as vendas cuja data está no período.
+        4. As partições são lidas com `_ler_particao()`, que ignora uma linha incompleta no fim e lança `ValueError` em uma linha corrompida.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo depende do número de vendas dos meses do período, e não do histórico inteiro da unidade.
+        """
+        meses = self.manifesto(codigo_unidade)["meses"]
+        for mes in self.particoes(codigo_unidade, inicio, fim):
+            inteira = inicio <= meses[mes]["data_min"] and meses[mes]["data_max"] <= fim
+            for registro in self._ler_particao(codigo_unidade, mes):
+                if inteira or inicio <= registro["data_hora"] <= fim:
+                    yield registro
+
+    def resumo_periodo(self, codigo_unidade: int, inicio: str, fim: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: resumo_periodo()
+
+        B) OBJETIVO:
+        Calcular a quantidade de vendas e a renda de uma unidade em um período, usando o manifesto sempre que possível.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo_unidade (inteiro)
+        Código da unidade.
+        PARÂMETRO 2: inicio (string)
+        Data inicial ("AAAA/MM/DD"), inclusiva.
+        PARÂMETRO 3: fim (string)
+        Data final ("AAAA/MM/DD"), inclusiva.
+
+        RETORNO 1: DICIONÁRIO {"quantidade": int, "total": float}
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - As datas estão no formato "AAAA/MM/DD".
+
+        Assertiva(s) de saída:
+        - O resultado é igual ao obtido somando as vendas de `iterar_periodo()`.
+
+        E) DESCRIÇÃO:
+        1. Para cada partição que se sobrepõe ao período, se ela estiver inteiramente dentro dele, soma a contagem e o total do manifesto.
+        2. Caso contrário, lê a partição com `_ler_particao()` e soma apenas as vendas do período.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Apenas as partições das bordas do período são lidas.
+        """
+        meses = self.manifesto(codigo_unidade)["meses"]
+        quantidade = 0
+        total = 0
+        for mes in self.particoes(codigo_unidade, inicio, fim):
+            resumo = meses[mes]
+            if inicio <= resumo["data_min"] and resumo["data_max"] <= fim:
+                quantidade += resumo["quantidade"]
+                total += resumo["total"]
+                continue
+            for registro in self._ler_particao(codigo_unidade, mes):
+                if inicio <= registro["data_hora"] <= fim:
+                    quantidade += 1
+                    total += registro["total"]
+        return {"quantidade": quantidade, "total": total}
+
+    def _ler_particao(self, codigo_unidade: int, mes: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _ler_particao()
+
+        B) OBJETIVO:
+        Percorrer as vendas de uma partição, distinguindo a linha interrompida no fim do arquivo de uma linha corrompida.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo_unidade (inteiro)
+        Código da unidade.
+        PARÂMETRO 2: mes (string)
+        Chave "AAAA-MM" da partição.
+
+        RETORNO 1: Gerador de dicionários no formato de `Carrinho.to_json()`, na ordem em que foram arquivados.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - A partição existe.
+
+        Assertiva(s) de saída:
+        - A partição não é alterada.
+
+        E) DESCRIÇÃO:
+        1. Lê a partição linha a linha.
+        2. Uma última linha sem quebra de linha é de uma escrita interrompida: não é produzida (e `arquivar()` a remove antes de anexar a venda seguinte).
+        3. Uma linha completa que não é JSON válido lança `ValueError`, com a partição e o número da linha, em vez de encerrar a leitura em silêncio.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Método de uso interno da classe.
+        """
+        caminho = os.path.join(self._pasta_unidade(codigo_unidade), mes + '.jsonl')
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for numero, linha in enumerate(f, start=1):
+                if not linha.endswith('\n'):
+                    return
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    raise ValueError(f"Linha {numero} corrompida na partição {mes} da unidade {codigo_unidade}.") from None
+                yield registro
+
+    def _pasta_unidade(self, codigo_unidade: int):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _pasta_unidade()
+
+        B) OBJETIVO:
+        Obter a pasta com as partições de uma unidade.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo_unidade (inteiro)
+        Código da unidade.
+
+        RETORNO 1: Caminho da pasta (string).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - A pasta não é criada.
+
+        E) DESCRIÇÃO:
+        1. Junta a pasta raiz com o código da unidade.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Método de uso interno da classe.
+        """
+        return os.path.join(self.pasta, str(codigo_unidade))
+
+    @staticmethod
+    def _acumular(manifesto: dict, mes: str, registro: dict):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _acumular()
+
+        B) OBJETIVO:
+        Incluir uma venda na entrada do seu mês no manifesto.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: manifesto (dicionário)
+        Manifesto da unidade.
+        PARÂMETRO 2: mes (string)
+        Chave "AAAA-MM" da partição.
+        PARÂMETRO 3: registro (dicionário)
+        Venda serializada, com `data_hora` e `total` preenchidos.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - A entrada do mês conta a venda, soma o seu total e abrange a sua data.
+
+        E) DESCRIÇÃO:
+        1. Cria a entrada do mês, se não existir.
+        2. Incrementa a quantidade, soma o total e ajusta as datas mínima e máxima.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Método de uso interno da classe.
+        """
+        data = registro["data_hora"]
+        resumo = manifesto["meses"].setdefault(mes, {"quantidade": 0, "total": 0, "data_min": data, "data_max": data})
+        resumo["quantidade"] += 1
+        resumo["total"] = round(resumo["total"] + registro["total"], 2)
+        resumo["data_min"] = min(resumo["data_min"], data)
+        resumo["data_max"] = max(resumo["data_max"], data)
+
+    def _gravar_manifesto(self, codigo_unidade: int):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _gravar_manifesto()
+
+        B) OBJETIVO:
+        Gravar o manifesto de uma unidade de forma atômica.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo_unidade (inteiro)
+        Código da unidade.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O manifesto da unidade está em cache.
+
+        Assertiva(s) de saída:
+        - O arquivo de manifesto contém o manifesto em cache.
+
+        E) DESCRIÇÃO:
+        1. Cria a pasta da unidade, se necessário.
+        2. Escreve o manifesto em um arquivo temporário, força a sua gravação em disco com `os.fsync()` e troca-o pelo definitivo com `os.replace`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Método de uso interno da classe.
+        """
+        pasta = self._pasta_unidade(codigo_unidade)
+        os.makedirs(pasta, exist_ok=True)
+        caminho = os.path.join(pasta, MANIFESTO)
+        with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self._manifestos[codigo_unidade], f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(caminho + '.tmp', caminho)
@@ -0,0 +1,199 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .armazenamento import obter_armazenamento, ArmazenamentoJSON
+from .produto import carregar_produtos
+from .funcionario import carregar_funcionarios
+from .estoque import carregar_estoques
+from .carrinho import carregar_carrinhos, carregar_ultimo_id
+from .unidades import carregar_unidades
+from .contexto_carga import ContextoCarga
+
+
+__all__ = [
+    "carregar_em_paralelo",
+    "formatar_tempos"
+]
+
+
+# Ordem de resolução: cada entidade só referencia entidades anteriores
+# (estoques -> produtos; carrinhos -> produtos, funcionarios; unidades -> estoques, funcionarios, carrinhos)
+_ETAPAS = [
+    ("produtos", carregar_produtos),
+    ("funcionarios", carregar_funcionarios),
+    ("estoques", carregar_estoques),
+    ("carrinhos", carregar_carrinhos),
+    ("unidades", carregar_unidades)
+]
+
+# Registros pequenos, lidos por inteiro no pool; carrinhos e unidades crescem com o histórico e são lidos
+# registro a registro pelo iterador do armazenamento, na etapa de resolução
+_LIDAS_NO_POOL = ("produtos", "funcionarios", "estoques")
+
+
+def _ler(armazenamento, entidade: str):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _ler()
+
+    B) OBJETIVO:
+    Ler e desserializar os registros de uma entidade, medindo o tempo gasto; é a tarefa executada no pool.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: armazenamento
+    Mecanismo de armazenamento de onde os registros são lidos.
+    PARÂMETRO 2: entidade (string)
+    Nome da entidade.
+
+    RETORNO 1: TUPLA (<dicionário de registros>, <segundos gastos>)
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Os registros são dicionários primitivos; nenhum objeto do sistema é criado.
+
+    E) DESCRIÇÃO:
+    1. Chama `armazenamento.carregar(entidade)` e mede o tempo decorrido.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Função de uso interno deste módulo; precisa estar no nível do módulo para ser executada em outro processo.
+    """
+    inicio = time.perf_counter()
+    registros = armazenamento.carregar(entidade)
+    return registros, time.perf_counter() - inicio
+
+
+def carregar_em_paralelo(trabalhadores: int = None, modo: str = "thread", manter_carrinhos: bool = True):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: carregar_em_paralelo()
+
+    B) OBJETIVO:
+    Carregar todas as entidades lendo os arquivos dos registros pequenos ao mesmo tempo e resolvendo as referências entre objetos na ordem de dependência.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: trabalhadores (inteiro, opcional)
+    Número de threads ou processos do pool. Se omitido, usa um por entidade lida no pool.
+    PARÂMETRO 2: modo (string, opcional)
+    "thread" (padrão) ou "processo".
+    PARÂMETRO 3: manter_carrinhos (booleano, opcional)
+    Se `False`, os carrinhos não são lidos nem montados: a etapa dos carrinhos apenas obtém o último ID gravado com `carregar_ultimo_id()`, e o histórico é lido sob demanda pelas `VendasPaginadas` das unidades.
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR MODO DESCONHECIDO:
+    {"retorno": 1, "mensagem": "Modo de carga desconhecido"}
+
+    RETORNO 2: DICIONÁRIO DE ERRO POR REFERÊNCIAS NÃO RESOLVIDAS:
+    {"retorno": 2, "mensagem": <relatório de todos os códigos ausentes>, "dados": <tempos, como no sucesso>}
+
+    RETORNO 3: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Dados carregados", "dados": {
+        "leitura": {<entidade>: segundos}, "espera": {<entidade>: segundos},
+        "resolucao": {<entidade>: segundos}, "total": segundos}}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Os registros globais estão vazios (início do programa).
+
+    Assertiva(s) de saída:
+    - Os registros globais ficam no mesmo estado que após chamar `carregar_produtos()`, `carregar_funcionarios()`, `carregar_estoques()`, `carregar_carrinhos()` e `carregar_unidades()` em sequência.
+
+    E) DESCRIÇÃO:
+    1. Envia ao pool a leitura de cada entidade de `_LIDAS_NO_POOL` (produtos, funcionários e estoques).
+    2. Percorre as entidades na ordem de dependência; para cada uma lida no pool, aguarda a sua leitura e chama a função `carregar_*` correspondente com os registros lidos. Assim, os produtos são resolvidos enquanto as demais entidades ainda estão sendo lidas.
+    3. Carrinhos e unidades são carregados sem registros, e as suas funções `carregar_*` os leem um a um com `armazenamento.iterar()`; se `manter_carrinhos` for falso, a etapa dos carrinhos só chama `carregar_ultimo_id()`.
+    4. Estoques e carrinhos compartilham um único `ContextoCarga`, que acumula as referências ausentes de toda a carga.
+    5. Registra, por entidade, o tempo de leitura (medido no trabalhador), o tempo que a resolução ficou esperando pela leitura e o tempo de resolução (que, para carrinhos e unidades, inclui a leitura).
+    6. Se houver referências ausentes, retorna o relatório completo; caso contrário, retorna os tempos medidos.
+
+    F) HIPÓTESES:
+    - A leitura de uma entidade não depende das demais; apenas a resolução depende.
+
+    G) RESTRIÇÕES:
+    - No modo "processo", os registros lidos são copiados de volta para o processo principal; ele só é usado com `ArmazenamentoJSON`, e os demais mecanismos (cuja conexão não pode ser enviada a outro processo) são lidos com threads.
+    - Com threads, a desserialização JSON disputa o GIL; o ganho vem de sobrepor a leitura dos arquivos e a resolução das entidades já lidas.
+    - Carrinhos e unidades não são lidos no pool para que o pico de memória não inclua os seus arquivos inteiros desserializados.
+    - Com referências ausentes, os registros globais ficam carregados sem os itens não resolvidos; quem chamou não deve gravá-los.
+    """
+    if modo not in ("thread", "processo"):
+        return {"retorno": 1, "mensagem": "Modo de carga desconhecido"}
+
+    armazenamento = obter_armazenamento()
+    lidas = _LIDAS_NO_POOL
+    if modo == "processo" and isinstance(armazenamento, ArmazenamentoJSON):
+        pool = ProcessPoolExecutor(max_workers=trabalhadores or len(lidas))
+    else:
+        pool = ThreadPoolExecutor(max_workers=trabalhadores or len(lidas), thread_name_prefix="carga")
+
+    tempos = {"leitura": {}, "espera": {}, "resolucao": {}}
+    contexto = ContextoCarga()
+    inicio_total = time.perf_counter()
+    with pool:
+        futuros = {entidade: pool.submit(_ler, armazenamento, entidade) for entidade in lidas}
+        for entidade, carregar in _ETAPAS:
+            registros = None
+            if entidade in futuros:
+                inicio = time.perf_counter()
+                registros, tempos["leitura"][entidade] = futuros[entidade].result()
+                tempos["espera"][entidade] = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            if entidade == "carrinhos" and not manter_carrinhos:
+                carregar_ultimo_id()
+            elif entidade in ("carrinhos", "estoques"):
+                carregar(registros=registros, contexto=contexto)
+            else:
+                carregar(registros=registros)
+            tempos["resolucao"][entidade] = time.perf_counter() - inicio
+    tempos["total"] = time.perf_counter() - inicio_total
+
+    if contexto.possui_pendencias():
+        return {"retorno": 2, "mensagem": "Referências não encontradas:\n" + contexto.relatorio(), "dados": tempos}
+    return {"retorno": 0, "mensagem": "Dados carregados", "dados": tempos}
+
+
+def formatar_tempos(tempos: dict):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: formatar_tempos()
+
+    B) OBJETIVO:
+    Montar uma tabela de texto com o tempo de cada etapa da carga, por entidade.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: tempos (dicionário)
+    O campo "dados" retornado por `carregar_em_paralelo()`.
+
+    RETORNO 1: String com uma linha por entidade e uma linha de total.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Os tempos são exibidos em milissegundos; "-" indica uma entidade que não foi lida no pool.
+
+    E) DESCRIÇÃO:
+    1. Monta o cabeçalho com as colunas leitura, espera e resolução.
+    2. Acrescenta uma linha por entidade, na ordem de resolução.
+    3. Acrescenta o tempo total de parede.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Como as leituras ocorrem em paralelo, a soma das colunas pode ser maior que o total.
+    """
+    def ms(valor):
+        return "-" if valor is None else f"{valor * 1000:.1f}"
+
+    linhas = [f"{'entidade':<14}{'leitura (ms)':>14}{'espera (ms)':>14}{'resolução (ms)':>16}"]
+    for entidade, _ in _ETAPAS:
+        linhas.append(f"{entidade:<14}{ms(tempos['leitura'].get(entidade)):>14}"
+                      f"{ms(tempos['espera'].get(entidade)):>14}{ms(tempos['resolucao'].get(entidade)):>16}")
+    linhas.append(f"{'total':<14}{ms(tempos['total']):>44}")
+    return "\n".join(linhas)
@@ -1,6 +1,9 @@
-import json
 from datetime import date
-from .produto import Produto
+from .produto import Produto, calcula_precos
+from .contexto_carga import ContextoCarga
+from .armazenamento import obter_armazenamento
+from .rastreamento import Rastreavel, marcar_modificado, limpar_modificados, geracao_atual, selecionar_para_gravacao
+from .paginacao import parametro_invalido, iterar_registro, fatiar, paginar
 
 
 __all__ = [
@@ -8,8 +11,11 @@ __all__ = [
     "criar_carrinho",
     "consultar_carrinho_por_id",
     "listar_todos_carrinhos",
+    "iterar_todos_carrinhos",
     "salvar_carrinhos",
-    "carregar_carrinhos"
+    "carregar_carrinhos",
+    "carregar_ultimo_id",
+    "totalizar_vendas"
 ]
 
 
@@ -17,8 +23,11 @@ CARRINHOS_JSON = 'dados/carrinhos.json'
 
 _todos_carrinhos = {}
 
+# Maior ID de carrinho já visto, inclusive os que ficaram só no armazenamento
+_ultimo_id = 0
 
-class Carrinho:
+
+class Carrinho(Rastreavel, entidade="carrinhos"):
     def __init__(self, id:int, data_hora:str=None, itens:dict=None, total:float=None, funcionario: 'Funcionario'=None):
         """
         ESPECIFICAÇÃO DE FUNÇÃO:
@@ -116,7 +125,7 @@ class Carrinho:
         }
 
     @classmethod
-    def from_json(cls, data: dict):
+    def from_json(cls, data: dict, contexto: ContextoCarga = None):
         """
         ESPECIFICAÇÃO DE FUNÇÃO:
         A) NOME: from_json()
@@ -127,6 +136,8 @@ class Carrinho:
         C) ACOPLAMENTO:
         PARÂMETRO 1: data (dicionário)
         Dicionário com os dados do carrinho, onde produtos e funcionários são representados por seus códigos.
+        PARÂMETRO 2: contexto (ContextoCarga, opcional)
+        Contexto compartilhado por todos os registros de uma carga. Se omitido, é criado um só para este carrinho.
 
         RETORNO 1: Uma nova instância da classe `Carrinho`.
 
@@ -139,44 +150,43 @@ class Carrinho:
         - Retorna uma instância de `Carrinho` cujos dicionários internos usam objetos como chaves/valores.
 
         E) DESCRIÇÃO:
-        1. Realiza importações locais de `consultar_produto_por_codigo` e `consultar_funcionario` para evitar importações circulares.
-        2. Inicia um dicionário `itens` vazio.
-        3. Itera sobre os códigos de produto em `data["itens"]`, busca cada objeto `Produto` e popula o dicionário `itens`.
-        4. Verifica se há um código de funcionário em `data`. Se houver, busca o objeto `Funcionario`.
-        5. Se um produto ou funcionário não for encontrado durante a busca, lança uma exceção `ValueError`.
-        6. Invoca o construtor da classe (`cls(...)`) com os dados e objetos recuperados.
-        7. Retorna a instância de `Carrinho` completamente populada.
+        1. Usa o contexto recebido ou cria um novo.
+        2. Converte todos os códigos de produto de `data["itens"]` de uma vez com `contexto.resolver_itens()`, que consulta diretamente o registro global.
+        3. Se houver um código de funcionário em `data`, resolve-o com `contexto.funcionario()`.
+        4. Códigos não encontrados são acumulados no contexto e omitidos do carrinho.
+        5. Se o contexto foi criado aqui, chama `contexto.verificar()`, que lança `ErroReferencias` listando todos os códigos ausentes deste carrinho.
+        6. Cria a instância sem passar pelo construtor e preenche os atributos diretamente, os mesmos definidos por `__init__`.
 
         F) HIPÓTESES:
         - Os módulos de produto e funcionário, juntamente com seus dados, já foram carregados no sistema.
 
         G) RESTRIÇÕES:
-        - Lança uma exceção não tratada se um código de produto ou funcionário não existir, o que pode interromper o processo de carregamento do sistema.
-        """    
-        from modulos.produto import consultar_produto_por_codigo
-        from modulos.funcionario import consultar_funcionario
-
-        itens = {}
-        for cod, qtd in data["itens"].items():
-            res = consultar_produto_por_codigo(cod)
-            if res["retorno"] != 0:
-                raise ValueError(f"Produto {cod} não encontrado. Inicialize antes de carregar o carrinho.")
-            itens[res["dados"]] = qtd
+        - Com um contexto recebido, nenhuma exceção é lançada por referências ausentes: cabe a quem criou o contexto chamar `verificar()` ao final da carga.
+        - O preenchimento direto evita as chamadas a `__setattr__` (uma por atributo), que dominavam a carga de históricos grandes; um atributo novo em `__init__` precisa ser acrescentado aqui também.
+        """
+        proprio = contexto is None
+        if proprio:
+            contexto = ContextoCarga()
+        origem = f"carrinho {data['id']}"
+
+        itens = contexto.resolver_itens(data["itens"], origem)
 
         funcionario = None
         if data.get("funcionario"):
-            res = consultar_funcionario(data["funcionario"], incluir_inativos=True)
-            if res["retorno"] != 0:
-                raise ValueError(f"Funcionário {data['funcionario']} não encontrado.")
-            funcionario = res["dados"]
+            funcionario = contexto.funcionario(data["funcionario"], origem)
 
-        return cls(
+        if proprio:
+            contexto.verificar()
+
+        carrinho = cls.__new__(cls)
+        carrinho.__dict__.update(
             id=data["id"],
             data_hora=data.get("data_hora"),
             itens=itens,
             total=data.get("total"),
             funcionario=funcionario
         )
+        return carrinho
 
 
 
@@ -235,6 +245,7 @@ class Carrinho:
         if not isinstance(qtd, (int, float)) or qtd <= 0:
             return {'retorno': 2, 'mensagem': 'Parâmetro quantidade inválido'}
 
+        marcar_modificado("carrinhos", self)
         if produto in self.itens:
             self.itens[produto] += qtd
             return {'retorno': 1, 'mensagem': 'Produto já existia, quantidade atualizada'}
@@ -301,6 +312,7 @@ class Carrinho:
         if produto not in self.itens:
             return {'retorno': 1, 'mensagem': 'Produto não encontrado no carrinho'}
 
+        marcar_modificado("carrinhos", self)
         if self.itens[produto] <= quantidade:
             del self.itens[produto]
         else:
@@ -437,6 +449,7 @@ class Carrinho:
         G) RESTRIÇÕES:
         - A operação é irreversível para o estado atual dos itens no carrinho.
         """
+        marcar_modificado("carrinhos", self)
         self.itens.clear()
         return {'retorno': 0, 'mensagem': 'Carrinho esvaziado com sucesso'}
 
@@ -493,7 +506,7 @@ def salvar_carrinhos():
     C) ACOPLAMENTO:
     PARÂMETROS: Nenhum.
 
-    RETORNO: Nenhum valor explícito. A função realiza uma operação de escrita em arquivo.
+    RETORNO 1: Número de registros gravados (inteiro). Zero indica que nada havia mudado desde a última gravação.
 
     D) CONDIÇÕES DE ACOPLAMENTO:
     Assertiva(s) de entrada:
@@ -503,12 +516,11 @@ def salvar_carrinhos():
     - O arquivo definido pela constante `CARRINHOS_JSON` é criado ou sobrescrito com os dados de todos os carrinhos.
 
     E) DESCRIÇÃO:
-    1. Inicializa um dicionário vazio `json_carrinhos`.
-    2. Itera sobre cada par de id-carrinho no dicionário global `_todos_carrinhos`.
-    3. Para cada objeto, invoca seu método `to_json()` para obter sua representação em dicionário serializável.
-    4. Adiciona este dicionário ao `json_carrinhos`, usando o ID do carrinho como chave.
-    5. Abre o arquivo de destino em modo de escrita ("w") com codificação "utf-8".
-    6. Utiliza `json.dump()` para escrever o conteúdo do `json_carrinhos` no arquivo, com formatação indentada.
+    1. Obtém o mecanismo de armazenamento atual (`obter_armazenamento()`).
+    2. Usa `selecionar_para_gravacao()` para escolher os objetos de `_todos_carrinhos` a gravar: nenhum, se nada foi modificado desde a última gravação; apenas os modificados, se o mecanismo suporta gravação parcial; ou todos, se o arquivo precisa ser reescrito (JSON em `CARRINHOS_JSON`).
+    3. Para cada objeto escolhido, invoca seu método `to_json()`, usando o ID do carrinho como chave.
+    4. Entrega o dicionário resultante ao mecanismo de armazenamento, se houver algo a gravar.
+    5. Limpa as marcações de modificação da entidade "carrinhos" feitas até o início da gravação (objetos alterados durante a gravação continuam marcados) e retorna o número de registros gravados.
 
     F) HIPÓTESES:
     - Existe um dicionário global `_todos_carrinhos`.
@@ -519,26 +531,36 @@ def salvar_carrinhos():
     - A função sobrescreve o arquivo de destino sem aviso ou backup.
     - Possíveis erros de I/O não são tratados internamente.
     """
-    json_carrinhos = {}
+    armazenamento = obter_armazenamento()
+    geracao = geracao_atual()
+    alterados = selecionar_para_gravacao("carrinhos", _todos_carrinhos, lambda c: c.id, armazenamento.suporta_parcial)
 
-    for id, c in _todos_carrinhos.items():
-        json_carrinhos[id] = c.to_json()
+    if alterados:
+        json_carrinhos = {id: c.to_json() for id, c in alterados.items()}
+        armazenamento.salvar("carrinhos", json_carrinhos)
 
-    with open(CARRINHOS_JSON, "w", encoding="utf-8") as f:
-        json.dump(json_carrinhos, f, ensure_ascii=False, indent=4)
+    limpar_modificados("carrinhos", ate=geracao)
+    return len(alterados)
 
-def carregar_carrinhos():
+def carregar_carrinhos(callback=None, manter_em_memoria: bool = True, registros: dict = None, contexto: ContextoCarga = None):
     """
     ESPECIFICAÇÃO DE FUNÇÃO:
     A) NOME: carregar_carrinhos()
 
     B) OBJETIVO:
-    Ler os dados de carrinhos de um arquivo JSON e carregá-los para a memória, populando o dicionário global `_todos_carrinhos`.
+    Ler os dados de carrinhos do armazenamento registro a registro e carregá-los para a memória, populando o dicionário global `_todos_carrinhos`.
 
     C) ACOPLAMENTO:
-    PARÂMETROS: Nenhum.
+    PARÂMETRO 1: callback (função, opcional)
+    Função chamada com cada `Carrinho` assim que ele é montado.
+    PARÂMETRO 2: manter_em_memoria (booleano, opcional)
+    Se `False`, os carrinhos são apenas repassados ao `callback` e não são guardados em `_todos_carrinhos`, mantendo o uso de memória limitado a um registro por vez.
+    PARÂMETRO 3: registros (dicionário, opcional)
+    Registros já lidos do armazenamento (ex: pela carga paralela de `carga_paralela.py`). Se omitido, são lidos do armazenamento atual, um a um.
+    PARÂMETRO 4: contexto (ContextoCarga, opcional)
+    Contexto que resolve as referências e acumula as ausentes. Se omitido, é criado um para esta carga.
 
-    RETORNO: Nenhum valor explícito. Modifica o estado do dicionário global `_todos_carrinhos`.
+    RETORNO 1: Número de carrinhos lidos (inteiro).
 
     D) CONDIÇÕES DE ACOPLAMENTO:
     Assertiva(s) de entrada:
@@ -549,26 +571,77 @@ def carregar_carrinhos():
     - O dicionário `_todos_carrinhos` é preenchido com instâncias de `Carrinho` recriadas a partir do arquivo.
 
     E) DESCRIÇÃO:
-    1. Utiliza um bloco `try-except` para tratar o caso de o arquivo não existir (`FileNotFoundError`), retornando silenciosamente.
-    2. Se o arquivo existir, seu conteúdo JSON é carregado para um dicionário `json_carrinhos`.
-    3. Itera sobre cada par de id-dados no dicionário carregado.
-    4. Invoca o método de classe `Carrinho.from_json()` para criar uma nova instância de `Carrinho`.
-    5. Armazena a instância no dicionário global `_todos_carrinhos`.
+    1. Se `registros` não foi informado, solicita ao mecanismo de armazenamento atual (`obter_armazenamento()`) um iterador sobre os registros da entidade "carrinhos", que os lê um a um em vez de desserializar o arquivo inteiro.
+    2. Se não houver dados persistidos, o iterador é vazio e nada é carregado.
+    3. Para cada par de id-dados, invoca o método de classe `Carrinho.from_json()` com o contexto da carga, que resolve os códigos por consulta direta e acumula os ausentes sem interromper a leitura.
+    4. Atualiza `_ultimo_id`, para que `criar_carrinho` não reutilize IDs de carrinhos que não ficaram na memória.
+    5. Se `manter_em_memoria` for verdadeiro, guarda a instância em um dicionário local, com o ID convertido para inteiro como chave (o mesmo tipo usado por `criar_carrinho`).
+    6. Se houver `callback`, chama-o com a instância.
+    7. Se o contexto foi criado aqui, chama `contexto.verificar()`, que lança `ErroReferencias` com todos os códigos ausentes do histórico.
+    8. Copia os carrinhos guardados para `_todos_carrinhos` e retorna o número de carrinhos lidos.
 
     F) HIPÓTESES:
     - As funções `carregar_produtos()` e `carregar_funcionarios()` foram executadas previamente.
 
     G) RESTRIÇÕES:
-    - Não trata exceções que podem ser levantadas por `Carrinho.from_json` (como `ValueError` ou `KeyError`), o que pode interromper o processo de carregamento.
+    - Com o contexto criado aqui, nenhum carrinho é registrado se houver referências ausentes; o `callback`, porém, já terá recebido os carrinhos lidos.
+    - Com um contexto recebido, os carrinhos são registrados sem os itens ausentes, e cabe a quem criou o contexto chamar `verificar()`.
+    """
+    global _ultimo_id
+    proprio = contexto is None
+    if proprio:
+        contexto = ContextoCarga()
+    lidos = 0
+    carregados = {}
+    pares = registros.items() if registros is not None else obter_armazenamento().iterar("carrinhos")
+    for id, c_json in pares:
+        carrinho = Carrinho.from_json(c_json, contexto)
+        _ultimo_id = max(_ultimo_id, int(id))
+        if manter_em_memoria:
+            carregados[int(id)] = carrinho
+        if callback is not None:
+            callback(carrinho)
+        lidos += 1
+    if proprio:
+        contexto.verificar()
+    _todos_carrinhos.update(carregados)
+    return lidos
+
+
+def carregar_ultimo_id():
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: carregar_ultimo_id()
+
+    B) OBJETIVO:
+    Atualizar `_ultimo_id` com o maior ID de carrinho gravado, sem ler nem montar os carrinhos, quando o histórico fica no armazenamento.
+
+    C) ACOPLAMENTO:
+    PARÂMETROS: Nenhum.
+
+    RETORNO 1: O valor atualizado de `_ultimo_id` (inteiro).
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - O armazenamento atual implementa `maior_chave_inteira()`.
+
+    Assertiva(s) de saída:
+    - `criar_carrinho()` não reutiliza o ID de nenhum carrinho gravado.
+
+    E) DESCRIÇÃO:
+    1. Consulta a maior chave da entidade "carrinhos" no armazenamento atual.
+    2. Guarda o maior entre ela e o `_ultimo_id` atual.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Substitui `carregar_carrinhos(manter_em_memoria=False)` na carga inicial: as referências dos carrinhos não são verificadas na carga, e sim quando cada página do histórico é lida.
     """
-    try:
-        with open(CARRINHOS_JSON, "r", encoding="utf-8") as f:
-            json_carrinhos = json.load(f)
-    except FileNotFoundError:
-        return  # Arquivo ainda não existe, nada para carregar
+    global _ultimo_id
+    _ultimo_id = max(_ultimo_id, obter_armazenamento().maior_chave_inteira("carrinhos"))
+    return _ultimo_id
 
-    for id, c_json in json_carrinhos.items():
-        _todos_carrinhos[id] = Carrinho.from_json(c_json)
 
 def criar_carrinho():
     """
@@ -593,7 +666,7 @@ def criar_carrinho():
     - O retorno é um dicionário contendo o objeto recém-criado.
 
     E) DESCRIÇÃO:
-    1. Determina um novo ID para o carrinho, utilizando o tamanho atual do dicionário `_todos_carrinhos` e somando 1.
+    1. Determina um novo ID para o carrinho, somando 1 ao maior entre `_ultimo_id` e o tamanho atual do dicionário `_todos_carrinhos`, e avançando enquanto o ID já estiver em uso.
     2. Importa a classe `Carrinho` localmente para evitar possíveis problemas de referência.
     3. Cria uma nova instância da classe `Carrinho`, passando o novo ID.
     4. Adiciona o novo carrinho ao dicionário global `_todos_carrinhos`, usando o ID como chave.
@@ -603,12 +676,17 @@ def criar_carrinho():
     - Existe um dicionário global `_todos_carrinhos` para o armazenamento.
 
     G) RESTRIÇÕES:
-    - O método de geração de ID é simples (tamanho + 1) e pode não ser robusto para casos de remoção de carrinhos ou ambientes concorrentes.
+    - O método de geração de ID não é seguro em ambientes concorrentes.
     """
-    novo_id = len(_todos_carrinhos) + 1
+    global _ultimo_id
+    novo_id = max(_ultimo_id, len(_todos_carrinhos)) + 1
+    while novo_id in _todos_carrinhos:
+        novo_id += 1
+    _ultimo_id = novo_id
     from modulos.carrinho import Carrinho
 
     carrinho = Carrinho(id=novo_id)
+    marcar_modificado("carrinhos", carrinho)
     _todos_carrinhos[novo_id] = carrinho
     return {"retorno": 0, "mensagem": "Carrinho criado com sucesso", "dados": carrinho}
 
@@ -644,8 +722,9 @@ def consultar_carrinho_por_id(id: int):
     E) DESCRIÇÃO:
     1. Valida se o `id` fornecido é do tipo inteiro. Se não for, retorna um erro.
     2. Utiliza o método `.get()` para buscar o `id` no dicionário global `_todos_carrinhos`.
-    3. Se o método `.get()` retornar `None` (carrinho não encontrado), retorna um dicionário de erro.
-    4. Se o carrinho for encontrado, retorna um dicionário de sucesso com o objeto correspondente.
+    3. Se o carrinho não estiver na memória (histórico carregado sob demanda), consulta-o no armazenamento atual e o recria com `Carrinho.from_json()`, sem guardá-lo no dicionário global.
+    4. Se o carrinho não for encontrado em nenhum dos dois, retorna um dicionário de erro.
+    5. Se o carrinho for encontrado, retorna um dicionário de sucesso com o objeto correspondente.
 
     F) HIPÓTESES:
     - `_todos_carrinhos` é o dicionário global que armazena todas as instâncias de `Carrinho`.
@@ -657,28 +736,41 @@ def consultar_carrinho_por_id(id: int):
         return {"retorno": 2, "mensagem": "Parâmetro inválido: id deve ser um inteiro"}
 
     carrinho = _todos_carrinhos.get(id)
+    if carrinho is None:
+        dados = obter_armazenamento().consultar("carrinhos", id)
+        if dados is not None:
+            carrinho = Carrinho.from_json(dados)
     if not carrinho:
         return {"retorno": 1, "mensagem": "Carrinho não encontrado"}
 
     return {"retorno": 0, "mensagem": "Carrinho encontrado", "dados": carrinho}
 
 
-def listar_todos_carrinhos():
+def listar_todos_carrinhos(limite: int = None, deslocamento: int = 0, cursor: tuple = None):
     """
     ESPECIFICAÇÃO DE FUNÇÃO:
     A) NOME: listar_todos_carrinhos()
 
     B) OBJETIVO:
-    Retornar uma lista contendo todos os objetos de carrinho (vendas) registrados no sistema.
+    Retornar uma lista contendo todos os objetos de carrinho (vendas) registrados no sistema, inteira ou uma página de cada vez.
 
     C) ACOPLAMENTO:
-    PARÂMETROS: Nenhum.
+    PARÂMETRO 1: limite (inteiro, opcional)
+    Tamanho da página. Se omitido, lista todos os carrinhos a partir do `deslocamento`/`cursor`.
+    PARÂMETRO 2: deslocamento (inteiro, opcional)
+    Número de carrinhos saltados antes da página.
+    PARÂMETRO 3: cursor (tupla, opcional)
+    Cursor retornado pela página anterior; a listagem continua depois dele.
 
-    RETORNO 1: DICIONÁRIO SE NÃO HOUVER CARRINHOS:
+    RETORNO 1: DICIONÁRIO DE ERRO POR PAGINAÇÃO INVÁLIDA:
+    {"retorno": 2, "mensagem": "Parâmetro <nome_do_parametro> inválido"}
+
+    RETORNO 2: DICIONÁRIO SE NÃO HOUVER CARRINHOS:
     {"retorno": 1, "mensagem": "Nenhum carrinho registrado", "dados": []}
 
-    RETORNO 2: DICIONÁRIO DE SUCESSO:
+    RETORNO 3: DICIONÁRIO DE SUCESSO:
     {"retorno": 0, "mensagem": "Listagem realizada com sucesso", "dados": [<lista de objetos Carrinho>]}
+    Com `limite`, também a chave "cursor": <cursor da página seguinte, ou None na última página>.
 
     D) CONDIÇÕES DE ACOPLAMENTO:
     Assertiva(s) de entrada:
@@ -688,18 +780,137 @@ def listar_todos_carrinhos():
     - O retorno é um dicionário com uma chave "dados" contendo uma lista de objetos `Carrinho`. A lista pode estar vazia.
 
     E) DESCRIÇÃO:
-    1. Verifica se o dicionário global `_todos_carrinhos` está vazio.
-    2. Se estiver vazio, retorna um dicionário informando que não há carrinhos registrados.
-    3. Se houver carrinhos, converte os valores do dicionário em uma lista (`list(_todos_carrinhos.values())`).
-    4. Retorna um dicionário de sucesso com a lista de todos os carrinhos.
+    1. Valida os parâmetros de paginação.
+    2. Verifica se o dicionário global `_todos_carrinhos` está vazio e, se estiver, retorna um dicionário informando que não há carrinhos registrados.
+    3. Percorre `_todos_carrinhos` com `iterar_registro()` a partir do cursor.
+    4. Sem `limite`, reúne todos os carrinhos depois do `deslocamento`; com `limite`, reúne apenas a página com `paginar()` e guarda o cursor da página seguinte.
 
     F) HIPÓTESES:
     - `_todos_carrinhos` é o dicionário que centraliza todos os carrinhos.
 
     G) RESTRIÇÕES:
-    - A função retorna uma lista com todos os objetos, o que pode consumir uma quantidade significativa de memória se o número de carrinhos for muito grande.
+    - Sem `limite`, a função retorna uma lista com todos os objetos, o que pode consumir uma quantidade significativa de memória se o número de carrinhos for muito grande.
+    - Com gravação parcial (SQLite), lista apenas os carrinhos residentes na memória.
     """
+    erro = parametro_invalido(limite, deslocamento, cursor)
+    if erro is not None:
+        return {"retorno": 2, "mensagem": f"Parâmetro {erro} inválido"}
+
     if not _todos_carrinhos:
         return {"retorno": 1, "mensagem": "Nenhum carrinho registrado", "dados": []}
 
-    return {"retorno": 0, "mensagem": "Listagem realizada com sucesso", "dados": list(_todos_carrinhos.values())}
+    pares = iterar_registro(_todos_carrinhos, cursor)
+    if limite is None:
+        return {"retorno": 0, "mensagem": "Listagem realizada com sucesso", "dados": list(fatiar(pares, None, deslocamento))}
+
+    carrinhos, proximo = paginar(pares, limite, deslocamento)
+    return {"retorno": 0, "mensagem": "Listagem realizada com sucesso", "dados": carrinhos, "cursor": proximo}
+
+
+def iterar_todos_carrinhos(limite: int = None, deslocamento: int = 0, cursor: tuple = None):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: iterar_todos_carrinhos()
+
+    B) OBJETIVO:
+    Variante sob demanda de `listar_todos_carrinhos()`: percorrer os carrinhos sem montar uma lista.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: limite (inteiro, opcional)
+    Número máximo de carrinhos produzidos. Se omitido, vai até o último.
+    PARÂMETRO 2: deslocamento (inteiro, opcional)
+    Número de carrinhos saltados antes do primeiro produzido.
+    PARÂMETRO 3: cursor (tupla, opcional)
+    Cursor retornado por `listar_todos_carrinhos(limite=...)`; o percurso continua depois dele.
+
+    RETORNO 1: Gerador de objetos `Carrinho`, na ordem do registro.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - O registro de carrinhos não é alterado enquanto o gerador é consumido.
+
+    Assertiva(s) de saída:
+    - Nenhuma lista do tamanho do registro é criada.
+
+    E) DESCRIÇÃO:
+    1. Valida os parâmetros de paginação.
+    2. Retorna os carrinhos de `iterar_registro()`, fatiados por `deslocamento` e `limite`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Lança `ValueError` se um parâmetro for inválido, já que um gerador não retorna dicionário de erro.
+    """
+    erro = parametro_invalido(limite, deslocamento, cursor)
+    if erro is not None:
+        raise ValueError(f"Parâmetro {erro} inválido")
+    return fatiar(iterar_registro(_todos_carrinhos, cursor), limite, deslocamento)
+
+
+def totalizar_vendas(vendas: list):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: totalizar_vendas()
+
+    B) OBJETIVO:
+    Obter o total de cada venda de uma lista, calculando de uma só vez, pelos preços vigentes na data de cada venda, os das vendas sem total registrado.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: vendas (lista)
+    Carrinhos finalizados (ex: as vendas do período de um relatório ou uma página do histórico a arquivar).
+
+    RETORNO 1: Lista com o total de cada venda, na ordem recebida.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - O total de cada venda é o registrado ou o calculado com os preços vigentes na data da venda.
+    - Os carrinhos não são alterados nem marcados como modificados.
+
+    E) DESCRIÇÃO:
+    1. Separa as vendas sem total e reúne, em listas paralelas, o código, a quantidade e a data da venda de todos os seus itens com quantidade positiva (os demais são ignorados, como em `Carrinho.calcula_total()`).
+    2. Calcula todos os preços com uma única chamada a `calcula_precos()`, que cobra os produtos com agenda de preços pelo preço vigente na data da venda.
+    3. Soma os preços de cada venda, na ordem dos seus itens.
+    4. Se o cálculo em lote falhar (ex: item de produto que não está mais registrado), soma os preços atuais dos itens de cada venda pendente com `Produto.calcula_preco()`, como `calcula_total()`.
+
+    F) HIPÓTESES:
+    - Os itens dos carrinhos são os objetos `Produto` registrados, como os recriados por `carregar_carrinhos()`.
+
+    G) RESTRIÇÕES:
+    - O total calculado não é guardado no carrinho: atribuí-lo marcaria cada venda antiga como modificada, e o histórico inteiro seria regravado no próximo salvamento.
+    - Com o catálogo colunar ativado (`definir_catalogo_colunar()`), os preços de todas as vendas são calculados em uma só operação sobre as colunas.
+    """
+    totais = [venda.total for venda in vendas]
+    pendentes = [i for i, total in enumerate(totais) if total is None]
+    if not pendentes:
+        return totais
+
+    codigos, quantidades, datas, tamanhos = [], [], [], []
+    for i in pendentes:
+        venda = vendas[i]
+        itens = [(produto.codigo, qtd) for produto, qtd in venda.itens.items() if qtd > 0]
+        tamanhos.append(len(itens))
+        for codigo, qtd in itens:
+            codigos.append(codigo)
+            quantidades.append(qtd)
+        datas.extend([venda.data_hora] * len(itens))
+    resultado = calcula_precos(codigos, quantidades, datas)
+    if resultado['retorno'] == 0:
+        precos = iter(resultado['dados'])
+        for i, tamanho in zip(pendentes, tamanhos):
+            total = 0
+            for _ in range(tamanho):
+                total += next(precos)
+            totais[i] = total
+    else:
+        for i in pendentes:
+            total = 0
+            for produto, quantidade in vendas[i].itens.items():
+                resultado_preco = produto.calcula_preco(quantidade)
+                if resultado_preco['retorno'] == 0:
+                    total += resultado_preco['dados']
+            totais[i] = total
+    return totais
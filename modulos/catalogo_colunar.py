@@ -0,0 +1,217 @@
+import math
+from array import array
+from operator import mul
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+__all__ = [
+    "CAMPOS_NUMERICOS",
+    "CatalogoColunar"
+]
+
+
+# Atributos de `Produto` guardados em colunas pelo catálogo colunar
+CAMPOS_NUMERICOS = ("peso", "preco", "preco_por_peso")
+
+# Valor da coluna `preco_por_peso` para produtos sem preço por peso (`None` no `Produto`)
+_AUSENTE = math.nan
+
+
+def _valor(numero):
+    """Converte um campo numérico em `float`; `None` ou um valor não numérico resultam em NaN."""
+    try:
+        return float(numero)
+    except (TypeError, ValueError):
+        return _AUSENTE
+
+
+class CatalogoColunar:
+
+    def __init__(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Criar um catálogo colunar vazio: os campos numéricos dos produtos em colunas contíguas de `float`, uma linha por produto, e um índice do EAN-13 para a linha.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O catálogo não contém nenhum produto.
+
+        E) DESCRIÇÃO:
+        1. Inicializa a lista de códigos, na ordem das linhas, e o índice {<código>: <linha>}.
+        2. Inicializa as colunas `peso`, `preco` e `preco_por_peso` como `array('d')`; a ausência de preço por peso é NaN.
+        3. Inicializa a coluna do preço unitário efetivo (o preço por peso, se houver, ou o preço), usada no cálculo dos preços.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - As colunas são `array('d')` da biblioteca padrão, que crescem no fim sem cópia; com NumPy instalado, `calcula_precos()` as lê como vetores sem copiá-las.
+        """
+        self.codigos = []
+        self._linhas = {}
+        self.peso = array("d")
+        self.preco = array("d")
+        self.preco_por_peso = array("d")
+        self._unitario = array("d")
+
+    def __len__(self):
+        """Retorna o número de produtos no catálogo."""
+        return len(self._linhas)
+
+    def __contains__(self, codigo):
+        """Indica se o código tem uma linha no catálogo."""
+        return codigo in self._linhas
+
+    def linha(self, codigo):
+        """Retorna a linha do código nas colunas, ou `None` se ele não estiver no catálogo."""
+        return self._linhas.get(codigo)
+
+    def adicionar(self, produto):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: adicionar()
+
+        B) OBJETIVO:
+        Acrescentar a linha de um produto novo ou atualizar a linha de um produto cujo peso ou preços mudaram.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: produto (Produto)
+        Produto a copiar para as colunas.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `produto` possui os atributos `codigo` e os de `CAMPOS_NUMERICOS`, numéricos (`preco_por_peso` pode ser `None`).
+
+        Assertiva(s) de saída:
+        - A linha do código contém os valores atuais do produto.
+
+        E) DESCRIÇÃO:
+        1. Converte os campos numéricos em `float` com `_valor()`, com NaN para a ausência de preço por peso, e calcula o preço unitário efetivo.
+        2. Se o código já tem linha, sobrescreve-a; caso contrário, acrescenta uma linha no fim de cada coluna e registra-a no índice.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é constante (amortizado); o catálogo nunca é reordenado.
+        - `registrar_produto()` não valida os tipos de peso e preço: um valor não numérico é guardado como NaN, e os preços calculados com ele também.
+        """
+        codigo = produto.codigo
+        peso = _valor(produto.peso)
+        preco = _valor(produto.preco)
+        preco_por_peso = _valor(produto.preco_por_peso)
+        unitario = preco if produto.preco_por_peso is None else preco_por_peso
+
+        linha = self._linhas.get(codigo)
+        if linha is None:
+            self._linhas[codigo] = len(self.codigos)
+            self.codigos.append(codigo)
+            self.peso.append(peso)
+            self.preco.append(preco)
+            self.preco_por_peso.append(preco_por_peso)
+            self._unitario.append(unitario)
+        else:
+            self.peso[linha] = peso
+            self.preco[linha] = preco
+            self.preco_por_peso[linha] = preco_por_peso
+            self._unitario[linha] = unitario
+
+    def reconstruir(self, produtos):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: reconstruir()
+
+        B) OBJETIVO:
+        Descartar as colunas e montá-las novamente a partir de um conjunto de produtos.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: produtos (iterável)
+        Produtos a copiar (ex: `_todos_produtos.values()`).
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O catálogo contém exatamente os produtos recebidos, na ordem recebida.
+
+        E) DESCRIÇÃO:
+        1. Esvazia a lista de códigos, o índice e as colunas.
+        2. Chama `adicionar()` para cada produto.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é proporcional ao tamanho do catálogo; é usado apenas quando o catálogo perde a sincronia com o registro.
+        """
+        self.codigos = []
+        self._linhas = {}
+        self.peso = array("d")
+        self.preco = array("d")
+        self.preco_por_peso = array("d")
+        self._unitario = array("d")
+        for produto in produtos:
+            self.adicionar(produto)
+
+    def calcula_precos(self, codigos, quantidades):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: calcula_precos()
+
+        B) OBJETIVO:
+        Calcular de uma só vez o preço de muitos itens (ex: todos os itens de um histórico de vendas), com a mesma regra de `Produto.calcula_preco()`.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigos (sequência)
+        Código de cada item.
+        PARÂMETRO 2: quantidades (sequência)
+        Quantidade de cada item, na mesma ordem.
+
+        RETORNO 1: Lista com o preço (float) de cada item: o preço por peso vezes a quantidade, se o produto tiver preço por peso, ou o preço unitário vezes a quantidade.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Todos os códigos estão no catálogo, e as duas sequências têm o mesmo tamanho.
+
+        Assertiva(s) de saída:
+        - O catálogo não é alterado.
+
+        E) DESCRIÇÃO:
+        1. Converte os códigos em linhas pelo índice.
+        2. Com NumPy, lê a coluna do preço unitário efetivo como vetor (sem cópia), seleciona as linhas e multiplica pelo vetor de quantidades.
+        3. Sem NumPy, seleciona e multiplica com `map()`, que percorre as colunas em C sem criar objetos intermediários por item.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lança `KeyError` para um código fora do catálogo.
+        - Os preços são sempre `float`, mesmo quando preço e quantidade são inteiros.
+        """
+        linhas = list(map(self._linhas.__getitem__, codigos))
+        if not linhas:
+            return []
+        if numpy is not None:
+            unitarios = numpy.frombuffer(self._unitario, dtype=numpy.float64)[linhas]
+            return (unitarios * numpy.asarray(quantidades, dtype=numpy.float64)).tolist()
+        return list(map(mul, map(self._unitario.__getitem__, linhas), quantidades))
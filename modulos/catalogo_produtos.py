@@ -0,0 +1,401 @@
+import math
+import mmap
+import os
+import struct
+
+from .armazenamento import obter_armazenamento
+from .produto import Produto, _todos_produtos
+
+
+__all__ = [
+    "CatalogoProdutos",
+    "gerar_catalogo"
+]
+
+
+CATALOGO_PRODUTOS = 'dados/produtos.catalogo'
+
+MAGICO = b"MCAT"
+VERSAO = 1
+# Cabeçalho: identificador, versão e número de registros
+_CABECALHO = struct.Struct("<4sHI")
+# Registro: EAN-13, deslocamentos de nome, marca e categoria no bloco de strings, peso, preço e preço por peso
+_REGISTRO = struct.Struct("<13s3I3d")
+_TAMANHO_TEXTO = struct.Struct("<H")
+
+
+def gerar_catalogo(caminho: str = CATALOGO_PRODUTOS):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: gerar_catalogo()
+
+    B) OBJETIVO:
+    Gerar o arquivo de catálogo de produtos otimizado para leitura: registros de tamanho fixo, ordenados por EAN-13, seguidos de um bloco com as strings.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: caminho (string, opcional)
+    Caminho do arquivo de catálogo.
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR PRODUTO COM PREÇOS AGENDADOS:
+    {"retorno": 1, "mensagem": "Produto com preços agendados não cabe no catálogo.", "dados": <código do produto>}
+
+    RETORNO 2: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Catálogo gerado com sucesso.", "dados": <número de produtos>}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Os códigos dos produtos são EAN-13 válidos (13 dígitos), como exigido por `registrar_produto()`.
+
+    Assertiva(s) de saída:
+    - O arquivo é substituído de forma atômica.
+    - Em caso de erro, o catálogo anterior não é alterado.
+
+    E) DESCRIÇÃO:
+    1. Percorre os produtos persistidos com `iterar()` do armazenamento atual, sem criar objetos `Produto`.
+    2. Sobrepõe os produtos presentes em `_todos_produtos`, para incluir alterações ainda não gravadas.
+    3. Recusa a geração se algum produto tem mudanças de preço agendadas, que os registros de tamanho fixo não comportam.
+    4. Ordena os produtos pelo código e monta o bloco de strings, gravando cada nome, marca e categoria distintos uma única vez.
+    5. Escreve o cabeçalho, os registros e o bloco de strings em um arquivo temporário e substitui o catálogo anterior com `os.replace()`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - O preço por peso ausente é gravado como NaN; peso e preços são lidos de volta como `float`.
+    - O catálogo é uma cópia: alterações posteriores nos produtos exigem gerá-lo novamente.
+    - A agenda de preços não é gravada; um produto lido do catálogo teria apenas o preço vigente, por isso produtos com agenda são recusados.
+    """
+    produtos = {}
+    for codigo, dados in obter_armazenamento().iterar("produtos"):
+        produtos[codigo] = dados
+    for codigo, produto in _todos_produtos.items():
+        produtos[codigo] = produto.to_json()
+
+    for codigo, dados in produtos.items():
+        agenda = dados.get("agenda_precos")
+        if agenda is not None and len(agenda["precos"]) > 1:
+            return {"retorno": 1, "mensagem": "Produto com preços agendados não cabe no catálogo.", "dados": codigo}
+
+    textos = {}
+    bloco = bytearray()
+
+    def deslocamento(texto):
+        if texto not in textos:
+            codificado = texto.encode("utf-8")
+            textos[texto] = len(bloco)
+            bloco.extend(_TAMANHO_TEXTO.pack(len(codificado)))
+            bloco.extend(codificado)
+        return textos[texto]
+
+    registros = bytearray()
+    for codigo in sorted(produtos):
+        dados = produtos[codigo]
+        preco_por_peso = dados.get("preco_por_peso")
+        registros += _REGISTRO.pack(
+            codigo.encode("ascii"),
+            deslocamento(dados["nome"]),
+            deslocamento(dados["marca"]),
+            deslocamento(dados["categoria"]),
+            dados["peso"],
+            dados["preco"],
+            math.nan if preco_por_peso is None else preco_por_peso
+        )
+
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    temporario = caminho + ".tmp"
+    with open(temporario, 'wb') as f:
+        f.write(_CABECALHO.pack(MAGICO, VERSAO, len(produtos)))
+        f.write(registros)
+        f.write(bloco)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+    return {"retorno": 0, "mensagem": "Catálogo gerado com sucesso.", "dados": len(produtos)}
+
+
+class CatalogoProdutos:
+
+    def __init__(self, caminho: str = CATALOGO_PRODUTOS):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Abrir um catálogo gerado por `gerar_catalogo()` para consultas, mapeando o arquivo na memória em vez de lê-lo.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: caminho (string, opcional)
+        Caminho do arquivo de catálogo.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O arquivo existe.
+
+        Assertiva(s) de saída:
+        - O catálogo está pronto para consultas; nenhum produto foi materializado.
+
+        E) DESCRIÇÃO:
+        1. Abre o arquivo e o mapeia com `mmap` somente para leitura.
+        2. Confere o identificador e a versão do formato e lê o número de registros.
+        3. Calcula onde começa o bloco de strings.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lança `ValueError` se o arquivo não for um catálogo ou se a versão não for suportada.
+        - O tempo de abertura não depende do número de produtos; as páginas do arquivo são lidas pelo sistema operacional conforme a necessidade.
+        """
+        self.caminho = caminho
+        self._arquivo = open(caminho, 'rb')
+        try:
+            self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._arquivo.close()
+            raise ValueError("Arquivo não é um catálogo de produtos.")
+
+        if len(self._mapa) < _CABECALHO.size:
+            self.fechar()
+            raise ValueError("Arquivo não é um catálogo de produtos.")
+        magico, versao, self._quantidade = _CABECALHO.unpack_from(self._mapa, 0)
+        if magico != MAGICO:
+            self.fechar()
+            raise ValueError("Arquivo não é um catálogo de produtos.")
+        if versao != VERSAO:
+            self.fechar()
+            raise ValueError(f"Versão de catálogo não suportada: {versao}.")
+        self._inicio_textos = _CABECALHO.size + self._quantidade * _REGISTRO.size
+
+    def __len__(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __len__()
+
+        B) OBJETIVO:
+        Informar o número de produtos do catálogo.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: Número de produtos (inteiro).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Nenhuma.
+
+        E) DESCRIÇÃO:
+        1. Retorna o número de registros lido do cabeçalho.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        return self._quantidade
+
+    def __contains__(self, codigo):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __contains__()
+
+        B) OBJETIVO:
+        Verificar se um código existe no catálogo sem materializar o produto.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo (string)
+        Código EAN-13 procurado.
+
+        RETORNO 1: Booleano.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Nenhum objeto `Produto` é criado.
+
+        E) DESCRIÇÃO:
+        1. Retorna se `_buscar()` encontrou uma posição válida.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        return self._buscar(codigo) >= 0
+
+    def consultar(self, codigo: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: consultar()
+
+        B) OBJETIVO:
+        Buscar um produto pelo código EAN-13, criando o objeto `Produto` apenas se ele for encontrado.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo (string)
+        Código EAN-13 procurado.
+
+        RETORNO 1: Um novo objeto `Produto`, ou `None` se o código não estiver no catálogo.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O produto retornado não é registrado em `_todos_produtos`; cabe a quem consulta guardá-lo, se precisar.
+
+        E) DESCRIÇÃO:
+        1. Localiza o registro com `_buscar()`.
+        2. Desempacota os campos numéricos e os deslocamentos das strings.
+        3. Lê o nome, a marca e a categoria do bloco de strings com `_texto()`.
+        4. Converte o preço por peso NaN de volta para `None` e cria o `Produto`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Cada chamada cria um novo objeto.
+        """
+        posicao = self._buscar(codigo)
+        if posicao < 0:
+            return None
+
+        _, nome, marca, categoria, peso, preco, preco_por_peso = _REGISTRO.unpack_from(
+            self._mapa, _CABECALHO.size + posicao * _REGISTRO.size)
+        return Produto(
+            self._texto(nome),
+            self._texto(marca),
+            self._texto(categoria),
+            codigo,
+            peso,
+            preco,
+            None if math.isnan(preco_por_peso) else preco_por_peso
+        )
+
+    def fechar(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: fechar()
+
+        B) OBJETIVO:
+        Liberar o mapeamento e o arquivo do catálogo.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O catálogo não pode mais ser consultado.
+
+        E) DESCRIÇÃO:
+        1. Fecha o mapeamento, se existir, e o arquivo.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        if getattr(self, "_mapa", None) is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._arquivo.close()
+
+    def _buscar(self, codigo: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _buscar()
+
+        B) OBJETIVO:
+        Encontrar, por busca binária, a posição do registro com um código.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo (string)
+        Código EAN-13 procurado.
+
+        RETORNO 1: Posição do registro (inteiro), ou -1 se o código não existir.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Os registros estão ordenados por código.
+
+        Assertiva(s) de saída:
+        - No máximo log2(n) + 1 registros são lidos.
+
+        E) DESCRIÇÃO:
+        1. Recusa códigos que não tenham 13 dígitos ASCII, que não podem estar no catálogo.
+        2. Compara o código com o do registro do meio do intervalo e descarta a metade que não pode contê-lo, até encontrá-lo ou esvaziar o intervalo.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Método de uso interno da classe.
+        """
+        if not isinstance(codigo, str) or len(codigo) != 13 or not codigo.isascii():
+            return -1
+        chave = codigo.encode("ascii")
+        mapa = self._mapa
+        inicio, fim = 0, self._quantidade
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            deslocamento = _CABECALHO.size + meio * _REGISTRO.size
+            atual = mapa[deslocamento:deslocamento + 13]
+            if atual < chave:
+                inicio = meio + 1
+            elif atual > chave:
+                fim = meio
+            else:
+                return meio
+        return -1
+
+    def _texto(self, deslocamento: int):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _texto()
+
+        B) OBJETIVO:
+        Ler uma string do bloco de strings.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: deslocamento (inteiro)
+        Posição da string em relação ao início do bloco.
+
+        RETORNO 1: A string lida.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `deslocamento` foi lido de um registro do catálogo.
+
+        Assertiva(s) de saída:
+        - Nenhuma.
+
+        E) DESCRIÇÃO:
+        1. Lê o tamanho da string e decodifica os bytes seguintes como UTF-8.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Método de uso interno da classe.
+        """
+        inicio = self._inicio_textos + deslocamento
+        tamanho = _TAMANHO_TEXTO.unpack_from(self._mapa, inicio)[0]
+        inicio += _TAMANHO_TEXTO.size
+        return self._mapa[inicio:inicio + tamanho].decode("utf-8")
@@ -0,0 +1,308 @@
+from .produto import _todos_produtos, consultar_produto_por_codigo
+from .funcionario import _todos_funcionarios
+
+
+__all__ = [
+    "ContextoCarga",
+    "ErroReferencias"
+]
+
+
+class ErroReferencias(ValueError):
+
+    def __init__(self, mensagem: str, pendencias: dict):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Criar a exceção que reúne todas as referências não resolvidas de uma carga.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: mensagem (string)
+        Texto da exceção, com o relatório das pendências.
+        PARÂMETRO 2: pendencias (dicionário)
+        Pendências no formato de `ContextoCarga.pendencias`.
+
+        RETORNO: Nenhum (construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - `pendencias` fica disponível como atributo, para tratamento programático.
+
+        E) DESCRIÇÃO:
+        1. Inicializa a `ValueError` com a mensagem e guarda as pendências.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        super().__init__(mensagem)
+        self.pendencias = pendencias
+
+
+class ContextoCarga:
+
+    def __init__(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Criar um contexto que resolve, durante a carga, os códigos de produtos e funcionários gravados nos registros em objetos já carregados, acumulando os que não forem encontrados.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum (construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - `pendencias` começa com as entidades "produtos" e "funcionarios" vazias.
+
+        E) DESCRIÇÃO:
+        1. Guarda referências aos registros globais `_todos_produtos` e `_todos_funcionarios`, consultados diretamente.
+        2. Inicializa `pendencias` no formato {<entidade>: {<código>: [<origem>, ...]}}.
+
+        F) HIPÓTESES:
+        - Um mesmo contexto é usado por uma única carga (uma thread por vez).
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        self._produtos = _todos_produtos
+        self._funcionarios = _todos_funcionarios
+        self.pendencias = {"produtos": {}, "funcionarios": {}}
+
+    def produto(self, codigo: str, origem: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: produto() (Método de ContextoCarga)
+
+        B) OBJETIVO:
+        Obter o objeto `Produto` de um código lido do armazenamento.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo (string)
+        Código de barras gravado no registro.
+        PARÂMETRO 2: origem (string)
+        Descrição do registro que faz a referência (ex: "carrinho 42"), usada no relatório de pendências.
+
+        RETORNO 1: O objeto `Produto`, ou `None` se o código não existir.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Os produtos já foram carregados.
+
+        Assertiva(s) de saída:
+        - Um código não encontrado é acrescentado a `pendencias["produtos"]` com a sua origem.
+
+        E) DESCRIÇÃO:
+        1. Procura o código diretamente em `_todos_produtos`.
+        2. Se não o encontrar, recorre a `consultar_produto_por_codigo()`, que também consulta o catálogo em disco, se houver.
+        3. Se ainda assim não existir, registra a pendência e retorna `None`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Não valida o tipo do código: os registros gravados pelo próprio sistema sempre usam strings.
+        """
+        produto = self._produtos.get(codigo)
+        if produto is not None:
+            return produto
+        res = consultar_produto_por_codigo(codigo)
+        if res["retorno"] == 0:
+            return res["dados"]
+        self.pendencias["produtos"].setdefault(codigo, []).append(origem)
+        return None
+
+    def resolver_itens(self, itens: dict, origem: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: resolver_itens() (Método de ContextoCarga)
+
+        B) OBJETIVO:
+        Converter, de uma só vez, um dicionário {<código do produto>: <valor>} lido do armazenamento em {<objeto Produto>: <valor>}.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: itens (dicionário)
+        Dicionário indexado por códigos de produto (ex: os itens gravados de um carrinho).
+        PARÂMETRO 2: origem (string)
+        Descrição do registro que faz as referências, usada no relatório de pendências.
+
+        RETORNO 1: Novo dicionário indexado pelos objetos `Produto`, sem os códigos não encontrados.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Os produtos já foram carregados.
+
+        Assertiva(s) de saída:
+        - Os códigos não encontrados são acrescentados a `pendencias["produtos"]`.
+
+        E) DESCRIÇÃO:
+        1. Tenta montar o dicionário com consultas diretas a `_todos_produtos` em uma única compreensão, o caso comum.
+        2. Se algum código faltar no registro, refaz a conversão item a item com `produto()`, que consulta o catálogo e registra as pendências.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        produtos = self._produtos
+        try:
+            return {produtos[codigo]: valor for codigo, valor in itens.items()}
+        except KeyError:
+            pass
+        resolvidos = {}
+        for codigo, valor in itens.items():
+            produto = self.produto(codigo, origem)
+            if produto is not None:
+                resolvidos[produto] = valor
+        return resolvidos
+
+    def funcionario(self, codigo: int, origem: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: funcionario() (Método de ContextoCarga)
+
+        B) OBJETIVO:
+        Obter o objeto `Funcionario` de um código lido do armazenamento, incluindo funcionários desligados.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo (inteiro)
+        Código do funcionário gravado no registro.
+        PARÂMETRO 2: origem (string)
+        Descrição do registro que faz a referência, usada no relatório de pendências.
+
+        RETORNO 1: O objeto `Funcionario`, ou `None` se o código não existir.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Os funcionários já foram carregados.
+
+        Assertiva(s) de saída:
+        - Um código não encontrado é acrescentado a `pendencias["funcionarios"]` com a sua origem.
+
+        E) DESCRIÇÃO:
+        1. Procura o código diretamente em `_todos_funcionarios`.
+        2. Se não o encontrar, registra a pendência e retorna `None`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        funcionario = self._funcionarios.get(codigo)
+        if funcionario is None:
+            self.pendencias["funcionarios"].setdefault(codigo, []).append(origem)
+        return funcionario
+
+    def possui_pendencias(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: possui_pendencias() (Método de ContextoCarga)
+
+        B) OBJETIVO:
+        Informar se alguma referência não foi resolvida.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: `True` se houver ao menos um código pendente.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Nenhuma.
+
+        E) DESCRIÇÃO:
+        1. Verifica se alguma entidade de `pendencias` tem códigos.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        return any(self.pendencias.values())
+
+    def relatorio(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: relatorio() (Método de ContextoCarga)
+
+        B) OBJETIVO:
+        Descrever em texto todas as referências não resolvidas.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: String com uma linha por código pendente, ou string vazia se não houver pendências.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Nenhuma.
+
+        E) DESCRIÇÃO:
+        1. Para cada código pendente, monta uma linha com a entidade, o código, o número de referências e as primeiras origens.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lista no máximo 3 origens por código, para que o relatório continue legível em históricos grandes.
+        """
+        linhas = []
+        for entidade, codigos in self.pendencias.items():
+            for codigo, origens in codigos.items():
+                exemplos = ", ".join(origens[:3]) + (", ..." if len(origens) > 3 else "")
+                linhas.append(f"{entidade} {codigo}: {len(origens)} referência(s) ({exemplos})")
+        return "\n".join(linhas)
+
+    def verificar(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: verificar() (Método de ContextoCarga)
+
+        B) OBJETIVO:
+        Interromper a carga, de uma só vez, se alguma referência não foi resolvida.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Todos os registros que usam o contexto já foram percorridos.
+
+        Assertiva(s) de saída:
+        - Retorna normalmente apenas se não houver pendências.
+
+        E) DESCRIÇÃO:
+        1. Se houver pendências, lança `ErroReferencias` com o relatório completo e o dicionário `pendencias`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - `ErroReferencias` é subclasse de `ValueError`, a exceção lançada antes pela primeira referência ausente.
+        """
+        if self.possui_pendencias():
+            raise ErroReferencias("Referências não encontradas:\n" + self.relatorio(), self.pendencias)
@@ -0,0 +1,244 @@
+import threading
+
+from .rastreamento import adicionar_observador, remover_observador
+from .produto import _todos_produtos
+from .funcionario import _todos_funcionarios
+from .estoque import _todos_estoques
+from .carrinho import _todos_carrinhos
+from .unidades import _unidades
+
+
+__all__ = [
+    "CopiaSeguranca"
+]
+
+
+# Registro global e chave no registro de cada entidade, na ordem de dependência
+_REGISTROS = {
+    "produtos": (_todos_produtos, lambda p: p.codigo),
+    "funcionarios": (_todos_funcionarios, lambda f: f.codigo),
+    "estoques": (_todos_estoques, lambda e: e.codigo),
+    "carrinhos": (_todos_carrinhos, lambda c: c.id),
+    "unidades": (_unidades, lambda u: u.codigo)
+}
+
+
+class _Preservado:
+    """Estado de um objeto congelado, guardado na visão no lugar do objeto antes da sua primeira alteração."""
+    __slots__ = ("registro",)
+
+    def __init__(self, registro: dict):
+        self.registro = registro
+
+
+class CopiaSeguranca:
+
+    def __init__(self, destino):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Configurar uma cópia de segurança consistente de todos os registros, congelada em um instante e gravada em segundo plano enquanto o sistema continua em uso.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: destino (objeto de armazenamento)
+        Mecanismo que recebe a cópia (ex: `ArmazenamentoJSON` com os arquivos em uma pasta de backup, ou `ArmazenamentoSQLite` em outro banco).
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `destino` não é o armazenamento atual do sistema.
+
+        Assertiva(s) de saída:
+        - A instância está configurada, mas nada foi congelado ainda.
+
+        E) DESCRIÇÃO:
+        1. Guarda o destino e inicializa os contadores de registros gravados e de cópias preservadas.
+        2. Inicializa a trava que sincroniza o observador com a thread de gravação.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Cada instância produz uma única cópia.
+        """
+        self.destino = destino
+        self.gravados = {}
+        self.preservados = 0
+        self.ultimo_erro = None
+
+        self._trava = threading.Lock()
+        self._thread = None
+        self._visao = None
+
+    def iniciar(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: iniciar()
+
+        B) OBJETIVO:
+        Congelar o estado atual de todos os registros e iniciar a thread que o grava no destino.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Chamado pela thread que altera os dados, entre duas operações (nunca no meio de uma venda), para que o instante congelado seja consistente.
+        - A instância ainda não foi iniciada.
+
+        Assertiva(s) de saída:
+        - A cópia gravada corresponde ao estado dos registros neste instante, qualquer que seja a alteração feita depois.
+
+        E) DESCRIÇÃO:
+        1. Copia os dicionários dos registros globais; os objetos não são copiados, apenas compartilhados com o estado vivo.
+        2. Registra `_ao_modificar()` como observador do rastreamento, que preserva o estado anterior de um objeto congelado antes da sua primeira alteração.
+        3. Cria e inicia a thread (daemon) que executa `_executar()`.
+
+        F) HIPÓTESES:
+        - Toda alteração de um objeto de domínio é precedida por `marcar_modificado()`.
+
+        G) RESTRIÇÕES:
+        - O custo no instante do congelamento é proporcional ao número de registros (cópia de referências), não ao tamanho dos dados.
+        - Copia apenas o que está na memória: com gravação parcial (SQLite), os carrinhos do histórico que não foram carregados não entram na cópia.
+        """
+        self._visao = {entidade: dict(registro) for entidade, (registro, _) in _REGISTROS.items()}
+        adicionar_observador(self._ao_modificar)
+        self._thread = threading.Thread(target=self._executar, name="copia-seguranca", daemon=True)
+        self._thread.start()
+
+    def aguardar(self, timeout: float = None):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: aguardar()
+
+        B) OBJETIVO:
+        Aguardar o término da gravação da cópia.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: timeout (float, opcional)
+        Tempo máximo de espera, em segundos. Se omitido, espera indefinidamente.
+
+        RETORNO 1: `True` se a cópia foi gravada por completo, `False` se o tempo se esgotou ou se a gravação falhou.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - A instância foi iniciada.
+
+        Assertiva(s) de saída:
+        - Se retornou `True`, todas as entidades estão gravadas no destino.
+
+        E) DESCRIÇÃO:
+        1. Aguarda o término da thread pelo tempo informado.
+        2. Retorna se a thread terminou sem erro.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Em caso de falha, o erro fica em `ultimo_erro`.
+        """
+        self._thread.join(timeout)
+        return not self._thread.is_alive() and self.ultimo_erro is None
+
+    def _ao_modificar(self, entidade, objeto):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _ao_modificar()
+
+        B) OBJETIVO:
+        Preservar o estado congelado de um objeto prestes a ser alterado; é o observador registrado no rastreamento.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Entidade do objeto marcado.
+        PARÂMETRO 2: objeto
+        Objeto marcado, ainda no estado anterior à alteração.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Chamado por `marcar_modificado()`.
+
+        Assertiva(s) de saída:
+        - Se o objeto faz parte da visão congelada e ainda não foi gravado, a visão guarda o seu `to_json()` no lugar dele.
+
+        E) DESCRIÇÃO:
+        1. Com a trava, procura o objeto na visão congelada pela sua chave, comparando por identidade.
+        2. Se não estiver lá (objeto novo, já gravado ou já preservado), não faz nada.
+        3. Caso contrário, substitui o objeto na visão pelo seu `to_json()`, mantendo a posição da chave.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Executa na thread que altera os dados; se a thread de gravação estiver serializando um objeto, espera no máximo por esse objeto.
+        - Cada objeto é copiado no máximo uma vez, na primeira alteração após o congelamento.
+        """
+        with self._trava:
+            if self._visao is None or entidade not in self._visao:
+                return
+            visao = self._visao[entidade]
+            chave = _REGISTROS[entidade][1](objeto)
+            if visao.get(chave) is not objeto:
+                return
+            visao[chave] = _Preservado(objeto.to_json())
+            self.preservados += 1
+
+    def _executar(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _executar()
+
+        B) OBJETIVO:
+        Laço da thread de gravação: serializar a visão congelada, entidade por entidade, e gravá-la no destino.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Executado pela thread criada em `iniciar()`.
+
+        Assertiva(s) de saída:
+        - O observador foi removido e a visão foi descartada.
+        - Em caso de sucesso, `gravados` contém o número de registros de cada entidade; em caso de erro, o erro está em `ultimo_erro`.
+
+        E) DESCRIÇÃO:
+        1. Para cada entidade, na ordem de dependência, percorre as chaves da visão na ordem do registro.
+        2. Para cada chave, com a trava, retira o item da visão e usa o estado preservado pelo observador ou, se o objeto não foi alterado, o seu `to_json()`.
+        3. Entrega os registros da entidade ao destino com `salvar()` e libera a memória antes da próxima entidade.
+        4. Ao final, ou em caso de erro, remove o observador e descarta a visão.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - A trava é mantida apenas durante a serialização de um objeto, nunca durante a escrita no destino.
+        - A serialização concorre pelo GIL com a thread principal; a escrita em disco não.
+        """
+        try:
+            for entidade in _REGISTROS:
+                visao = self._visao[entidade]
+                registros = {}
+                with self._trava:
+                    chaves = list(visao)
+                for chave in chaves:
+                    with self._trava:
+                        objeto = visao.pop(chave)
+                        registros[str(chave)] = objeto.registro if isinstance(objeto, _Preservado) else objeto.to_json()
+                self.destino.salvar(entidade, registros)
+                self.gravados[entidade] = len(registros)
+        except Exception as erro:
+            self.ultimo_erro = erro
+        finally:
+            remover_observador(self._ao_modificar)
+            with self._trava:
+                self._visao = None
@@ -0,0 +1,502 @@
+import json
+import os
+
+from . import estoque as _modulo_estoque
+from .rastreamento import marcar_modificado
+
+
+__all__ = [
+    "DiarioEstoque"
+]
+
+
+DIARIO_ESTOQUES = 'dados/estoques.diario'
+SNAPSHOT_ESTOQUES = 'dados/estoques.snapshot.json'
+
+
+def _estoques_ativos():
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _estoques_ativos()
+
+    B) OBJETIVO:
+    Reunir as instâncias de `Estoque` em uso no sistema, indexadas pelo código do estoque.
+
+    C) ACOPLAMENTO:
+    PARÂMETROS: Nenhum.
+
+    RETORNO 1: DICIONÁRIO {<código do estoque>: [<instâncias de Estoque>]}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Cada instância aparece uma única vez, mesmo que esteja em mais de um registro.
+
+    E) DESCRIÇÃO:
+    1. Importa localmente o módulo de unidades para evitar importações circulares.
+    2. Percorre primeiro os estoques das unidades (que são os manipulados pelo menu) e depois o registro `_todos_estoques`.
+    3. Agrupa as instâncias pelo código, ignorando repetições da mesma instância.
+    4. Retorna o dicionário montado.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Função de uso interno deste módulo.
+    """
+    from modulos import unidades
+
+    candidatos = [u.estoque for u in unidades._unidades.values()]
+    candidatos.extend(_modulo_estoque._todos_estoques.values())
+
+    ativos = {}
+    vistos = set()
+    for estoque in candidatos:
+        if id(estoque) in vistos:
+            continue
+        vistos.add(id(estoque))
+        ativos.setdefault(estoque.codigo, []).append(estoque)
+    return ativos
+
+
+class DiarioEstoque:
+
+    def __init__(self, caminho_diario: str = DIARIO_ESTOQUES, caminho_snapshot: str = SNAPSHOT_ESTOQUES,
+                 limite_compactacao: int = 1000, sincronizar: bool = False):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Inicializar o diário de operações de estoque, composto por um arquivo de operações (uma por linha) e um snapshot periódico.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: caminho_diario (string, opcional)
+        Arquivo onde as operações são anexadas.
+        PARÂMETRO 2: caminho_snapshot (string, opcional)
+        Arquivo com o estado completo dos estoques no momento da última compactação.
+        PARÂMETRO 3: limite_compactacao (inteiro, opcional)
+        Número de operações no diário que dispara uma compactação automática. `0` desativa a compactação automática.
+        PARÂMETRO 4: sincronizar (booleano, opcional)
+        Se `True`, força a gravação física (`fsync`) de cada operação.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O diretório dos arquivos existe.
+
+        Assertiva(s) de saída:
+        - Uma nova instância de `DiarioEstoque` é criada. O arquivo do diário só é aberto na primeira operação.
+
+        E) DESCRIÇÃO:
+        1. Armazena os caminhos e as opções recebidas.
+        2. Deixa o número de sequência indefinido; ele é descoberto em `recuperar()` ou na primeira operação registrada.
+
+        F) HIPÓTESES:
+        - Apenas um processo usa os arquivos do diário por vez.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        self.caminho_diario = caminho_diario
+        self.caminho_snapshot = caminho_snapshot
+        self.limite_compactacao = limite_compactacao
+        self.sincronizar = sincronizar
+        self._arquivo = None
+        self._seq = None
+        self._pendentes = 0
+
+    def registrar(self, codigo_estoque: str, operacao: str, argumentos):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: registrar()
+
+        B) OBJETIVO:
+        Anexar uma operação de estoque ao final do arquivo do diário.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo_estoque (string)
+        Código do estoque alterado.
+        PARÂMETRO 2: operacao (string)
+        Código de uma letra da operação (ver `Estoque._registrar_operacao`).
+        PARÂMETRO 3: argumentos (sequência)
+        Dados primitivos necessários para refazer a operação.
+
+        RETORNO 1: O número de sequência atribuído à operação (inteiro).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - A operação já foi aplicada com sucesso em memória.
+
+        Assertiva(s) de saída:
+        - Uma nova linha `[seq, codigo_estoque, operacao, *argumentos]` foi escrita no diário.
+
+        E) DESCRIÇÃO:
+        1. Descobre o último número de sequência, se ainda não for conhecido.
+        2. Abre o arquivo do diário em modo de anexação, se ainda não estiver aberto.
+        3. Escreve a operação como uma linha JSON compacta e descarrega o buffer (e sincroniza com o disco, se configurado).
+        4. Se o número de operações pendentes atingir `limite_compactacao`, executa `compactar()`.
+        5. Retorna o número de sequência.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo de cada chamada depende apenas do tamanho da operação, e não do número de produtos do estoque (exceto quando dispara a compactação).
+        """
+        if self._seq is None:
+            self._seq = self._descobrir_seq()
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho_diario, 'a', encoding='utf-8')
+
+        self._seq += 1
+        linha = json.dumps([self._seq, codigo_estoque, operacao, *argumentos],
+                           ensure_ascii=False, separators=(',', ':'))
+        self._arquivo.write(linha + '\n')
+        self._arquivo.flush()
+        if self.sincronizar:
+            os.fsync(self._arquivo.fileno())
+
+        self._pendentes += 1
+        if self.limite_compactacao and self._pendentes >= self.limite_compactacao:
+            self.compactar()
+        return self._seq
+
+    def compactar(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: compactar()
+
+        B) OBJETIVO:
+        Gravar o estado atual de todos os estoques em um snapshot e esvaziar o diário.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: DICIONÁRIO {"retorno": 0, "mensagem": str, "dados": <número de estoques gravados>}
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Todas as operações registradas no diário já estão refletidas em memória.
+
+        Assertiva(s) de saída:
+        - O snapshot contém o estado atual e o número de sequência da última operação; o diário fica vazio.
+
+        E) DESCRIÇÃO:
+        1. Serializa cada estoque ativo com `to_json()`.
+        2. Escreve o snapshot em um arquivo temporário, sincroniza-o e o troca pelo definitivo com `os.replace`, de forma atômica.
+        3. Só então trunca o arquivo do diário.
+        4. Zera o contador de operações pendentes e retorna sucesso.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Uma queda entre a troca do snapshot e o truncamento do diário é segura: `recuperar()` ignora operações com sequência já incluída no snapshot.
+        """
+        if self._seq is None:
+            self._seq = self._descobrir_seq()
+
+        estoques = {codigo: instancias[0].to_json() for codigo, instancias in _estoques_ativos().items()}
+
+        temporario = self.caminho_snapshot + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({"seq": self._seq, "estoques": estoques}, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho_snapshot)
+
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+        open(self.caminho_diario, 'w', encoding='utf-8').close()
+        self._pendentes = 0
+
+        return {"retorno": 0, "mensagem": "Diário compactado com sucesso.", "dados": len(estoques)}
+
+    def recuperar(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: recuperar()
+
+        B) OBJETIVO:
+        Restaurar o estado dos estoques combinando o que foi carregado do armazenamento, o último snapshot e as operações do diário que nenhum dos dois reflete.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: DICIONÁRIO {"retorno": 0, "mensagem": str, "dados": <número de operações refeitas>}
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Os produtos e os estoques já foram carregados (`carregar_produtos`, `carregar_estoques`, `carregar_unidades`).
+
+        Assertiva(s) de saída:
+        - As instâncias de `Estoque` em uso refletem o estado mais recente entre o gravado e o snapshot, mais as operações posteriores do diário.
+        - O diário fica pronto para receber novas operações a partir da maior sequência conhecida.
+
+        E) DESCRIÇÃO:
+        1. Se houver snapshot, percorre os seus estoques:
+           a. Estoques ausentes em memória são criados a partir do snapshot e registrados em `_todos_estoques`.
+           b. Um estoque carregado é substituído pelo do snapshot apenas se foi gravado com uma sequência do diário (`seq_diario`) menor que a do snapshot.
+           c. Estoques gravados com sequência igual ou maior, ou sem sequência (gravados sem diário ativo, como pela geração de dados de teste ou pela importação), são mais recentes que o snapshot e ficam como foram carregados.
+        2. Define, para cada estoque, a sequência a partir da qual o diário é refeito: a maior entre a gravada e a do snapshot.
+        3. Desativa temporariamente o diário global, para que a reaplicação não gere novas linhas.
+        4. Lê o diário com `_ler_operacoes()`, ignorando as operações com sequência menor ou igual à do seu estoque (ou à do snapshot, para estoques ainda desconhecidos).
+        5. A leitura termina na primeira linha incompleta (escrita interrompida por uma queda), que é cortada do arquivo para que as próximas operações não sejam anexadas a ela.
+        6. Refaz cada operação chamando o método correspondente de `Estoque` em todas as instâncias com aquele código, criando e registrando o estoque se ele ainda não existir.
+        7. Restaura o diário global e retorna o número de operações refeitas.
+
+        F) HIPÓTESES:
+        - Os produtos referenciados no diário existem no catálogo; operações sobre produtos ausentes são ignoradas.
+        - Um estoque gravado sem diário reflete todas as operações até o snapshot; as posteriores a ele são refeitas.
+
+        G) RESTRIÇÕES:
+        - Deve ser chamada antes de qualquer nova mutação de estoque na sessão.
+        """
+        from modulos.produto import consultar_produto_por_codigo
+
+        ativos = _estoques_ativos()
+        seq_snapshot = 0
+
+        if os.path.exists(self.caminho_snapshot):
+            with open(self.caminho_snapshot, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            seq_snapshot = snapshot["seq"]
+            for codigo, dados in snapshot["estoques"].items():
+                if codigo in ativos:
+                    seq_gravada = ativos[codigo][0].seq_diario
+                    if seq_gravada is None or seq_gravada >= seq_snapshot:
+                        continue
+                restaurado = _modulo_estoque.Estoque.from_json(dados)
+                if codigo not in ativos:
+                    marcar_modificado("estoques", restaurado)
+                    _modulo_estoque._todos_estoques[codigo] = restaurado
+                    ativos[codigo] = [restaurado]
+                    continue
+                for instancia in ativos[codigo]:
+                    instancia.estoque = dict(restaurado.estoque)
+                    instancia.exposicao = dict(restaurado.exposicao)
+                    instancia.capacidades = {p: dict(c) for p, c in restaurado.capacidades.items()}
+
+        produtos = {}
+
+        def produto(codigo):
+            if codigo not in produtos:
+                res = consultar_produto_por_codigo(codigo)
+                produtos[codigo] = res["dados"] if res["retorno"] == 0 else None
+            return produtos[codigo]
+
+        inicio = {codigo: max(instancias[0].seq_diario or 0, seq_snapshot) for codigo, instancias in ativos.items()}
+
+        self._seq = max([seq_snapshot, *inicio.values()])
+        refeitas = 0
+        diario_anterior = _modulo_estoque._diario
+        _modulo_estoque.definir_diario(None)
+        try:
+            for seq, codigo, operacao, *argumentos in self._ler_operacoes():
+                self._seq = max(self._seq, seq)
+                if seq <= inicio.get(codigo, seq_snapshot):
+                    continue
+                self._pendentes += 1
+                if codigo not in ativos:
+                    novo = _modulo_estoque.Estoque(codigo=codigo)
+                    marcar_modificado("estoques", novo)
+                    _modulo_estoque._todos_estoques[codigo] = novo
+                    ativos[codigo] = [novo]
+                for instancia in ativos[codigo]:
+                    self._refazer(instancia, operacao, argumentos, produto)
+                refeitas += 1
+        finally:
+            _modulo_estoque.definir_diario(diario_anterior)
+
+        return {"retorno": 0, "mensagem": "Estoques recuperados com sucesso.", "dados": refeitas}
+
+    def seq_atual(self):
+        """Retorna a sequência da última operação registrada, gravada por `salvar_estoques()` junto de cada estoque."""
+        if self._seq is None:
+            self._seq = self._descobrir_seq()
+        return self._seq
+
+    def fechar(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: fechar()
+
+        B) OBJETIVO:
+        Liberar o arquivo do diário.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O arquivo do diário está fechado. Uma nova operação o reabre.
+
+        E) DESCRIÇÃO:
+        1. Fecha o arquivo, se estiver aberto.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def _descobrir_seq(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _descobrir_seq()
+
+        B) OBJETIVO:
+        Determinar o maior número de sequência já usado, consultando o snapshot e o diário existentes.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: O maior número de sequência encontrado (inteiro), ou 0.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Novas operações receberão sequências maiores do que todas as já gravadas.
+
+        E) DESCRIÇÃO:
+        1. Lê a sequência gravada no snapshot, se existir.
+        2. Percorre o diário com `_ler_operacoes()`, que corta uma linha incompleta no fim, e guarda a maior sequência.
+        3. Retorna o maior valor encontrado.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Método de uso interno da classe; só é usado quando `recuperar()` não foi chamado.
+        """
+        seq = 0
+        if os.path.exists(self.caminho_snapshot):
+            with open(self.caminho_snapshot, 'r', encoding='utf-8') as f:
+                seq = json.load(f)["seq"]
+        for operacao in self._ler_operacoes():
+            seq = max(seq, operacao[0])
+        return seq
+
+    def _ler_operacoes(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _ler_operacoes()
+
+        B) OBJETIVO:
+        Ler as operações completas do diário e remover do arquivo a linha incompleta deixada por uma queda, antes que novas operações sejam anexadas a ela.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: Gerador das operações do diário, cada uma a lista `[seq, codigo_estoque, operacao, *argumentos]`.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O arquivo do diário não está aberto para anexação (`registrar()` só o abre depois de `recuperar()` ou `_descobrir_seq()`).
+
+        Assertiva(s) de saída:
+        - Consumido o gerador, o arquivo termina na última linha completa.
+
+        E) DESCRIÇÃO:
+        1. Se o diário não existir, não produz nada.
+        2. Lê o arquivo em modo binário, linha a linha, somando o tamanho das linhas lidas.
+        3. Para na primeira linha sem quebra de linha no fim ou que não seja um JSON válido; produz as anteriores.
+        4. Se o arquivo for maior que o trecho lido, trunca-o no fim da última linha completa e sincroniza-o com o disco.
+
+        F) HIPÓTESES:
+        - Uma linha incompleta só pode estar no fim: cada operação é escrita e descarregada inteira antes da seguinte.
+
+        G) RESTRIÇÕES:
+        - Sem o truncamento, a próxima operação seria anexada ao fragmento, e a linha resultante, inválida, interromperia as recuperações seguintes, descartando todas as operações posteriores.
+        - O gerador deve ser consumido até o fim para que o truncamento ocorra.
+        """
+        if not os.path.exists(self.caminho_diario):
+            return
+        with open(self.caminho_diario, 'rb+') as f:
+            fim = 0
+            for linha in f:
+                if not linha.endswith(b'\n'):
+                    break
+                try:
+                    operacao = json.loads(linha)
+                except ValueError:
+                    break
+                fim += len(linha)
+                yield operacao
+            if f.seek(0, os.SEEK_END) > fim:
+                f.truncate(fim)
+                f.flush()
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _refazer(instancia, operacao: str, argumentos: list, produto):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _refazer()
+
+        B) OBJETIVO:
+        Reaplicar uma única operação do diário sobre uma instância de `Estoque`.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: instancia (Estoque)
+        Estoque sobre o qual a operação é refeita.
+        PARÂMETRO 2: operacao (string)
+        Código de uma letra da operação.
+        PARÂMETRO 3: argumentos (lista)
+        Argumentos gravados no diário.
+        PARÂMETRO 4: produto (função)
+        Função que converte um código de produto no objeto `Produto` (ou `None`).
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O diário global está desativado durante a chamada.
+
+        Assertiva(s) de saída:
+        - A instância reflete a operação, se os produtos envolvidos existirem.
+
+        E) DESCRIÇÃO:
+        1. Para vendas ("V"), converte os códigos em produtos e chama `retirar_venda`, descartando itens de produtos inexistentes.
+        2. Para as demais operações, converte o primeiro argumento em produto e chama o método correspondente.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Método de uso interno da classe.
+        """
+        if operacao == "V":
+            venda = {produto(c): q for c, q in argumentos[0].items() if produto(c) is not None}
+            instancia.retirar_venda(venda)
+            return
+
+        alvo = produto(argumentos[0])
+        if alvo is None:
+            return
+        if operacao == "R":
+            instancia.registrar_produto(alvo, argumentos[1], argumentos[2])
+        elif operacao == "X":
+            instancia.remover_produto(alvo)
+        elif operacao == "C":
+            instancia.atualizar_capacidades(alvo, argumentos[1], argumentos[2])
+        elif operacao == "A":
+            instancia.adicionar_produto(alvo, argumentos[1], argumentos[2])
+        elif operacao == "M":
+            instancia.mover_para_exposicao(alvo, argumentos[1])
@@ -1,23 +1,30 @@
-import json
+from .armazenamento import obter_armazenamento
+from .rastreamento import Rastreavel, marcar_modificado, limpar_modificados, geracao_atual, selecionar_para_gravacao
+from .contexto_carga import ContextoCarga
+from .paginacao import parametro_invalido, iterar_registro, fatiar, paginar
 
 ESTOQUES_JSON = 'dados/estoques.json'
 
 _todos_estoques = {}
 
+_diario = None
+
 
 __all__ = [
     "Estoque",
     "registrar_estoque",
     "listar_todos_estoques",
     "salvar_estoques",
-    "carregar_estoques"
+    "carregar_estoques",
+    "definir_diario"
 ]
 
 
 
-class Estoque:
+class Estoque(Rastreavel, entidade="estoques"):
 
-    def __init__(self, codigo: str, estoque: dict = None, exposicao: dict = None, capacidades: dict = None):
+    def __init__(self, codigo: str, estoque: dict = None, exposicao: dict = None, capacidades: dict = None,
+                 seq_diario: int = None):
         """
         ESPECIFICAÇÃO DE FUNÇÃO:
         A) NOME: __init__()
@@ -34,6 +41,8 @@ class Estoque:
         Dicionário para rastrear as quantidades de produtos na área de exposição (prateleiras).
         PARÂMETRO 4: capacidades (dicionário, opcional)
         Dicionário para definir as capacidades máximas de cada produto no estoque e na exposição.
+        PARÂMETRO 5: seq_diario (inteiro, opcional)
+        Sequência da última operação do diário de estoques refletida no estado gravado deste estoque (ver `salvar_estoques()`). `None` se o estado foi gravado sem um diário ativo.
 
         RETORNO: Nenhum (é um método construtor).
 
@@ -51,6 +60,7 @@ class Estoque:
         3. Para cada um dos parâmetros de dicionário (`estoque`, `exposicao`, `capacidades`), ele verifica se foi fornecido um valor.
         4. Se um parâmetro for `None`, ele inicializa o atributo correspondente como um dicionário vazio para evitar erros em operações futuras.
         5. Se um valor for fornecido, ele é atribuído diretamente.
+        6. Guarda `seq_diario`, usado por `DiarioEstoque.recuperar()` para decidir quais operações do diário ainda não constam do estado gravado.
 
         F) HIPÓTESES:
         - A validação da unicidade e do formato do `codigo` é feita pela função que chama este construtor (ex: `registrar_estoque`).
@@ -70,6 +80,7 @@ class Estoque:
         self.estoque = estoque
         self.exposicao = exposicao
         self.capacidades = capacidades
+        self.seq_diario = seq_diario
 
 
 
@@ -153,7 +164,8 @@ class Estoque:
         2. Utiliza "dictionary comprehensions" para transformar os dicionários internos:
            a. Para `estoque` e `exposicao`, o novo dicionário usará o `produto.codigo` como chave e a quantidade como valor.
            b. Para `capacidades`, o novo dicionário usará o `produto.codigo` como chave e um dicionário com as capacidades como valor.
-        3. Retorna o dicionário completo e formatado para JSON.
+        3. Se `seq_diario` for conhecido, inclui-o na chave "seq_diario".
+        4. Retorna o dicionário completo e formatado para JSON.
 
         F) HIPÓTESES:
         - A estrutura de dados interna está consistente.
@@ -161,7 +173,7 @@ class Estoque:
         G) RESTRIÇÕES:
         - A estrutura do dicionário de saída é fixa. Qualquer alteração na classe pode exigir uma atualização neste método.
         """        
-        return {
+        dados = {
             "codigo": self.codigo,
             "estoque": {p.codigo: qtd for p, qtd in self.estoque.items()},
             "exposicao": {p.codigo: qtd for p, qtd in self.exposicao.items()},
@@ -170,9 +182,12 @@ class Estoque:
                 for p, cap in self.capacidades.items()
             }
         }
+        if self.seq_diario is not None:
+            dados["seq_diario"] = self.seq_diario
+        return dados
 
     @classmethod
-    def from_json(cls, data: dict):
+    def from_json(cls, data: dict, contexto: ContextoCarga = None):
         """
         ESPECIFICAÇÃO DE FUNÇÃO:
         A) NOME: from_json()
@@ -183,6 +198,8 @@ class Estoque:
         C) ACOPLAMENTO:
         PARÂMETRO 1: data (dicionário)
         Dicionário com os dados do estoque, onde os produtos são representados por seus códigos.
+        PARÂMETRO 2: contexto (ContextoCarga, opcional)
+        Contexto compartilhado por todos os registros de uma carga. Se omitido, é criado um só para este estoque.
 
         RETORNO 1: Uma nova instância da classe `Estoque`.
 
@@ -195,34 +212,39 @@ class Estoque:
         - Retorna uma instância de `Estoque` cujos dicionários internos usam objetos `Produto` como chaves.
 
         E) DESCRIÇÃO:
-        1. Realiza uma importação local da função `consultar_produto_por_codigo` para evitar problemas de importação circular.
-        2. Cria uma instância de `Estoque` preliminar, apenas com o código.
+        1. Usa o contexto recebido ou cria um novo.
+        2. Cria uma instância de `Estoque` preliminar, apenas com o código e a sequência do diário gravada (`data.get("seq_diario")`, ausente nos registros gravados sem diário).
         3. Itera sobre os códigos de produto encontrados no dicionário `data["capacidades"]`.
-        4. Para cada código, utiliza `consultar_produto_por_codigo` para obter o objeto `Produto` completo correspondente.
-        5. Se um produto não for encontrado, lança uma exceção `ValueError`, interrompendo o carregamento.
+        4. Para cada código, utiliza `contexto.produto()`, que consulta diretamente o registro global, para obter o objeto `Produto` correspondente.
+        5. Códigos não encontrados são acumulados no contexto e omitidos do estoque.
         6. Usa o objeto `Produto` recuperado como a chave para popular os dicionários `capacidades`, `estoque` e `exposicao` da nova instância.
-        7. Retorna a instância de `Estoque` completamente populada.
+        7. Se o contexto foi criado aqui, chama `contexto.verificar()`, que lança `ErroReferencias` listando todos os códigos ausentes deste estoque.
+        8. Retorna a instância de `Estoque` completamente populada.
 
         F) HIPÓTESES:
         - O módulo de produtos e seus dados já foram carregados no sistema antes da execução desta função.
-        - A função `consultar_produto_por_codigo` está disponível e funciona como esperado.
 
         G) RESTRIÇÕES:
         - O processo de carregamento de estoques depende criticamente do carregamento prévio dos produtos.
-        - Lança uma exceção não tratada se um código de produto no JSON não existir, o que pode interromper a inicialização do sistema.
-        """    
-        from modulos.produto import consultar_produto_por_codigo
-
-        estoque = cls(codigo=data["codigo"])
-        for codigo in data["capacidades"]:
-            res = consultar_produto_por_codigo(codigo)
-            if res["retorno"] != 0:
-                raise ValueError(f"Produto {codigo} não encontrado. Inicialize antes de carregar o estoque.")
-            produto = res["dados"]
-            estoque.capacidades[produto] = data["capacidades"][codigo]
-            estoque.estoque[produto] = data["estoque"].get(codigo, 0)
-            estoque.exposicao[produto] = data["exposicao"].get(codigo, 0)
-
+        - Com um contexto recebido, nenhuma exceção é lançada por referências ausentes: cabe a quem criou o contexto chamar `verificar()` ao final da carga.
+        """
+        proprio = contexto is None
+        if proprio:
+            contexto = ContextoCarga()
+        origem = f"estoque {data['codigo']}"
+
+        estoque = cls(codigo=data["codigo"], seq_diario=data.get("seq_diario"))
+        capacidades, quantidades, exposicao = data["capacidades"], data["estoque"], data["exposicao"]
+        for codigo, capacidade in capacidades.items():
+            produto = contexto.produto(codigo, origem)
+            if produto is None:
+                continue
+            estoque.capacidades[produto] = capacidade
+            estoque.estoque[produto] = quantidades.get(codigo, 0)
+            estoque.exposicao[produto] = exposicao.get(codigo, 0)
+
+        if proprio:
+            contexto.verificar()
         return estoque
 
 
@@ -276,12 +298,14 @@ class Estoque:
         if produto in self.capacidades:
             return {"retorno": 1, "mensagem": "Produto já está registrado."}
 
+        marcar_modificado("estoques", self)
         self.estoque[produto] = 0
         self.exposicao[produto] = 0
         self.capacidades[produto] = {
             "estoque": capacidade_estoque,
             "exposicao": capacidade_exposicao
         }
+        self._registrar_operacao("R", produto.codigo, capacidade_estoque, capacidade_exposicao)
         return {"retorno": 0, "mensagem": "Produto registrado com sucesso."}
 
 
@@ -334,9 +358,11 @@ class Estoque:
         if self.estoque.get(produto, 0) > 0 or self.exposicao.get(produto, 0) > 0:
             return {"retorno": 2, "mensagem": "Produto ainda possui quantidades em estoque ou exposição."}
 
+        marcar_modificado("estoques", self)
         self.estoque.pop(produto, None)
         self.exposicao.pop(produto, None)
         self.capacidades.pop(produto, None)
+        self._registrar_operacao("X", produto.codigo)
 
         return {"retorno": 0, "mensagem": "Produto removido com sucesso."}
 
@@ -460,20 +486,30 @@ class Estoque:
 
 
 
-    def listar_produtos(self, detalhado=False):
+    def listar_produtos(self, detalhado=False, limite: int = None, deslocamento: int = 0, cursor: tuple = None):
         """
         ESPECIFICAÇÃO DE FUNÇÃO:
         A) NOME: listar_produtos() (Método de Estoque)
 
         B) OBJETIVO:
-        Fornecer uma lista de todos os produtos registrados neste estoque, de forma simples (só códigos) ou detalhada (com quantidades e capacidades).
+        Fornecer uma lista de todos os produtos registrados neste estoque, de forma simples (só códigos) ou detalhada (com quantidades e capacidades), inteira ou uma página de cada vez.
 
         C) ACOPLAMENTO:
         PARÂMETRO 1: detalhado (booleano, opcional)
         Se `True`, retorna uma lista de dicionários com todos os detalhes. Se `False` (padrão), retorna uma lista de strings com os códigos.
+        PARÂMETRO 2: limite (inteiro, opcional)
+        Tamanho da página. Se omitido, lista todos os produtos a partir do `deslocamento`/`cursor`.
+        PARÂMETRO 3: deslocamento (inteiro, opcional)
+        Número de produtos saltados antes da página.
+        PARÂMETRO 4: cursor (tupla, opcional)
+        Cursor retornado pela página anterior; a listagem continua depois dele.
+
+        RETORNO 1: DICIONÁRIO DE ERRO POR PAGINAÇÃO INVÁLIDA:
+        {"retorno": 2, "mensagem": "Parâmetro <nome_do_parametro> inválido."}
 
-        RETORNO 1: DICIONÁRIO DE SUCESSO COM A LISTA DE PRODUTOS:
+        RETORNO 2: DICIONÁRIO DE SUCESSO COM A LISTA DE PRODUTOS:
         {"retorno": 0, "mensagem": "Listagem realizada com sucesso.", "dados": [<lista>]}
+        Com `limite`, também a chave "cursor": <cursor da página seguinte, ou None na última página>.
 
         D) CONDIÇÕES DE ACOPLAMENTO:
         Assertiva(s) de entrada:
@@ -483,35 +519,87 @@ class Estoque:
         - O retorno é um dicionário contendo, na chave 'dados', uma lista de strings ou uma lista de dicionários, dependendo do parâmetro `detalhado`.
 
         E) DESCRIÇÃO:
-        1. Itera sobre todos os códigos de produtos registrados em `self.capacidades`.
-        2. Se `detalhado` for `True`, monta um dicionário com todos os dados do produto (código, quantidades, capacidades) e o adiciona à lista de resultados.
-        3. Se `detalhado` for `False`, adiciona apenas o código do produto à lista de resultados.
+        1. Valida os parâmetros de paginação.
+        2. Percorre os produtos registrados em `self.capacidades` com `_iterar_produtos()`, que descreve cada um pelo código ou, se `detalhado`, por um dicionário com código, quantidades e capacidades.
+        3. Sem `limite`, reúne todos os produtos depois do `deslocamento`; com `limite`, reúne apenas a página com `paginar()` e guarda o cursor da página seguinte.
         4. Retorna um dicionário de sucesso com a lista montada.
 
         F) HIPÓTESES:
         - A estrutura de dados do estoque está consistente.
 
         G) RESTRIÇÕES:
+        - Com `limite`, só os produtos da página são descritos.
+        """
+        erro = parametro_invalido(limite, deslocamento, cursor)
+        if erro is not None:
+            return {"retorno": 2, "mensagem": f"Parâmetro {erro} inválido."}
+
+        pares = self._iterar_produtos(detalhado, cursor)
+        if limite is None:
+            return {
+                "retorno": 0,
+                "mensagem": "Listagem realizada com sucesso.",
+                "dados": list(fatiar(pares, None, deslocamento))
+            }
+
+        produtos, proximo = paginar(pares, limite, deslocamento)
+        return {
+            "retorno": 0,
+            "mensagem": "Listagem realizada com sucesso.",
+            "dados": produtos,
+            "cursor": proximo
+        }
+
+    def iterar_produtos(self, detalhado=False, limite: int = None, deslocamento: int = 0, cursor: tuple = None):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: iterar_produtos() (Método de Estoque)
+
+        B) OBJETIVO:
+        Variante sob demanda de `listar_produtos()`: percorrer os produtos do estoque sem montar uma lista.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS 1 a 4: detalhado, limite, deslocamento e cursor
+        Como em `listar_produtos()`; `limite` é o número máximo de itens produzidos.
+
+        RETORNO 1: Gerador de códigos ou, se `detalhado`, de dicionários com código, quantidades e capacidades.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O estoque não ganha nem perde produtos enquanto o gerador é consumido.
+
+        Assertiva(s) de saída:
+        - Cada item é descrito apenas quando pedido.
+
+        E) DESCRIÇÃO:
+        1. Valida os parâmetros de paginação.
+        2. Retorna os itens de `_iterar_produtos()`, fatiados por `deslocamento` e `limite`.
+
+        F) HIPÓTESES:
         - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lança `ValueError` se um parâmetro for inválido, já que um gerador não retorna dicionário de erro.
         """
-        produtos = []
-        for produto in self.capacidades:
+        erro = parametro_invalido(limite, deslocamento, cursor)
+        if erro is not None:
+            raise ValueError(f"Parâmetro {erro} inválido.")
+        return fatiar(self._iterar_produtos(detalhado, cursor), limite, deslocamento)
+
+    def _iterar_produtos(self, detalhado, cursor=None):
+        """Percorre `self.capacidades` a partir do cursor, produzindo os pares (<cursor>, <código ou dicionário detalhado>)."""
+        for cursor_produto, capacidade in iterar_registro(self.capacidades, cursor):
+            produto = cursor_produto[1]
             if detalhado:
-                produtos.append({
+                yield cursor_produto, {
                     "codigo": produto.codigo,
                     "estoque": self.estoque[produto],
                     "exposicao": self.exposicao[produto],
-                    "capacidade_estoque": self.capacidades[produto]["estoque"],
-                    "capacidade_exposicao": self.capacidades[produto]["exposicao"]
-                })
+                    "capacidade_estoque": capacidade["estoque"],
+                    "capacidade_exposicao": capacidade["exposicao"]
+                }
             else:
-                produtos.append(produto.codigo)
-
-        return {
-            "retorno": 0,
-            "mensagem": "Listagem realizada com sucesso.",
-            "dados": produtos
-        }
+                yield cursor_produto, produto.codigo
 
 
 
@@ -568,12 +656,14 @@ class Estoque:
         if capacidade_estoque is None and capacidade_exposicao is None:
             return {"retorno": 2, "mensagem": "Por favor especifique alguma capacidade a atualizar."}
 
+        marcar_modificado("estoques", self)
         if capacidade_estoque is not None:
             self.capacidades[produto]["estoque"] = capacidade_estoque
 
         if capacidade_exposicao is not None:
             self.capacidades[produto]["exposicao"] = capacidade_exposicao
 
+        self._registrar_operacao("C", produto.codigo, capacidade_estoque, capacidade_exposicao)
         return {"retorno": 0, "mensagem": "Capacidades atualizadas com sucesso."}
 
 
@@ -649,7 +739,9 @@ class Estoque:
             limite = self.capacidades[produto]["estoque"]
             if atual + quantidade > limite:
                 return {"retorno": 2, "mensagem": "Capacidade de estoque excedida para o produto."}
+            marcar_modificado("estoques", self)
             self.estoque[produto] += quantidade
+            self._registrar_operacao("A", produto.codigo, quantidade, destino)
             return {"retorno": 0, "mensagem": "Produto adicionado ao estoque interno."}
 
         elif destino == 'exposicao':
@@ -657,7 +749,9 @@ class Estoque:
             limite = self.capacidades[produto]["exposicao"]
             if atual + quantidade > limite:
                 return {"retorno": 3, "mensagem": "Capacidade de exposição excedida para o produto."}
+            marcar_modificado("estoques", self)
             self.exposicao[produto] += quantidade
+            self._registrar_operacao("A", produto.codigo, quantidade, destino)
             return {"retorno": 0, "mensagem": "Produto adicionado à exposição."}
 
         else:
@@ -721,8 +815,10 @@ class Estoque:
         if self.exposicao[produto] + quantidade > self.capacidades[produto]["exposicao"]:
             return {"retorno": 3, "mensagem": "Capacidade de exposição excedida para o produto."}
 
+        marcar_modificado("estoques", self)
         self.estoque[produto] -= quantidade
         self.exposicao[produto] += quantidade
+        self._registrar_operacao("M", produto.codigo, quantidade)
         return {"retorno": 0, "mensagem": "Produto movido para a exposição."}
 
 
@@ -760,18 +856,18 @@ class Estoque:
 
         E) DESCRIÇÃO:
         1. Itera sobre os itens e quantidades no dicionário `venda`.
-        2. Para cada item, extrai o código do produto.
-        3. Verifica se o produto está registrado no estoque.
-        4. Verifica se a quantidade em exposição é suficiente para cobrir a venda.
-        5. Se qualquer verificação falhar, a função retorna um erro imediatamente e não altera o estado do estoque.
-        6. Se todos os itens forem válidos, a função então subtrai a quantidade vendida da `exposicao` para cada item.
+        2. Para cada item, verifica se o produto está registrado no estoque.
+        3. Verifica se a quantidade em exposição é suficiente para cobrir a venda.
+        4. Se qualquer verificação falhar, a função retorna um erro imediatamente e não altera o estado do estoque.
+        5. Se todos os itens forem válidos, a função então subtrai a quantidade vendida da `exposicao` para cada item, em uma segunda passagem.
+        6. Registra a venda inteira como uma única operação no diário de estoques, se houver um ativo.
         7. Retorna sucesso.
 
         F) HIPÓTESES:
         - A função é chamada após a validação da venda, mas faz sua própria verificação de consistência.
 
         G) RESTRIÇÕES:
-        - A operação não é atômica no sentido de que, se um item falhar no meio do loop (o que não ocorre no código atual), os anteriores não seriam revertidos. O código atual retorna no primeiro erro, evitando este problema.
+        - Como a validação é feita antes de qualquer baixa, uma venda é aplicada por inteiro ou não é aplicada.
         """
         for produto, quantidade in venda.items():
             if produto not in self.capacidades:
@@ -779,7 +875,10 @@ class Estoque:
             if self.exposicao[produto] < quantidade:
                 return {"retorno": 2, "mensagem": "Quantidade insuficiente na exposição para venda."}
 
+        marcar_modificado("estoques", self)
+        for produto, quantidade in venda.items():
             self.exposicao[produto] -= quantidade
+        self._registrar_operacao("V", {produto.codigo: quantidade for produto, quantidade in venda.items()})
         return {"retorno": 0, "mensagem": "Produtos removidos com sucesso."}
 
 
@@ -967,6 +1066,45 @@ class Estoque:
         }
 
 
+
+    def _registrar_operacao(self, operacao: str, *argumentos):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _registrar_operacao() (Método de Estoque)
+
+        B) OBJETIVO:
+        Notificar o diário de estoques (se houver um ativo) sobre uma mutação concluída nesta instância.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: operacao (string)
+        Código de uma letra da operação: "R" (registrar), "X" (remover), "C" (capacidades), "A" (adicionar), "M" (mover) ou "V" (venda).
+        PARÂMETROS SEGUINTES: argumentos
+        Dados primitivos necessários para refazer a operação (códigos de produto, quantidades, destino).
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - A mutação descrita já foi aplicada com sucesso.
+        - Os argumentos são serializáveis em JSON.
+
+        Assertiva(s) de saída:
+        - Se houver um diário ativo, a operação foi anexada a ele.
+
+        E) DESCRIÇÃO:
+        1. Verifica se a variável global `_diario` está definida.
+        2. Se estiver, repassa o código do estoque, a operação e os argumentos ao seu método `registrar()`.
+
+        F) HIPÓTESES:
+        - O diário foi definido por `definir_diario()`.
+
+        G) RESTRIÇÕES:
+        - Método de uso interno da classe.
+        """
+        if _diario is not None:
+            _diario.registrar(self.codigo, operacao, argumentos)
+
+
 def salvar_estoques():
     """
     ESPECIFICAÇÃO DE FUNÇÃO:
@@ -978,7 +1116,7 @@ def salvar_estoques():
     C) ACOPLAMENTO:
     PARÂMETROS: Nenhum.
 
-    RETORNO: Nenhum valor explícito. A função realiza uma operação de escrita em arquivo.
+    RETORNO 1: Número de registros gravados (inteiro). Zero indica que nada havia mudado desde a última gravação.
 
     D) CONDIÇÕES DE ACOPLAMENTO:
     Assertiva(s) de entrada:
@@ -988,15 +1126,16 @@ def salvar_estoques():
     - O arquivo definido pela constante `ESTOQUES_JSON` é criado ou sobrescrito com os dados de todos os estoques.
 
     E) DESCRIÇÃO:
-    1. Inicializa um dicionário vazio `json_estoques`.
-    2. Itera sobre cada par de código-estoque no dicionário global `_todos_estoques`.
-    3. Para cada objeto de estoque, invoca seu método `to_json()` para obter sua representação em dicionário serializável.
-    4. Adiciona este dicionário ao `json_estoques`, usando o código do estoque como chave.
-    5. Abre o arquivo de destino em modo de escrita ("w") com codificação "utf-8".
-    6. Utiliza a função `json.dump()` para escrever o conteúdo do dicionário `json_estoques` no arquivo, com formatação indentada para legibilidade.
+    1. Obtém o mecanismo de armazenamento atual (`obter_armazenamento()`).
+    2. Usa `selecionar_para_gravacao()` para escolher os objetos de `_todos_estoques` a gravar: nenhum, se nada foi modificado desde a última gravação; apenas os modificados, se o mecanismo suporta gravação parcial; ou todos, se o arquivo precisa ser reescrito (JSON em `ESTOQUES_JSON`).
+    3. Se houver um diário ativo, registra em cada objeto escolhido a sequência da sua última operação (`seq_diario`), sem marcá-lo como modificado: o estado gravado já reflete todas as operações até ela. Sem diário, cada objeto mantém a sequência com que foi carregado.
+    4. Para cada objeto escolhido, invoca seu método `to_json()`, usando o código do estoque como chave.
+    5. Entrega o dicionário resultante ao mecanismo de armazenamento, se houver algo a gravar.
+    6. Limpa as marcações de modificação da entidade "estoques" feitas até o início da gravação (objetos alterados durante a gravação continuam marcados) e retorna o número de registros gravados.
 
     F) HIPÓTESES:
     - Existe um dicionário global `_todos_estoques` para armazenamento em memória.
+    - Nenhuma operação de estoque ocorre entre a leitura da sequência do diário e a serialização.
     - A constante `ESTOQUES_JSON` contém um caminho de arquivo válido e com permissão de escrita.
     - Cada objeto `Estoque` possui um método `to_json()` funcional.
 
@@ -1004,15 +1143,22 @@ def salvar_estoques():
     - A função sobrescreve completamente o arquivo de destino sem criar backups ou avisos.
     - Possíveis erros de I/O (ex: disco cheio, permissão negada) não são tratados internamente e podem interromper o programa.
     """
-    json_estoques = {}
-
-    for codigo, estoque in _todos_estoques.items():
-        json_estoques[codigo] = estoque.to_json()
-
-    with open(ESTOQUES_JSON, "w", encoding="utf-8") as f:
-        json.dump(json_estoques, f, ensure_ascii=False, indent=4)
-
-def carregar_estoques():
+    armazenamento = obter_armazenamento()
+    geracao = geracao_atual()
+    alterados = selecionar_para_gravacao("estoques", _todos_estoques, lambda e: e.codigo, armazenamento.suporta_parcial)
+
+    if alterados:
+        if _diario is not None:
+            seq = _diario.seq_atual()
+            for e in alterados.values():
+                object.__setattr__(e, "seq_diario", seq)
+        json_estoques = {codigo: e.to_json() for codigo, e in alterados.items()}
+        armazenamento.salvar("estoques", json_estoques)
+
+    limpar_modificados("estoques", ate=geracao)
+    return len(alterados)
+
+def carregar_estoques(registros: dict = None, contexto: ContextoCarga = None):
     """
     ESPECIFICAÇÃO DE FUNÇÃO:
     A) NOME: carregar_estoques()
@@ -1021,7 +1167,10 @@ def carregar_estoques():
     Ler os dados de estoques de um arquivo JSON e carregá-los para a memória, populando o dicionário global `_todos_estoques`.
 
     C) ACOPLAMENTO:
-    PARÂMETROS: Nenhum.
+    PARÂMETRO 1: registros (dicionário, opcional)
+    Registros já lidos do armazenamento (ex: pela carga paralela de `carga_paralela.py`). Se omitido, são lidos do armazenamento atual.
+    PARÂMETRO 2: contexto (ContextoCarga, opcional)
+    Contexto que resolve as referências e acumula as ausentes. Se omitido, é criado um para esta carga.
 
     RETORNO: Nenhum valor explícito. A função modifica o estado do dicionário global `_todos_estoques`.
 
@@ -1035,27 +1184,31 @@ def carregar_estoques():
     - O dicionário global `_todos_estoques` é preenchido com as instâncias de `Estoque` recriadas a partir dos dados do arquivo.
 
     E) DESCRIÇÃO:
-    1. Utiliza um bloco `try-except` para tratar o caso de o arquivo não existir (`FileNotFoundError`), retornando silenciosamente se for o caso.
-    2. Se o arquivo existir, ele é aberto e seu conteúdo JSON é carregado para um dicionário `json_estoques`.
+    1. Se `registros` não foi informado, solicita ao mecanismo de armazenamento atual (`obter_armazenamento()`) os registros da entidade "estoques".
+    2. Se não houver dados persistidos, o dicionário `json_estoques` recebido é vazio e nada é carregado.
     3. Itera sobre cada par de código-dados no dicionário carregado.
-    4. Para cada item, invoca o método de classe `Estoque.from_json()` para criar uma nova instância de `Estoque`.
-    5. Armazena a instância recém-criada no dicionário global `_todos_estoques`, usando o código como chave.
+    4. Para cada item, invoca o método de classe `Estoque.from_json()` com o contexto da carga, que acumula os códigos de produto ausentes sem interromper a leitura.
+    5. Se o contexto foi criado aqui, chama `contexto.verificar()`, que lança `ErroReferencias` com todos os códigos ausentes.
+    6. Armazena as instâncias no dicionário global `_todos_estoques`, usando o código como chave.
 
     F) HIPÓTESES:
     - A função `carregar_produtos` foi executada antes desta para garantir que os produtos possam ser encontrados.
     - A classe `Estoque` implementa um método de classe `from_json()` funcional.
 
     G) RESTRIÇÕES:
-    - A função não trata exceções que podem ser levantadas por `Estoque.from_json` (como `ValueError`, `KeyError`), o que pode interromper o processo de carregamento se o arquivo de dados estiver inconsistente.
+    - Com o contexto criado aqui, nenhum estoque é registrado se houver referências ausentes.
+    - Com um contexto recebido, os estoques são registrados sem os produtos ausentes, e cabe a quem criou o contexto chamar `verificar()`.
+    - Erros de formato (como `KeyError`) continuam interrompendo a carga no primeiro registro inválido.
     """
-    try:
-        with open(ESTOQUES_JSON, "r", encoding="utf-8") as f:
-            json_estoques = json.load(f)
-    except FileNotFoundError:
-        return
+    proprio = contexto is None
+    if proprio:
+        contexto = ContextoCarga()
+    json_estoques = registros if registros is not None else obter_armazenamento().carregar("estoques")
 
-    for codigo, estoque_json in json_estoques.items():
-        _todos_estoques[codigo] = Estoque.from_json(estoque_json)
+    carregados = {codigo: Estoque.from_json(estoque_json, contexto) for codigo, estoque_json in json_estoques.items()}
+    if proprio:
+        contexto.verificar()
+    _todos_estoques.update(carregados)
 
 
 def registrar_estoque(codigo: str):
@@ -1116,6 +1269,7 @@ def registrar_estoque(codigo: str):
         return {"retorno": 1, "mensagem": "Estoque já registrado com este código"}
 
     estoque = Estoque(codigo=codigo)
+    marcar_modificado("estoques", estoque)
     _todos_estoques[codigo] = estoque
     return {"retorno": 0, "mensagem": "Estoque registrado com sucesso", "dados": estoque}
 
@@ -1161,3 +1315,37 @@ def listar_todos_estoques():
         return {'retorno': 1, 'mensagem': 'Nenhum estoque registrado', 'dados': []}
 
     return {'retorno': 0, 'mensagem': 'Estoques listados com sucesso', 'dados': estoques}
+
+
+def definir_diario(diario):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: definir_diario()
+
+    B) OBJETIVO:
+    Ativar (ou desativar) o diário que recebe cada mutação feita em qualquer `Estoque`.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: diario (objeto com os métodos `registrar(codigo, operacao, argumentos)` e `seq_atual()`, ou None)
+    Diário a ser usado. `None` desativa o registro de operações.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `diario` implementa os métodos `registrar()` e `seq_atual()` ou é `None`.
+
+    Assertiva(s) de saída:
+    - As próximas mutações de estoque são repassadas ao diário informado.
+
+    E) DESCRIÇÃO:
+    1. Atualiza a variável global `_diario`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Há um único diário para todos os estoques do sistema.
+    """
+    global _diario
+    _diario = diario
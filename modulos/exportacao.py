@@ -0,0 +1,789 @@
+import csv
+import os
+from itertools import islice
+
+from .armazenamento import obter_armazenamento
+from .serializacao import obter_serializador
+from .produto import registrar_produtos_em_lote, consultar_produto_por_codigo
+from .funcionario import adiciona_funcionario, consultar_funcionario, _todos_funcionarios
+from .estoque import registrar_estoque, _todos_estoques
+from .carrinho import Carrinho, _todos_carrinhos, carregar_ultimo_id
+from .unidades import adiciona_Unidade, _unidades
+from .vendas_paginadas import VendasPaginadas
+from .rastreamento import marcar_modificado
+
+
+__all__ = [
+    "FORMATOS",
+    "COLUNAS",
+    "exportar",
+    "importar"
+]
+
+
+FORMATOS = ("csv", "jsonl")
+
+# Número de linhas escritas de uma vez na exportação e de registros validados por lote na importação
+TAMANHO_LOTE = 1000
+
+# Quantidade máxima de erros guardados no resultado da importação (os demais são apenas contados)
+MAXIMO_ERROS = 100
+
+# Maior célula aceita na leitura de CSV: a lista de vendas de uma unidade passa facilmente do limite padrão (128 KiB)
+TAMANHO_MAXIMO_CELULA = 2 ** 31 - 1
+
+# Colunas de cada entidade, na ordem em que são exportadas.
+# Estoques têm uma linha por produto; carrinhos, uma linha por item (com os dados do carrinho repetidos).
+COLUNAS = {
+    "produtos": ["codigo", "nome", "marca", "categoria", "peso", "preco", "preco_por_peso"],
+    "funcionarios": ["codigo", "nome", "cargo", "data_contratacao", "data_desligamento"],
+    "estoques": ["estoque", "produto", "capacidade_estoque", "capacidade_exposicao",
+                 "quantidade_estoque", "quantidade_exposicao"],
+    "carrinhos": ["id", "data_hora", "funcionario", "total", "produto", "quantidade"],
+    "unidades": ["codigo", "nome", "latitude", "longitude", "estoque", "ativo",
+                 "funcionarios", "vendas", "datas_vendas"]
+}
+
+
+def _linhas(entidade: str, registro: dict):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _linhas()
+
+    B) OBJETIVO:
+    Converter um registro gravado de uma entidade nas linhas da exportação.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: entidade (string)
+    Nome da entidade (uma das chaves de `COLUNAS`).
+    PARÂMETRO 2: registro (dicionário)
+    Registro no formato gerado por `to_json()` da classe da entidade.
+
+    RETORNO 1: LISTA de dicionários {<coluna>: <valor>}, com as colunas de `COLUNAS[entidade]`.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - O registro está no formato normalizado (referências por código).
+
+    Assertiva(s) de saída:
+    - Os valores mantêm os tipos do registro (números, listas, booleanos e `None`).
+
+    E) DESCRIÇÃO:
+    1. Produtos e funcionários geram uma linha com os próprios campos.
+    2. Estoques geram uma linha por produto registrado.
+    3. Carrinhos geram uma linha por item; um carrinho sem itens gera uma linha com produto e quantidade vazios, para não ser perdido.
+    4. Unidades geram uma linha com a localização em duas colunas e as listas de funcionários e vendas.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Função de uso interno deste módulo.
+    """
+    if entidade in ("produtos", "funcionarios"):
+        return [{coluna: registro.get(coluna) for coluna in COLUNAS[entidade]}]
+
+    if entidade == "estoques":
+        return [{"estoque": registro["codigo"], "produto": codigo,
+                 "capacidade_estoque": capacidade["estoque"], "capacidade_exposicao": capacidade["exposicao"],
+                 "quantidade_estoque": registro["estoque"].get(codigo, 0),
+                 "quantidade_exposicao": registro["exposicao"].get(codigo, 0)}
+                for codigo, capacidade in registro["capacidades"].items()]
+
+    if entidade == "carrinhos":
+        base = {"id": registro["id"], "data_hora": registro.get("data_hora"),
+                "funcionario": registro.get("funcionario"), "total": registro.get("total")}
+        itens = registro["itens"].items() or [(None, None)]
+        return [dict(base, produto=codigo, quantidade=quantidade) for codigo, quantidade in itens]
+
+    latitude, longitude = registro["localizacao"]
+    return [{"codigo": registro["codigo"], "nome": registro["nome"], "latitude": latitude, "longitude": longitude,
+             "estoque": registro["estoque"], "ativo": registro.get("ativo", True),
+             "funcionarios": registro["funcionarios"], "vendas": registro["vendas"],
+             "datas_vendas": registro.get("datas_vendas") or []}]
+
+
+def _escrever_lote(arquivo, formato: str, colunas: list, lote: list):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _escrever_lote()
+
+    B) OBJETIVO:
+    Escrever um lote de linhas no arquivo de exportação com uma única chamada de escrita.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: arquivo (arquivo de texto aberto para escrita)
+    Destino.
+    PARÂMETRO 2: formato (string)
+    "csv" ou "jsonl".
+    PARÂMETRO 3: colunas (lista)
+    Colunas da entidade, na ordem de exportação.
+    PARÂMETRO 4: lote (lista)
+    Linhas geradas por `_linhas()`.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - No CSV, o cabeçalho já foi escrito.
+
+    Assertiva(s) de saída:
+    - Cada linha ocupa uma linha do arquivo.
+
+    E) DESCRIÇÃO:
+    1. No CSV, converte `None` em célula vazia e listas em valores separados por ";", e grava com `writerows()`.
+    2. No JSONL, codifica cada linha com o serializador atual e grava o texto do lote de uma vez.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Função de uso interno deste módulo.
+    """
+    if formato == "csv":
+        def celula(valor):
+            if valor is None:
+                return ""
+            if isinstance(valor, list):
+                return ";".join(str(v) for v in valor)
+            return valor
+        csv.writer(arquivo).writerows([[celula(linha[c]) for c in colunas] for linha in lote])
+    else:
+        codificar = obter_serializador().codificar
+        arquivo.write("".join(codificar(linha) + "\n" for linha in lote))
+
+
+def exportar(entidade: str, caminho: str, formato: str = "csv", tamanho_lote: int = TAMANHO_LOTE):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: exportar()
+
+    B) OBJETIVO:
+    Exportar os registros gravados de uma entidade para um arquivo CSV ou JSONL, lendo e escrevendo aos poucos.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: entidade (string)
+    "produtos", "funcionarios", "estoques", "carrinhos" ou "unidades".
+    PARÂMETRO 2: caminho (string)
+    Arquivo de destino; é sobrescrito.
+    PARÂMETRO 3: formato (string, opcional)
+    "csv" (padrão) ou "jsonl".
+    PARÂMETRO 4: tamanho_lote (inteiro, opcional)
+    Número de linhas acumuladas antes de cada escrita.
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR ENTIDADE DESCONHECIDA:
+    {"retorno": 1, "mensagem": "Entidade desconhecida"}
+
+    RETORNO 2: DICIONÁRIO DE ERRO POR FORMATO DESCONHECIDO:
+    {"retorno": 2, "mensagem": "Formato desconhecido"}
+
+    RETORNO 3: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Exportação concluída", "dados": <número de linhas escritas>}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - O mecanismo de armazenamento atual está definido.
+
+    Assertiva(s) de saída:
+    - O arquivo contém as colunas de `COLUNAS[entidade]` (cabeçalho no CSV, chaves no JSONL).
+
+    E) DESCRIÇÃO:
+    1. Valida a entidade e o formato.
+    2. Percorre os registros com `obter_armazenamento().iterar()`, que os lê um a um.
+    3. Converte cada registro em linhas com `_linhas()` e acumula-as em um lote.
+    4. Escreve o lote com `_escrever_lote()` sempre que ele atinge `tamanho_lote` linhas, e o restante ao final.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Exporta o que está gravado no armazenamento, não as alterações ainda não salvas da sessão; não é preciso carregar os dados na memória.
+    - A memória usada é limitada a um registro e um lote de linhas.
+    """
+    if entidade not in COLUNAS:
+        return {"retorno": 1, "mensagem": "Entidade desconhecida"}
+    if formato not in FORMATOS:
+        return {"retorno": 2, "mensagem": "Formato desconhecido"}
+
+    colunas = COLUNAS[entidade]
+    escritas = 0
+    with open(caminho, "w", encoding="utf-8", newline="") as arquivo:
+        if formato == "csv":
+            csv.writer(arquivo).writerow(colunas)
+        lote = []
+        for _, registro in obter_armazenamento().iterar(entidade):
+            lote.extend(_linhas(entidade, registro))
+            if len(lote) >= tamanho_lote:
+                _escrever_lote(arquivo, formato, colunas, lote)
+                escritas += len(lote)
+                lote = []
+        if lote:
+            _escrever_lote(arquivo, formato, colunas, lote)
+            escritas += len(lote)
+
+    return {"retorno": 0, "mensagem": "Exportação concluída", "dados": escritas}
+
+
+def _texto(valor):
+    """Converte uma célula em string, ou `None` se estiver vazia."""
+    if valor is None or valor == "":
+        return None
+    return str(valor)
+
+
+def _numero(valor):
+    """Converte uma célula em inteiro (se não tiver parte decimal) ou float, ou `None` se estiver vazia."""
+    if valor is None or valor == "":
+        return None
+    if isinstance(valor, (int, float)):
+        return valor
+    try:
+        return int(valor)
+    except ValueError:
+        return float(valor)
+
+
+def _lista(valor, converter):
+    """Converte uma célula com valores separados por ";" (CSV) ou uma lista (JSONL) em lista convertida."""
+    if valor is None or valor == "":
+        return []
+    if isinstance(valor, str):
+        valor = valor.split(";")
+    return [converter(v) for v in valor]
+
+
+def _booleano(valor):
+    """Converte uma célula em booleano; vazia conta como verdadeira (o padrão de `ativo`)."""
+    if isinstance(valor, bool):
+        return valor
+    return str(valor).strip().lower() not in ("false", "0", "nao", "não")
+
+
+def _valores_produto(linha: dict):
+    """Converte as células de uma linha de produto na tupla de valores de `registrar_produtos_em_lote()`."""
+    return (_texto(linha["nome"]), _texto(linha["marca"]), _texto(linha["categoria"]), _texto(linha["codigo"]),
+            _numero(linha["peso"]), _numero(linha["preco"]), _numero(linha["preco_por_peso"]))
+
+
+def _importar_produtos(linhas, tamanho_lote: int, ao_concluir_lote):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _importar_produtos()
+
+    B) OBJETIVO:
+    Cadastrar os produtos de um arquivo de importação em lotes, com `registrar_produtos_em_lote()`.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: linhas (iterável)
+    Tuplas (<número da linha>, <dicionário da linha>) de `_ler_linhas()`.
+    PARÂMETRO 2: tamanho_lote (inteiro)
+    Número de linhas de cada lote.
+    PARÂMETRO 3: ao_concluir_lote (função ou None)
+    Chamada sem argumentos ao fim de cada lote.
+
+    RETORNO 1: Tupla (<importados>, <rejeitados>, <lista de erros {"linha", "mensagem"}>), como em `importar()`.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - As linhas têm as colunas de `COLUNAS["produtos"]`.
+
+    Assertiva(s) de saída:
+    - Os produtos aceitos são os mesmos do cadastro linha a linha com `registrar_produto()`; um código repetido dentro do mesmo lote é recusado com "Código repetido no lote", e não "Produto já cadastrado com este código".
+
+    E) DESCRIÇÃO:
+    1. Lê até `tamanho_lote` linhas e converte as células de cada uma; uma linha com coluna ausente ou valor ilegível é recusada.
+    2. Cadastra as linhas convertidas com `registrar_produtos_em_lote()`, que verifica os códigos de barras e as duplicidades do lote de uma vez.
+    3. Traduz as posições dos erros do lote nos números de linha do arquivo e guarda-os em ordem, até `MAXIMO_ERROS`.
+    4. Chama `ao_concluir_lote` e passa ao lote seguinte, até o fim das linhas.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Função de uso interno deste módulo.
+    """
+    importados = rejeitados = 0
+    erros = []
+    linhas = iter(linhas)
+    while True:
+        lote = list(islice(linhas, tamanho_lote))
+        if not lote:
+            break
+
+        numeros, valores, erros_lote = [], [], []
+        for numero, linha in lote:
+            try:
+                valores.append(_valores_produto(linha))
+                numeros.append(numero)
+            except KeyError as e:
+                erros_lote.append((numero, f"Coluna ausente: {e}"))
+            except (ValueError, TypeError) as e:
+                erros_lote.append((numero, f"Valor inválido: {e}"))
+
+        dados = registrar_produtos_em_lote(valores)["dados"]
+        importados += dados["registrados"]
+        rejeitados += dados["rejeitados"] + len(erros_lote)
+        erros_lote += [(numeros[posicao], mensagem) for posicao, _, mensagem in dados["erros"]]
+        for numero, mensagem in sorted(erros_lote)[:MAXIMO_ERROS - len(erros)]:
+            erros.append({"linha": numero, "mensagem": mensagem})
+
+        if ao_concluir_lote is not None:
+            ao_concluir_lote()
+    return importados, rejeitados, erros
+
+
+def _importar_funcionario(linhas: list):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _importar_funcionario()
+
+    B) OBJETIVO:
+    Cadastrar um funcionário a partir de uma linha importada, mantendo a data de desligamento, se houver.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: linhas (lista)
+    Lista com a única linha do funcionário.
+
+    RETORNO 1: O dicionário retornado por `adiciona_funcionario()` ou, se houver desligamento, por `desligar_funcionario()`.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - A linha tem as colunas de `COLUNAS["funcionarios"]`.
+
+    Assertiva(s) de saída:
+    - Nenhuma.
+
+    E) DESCRIÇÃO:
+    1. Converte as células e chama `adiciona_funcionario()`, que valida os campos e a duplicidade do código.
+    2. Se a linha tiver data de desligamento, aplica-a com `Funcionario.desligar_funcionario()`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Função de uso interno deste módulo.
+    """
+    linha = linhas[0]
+    codigo = _numero(linha["codigo"])
+    res = adiciona_funcionario(_texto(linha["nome"]), codigo, _texto(linha["cargo"]),
+                               _texto(linha["data_contratacao"]))
+    desligamento = _texto(linha["data_desligamento"])
+    if res["retorno"] != 0 or desligamento is None:
+        return res
+    return _todos_funcionarios[codigo].desligar_funcionario(desligamento)
+
+
+def _importar_estoque(linhas: list):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _importar_estoque()
+
+    B) OBJETIVO:
+    Registrar um produto em um estoque, com capacidades e quantidades, a partir de uma linha importada.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: linhas (lista)
+    Lista com a única linha (um produto de um estoque).
+
+    RETORNO 1: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Produto registrado no estoque"}
+
+    RETORNO 2: O dicionário de erro da primeira validação que falhar.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - A linha tem as colunas de `COLUNAS["estoques"]`.
+    - Os produtos já foram carregados ou importados.
+
+    Assertiva(s) de saída:
+    - Em caso de erro, o estoque não fica com o produto registrado pela metade.
+
+    E) DESCRIÇÃO:
+    1. Usa o estoque já registrado ou cria-o com `registrar_estoque()`.
+    2. Obtém o produto com `consultar_produto_por_codigo()`.
+    3. Registra-o com `Estoque.registrar_produto()` e adiciona as quantidades com `Estoque.adicionar_produto()`, que valida as capacidades.
+    4. Se uma quantidade for recusada, remove o produto com `Estoque.remover_produto()` e retorna o erro.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Função de uso interno deste módulo.
+    """
+    linha = linhas[0]
+    codigo = _texto(linha["estoque"])
+    estoque = _todos_estoques.get(codigo)
+    if estoque is None:
+        res = registrar_estoque(codigo)
+        if res["retorno"] != 0:
+            return res
+        estoque = res["dados"]
+
+    res = consultar_produto_por_codigo(_texto(linha["produto"]))
+    if res["retorno"] != 0:
+        return res
+    produto = res["dados"]
+
+    res = estoque.registrar_produto(produto, _numero(linha["capacidade_estoque"]),
+                                    _numero(linha["capacidade_exposicao"]))
+    if res["retorno"] != 0:
+        return res
+    for destino, coluna in (("estoque", "quantidade_estoque"), ("exposicao", "quantidade_exposicao")):
+        quantidade = _numero(linha[coluna])
+        if quantidade:
+            res = estoque.adicionar_produto(produto, quantidade, destino)
+            if res["retorno"] != 0:
+                estoque.remover_produto(produto)
+                return res
+    return {"retorno": 0, "mensagem": "Produto registrado no estoque"}
+
+
+def _importar_carrinho(linhas: list):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _importar_carrinho()
+
+    B) OBJETIVO:
+    Registrar um carrinho finalizado, mantendo o seu ID, a partir das suas linhas de item.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: linhas (lista)
+    Linhas consecutivas de um mesmo carrinho, uma por item.
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR ID DUPLICADO:
+    {"retorno": 1, "mensagem": "Carrinho já cadastrado com este ID"}
+
+    RETORNO 2: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Carrinho importado", "dados": <objeto Carrinho>}
+
+    RETORNO 3: O dicionário de erro da primeira validação de produto, item ou funcionário que falhar.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - As linhas têm as colunas de `COLUNAS["carrinhos"]`.
+    - Os produtos e funcionários já foram carregados ou importados.
+
+    Assertiva(s) de saída:
+    - O carrinho só é registrado se todas as linhas forem válidas.
+
+    E) DESCRIÇÃO:
+    1. Recusa IDs já presentes em `_todos_carrinhos` ou, se o armazenamento suporta gravação parcial (e o histórico não fica na memória), já gravados nele.
+    2. Monta o carrinho com `Carrinho.adiciona_no_carrinho()`, que valida as quantidades, resolvendo cada produto com `consultar_produto_por_codigo()`.
+    3. Resolve o funcionário com `consultar_funcionario()` (incluindo desligados).
+    4. Preenche data e total, marca o carrinho como modificado e registra-o em `_todos_carrinhos`.
+
+    F) HIPÓTESES:
+    - `criar_carrinho()` pula IDs em uso na memória, e `importar()` atualiza o último ID com os gravados, então os IDs importados não são reutilizados.
+
+    G) RESTRIÇÕES:
+    - Função de uso interno deste módulo.
+    - Em JSON todos os carrinhos gravados estão na memória, e consultar o arquivo a cada carrinho o leria por inteiro.
+    """
+    primeira = linhas[0]
+    id = _numero(primeira["id"])
+    armazenamento = obter_armazenamento()
+    if id in _todos_carrinhos or (armazenamento.suporta_parcial and armazenamento.consultar("carrinhos", id) is not None):
+        return {"retorno": 1, "mensagem": "Carrinho já cadastrado com este ID"}
+
+    carrinho = Carrinho(id=id)
+    for linha in linhas:
+        codigo = _texto(linha["produto"])
+        if codigo is None:
+            continue
+        res = consultar_produto_por_codigo(codigo)
+        if res["retorno"] != 0:
+            return res
+        res = carrinho.adiciona_no_carrinho(res["dados"], _numero(linha["quantidade"]))
+        if res["retorno"] not in (0, 1):
+            return res
+
+    funcionario = _numero(primeira["funcionario"])
+    if funcionario is not None:
+        res = consultar_funcionario(funcionario, incluir_inativos=True)
+        if res["retorno"] != 0:
+            return res
+        carrinho.funcionario = res["dados"]
+    carrinho.data_hora = _texto(primeira["data_hora"])
+    carrinho.total = _numero(primeira["total"])
+
+    marcar_modificado("carrinhos", carrinho)
+    _todos_carrinhos[id] = carrinho
+    return {"retorno": 0, "mensagem": "Carrinho importado", "dados": carrinho}
+
+
+def _importar_unidade(linhas: list):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _importar_unidade()
+
+    B) OBJETIVO:
+    Cadastrar uma unidade a partir de uma linha importada, ligando-a ao estoque, aos funcionários e às vendas já existentes.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: linhas (lista)
+    Lista com a única linha da unidade.
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR ESTOQUE INEXISTENTE:
+    {"retorno": 5, "mensagem": "Estoque não encontrado"}
+
+    RETORNO 2: O dicionário retornado por `consultar_funcionario()` para um funcionário inexistente, ou por `adiciona_Unidade()`.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - A linha tem as colunas de `COLUNAS["unidades"]`.
+    - Estoques, funcionários e carrinhos já foram carregados ou importados.
+
+    Assertiva(s) de saída:
+    - Nenhuma.
+
+    E) DESCRIÇÃO:
+    1. Resolve o estoque em `_todos_estoques` e cada funcionário com `consultar_funcionario()`.
+    2. Chama `adiciona_Unidade()`, que valida código, nome e localização.
+    3. Associa as vendas por referência (`VendasPaginadas` com IDs e datas) e aplica o estado `ativo`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Como em `Localidade.from_json()`, vendas inexistentes só são detectadas quando acessadas: o histórico pode não estar na memória.
+    - Função de uso interno deste módulo.
+    """
+    linha = linhas[0]
+    estoque = None
+    codigo_estoque = _texto(linha["estoque"])
+    if codigo_estoque is not None:
+        estoque = _todos_estoques.get(codigo_estoque)
+        if estoque is None:
+            return {"retorno": 5, "mensagem": "Estoque não encontrado"}
+
+    funcionarios = []
+    for codigo in _lista(linha["funcionarios"], int):
+        res = consultar_funcionario(codigo, incluir_inativos=True)
+        if res["retorno"] != 0:
+            return res
+        funcionarios.append(res["dados"])
+
+    codigo = _numero(linha["codigo"])
+    localizacao = (float(linha["latitude"]), float(linha["longitude"]))
+    res = adiciona_Unidade(codigo, _texto(linha["nome"]), localizacao, estoque=estoque, funcionarios=funcionarios)
+    if res["retorno"] != 0:
+        return res
+
+    unidade = _unidades[codigo]
+    vendas = _lista(linha["vendas"], int)
+    if vendas:
+        unidade.vendas = VendasPaginadas(vendas, _lista(linha["datas_vendas"], str) or None)
+    if not _booleano(linha["ativo"]):
+        unidade.ativo = False
+    return res
+
+
+_IMPORTADORES = {
+    "funcionarios": _importar_funcionario,
+    "estoques": _importar_estoque,
+    "carrinhos": _importar_carrinho,
+    "unidades": _importar_unidade
+}
+
+# Entidades cadastradas em lotes: o importador recebe todas as linhas, o tamanho do lote e `ao_concluir_lote`
+_IMPORTADORES_EM_LOTE = {
+    "produtos": _importar_produtos
+}
+
+
+def _ler_linhas(arquivo, formato: str):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _ler_linhas()
+
+    B) OBJETIVO:
+    Ler as linhas de um arquivo de importação, uma a uma.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: arquivo (arquivo de texto aberto para leitura)
+    Origem.
+    PARÂMETRO 2: formato (string)
+    "csv" ou "jsonl".
+
+    RETORNO 1: GERADOR de tuplas (<número da linha no arquivo>, <dicionário da linha>).
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - No CSV, a primeira linha é o cabeçalho.
+
+    Assertiva(s) de saída:
+    - Linhas em branco do JSONL são ignoradas.
+
+    E) DESCRIÇÃO:
+    1. No CSV, eleva o limite de tamanho de célula do módulo `csv` para `TAMANHO_MAXIMO_CELULA` e usa `csv.DictReader`, que associa cada célula à coluna do cabeçalho.
+    2. No JSONL, decodifica cada linha com o serializador atual.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - O limite de célula do módulo `csv` é global ao processo e permanece elevado após a leitura.
+    - Função de uso interno deste módulo.
+    """
+    if formato == "csv":
+        csv.field_size_limit(TAMANHO_MAXIMO_CELULA)
+        leitor = csv.DictReader(arquivo)
+        for linha in leitor:
+            yield leitor.line_num, linha
+    else:
+        decodificar = obter_serializador().decodificar
+        for numero, texto in enumerate(arquivo, 1):
+            if texto.strip():
+                yield numero, decodificar(texto)
+
+
+def _agrupar(entidade: str, linhas):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _agrupar()
+
+    B) OBJETIVO:
+    Reunir as linhas que formam um mesmo registro: as linhas consecutivas de um carrinho, ou cada linha isolada nas demais entidades.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: entidade (string)
+    Nome da entidade.
+    PARÂMETRO 2: linhas (iterável)
+    Tuplas (<número da linha>, <dicionário da linha>) de `_ler_linhas()`.
+
+    RETORNO 1: GERADOR de tuplas (<número da primeira linha>, <lista de linhas do registro>).
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - As linhas de um carrinho estão juntas, como `exportar()` as grava.
+
+    Assertiva(s) de saída:
+    - Nenhuma.
+
+    E) DESCRIÇÃO:
+    1. Fora dos carrinhos, repassa cada linha em uma lista própria.
+    2. Nos carrinhos, acumula as linhas enquanto o ID se repete e entrega o grupo quando ele muda.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Função de uso interno deste módulo.
+    """
+    if entidade != "carrinhos":
+        for numero, linha in linhas:
+            yield numero, [linha]
+        return
+
+    inicio, grupo, id = None, [], None
+    for numero, linha in linhas:
+        if grupo and str(linha["id"]) != id:
+            yield inicio, grupo
+            grupo = []
+        if not grupo:
+            inicio, id = numero, str(linha["id"])
+        grupo.append(linha)
+    if grupo:
+        yield inicio, grupo
+
+
+def importar(entidade: str, caminho: str, formato: str = None, tamanho_lote: int = TAMANHO_LOTE,
+             ao_concluir_lote=None):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: importar()
+
+    B) OBJETIVO:
+    Importar registros de uma entidade de um arquivo CSV ou JSONL, aplicando as mesmas validações do cadastro manual, em lotes.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: entidade (string)
+    "produtos", "funcionarios", "estoques", "carrinhos" ou "unidades".
+    PARÂMETRO 2: caminho (string)
+    Arquivo de origem, no formato gerado por `exportar()`.
+    PARÂMETRO 3: formato (string, opcional)
+    "csv" ou "jsonl". Se omitido, é deduzido da extensão do arquivo.
+    PARÂMETRO 4: tamanho_lote (inteiro, opcional)
+    Número de registros validados entre as chamadas de `ao_concluir_lote`.
+    PARÂMETRO 5: ao_concluir_lote (função, opcional)
+    Chamada sem argumentos ao fim de cada lote (ex: para gravar os registros já importados).
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR ENTIDADE DESCONHECIDA:
+    {"retorno": 1, "mensagem": "Entidade desconhecida"}
+
+    RETORNO 2: DICIONÁRIO DE ERRO POR FORMATO DESCONHECIDO:
+    {"retorno": 2, "mensagem": "Formato desconhecido"}
+
+    RETORNO 3: DICIONÁRIO DE RESULTADO:
+    {"retorno": 0, "mensagem": "Importação concluída", "dados": {
+        "importados": <inteiro>, "rejeitados": <inteiro>,
+        "erros": [{"linha": <número da linha>, "mensagem": <motivo>}, ...]}}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - As entidades referenciadas já foram carregadas ou importadas (produtos e funcionários antes de estoques e carrinhos; estes antes das unidades).
+
+    Assertiva(s) de saída:
+    - Os registros importados estão nos registros globais e marcados como modificados; cabe a quem chamou gravá-los.
+
+    E) DESCRIÇÃO:
+    1. Valida a entidade e o formato.
+    2. Lê o arquivo linha a linha e agrupa as linhas por registro com `_agrupar()`.
+    3. Produtos são entregues a `_importar_produtos()`, que os cadastra de `tamanho_lote` em `tamanho_lote` com `registrar_produtos_em_lote()`.
+    4. Nas demais entidades, para cada registro, chama o importador da entidade, que usa as funções de cadastro (`adiciona_funcionario()`, `registrar_estoque()`, `adiciona_Unidade()`...).
+    5. Um registro recusado, ou com colunas ausentes ou valores ilegíveis, é contado em "rejeitados" e não interrompe a importação.
+    6. A cada `tamanho_lote` registros, e ao final, chama `ao_concluir_lote`.
+    7. Na importação de carrinhos, atualiza o último ID com `carregar_ultimo_id()`, para que `criar_carrinho()` não reutilize os IDs gravados.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Apenas os primeiros `MAXIMO_ERROS` erros são guardados; os demais só entram na contagem.
+    - O arquivo é lido em fluxo, mas os registros importados ficam na memória, como todos os registros do sistema.
+    """
+    if entidade not in _IMPORTADORES and entidade not in _IMPORTADORES_EM_LOTE:
+        return {"retorno": 1, "mensagem": "Entidade desconhecida"}
+    if formato is None:
+        formato = os.path.splitext(caminho)[1].lstrip(".").lower()
+    if formato not in FORMATOS:
+        return {"retorno": 2, "mensagem": "Formato desconhecido"}
+
+    if entidade in _IMPORTADORES_EM_LOTE:
+        with open(caminho, "r", encoding="utf-8", newline="") as arquivo:
+            importados, rejeitados, erros = _IMPORTADORES_EM_LOTE[entidade](_ler_linhas(arquivo, formato),
+                                                                           tamanho_lote, ao_concluir_lote)
+        return {"retorno": 0, "mensagem": "Importação concluída",
+                "dados": {"importados": importados, "rejeitados": rejeitados, "erros": erros}}
+
+    importador = _IMPORTADORES[entidade]
+    importados = rejeitados = no_lote = 0
+    erros = []
+    with open(caminho, "r", encoding="utf-8", newline="") as arquivo:
+        for numero, linhas in _agrupar(entidade, _ler_linhas(arquivo, formato)):
+            try:
+                res = importador(linhas)
+            except KeyError as e:
+                res = {"retorno": -1, "mensagem": f"Coluna ausente: {e}"}
+            except (ValueError, TypeError) as e:
+                res = {"retorno": -1, "mensagem": f"Valor inválido: {e}"}
+
+            if res["retorno"] == 0:
+                importados += 1
+            else:
+                rejeitados += 1
+                if len(erros) < MAXIMO_ERROS:
+                    erros.append({"linha": numero, "mensagem": res["mensagem"]})
+
+            no_lote += 1
+            if no_lote >= tamanho_lote:
+                if ao_concluir_lote is not None:
+                    ao_concluir_lote()
+                no_lote = 0
+    if no_lote and ao_concluir_lote is not None:
+        ao_concluir_lote()
+    if entidade == "carrinhos":
+        carregar_ultimo_id()
+
+    return {"retorno": 0, "mensagem": "Importação concluída",
+            "dados": {"importados": importados, "rejeitados": rejeitados, "erros": erros}}
@@ -1,5 +1,7 @@
-import json
 from datetime import date
+from .armazenamento import obter_armazenamento
+from .rastreamento import Rastreavel, marcar_modificado, limpar_modificados, geracao_atual, selecionar_para_gravacao
+from .paginacao import parametro_invalido, iterar_registro, fatiar, paginar
 
 _todos_funcionarios = {}
 
@@ -12,12 +14,13 @@ __all__ = [
     "consultar_funcionario",
     "consultar_funcionario_por_nome",
     "listar_todos_funcionarios",
+    "iterar_todos_funcionarios",
     "salvar_funcionarios",
     "carregar_funcionarios"
 ]
 
 
-class Funcionario:
+class Funcionario(Rastreavel, entidade="funcionarios"):
     def __init__(self, nome, codigo, cargo, data_contratacao, data_desligamento=None):
         """
         ESPECIFICAÇÃO DE FUNÇÃO:
@@ -349,7 +352,7 @@ def salvar_funcionarios():
     C) ACOPLAMENTO:
     PARÂMETROS: Nenhum.
 
-    RETORNO: Nenhum valor explícito. A função realiza uma operação de escrita em arquivo.
+    RETORNO 1: Número de registros gravados (inteiro). Zero indica que nada havia mudado desde a última gravação.
 
     D) CONDIÇÕES DE ACOPLAMENTO:
     Assertiva(s) de entrada:
@@ -359,11 +362,11 @@ def salvar_funcionarios():
     - O arquivo definido em `FUNCIONARIOS_JSON` é criado ou sobrescrito com os dados dos funcionários.
 
     E) DESCRIÇÃO:
-    1. Inicializa um dicionário vazio `json_funcionarios`.
-    2. Itera sobre cada par de código-funcionário no dicionário global `_todos_funcionarios`.
-    3. Para cada objeto, invoca seu método `to_json()` e armazena o resultado no `json_funcionarios`, usando o código (convertido para string) como chave.
-    4. Abre o arquivo de destino em modo de escrita ("w").
-    5. Utiliza `json.dump()` para escrever o dicionário `json_funcionarios` no arquivo, com formatação indentada.
+    1. Obtém o mecanismo de armazenamento atual (`obter_armazenamento()`).
+    2. Usa `selecionar_para_gravacao()` para escolher os objetos de `_todos_funcionarios` a gravar: nenhum, se nada foi modificado desde a última gravação; apenas os modificados, se o mecanismo suporta gravação parcial; ou todos, se o arquivo precisa ser reescrito (JSON em `FUNCIONARIOS_JSON`).
+    3. Para cada objeto escolhido, invoca seu método `to_json()`, usando o código (convertido para string) como chave.
+    4. Entrega o dicionário resultante ao mecanismo de armazenamento, se houver algo a gravar.
+    5. Limpa as marcações de modificação da entidade "funcionarios" feitas até o início da gravação (objetos alterados durante a gravação continuam marcados) e retorna o número de registros gravados.
 
     F) HIPÓTESES:
     - Existe um dicionário global `_todos_funcionarios`.
@@ -374,15 +377,18 @@ def salvar_funcionarios():
     - A função sobrescreve o arquivo de destino sem aviso.
     - Possíveis erros de I/O não são tratados internamente.
     """
-    json_funcionarios = {}
+    armazenamento = obter_armazenamento()
+    geracao = geracao_atual()
+    alterados = selecionar_para_gravacao("funcionarios", _todos_funcionarios, lambda f: f.codigo, armazenamento.suporta_parcial)
 
-    for codigo, f in _todos_funcionarios.items():
-        json_funcionarios[str(codigo)] = f.to_json()
+    if alterados:
+        json_funcionarios = {str(codigo): f.to_json() for codigo, f in alterados.items()}
+        armazenamento.salvar("funcionarios", json_funcionarios)
 
-    with open(FUNCIONARIOS_JSON, "w", encoding="utf-8") as f:
-        json.dump(json_funcionarios, f, ensure_ascii=False, indent=4)
+    limpar_modificados("funcionarios", ate=geracao)
+    return len(alterados)
 
-def carregar_funcionarios():
+def carregar_funcionarios(registros: dict = None):
     """
     ESPECIFICAÇÃO DE FUNÇÃO:
     A) NOME: carregar_funcionarios()
@@ -391,7 +397,8 @@ def carregar_funcionarios():
     Ler os dados de funcionários de um arquivo JSON e carregá-los para a memória, populando o dicionário global.
 
     C) ACOPLAMENTO:
-    PARÂMETROS: Nenhum.
+    PARÂMETRO 1: registros (dicionário, opcional)
+    Registros já lidos do armazenamento (ex: pela carga paralela de `carga_paralela.py`). Se omitido, são lidos do armazenamento atual.
 
     RETORNO: Nenhum valor explícito. A função modifica o estado do dicionário global `_todos_funcionarios`.
 
@@ -403,8 +410,8 @@ def carregar_funcionarios():
     - O dicionário global `_todos_funcionarios` é preenchido com instâncias de `Funcionario` recriadas a partir do arquivo.
 
     E) DESCRIÇÃO:
-    1. Utiliza um bloco `try-except` para tratar o caso de o arquivo não existir (`FileNotFoundError`), retornando silenciosamente.
-    2. Se o arquivo existir, ele é aberto e seu conteúdo JSON é carregado usando `json.load()`.
+    1. Se `registros` não foi informado, solicita ao mecanismo de armazenamento atual (`obter_armazenamento()`) os registros da entidade "funcionarios"; se não houver dados persistidos, recebe um dicionário vazio.
+    2. As chaves chegam como strings, no mesmo formato do arquivo JSON.
     3. Itera sobre cada par de código-dados no dicionário carregado.
     4. Para cada item, invoca o método de classe `Funcionario.from_json()` para criar uma nova instância.
     5. Armazena a instância no dicionário global `_todos_funcionarios`, convertendo a chave de string para inteiro.
@@ -417,11 +424,7 @@ def carregar_funcionarios():
     G) RESTRIÇÕES:
     - A função não trata erros de formatação no JSON (`JSONDecodeError`) ou de chaves ausentes (`KeyError`).
     """
-    try:
-        with open(FUNCIONARIOS_JSON, "r", encoding="utf-8") as f:
-            json_funcionarios = json.load(f)
-    except FileNotFoundError:
-        return
+    json_funcionarios = registros if registros is not None else obter_armazenamento().carregar("funcionarios")
 
     for codigo, f_json in json_funcionarios.items():
         _todos_funcionarios[int(codigo)] = Funcionario.from_json(f_json)
@@ -502,7 +505,9 @@ def adiciona_funcionario(nome: str, codigo: int, cargo: str, data_contratacao: s
     if codigo in _todos_funcionarios:
         return {'retorno': 1, 'mensagem': 'Código já cadastrado'}
 
-    _todos_funcionarios[codigo] = Funcionario(nome, codigo, cargo, data_contratacao)
+    funcionario = Funcionario(nome, codigo, cargo, data_contratacao)
+    marcar_modificado("funcionarios", funcionario)
+    _todos_funcionarios[codigo] = funcionario
     return {'retorno': 0, 'mensagem': 'Funcionário adicionado com sucesso'}
 
 
@@ -578,7 +583,9 @@ def novo_funcionario(nome: str, codigo: int, cargo: str):
         return {'retorno': 1, 'mensagem': 'Código já cadastrado'}
 
     hoje = date.today().strftime("%Y/%m/%d")
-    _todos_funcionarios[codigo] = Funcionario(nome, codigo, cargo, data_contratacao=hoje)
+    funcionario = Funcionario(nome, codigo, cargo, data_contratacao=hoje)
+    marcar_modificado("funcionarios", funcionario)
+    _todos_funcionarios[codigo] = funcionario
 
     return {'retorno': 0, 'mensagem': 'Funcionário registrado com sucesso'}
 
@@ -715,23 +722,33 @@ def consultar_funcionario_por_nome(nome: str, incluir_inativos: bool = False):
 
     return {'retorno': 0, 'mensagem': 'Funcionários encontrados', 'dados': resultados}
 
-def listar_todos_funcionarios(incluir_inativos: bool = False):
+def listar_todos_funcionarios(incluir_inativos: bool = False, limite: int = None, deslocamento: int = 0, cursor: tuple = None):
     """
     ESPECIFICAÇÃO DE FUNÇÃO:
     A) NOME: listar_todos_funcionarios()
 
     B) OBJETIVO:
-    Retornar uma lista de todos os funcionários registrados no sistema, com a opção de filtrar por status (ativo/inativo).
+    Retornar uma lista de todos os funcionários registrados no sistema, com a opção de filtrar por status (ativo/inativo), inteira ou uma página de cada vez.
 
     C) ACOPLAMENTO:
     PARÂMETRO 1: incluir_inativos (booleano, opcional)
     Se `True`, a lista retornada incluirá todos os funcionários. Se `False` (padrão), retornará apenas os ativos.
+    PARÂMETRO 2: limite (inteiro, opcional)
+    Tamanho da página. Se omitido, lista todos os funcionários a partir do `deslocamento`/`cursor`.
+    PARÂMETRO 3: deslocamento (inteiro, opcional)
+    Número de funcionários (já filtrados) saltados antes da página.
+    PARÂMETRO 4: cursor (tupla, opcional)
+    Cursor retornado pela página anterior; a listagem continua depois dele.
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR PAGINAÇÃO INVÁLIDA:
+    {"retorno": 4, "mensagem": "Parâmetro <nome_do_parametro> errado"}
 
-    RETORNO 1: DICIONÁRIO SE NÃO HOUVER FUNCIONÁRIOS:
+    RETORNO 2: DICIONÁRIO SE NÃO HOUVER FUNCIONÁRIOS:
     {"retorno": 1, "mensagem": "Nenhum funcionário registrado", "dados": []}
 
-    RETORNO 2: DICIONÁRIO DE SUCESSO:
+    RETORNO 3: DICIONÁRIO DE SUCESSO:
     {"retorno": 0, "mensagem": "Funcionários listados com sucesso", "dados": [<lista de objetos Funcionario>]}
+    Com `limite`, também a chave "cursor": <cursor da página seguinte, ou None na última página>.
 
     D) CONDIÇÕES DE ACOPLAMENTO:
     Assertiva(s) de entrada:
@@ -741,24 +758,81 @@ def listar_todos_funcionarios(incluir_inativos: bool = False):
     - O retorno é um dicionário com uma chave "dados" contendo uma lista de objetos `Funcionario`. A lista pode estar vazia.
 
     E) DESCRIÇÃO:
-    1. Filtra a lista de todos os funcionários (`_todos_funcionarios.values()`).
-    2. O critério de filtro mantém um funcionário se `incluir_inativos` for `True` ou se o funcionário estiver ativo (verificado pelo método `ativo()`).
-    3. Se a lista resultante do filtro estiver vazia, retorna um dicionário indicando que não há funcionários registrados que atendam ao critério.
-    4. Caso contrário, retorna um dicionário de sucesso com a lista filtrada de funcionários.
+    1. Valida os parâmetros de paginação.
+    2. Percorre os funcionários com `_iterar_funcionarios()`, que mantém um funcionário se `incluir_inativos` for `True` ou se ele estiver ativo (verificado pelo método `ativo()`).
+    3. Sem `limite`, reúne todos os funcionários depois do `deslocamento`; com `limite`, reúne apenas a página com `paginar()` e guarda o cursor da página seguinte.
+    4. Se a lista estiver vazia e a listagem começou do início, retorna um dicionário indicando que não há funcionários registrados que atendam ao critério.
+    5. Caso contrário, retorna um dicionário de sucesso com a lista filtrada de funcionários.
 
     F) HIPÓTESES:
     - Existe um dicionário global `_todos_funcionarios`.
     - Objetos `Funcionario` possuem um método `ativo()` que retorna seu status.
 
     G) RESTRIÇÕES:
-    - A função retorna uma lista completa de objetos, o que pode consumir memória se o número de funcionários for muito grande.
+    - Sem `limite`, a função retorna uma lista completa de objetos, o que pode consumir memória se o número de funcionários for muito grande.
     """
-    funcionarios = [
-        f for f in _todos_funcionarios.values()
-        if incluir_inativos or f.ativo()
-    ]
+    erro = parametro_invalido(limite, deslocamento, cursor)
+    if erro is not None:
+        return {'retorno': 4, 'mensagem': f'Parâmetro {erro} errado'}
 
-    if not funcionarios:
+    pares = _iterar_funcionarios(incluir_inativos, cursor)
+    if limite is None:
+        funcionarios, proximo = list(fatiar(pares, None, deslocamento)), None
+    else:
+        funcionarios, proximo = paginar(pares, limite, deslocamento)
+
+    if not funcionarios and deslocamento == 0 and cursor is None:
         return {'retorno': 1, 'mensagem': 'Nenhum funcionário registrado', 'dados': []}
 
-    return {'retorno': 0, 'mensagem': 'Funcionários listados com sucesso', 'dados': funcionarios}
+    resultado = {'retorno': 0, 'mensagem': 'Funcionários listados com sucesso', 'dados': funcionarios}
+    if limite is not None:
+        resultado['cursor'] = proximo
+    return resultado
+
+
+def _iterar_funcionarios(incluir_inativos: bool, cursor: tuple = None):
+    """Percorre `_todos_funcionarios` a partir do cursor, produzindo os pares (<cursor>, <Funcionario>) dos ativos ou, se pedido, de todos."""
+    return ((c, f) for c, f in iterar_registro(_todos_funcionarios, cursor) if incluir_inativos or f.ativo())
+
+
+def iterar_todos_funcionarios(incluir_inativos: bool = False, limite: int = None, deslocamento: int = 0, cursor: tuple = None):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: iterar_todos_funcionarios()
+
+    B) OBJETIVO:
+    Variante sob demanda de `listar_todos_funcionarios()`: percorrer os funcionários sem montar uma lista.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: incluir_inativos (booleano, opcional)
+    Se `True`, inclui os funcionários desligados.
+    PARÂMETRO 2: limite (inteiro, opcional)
+    Número máximo de funcionários produzidos. Se omitido, vai até o último.
+    PARÂMETRO 3: deslocamento (inteiro, opcional)
+    Número de funcionários (já filtrados) saltados antes do primeiro produzido.
+    PARÂMETRO 4: cursor (tupla, opcional)
+    Cursor retornado por `listar_todos_funcionarios(limite=...)`; o percurso continua depois dele.
+
+    RETORNO 1: Gerador de objetos `Funcionario`, na ordem do registro.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - O registro de funcionários não é alterado enquanto o gerador é consumido.
+
+    Assertiva(s) de saída:
+    - Nenhuma lista do tamanho do registro é criada.
+
+    E) DESCRIÇÃO:
+    1. Valida os parâmetros de paginação.
+    2. Retorna os funcionários de `_iterar_funcionarios()`, fatiados por `deslocamento` e `limite`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Lança `ValueError` se um parâmetro for inválido, já que um gerador não retorna dicionário de erro.
+    """
+    erro = parametro_invalido(limite, deslocamento, cursor)
+    if erro is not None:
+        raise ValueError(f"Parâmetro {erro} errado")
+    return fatiar(_iterar_funcionarios(incluir_inativos, cursor), limite, deslocamento)
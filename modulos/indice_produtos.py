@@ -0,0 +1,1249 @@
+import re
+import math
+import heapq
+import unicodedata
+from array import array
+from collections import Counter
+from bisect import bisect_left, insort
+
+
+__all__ = [
+    "CAMPOS_TEXTO",
+    "normalizar",
+    "tokenizar",
+    "IndiceTokens",
+    "IndiceTrigramas",
+    "CAMPOS_FACETAS",
+    "IndiceFacetas",
+    "CAMPOS_PREFIXOS",
+    "IndicePrefixos",
+    "PESOS_RELEVANCIA",
+    "IndiceRelevancia"
+]
+
+
+# Atributos de `Produto` percorridos pela busca por texto
+CAMPOS_TEXTO = ("nome", "marca", "categoria")
+
+# Atributos de `Produto` com índice de facetas, usados em filtros exatos e nas contagens por valor
+CAMPOS_FACETAS = ("categoria", "marca")
+
+# Atributos de `Produto` cujo início é completado pelo autocompletar
+CAMPOS_PREFIXOS = ("nome", "marca")
+
+# Peso de cada campo de `CAMPOS_TEXTO` na pontuação de relevância: uma palavra do nome vale mais que uma da categoria
+PESOS_RELEVANCIA = {"nome": 3.0, "marca": 2.0, "categoria": 1.0}
+
+# Parâmetros do BM25: saturação da frequência da palavra no campo e peso da normalização pelo tamanho do campo
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Na busca por trigramas, uma lista de ocorrência só é intersectada se não for mais que este número de vezes maior
+# que a interseção acumulada; acima disso, verificar os candidatos restantes custa menos que percorrer a lista
+LIMITE_INTERSECAO = 8
+
+_PALAVRA = re.compile(r"\w+")
+# Marcas de acentuação que sobram da decomposição NFKD (bloco "Combining Diacritical Marks")
+_ACENTOS = re.compile("[\u0300-\u036f]")
+
+
+def normalizar(texto: str):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: normalizar()
+
+    B) OBJETIVO:
+    Levar um texto à forma usada na comparação da busca: minúsculas e sem acentos.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: texto (string)
+    Texto a normalizar.
+
+    RETORNO 1: Texto normalizado (string).
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `texto` é uma string.
+
+    Assertiva(s) de saída:
+    - "Laticínios" e "LATICINIOS" resultam no mesmo texto.
+
+    E) DESCRIÇÃO:
+    1. Se o texto for só ASCII, retorna-o em minúsculas, sem decompor.
+    2. Caso contrário, decompõe os caracteres acentuados (NFKD), descarta as marcas de acentuação e converte o resultado para minúsculas com `casefold()`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Nenhuma.
+    """
+    if texto.isascii():
+        return texto.lower()
+    return _ACENTOS.sub("", unicodedata.normalize("NFKD", texto)).casefold()
+
+
+def tokenizar(texto: str):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: tokenizar()
+
+    B) OBJETIVO:
+    Separar um texto nas palavras normalizadas que o índice de busca associa aos produtos.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: texto (string)
+    Texto a separar.
+
+    RETORNO 1: Lista de palavras normalizadas, na ordem do texto (com repetições).
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `texto` é uma string.
+
+    Assertiva(s) de saída:
+    - Nenhuma palavra contém espaços ou pontuação.
+
+    E) DESCRIÇÃO:
+    1. Normaliza o texto com `normalizar()`.
+    2. Retorna as sequências de letras, dígitos e sublinhados.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Pontuação separa palavras: "Coca-Cola" resulta em "coca" e "cola".
+    """
+    return _PALAVRA.findall(normalizar(texto))
+
+
+class IndiceTokens:
+
+    def __init__(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Criar um índice invertido vazio, que associa cada palavra normalizada aos códigos dos produtos em cujo nome, marca ou categoria ela aparece.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O índice não contém nenhum produto.
+
+        E) DESCRIÇÃO:
+        1. Inicializa as listas de ocorrência {<palavra>: {<código>}}.
+        2. Inicializa as palavras indexadas de cada produto {<código>: frozenset}, usadas para retirá-lo das listas ao reindexá-lo.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        self._ocorrencias = {}
+        self._palavras = {}
+
+    def __len__(self):
+        """Retorna o número de produtos indexados."""
+        return len(self._palavras)
+
+    def __contains__(self, codigo):
+        """Indica se o código está indexado."""
+        return codigo in self._palavras
+
+    def adicionar(self, produto):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: adicionar()
+
+        B) OBJETIVO:
+        Indexar um produto novo ou reindexar um produto cujo nome, marca ou categoria mudou.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: produto (Produto)
+        Produto a indexar.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `produto` possui os atributos `codigo` e os de `CAMPOS_TEXTO`.
+
+        Assertiva(s) de saída:
+        - O código do produto consta exatamente nas listas das palavras atuais de `CAMPOS_TEXTO`.
+
+        E) DESCRIÇÃO:
+        1. Extrai o conjunto de palavras dos campos de texto.
+        2. Se o código já estava indexado com outras palavras, retira-o das listas que não valem mais (apagando as que ficarem vazias).
+        3. Acrescenta o código às listas das palavras novas e guarda o conjunto atual.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é proporcional ao número de palavras do produto, não ao tamanho do índice.
+        """
+        codigo = produto.codigo
+        novas = frozenset(tokenizar(" ".join(getattr(produto, campo) for campo in CAMPOS_TEXTO)))
+        antigas = self._palavras.get(codigo, frozenset())
+        if novas == antigas and codigo in self._palavras:
+            return
+
+        for palavra in antigas - novas:
+            codigos = self._ocorrencias[palavra]
+            codigos.discard(codigo)
+            if not codigos:
+                del self._ocorrencias[palavra]
+        for palavra in novas - antigas:
+            self._ocorrencias.setdefault(palavra, set()).add(codigo)
+        self._palavras[codigo] = novas
+
+    def reconstruir(self, produtos):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: reconstruir()
+
+        B) OBJETIVO:
+        Descartar o conteúdo do índice e indexar novamente um conjunto de produtos.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: produtos (iterável)
+        Produtos a indexar (ex: `_todos_produtos.values()`).
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O índice contém exatamente os produtos recebidos.
+
+        E) DESCRIÇÃO:
+        1. Esvazia as listas de ocorrência e as palavras por produto.
+        2. Chama `adicionar()` para cada produto.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é proporcional ao tamanho do catálogo; é usado apenas quando o índice perde a sincronia com o registro.
+        """
+        self._ocorrencias = {}
+        self._palavras = {}
+        for produto in produtos:
+            self.adicionar(produto)
+
+    def buscar(self, texto: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: buscar()
+
+        B) OBJETIVO:
+        Encontrar os códigos dos produtos que contêm todas as palavras de um texto de busca.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: texto (string)
+        Texto de busca.
+
+        RETORNO 1: Conjunto com os códigos encontrados (vazio se o texto não tiver palavras ou se alguma palavra não ocorrer em nenhum produto).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `texto` é uma string.
+
+        Assertiva(s) de saída:
+        - O índice não é alterado.
+
+        E) DESCRIÇÃO:
+        1. Separa o texto em palavras com `tokenizar()`.
+        2. Obtém a lista de ocorrência de cada palavra; se alguma não existir, retorna um conjunto vazio.
+        3. Ordena as listas pelo tamanho e as intersecta a partir da menor, parando se a interseção ficar vazia.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é proporcional ao tamanho da menor lista, não ao do catálogo.
+        - As palavras precisam ser completas: "lei" não encontra "leite".
+        """
+        listas = []
+        for palavra in set(tokenizar(texto)):
+            codigos = self._ocorrencias.get(palavra)
+            if not codigos:
+                return set()
+            listas.append(codigos)
+        if not listas:
+            return set()
+
+        listas.sort(key=len)
+        resultado = set(listas[0])
+        for codigos in listas[1:]:
+            resultado &= codigos
+            if not resultado:
+                break
+        return resultado
+
+
+class IndiceTrigramas:
+
+    def __init__(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Criar um índice vazio de trigramas (trechos de 3 caracteres) de nome, marca e categoria, que restringe a busca por trecho aos produtos candidatos.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O índice não contém nenhum produto.
+
+        E) DESCRIÇÃO:
+        1. Inicializa as listas de ocorrência {<trigrama>: array de posições}, em ordem crescente de posição.
+        2. Inicializa a posição de cada código, atribuída na ordem em que foi indexado pela primeira vez, e a lista inversa de códigos por posição.
+        3. Inicializa os campos de texto indexados de cada produto, em minúsculas, usados para retirá-lo das listas ao reindexá-lo.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - As listas guardam posições em arrays de inteiros de 32 bits (4 bytes por ocorrência) em vez de conjuntos, que ocupariam cerca de dez vezes mais memória.
+        """
+        self._ocorrencias = {}
+        self._posicao = {}
+        self._codigos = []
+        self._textos = {}
+
+    def __len__(self):
+        """Retorna o número de produtos indexados."""
+        return len(self._textos)
+
+    def __contains__(self, codigo):
+        """Indica se o código está indexado."""
+        return codigo in self._textos
+
+    @staticmethod
+    def _trigramas(textos):
+        """Retorna o conjunto dos trigramas de cada texto, sem atravessar de um texto para o outro."""
+        return {texto[i:i + 3] for texto in textos for i in range(len(texto) - 2)}
+
+    def adicionar(self, produto):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: adicionar()
+
+        B) OBJETIVO:
+        Indexar um produto novo ou reindexar um produto cujo nome, marca ou categoria mudou.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: produto (Produto)
+        Produto a indexar.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `produto` possui os atributos `codigo` e os de `CAMPOS_TEXTO`.
+
+        Assertiva(s) de saída:
+        - A posição do produto consta exatamente nas listas dos trigramas atuais de `CAMPOS_TEXTO`, em minúsculas, e cada lista continua em ordem crescente.
+
+        E) DESCRIÇÃO:
+        1. Converte os campos de texto para minúsculas com `lower()`, como a busca por trecho de `pesquisar_produto()`.
+        2. Se nada mudou, retorna.
+        3. Se o código é novo, atribui-lhe a próxima posição, maior que todas as existentes, e o acrescenta ao fim das listas dos seus trigramas.
+        4. Se o código já estava indexado, retira a sua posição das listas dos trigramas que deixaram de existir (apagando as que ficarem vazias) e a insere, na ordem, nas listas dos novos.
+        5. Guarda os campos atuais.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Usa `lower()`, e não `normalizar()`, para que os candidatos sejam os mesmos da busca sequencial, inclusive quanto a acentos.
+        - Indexar um produto novo custa um acréscimo por trigrama; reindexar custa até o tamanho das listas afetadas.
+        """
+        codigo = produto.codigo
+        textos = tuple(getattr(produto, campo).lower() for campo in CAMPOS_TEXTO)
+        anteriores = self._textos.get(codigo)
+        if textos == anteriores:
+            return
+
+        novos = self._trigramas(textos)
+        if anteriores is None:
+            posicao = len(self._codigos)
+            self._posicao[codigo] = posicao
+            self._codigos.append(codigo)
+            for trigrama in novos:
+                lista = self._ocorrencias.get(trigrama)
+                if lista is None:
+                    lista = self._ocorrencias[trigrama] = array("i")
+                lista.append(posicao)
+        else:
+            posicao = self._posicao[codigo]
+            antigos = self._trigramas(anteriores)
+            for trigrama in antigos - novos:
+                lista = self._ocorrencias[trigrama]
+                lista.remove(posicao)
+                if not lista:
+                    del self._ocorrencias[trigrama]
+            for trigrama in novos - antigos:
+                lista = self._ocorrencias.get(trigrama)
+                if lista is None:
+                    lista = self._ocorrencias[trigrama] = array("i")
+                lista.insert(bisect_left(lista, posicao), posicao)
+        self._textos[codigo] = textos
+
+    def reconstruir(self, produtos):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: reconstruir()
+
+        B) OBJETIVO:
+        Descartar o conteúdo do índice e indexar novamente um conjunto de produtos.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: produtos (iterável)
+        Produtos a indexar, na ordem do registro (ex: `_todos_produtos.values()`).
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O índice contém exatamente os produtos recebidos, com as posições na ordem recebida.
+
+        E) DESCRIÇÃO:
+        1. Esvazia as listas de ocorrência, as posições e os textos.
+        2. Chama `adicionar()` para cada produto.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é proporcional ao tamanho do catálogo; é usado apenas quando o índice perde a sincronia com o registro.
+        """
+        self._ocorrencias = {}
+        self._posicao = {}
+        self._codigos = []
+        self._textos = {}
+        for produto in produtos:
+            self.adicionar(produto)
+
+    def candidatos(self, texto: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: candidatos()
+
+        B) OBJETIVO:
+        Obter os códigos dos produtos que podem conter um trecho de texto, na ordem em que foram indexados.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: texto (string)
+        Trecho procurado, já em minúsculas.
+
+        RETORNO 1: Lista de códigos candidatos; `None` se o trecho tiver menos de 3 caracteres e o índice não puder restringir a busca.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `texto` está em minúsculas (`lower()`).
+
+        Assertiva(s) de saída:
+        - Todo produto indexado que contém o trecho em algum campo está na lista; a lista pode conter falsos positivos.
+
+        E) DESCRIÇÃO:
+        1. Se o trecho tiver menos de 3 caracteres, retorna `None`.
+        2. Obtém a lista de ocorrência de cada trigrama do trecho; se algum não existir, retorna uma lista vazia.
+        3. Parte da menor lista e a intersecta com as seguintes, em ordem de tamanho, enquanto a próxima lista não for mais de `LIMITE_INTERSECAO` vezes maior que a interseção (a partir daí, verificar os candidatos sai mais barato que percorrer a lista).
+        4. Ordena as posições restantes e retorna os códigos correspondentes.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Os trigramas de um candidato podem estar em campos diferentes ou fora de ordem; quem chama deve verificar o trecho em cada campo.
+        """
+        if len(texto) < 3:
+            return None
+
+        listas = []
+        for trigrama in self._trigramas((texto,)):
+            lista = self._ocorrencias.get(trigrama)
+            if lista is None:
+                return []
+            listas.append(lista)
+
+        listas.sort(key=len)
+        posicoes = set(listas[0])
+        for lista in listas[1:]:
+            if not posicoes or len(lista) > LIMITE_INTERSECAO * len(posicoes):
+                break
+            posicoes.intersection_update(lista)
+        codigos = self._codigos
+        return [codigos[p] for p in sorted(posicoes)]
+
+
+class IndiceFacetas:
+
+    def __init__(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Criar um índice vazio de facetas, que agrupa os códigos dos produtos pelo valor exato de cada campo de `CAMPOS_FACETAS`.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O índice não contém nenhum produto.
+
+        E) DESCRIÇÃO:
+        1. Inicializa os grupos de cada campo {<campo>: {<valor>: {<código>}}}.
+        2. Inicializa os valores indexados de cada produto {<código>: tupla}, usados para retirá-lo dos grupos ao reindexá-lo.
+        3. Inicializa a posição de cada código, atribuída na ordem em que foi indexado pela primeira vez.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Os valores são comparados exatamente, como nos filtros de `pesquisar_produto()`: "Nestlé" e "nestle" são grupos diferentes.
+        """
+        self._grupos = {campo: {} for campo in CAMPOS_FACETAS}
+        self._valores = {}
+        self._posicao = {}
+
+    def __len__(self):
+        """Retorna o número de produtos indexados."""
+        return len(self._valores)
+
+    def __contains__(self, codigo):
+        """Indica se o código está indexado."""
+        return codigo in self._valores
+
+    def adicionar(self, produto):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: adicionar()
+
+        B) OBJETIVO:
+        Indexar um produto novo ou reindexar um produto cuja categoria ou marca mudou.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: produto (Produto)
+        Produto a indexar.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `produto` possui os atributos `codigo` e os de `CAMPOS_FACETAS`, com valores que podem ser chaves de dicionário.
+
+        Assertiva(s) de saída:
+        - O código consta exatamente no grupo do valor atual de cada campo.
+
+        E) DESCRIÇÃO:
+        1. Obtém os valores atuais dos campos; se nada mudou, retorna.
+        2. Se o código é novo, atribui-lhe a próxima posição.
+        3. Para cada campo cujo valor mudou, retira o código do grupo antigo (apagando o grupo se ficar vazio) e o acrescenta ao grupo do novo valor.
+        4. Guarda os valores atuais.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Reindexar não muda a posição do produto.
+        """
+        codigo = produto.codigo
+        valores = tuple(getattr(produto, campo) for campo in CAMPOS_FACETAS)
+        anteriores = self._valores.get(codigo)
+        if valores == anteriores:
+            return
+
+        if anteriores is None:
+            self._posicao[codigo] = len(self._posicao)
+        for i, campo in enumerate(CAMPOS_FACETAS):
+            grupos = self._grupos[campo]
+            if anteriores is not None:
+                if anteriores[i] == valores[i]:
+                    continue
+                grupo = grupos[anteriores[i]]
+                grupo.discard(codigo)
+                if not grupo:
+                    del grupos[anteriores[i]]
+            grupos.setdefault(valores[i], set()).add(codigo)
+        self._valores[codigo] = valores
+
+    def reconstruir(self, produtos):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: reconstruir()
+
+        B) OBJETIVO:
+        Descartar o conteúdo do índice e indexar novamente um conjunto de produtos.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: produtos (iterável)
+        Produtos a indexar, na ordem do registro (ex: `_todos_produtos.values()`).
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O índice contém exatamente os produtos recebidos, com as posições na ordem recebida.
+
+        E) DESCRIÇÃO:
+        1. Esvazia os grupos, os valores e as posições.
+        2. Chama `adicionar()` para cada produto.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é proporcional ao tamanho do catálogo; é usado apenas quando o índice perde a sincronia com o registro.
+        """
+        self._grupos = {campo: {} for campo in CAMPOS_FACETAS}
+        self._valores = {}
+        self._posicao = {}
+        for produto in produtos:
+            self.adicionar(produto)
+
+    def selecionar(self, filtros: dict):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: selecionar()
+
+        B) OBJETIVO:
+        Obter os códigos dos produtos que atendem aos filtros exatos sobre os campos de `CAMPOS_FACETAS`.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: filtros (dicionário)
+        Filtros de `pesquisar_produto()`, {<atributo>: <valor>}; os atributos fora de `CAMPOS_FACETAS` são ignorados.
+
+        RETORNO 1: Conjunto novo de códigos; `None` se nenhum filtro for sobre um campo de faceta e o índice não puder restringir a busca.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O conjunto contém exatamente os produtos indexados com o valor pedido em cada campo de faceta filtrado.
+
+        E) DESCRIÇÃO:
+        1. Obtém o grupo do valor pedido para cada campo de faceta presente nos filtros; um valor sem grupo (ou que não pode ser chave de dicionário) resulta em um grupo vazio.
+        2. Se nenhum campo de faceta foi filtrado, retorna `None`.
+        3. Copia o menor grupo e o intersecta com os demais.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é proporcional ao tamanho do menor grupo, não ao do catálogo.
+        """
+        grupos = []
+        for campo in CAMPOS_FACETAS:
+            if campo in filtros:
+                try:
+                    grupos.append(self._grupos[campo].get(filtros[campo], ()))
+                except TypeError:
+                    grupos.append(())
+        if not grupos:
+            return None
+
+        grupos.sort(key=len)
+        codigos = set(grupos[0])
+        for grupo in grupos[1:]:
+            codigos.intersection_update(grupo)
+        return codigos
+
+    def ordenar(self, codigos):
+        """Retorna os códigos indexados recebidos na ordem em que foram indexados pela primeira vez."""
+        return sorted(codigos, key=self._posicao.__getitem__)
+
+    def posicao(self, codigo, padrao=None):
+        """Retorna a posição do código, atribuída na ordem em que foi indexado pela primeira vez, ou `padrao` se ele não estiver indexado."""
+        return self._posicao.get(codigo, padrao)
+
+    def contar(self, codigos=None):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: contar()
+
+        B) OBJETIVO:
+        Contar, para cada campo de `CAMPOS_FACETAS`, quantos produtos têm cada valor, sem consultar os objetos `Produto`.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigos (iterável, opcional)
+        Códigos indexados a contar (ex: os resultados de uma busca, produzidos sob demanda). Se omitido, conta todos os produtos indexados.
+
+        RETORNO 1: Dicionário {<campo>: {<valor>: <N>}}, de cada campo do valor mais frequente para o menos frequente.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Todos os códigos recebidos estão indexados.
+
+        Assertiva(s) de saída:
+        - O índice não é alterado.
+
+        E) DESCRIÇÃO:
+        1. Sem `codigos`, usa o tamanho do grupo de cada valor.
+        2. Com `codigos`, percorre-os uma única vez e soma os valores indexados de cada um em um `Counter` por campo.
+        3. Ordena as contagens de cada campo da maior para a menor.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - A memória usada é proporcional ao número de valores distintos, e não ao de códigos: um gerador de resultados é contado sem ser reunido em uma lista.
+        """
+        if codigos is None:
+            contagens = [Counter({valor: len(grupo) for valor, grupo in self._grupos[campo].items()})
+                         for campo in CAMPOS_FACETAS]
+        else:
+            contagens = [Counter() for _ in CAMPOS_FACETAS]
+            valores = self._valores
+            for codigo in codigos:
+                for contagem, valor in zip(contagens, valores[codigo]):
+                    contagem[valor] += 1
+        return {campo: dict(contagem.most_common()) for campo, contagem in zip(CAMPOS_FACETAS, contagens)}
+
+
+class IndicePrefixos:
+
+    def __init__(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Criar um índice vazio para completar o início de nomes e marcas de produtos, mantido como uma lista ordenada percorrida com busca binária.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O índice não contém nenhum produto nem pontuação.
+
+        E) DESCRIÇÃO:
+        1. Inicializa a lista ordenada de entradas (<texto normalizado>, <código>), uma por campo de `CAMPOS_PREFIXOS` de cada produto.
+        2. Inicializa as entradas de cada produto {<código>: tupla}, usadas para retirá-lo da lista ao reindexá-lo.
+        3. Inicializa a pontuação de cada código (ex: volume de vendas) e o ranking, lista ordenada de (-<pontuação>, <código>) dos códigos com pontuação positiva.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Uma lista ordenada ocupa bem menos memória que uma árvore de prefixos (trie) com um dicionário por caractere, e a busca binária encontra o início do intervalo em O(log n).
+        """
+        self._entradas = []
+        self._chaves = {}
+        self._pontuacao = {}
+        self._ranking = []
+
+    def __len__(self):
+        """Retorna o número de produtos indexados."""
+        return len(self._chaves)
+
+    def __contains__(self, codigo):
+        """Indica se o código está indexado."""
+        return codigo in self._chaves
+
+    @staticmethod
+    def _entradas_de(produto):
+        """Retorna as entradas de um produto: o texto normalizado de cada campo de `CAMPOS_PREFIXOS`, sem repetições."""
+        return tuple({(normalizar(getattr(produto, campo)), produto.codigo): None for campo in CAMPOS_PREFIXOS})
+
+    def adicionar(self, produto):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: adicionar()
+
+        B) OBJETIVO:
+        Indexar um produto novo ou reindexar um produto cujo nome ou marca mudou.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: produto (Produto)
+        Produto a indexar.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `produto` possui os atributos `codigo` e os de `CAMPOS_PREFIXOS`.
+
+        Assertiva(s) de saída:
+        - A lista contém exatamente as entradas atuais do produto e continua ordenada.
+
+        E) DESCRIÇÃO:
+        1. Calcula as entradas atuais do produto; se nada mudou, retorna.
+        2. Retira da lista, por busca binária, as entradas antigas que deixaram de existir.
+        3. Insere na posição ordenada as entradas novas.
+        4. Guarda as entradas atuais.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Cada inserção ou remoção desloca o fim da lista (O(n)); a carga de um catálogo inteiro deve usar `reconstruir()`, que ordena uma única vez.
+        """
+        entradas = self._entradas_de(produto)
+        anteriores = self._chaves.get(produto.codigo, ())
+        if entradas == anteriores:
+            return
+
+        for entrada in anteriores:
+            if entrada not in entradas:
+                del self._entradas[bisect_left(self._entradas, entrada)]
+        for entrada in entradas:
+            if entrada not in anteriores:
+                insort(self._entradas, entrada)
+        self._chaves[produto.codigo] = entradas
+
+    def reconstruir(self, produtos):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: reconstruir()
+
+        B) OBJETIVO:
+        Descartar as entradas do índice e indexar novamente um conjunto de produtos.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: produtos (iterável)
+        Produtos a indexar.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O índice contém exatamente os produtos recebidos; a pontuação é mantida.
+
+        E) DESCRIÇÃO:
+        1. Calcula as entradas de cada produto.
+        2. Ordena a lista de todas as entradas de uma só vez.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é O(n log n) no tamanho do catálogo; é usado quando o índice perde a sincronia com o registro.
+        """
+        self._chaves = {produto.codigo: self._entradas_de(produto) for produto in produtos}
+        self._entradas = sorted(entrada for entradas in self._chaves.values() for entrada in entradas)
+
+    def definir_pontuacao(self, pontuacao: dict):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: definir_pontuacao()
+
+        B) OBJETIVO:
+        Substituir a pontuação usada para ordenar as sugestões de `completar(ordenar=True)`.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: pontuacao (dicionário)
+        Pontuação de cada código {<código>: <número>} (ex: volume de vendas); os códigos ausentes valem 0.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O ranking contém, em ordem decrescente de pontuação e crescente de código, os códigos com pontuação positiva.
+
+        E) DESCRIÇÃO:
+        1. Copia as pontuações positivas.
+        2. Ordena o ranking de uma só vez.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é O(n log n) no número de códigos pontuados; para acréscimos pontuais, use `somar_pontuacao()`.
+        """
+        self._pontuacao = {codigo: valor for codigo, valor in pontuacao.items() if valor > 0}
+        self._ranking = sorted((-valor, codigo) for codigo, valor in self._pontuacao.items())
+
+    def somar_pontuacao(self, codigo, valor):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: somar_pontuacao()
+
+        B) OBJETIVO:
+        Acrescentar um valor à pontuação de um código (ex: a quantidade de uma venda), mantendo o ranking ordenado.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: codigo (string)
+        Código do produto.
+        PARÂMETRO 2: valor (número)
+        Valor a somar.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O código está no ranking, na posição da nova pontuação, se ela for positiva.
+
+        E) DESCRIÇÃO:
+        1. Retira do ranking, por busca binária, a posição da pontuação anterior, se houver.
+        2. Soma o valor e, se o resultado for positivo, insere o código na posição ordenada.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Cada chamada desloca o fim do ranking (O(n)), sem reordená-lo.
+        """
+        anterior = self._pontuacao.pop(codigo, 0)
+        if anterior > 0:
+            del self._ranking[bisect_left(self._ranking, (-anterior, codigo))]
+        atual = anterior + valor
+        if atual > 0:
+            self._pontuacao[codigo] = atual
+            insort(self._ranking, (-atual, codigo))
+
+    def pontuacao(self, codigo):
+        """Retorna a pontuação de um código (0 se não tiver)."""
+        return self._pontuacao.get(codigo, 0)
+
+    def completar(self, prefixo: str, k: int, ordenar: bool = False):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: completar()
+
+        B) OBJETIVO:
+        Obter os códigos de até `k` produtos cujo nome ou marca começa com um prefixo, ignorando acentos e maiúsculas.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: prefixo (string)
+        Início digitado do nome ou da marca.
+        PARÂMETRO 2: k (inteiro)
+        Número máximo de códigos retornados.
+        PARÂMETRO 3: ordenar (bool, opcional)
+        Se `True`, ordena pela pontuação definida com `definir_pontuacao()`/`somar_pontuacao()`.
+
+        RETORNO 1: Lista de até `k` códigos distintos. Sem ordenação, em ordem alfabética do texto completado; com ela, primeiro os pontuados, da maior para a menor pontuação (empates por código), e depois os demais em ordem alfabética.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `k` é um inteiro positivo.
+
+        Assertiva(s) de saída:
+        - Todo código retornado tem um campo de `CAMPOS_PREFIXOS` que começa com o prefixo normalizado.
+
+        E) DESCRIÇÃO:
+        1. Normaliza o prefixo e localiza, por busca binária, o intervalo contíguo de entradas que começam com ele.
+        2. Sem ordenação, percorre o intervalo do início e para ao reunir `k` códigos distintos.
+        3. Com ordenação, escolhe o percurso mais barato:
+           a. Se o intervalo for curto perto do custo estimado de percorrer o ranking (k * tamanho do ranking / tamanho do intervalo), reúne os códigos pontuados do intervalo e seleciona os `k` maiores com `heapq`.
+           b. Caso contrário, percorre o ranking do mais pontuado para o menos pontuado e para ao encontrar `k` códigos que completam o prefixo.
+           c. Se faltarem códigos, completa com os não pontuados do intervalo, em ordem alfabética.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Sem ordenação, o custo é O(log n + k); com ela, é o menor entre o tamanho do intervalo e o percurso do ranking, que para prefixos curtos (intervalos grandes) encontra os `k` códigos logo no início.
+        - Um prefixo vazio completa qualquer produto.
+        """
+        prefixo = normalizar(prefixo)
+        entradas = self._entradas
+        inicio = bisect_left(entradas, (prefixo,))
+        fim = bisect_left(entradas, (prefixo + "\U0010ffff",), inicio)
+
+        codigos = {}
+        if ordenar and self._ranking:
+            tamanho = fim - inicio
+            if tamanho * tamanho <= k * len(self._ranking):
+                pontuados = {codigo for _, codigo in entradas[inicio:fim] if codigo in self._pontuacao}
+                for codigo in heapq.nsmallest(k, ((-self._pontuacao[c], c) for c in pontuados)):
+                    codigos[codigo[1]] = None
+            else:
+                for _, codigo in self._ranking:
+                    if any(texto.startswith(prefixo) for texto, _ in self._chaves.get(codigo, ())):
+                        codigos[codigo] = None
+                        if len(codigos) == k:
+                            break
+
+        for indice in range(inicio, fim):
+            if len(codigos) == k:
+                break
+            codigo = entradas[indice][1]
+            if codigo not in codigos and not (ordenar and codigo in self._pontuacao):
+                codigos[codigo] = None
+        return list(codigos)
+
+
+class IndiceRelevancia:
+
+    def __init__(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Criar um índice vazio de relevância, que guarda, para cada campo de texto, quantas vezes cada palavra aparece em cada produto.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O índice não contém nenhum produto.
+
+        E) DESCRIÇÃO:
+        1. Inicializa, para cada campo de `CAMPOS_TEXTO`, as listas de ocorrência {<palavra>: {<código>: <frequência>}}.
+        2. Inicializa o número de produtos em que cada palavra aparece, em qualquer campo {<palavra>: <N>}, usado no IDF.
+        3. Inicializa a soma dos tamanhos (em palavras) de cada campo, usada no tamanho médio.
+        4. Inicializa as frequências de cada produto {<código>: (<frequências por campo>)}, usadas para retirá-lo das listas ao reindexá-lo e para obter o tamanho de cada campo.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        self._ocorrencias = tuple({} for _ in CAMPOS_TEXTO)
+        self._documentos = {}
+        self._soma_tamanhos = [0] * len(CAMPOS_TEXTO)
+        self._frequencias = {}
+        self._tamanhos = {}
+
+    def __len__(self):
+        """Retorna o número de produtos indexados."""
+        return len(self._frequencias)
+
+    def __contains__(self, codigo):
+        """Indica se o código está indexado."""
+        return codigo in self._frequencias
+
+    def _retirar(self, codigo):
+        """Retira um código de todas as listas de ocorrência, das contagens por palavra e da soma dos tamanhos."""
+        frequencias_campos = self._frequencias.pop(codigo)
+        for i, frequencias in enumerate(frequencias_campos):
+            ocorrencias = self._ocorrencias[i]
+            for palavra in frequencias:
+                codigos = ocorrencias[palavra]
+                del codigos[codigo]
+                if not codigos:
+                    del ocorrencias[palavra]
+        for palavra in set().union(*frequencias_campos):
+            self._documentos[palavra] -= 1
+            if not self._documentos[palavra]:
+                del self._documentos[palavra]
+        for i, tamanho in enumerate(self._tamanhos.pop(codigo)):
+            self._soma_tamanhos[i] -= tamanho
+
+    def adicionar(self, produto):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: adicionar()
+
+        B) OBJETIVO:
+        Indexar um produto novo ou reindexar um produto cujo nome, marca ou categoria mudou.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: produto (Produto)
+        Produto a indexar.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `produto` possui os atributos `codigo` e os de `CAMPOS_TEXTO`.
+
+        Assertiva(s) de saída:
+        - As listas de ocorrência e os tamanhos refletem apenas os campos atuais do produto.
+
+        E) DESCRIÇÃO:
+        1. Conta as palavras de cada campo de texto.
+        2. Se o código já estava indexado com as mesmas contagens, não faz nada; com outras, retira-o das listas antigas.
+        3. Acrescenta o código, com a frequência de cada palavra, às listas do seu campo, conta o produto uma vez em cada palavra distinta e soma os tamanhos dos campos.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é proporcional ao número de palavras do produto, não ao tamanho do índice.
+        """
+        codigo = produto.codigo
+        novas = []
+        for campo in CAMPOS_TEXTO:
+            frequencias = {}
+            for palavra in tokenizar(getattr(produto, campo)):
+                frequencias[palavra] = frequencias.get(palavra, 0) + 1
+            novas.append(frequencias)
+        novas = tuple(novas)
+        if codigo in self._frequencias:
+            if self._frequencias[codigo] == novas:
+                return
+            self._retirar(codigo)
+
+        tamanhos = []
+        for i, frequencias in enumerate(novas):
+            ocorrencias = self._ocorrencias[i]
+            for palavra, frequencia in frequencias.items():
+                ocorrencias.setdefault(palavra, {})[codigo] = frequencia
+            tamanho = sum(frequencias.values())
+            self._soma_tamanhos[i] += tamanho
+            tamanhos.append(tamanho)
+        for palavra in set().union(*novas):
+            self._documentos[palavra] = self._documentos.get(palavra, 0) + 1
+        self._frequencias[codigo] = novas
+        self._tamanhos[codigo] = tuple(tamanhos)
+
+    def reconstruir(self, produtos):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: reconstruir()
+
+        B) OBJETIVO:
+        Descartar o conteúdo do índice e indexar novamente um conjunto de produtos.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: produtos (iterável)
+        Produtos a indexar (ex: `_todos_produtos.values()`).
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O índice contém exatamente os produtos recebidos.
+
+        E) DESCRIÇÃO:
+        1. Esvazia as listas de ocorrência, as contagens por palavra, as somas de tamanhos e as frequências por produto.
+        2. Chama `adicionar()` para cada produto.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O custo é proporcional ao tamanho do catálogo; é usado apenas quando o índice perde a sincronia com o registro.
+        """
+        self._ocorrencias = tuple({} for _ in CAMPOS_TEXTO)
+        self._documentos = {}
+        self._soma_tamanhos = [0] * len(CAMPOS_TEXTO)
+        self._frequencias = {}
+        self._tamanhos = {}
+        for produto in produtos:
+            self.adicionar(produto)
+
+    def pontuar(self, texto: str, selecionados: set = None):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: pontuar()
+
+        B) OBJETIVO:
+        Calcular a relevância, pela soma do BM25 de cada campo ponderado por `PESOS_RELEVANCIA`, dos produtos que contêm alguma palavra de um texto de busca.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: texto (string)
+        Texto de busca.
+        PARÂMETRO 2: selecionados (conjunto, opcional)
+        Se informado, apenas estes códigos são pontuados (ex: os que atendem aos filtros de facetas).
+
+        RETORNO 1: Dicionário {<código>: <pontuação>} dos produtos com ao menos uma palavra do texto (vazio se o texto não tiver palavras).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `texto` é uma string.
+
+        Assertiva(s) de saída:
+        - O índice não é alterado.
+        - Toda pontuação retornada é positiva.
+
+        E) DESCRIÇÃO:
+        1. Separa o texto em palavras distintas com `tokenizar()`.
+        2. Para cada palavra, calcula o IDF: log(1 + (N - n + 0.5) / (n + 0.5)), em que N é o número de produtos e n o de produtos com a palavra em qualquer campo.
+        3. Para cada campo e cada palavra com lista de ocorrência no campo, para cada produto da lista (ou de `selecionados`, se for menor), soma peso * IDF * f * (K1 + 1) / (f + K1 * (1 - B + B * tamanho / tamanho médio)), em que f é a frequência da palavra no campo do produto.
+        4. Retorna as somas por código.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - O IDF é o mesmo em todos os campos: uma palavra rara nas marcas, mas comum nos nomes, não faz a marca valer mais que o nome.
+        - O custo é proporcional à soma das listas de ocorrência das palavras do texto, limitadas a `selecionados`.
+        - Basta uma palavra para o produto ser pontuado; os que contêm mais palavras do texto somam mais.
+        """
+        palavras = set(tokenizar(texto))
+        total = len(self._frequencias)
+        pontuacao = {}
+        if not palavras or not total:
+            return pontuacao
+
+        idf = {}
+        for palavra in palavras:
+            n = self._documentos.get(palavra, 0)
+            if n:
+                idf[palavra] = math.log(1 + (total - n + 0.5) / (n + 0.5))
+
+        tamanhos = self._tamanhos
+        for i, campo in enumerate(CAMPOS_TEXTO):
+            peso = PESOS_RELEVANCIA[campo]
+            media = self._soma_tamanhos[i] / total or 1
+            normalizacao = BM25_K1 * BM25_B / media
+            constante = BM25_K1 * (1 - BM25_B)
+            for palavra in idf:
+                codigos = self._ocorrencias[i].get(palavra)
+                if not codigos:
+                    continue
+                fator = peso * idf[palavra] * (BM25_K1 + 1)
+                if selecionados is not None:
+                    if len(selecionados) < len(codigos):
+                        codigos = {c: codigos[c] for c in selecionados if c in codigos}
+                    else:
+                        codigos = {c: f for c, f in codigos.items() if c in selecionados}
+                for codigo, frequencia in codigos.items():
+                    pontos = fator * frequencia / (frequencia + constante + normalizacao * tamanhos[codigo][i])
+                    pontuacao[codigo] = pontuacao.get(codigo, 0.0) + pontos
+        return pontuacao
@@ -0,0 +1,152 @@
+from itertools import islice
+
+
+__all__ = [
+    "parametro_invalido",
+    "iterar_registro",
+    "fatiar",
+    "paginar"
+]
+
+
+def parametro_invalido(limite, deslocamento, cursor):
+    """Retorna o nome do primeiro parâmetro de paginação inválido, ou `None` se todos forem válidos."""
+    if limite is not None and (not isinstance(limite, int) or limite < 1):
+        return "limite"
+    if not isinstance(deslocamento, int) or deslocamento < 0:
+        return "deslocamento"
+    if cursor is not None and (not isinstance(cursor, tuple) or len(cursor) != 2):
+        return "cursor"
+    return None
+
+
+def _retomar(registro: dict, cursor: tuple):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _retomar()
+
+    B) OBJETIVO:
+    Encontrar a posição do registro em que começa a página seguinte a um cursor.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: registro (dicionário)
+    Registro global percorrido, na ordem de inserção.
+    PARÂMETRO 2: cursor (tupla)
+    Cursor (<posição>, <chave>) do último item da página anterior.
+
+    RETORNO 1: Posição (inteiro) do primeiro item depois do cursor.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `cursor` foi gerado por `iterar_registro()` sobre o mesmo registro.
+
+    Assertiva(s) de saída:
+    - Se a chave do cursor ainda está no registro, a posição retornada é a do item seguinte a ela.
+
+    E) DESCRIÇÃO:
+    1. Salta diretamente para a posição guardada no cursor e confere se a chave continua nela.
+    2. Se não estiver (itens anteriores foram removidos), procura a chave no registro.
+    3. Se a chave também foi removida, retoma na posição guardada, onde está o item que a sucedia.
+
+    F) HIPÓTESES:
+    - Os registros só crescem no fim; remoções são raras.
+
+    G) RESTRIÇÕES:
+    - O salto percorre as chaves com `islice`, em C, sem criar listas; a procura do passo 2 é proporcional à posição da chave.
+    """
+    posicao, chave = cursor
+    if next(islice(registro, posicao, None), None) == chave:
+        return posicao + 1
+    for i, atual in enumerate(registro):
+        if atual == chave:
+            return i + 1
+    return posicao
+
+
+def iterar_registro(registro: dict, cursor: tuple = None):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: iterar_registro()
+
+    B) OBJETIVO:
+    Percorrer um registro global sob demanda, a partir do início ou do item seguinte a um cursor, informando o cursor de cada item.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: registro (dicionário)
+    Registro a percorrer, na ordem de inserção (ex: `_todos_produtos`).
+    PARÂMETRO 2: cursor (tupla, opcional)
+    Cursor do último item já visto, obtido de uma página anterior.
+
+    RETORNO 1: Gerador de pares (<cursor>, <valor>), em que o cursor é a tupla (<posição>, <chave>) do item.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - O registro não é alterado enquanto o gerador é consumido.
+
+    Assertiva(s) de saída:
+    - Nenhuma lista do tamanho do registro é criada.
+
+    E) DESCRIÇÃO:
+    1. Se houver cursor, obtém a posição de retomada com `_retomar()`.
+    2. Salta até essa posição com `islice` e produz cada item com o seu cursor.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - O cursor é opaco para quem chama: deve apenas ser devolvido para obter a página seguinte.
+    """
+    inicio = 0 if cursor is None else _retomar(registro, cursor)
+    for posicao, (chave, valor) in enumerate(islice(registro.items(), inicio, None), start=inicio):
+        yield (posicao, chave), valor
+
+
+def fatiar(pares, limite: int = None, deslocamento: int = 0):
+    """Retorna um gerador dos valores de pares (<cursor>, <valor>), saltando `deslocamento` itens e parando após `limite`."""
+    fim = None if limite is None else deslocamento + limite
+    return (valor for _, valor in islice(pares, deslocamento, fim))
+
+
+def paginar(pares, limite: int, deslocamento: int = 0):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: paginar()
+
+    B) OBJETIVO:
+    Montar uma página a partir de um gerador de pares (<cursor>, <valor>), consumindo apenas os itens necessários.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: pares (iterável)
+    Pares (<cursor>, <valor>), como os de `iterar_registro()`.
+    PARÂMETRO 2: limite (inteiro)
+    Número máximo de itens da página.
+    PARÂMETRO 3: deslocamento (inteiro, opcional)
+    Número de itens saltados antes da página.
+
+    RETORNO 1: Tupla (<lista de valores>, <cursor da página seguinte>); o cursor é `None` se não houver mais itens.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `limite` é um inteiro positivo e `deslocamento` um inteiro não negativo.
+
+    Assertiva(s) de saída:
+    - São consumidos no máximo `deslocamento + limite + 1` pares.
+
+    E) DESCRIÇÃO:
+    1. Salta `deslocamento` pares e reúne até `limite` valores, guardando o cursor do último.
+    2. Tenta obter mais um par: se existir, a página seguinte começa depois do último cursor; caso contrário, não há página seguinte.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - O par extra consumido no passo 2 é descartado junto com o gerador.
+    """
+    pares = iter(pares)
+    valores = []
+    cursor = None
+    for cursor, valor in islice(pares, deslocamento, deslocamento + limite):
+        valores.append(valor)
+    if len(valores) < limite or next(pares, None) is None:
+        return valores, None
+    return valores, cursor
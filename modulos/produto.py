@@ -1,24 +1,141 @@
-import json
+import gc
+import math
+import heapq
+import weakref
+from bisect import bisect_right
+from datetime import date, datetime
+
+from .armazenamento import obter_armazenamento
+from .rastreamento import Rastreavel, marcar_modificado, marcar_modificados, limpar_modificados, geracao_atual, selecionar_para_gravacao
+from .indice_produtos import CAMPOS_TEXTO, CAMPOS_FACETAS, IndiceTokens, IndiceTrigramas, IndiceFacetas, IndicePrefixos, IndiceRelevancia
+from .paginacao import parametro_invalido, iterar_registro, fatiar, paginar
+from .catalogo_colunar import CAMPOS_NUMERICOS, CatalogoColunar
+from .agenda_precos import AgendaPrecos
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 PRODUTOS_JSON = 'dados/produtos.json'
 
-_todos_produtos = {}
+class _RegistroProdutos(dict):
+    """
+    Dicionário de produtos que conta as suas alterações em `geracao`, para que os índices de busca saibam se estão
+    em dia com o registro, mesmo quando ele é esvaziado ou alterado diretamente (pela carga, pelo snapshot ou pelos testes).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.geracao = 0
+
+    def __setitem__(self, chave, valor):
+        super().__setitem__(chave, valor)
+        self.geracao += 1
+
+    def __delitem__(self, chave):
+        super().__delitem__(chave)
+        self.geracao += 1
+
+    def __ior__(self, outro):
+        self.update(outro)
+        return self
+
+    def clear(self):
+        super().clear()
+        self.geracao += 1
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.geracao += 1
+
+    def pop(self, *args):
+        self.geracao += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self.geracao += 1
+        return super().popitem()
+
+    def setdefault(self, chave, valor=None):
+        if chave not in self:
+            self.geracao += 1
+        return super().setdefault(chave, valor)
+
+
+_todos_produtos = _RegistroProdutos()
+
+_catalogo = None
+
+# Índice invertido das palavras de nome, marca e categoria, usado por `pesquisar_produto(modo="palavras")`
+_indice_palavras = IndiceTokens()
+
+# Índice de facetas (categoria e marca), usado pelos filtros de `pesquisar_produto()`
+_indice_facetas = IndiceFacetas()
+
+# Lista ordenada do início de nomes e marcas, usada por `completar_produto()`
+_indice_prefixos = IndicePrefixos()
+
+# Frequência das palavras em cada campo de texto, usada por `pesquisar_produto(modo="relevancia")`
+_indice_relevancia = IndiceRelevancia()
+
+# Geração de `_todos_produtos` com a qual cada índice de busca foi sincronizado pela última vez; os índices acima
+# começam vazios, em dia com o registro também vazio
+_geracoes_indices = weakref.WeakKeyDictionary({indice: _todos_produtos.geracao for indice in
+                                               (_indice_palavras, _indice_facetas, _indice_prefixos, _indice_relevancia)})
+
+# Na busca por relevância com `por_vendas=True`, a pontuação é multiplicada por 1 + PESO_VENDAS * log(1 + quantidade vendida)
+PESO_VENDAS = 0.2
+
+# Peso de cada um dos 13 dígitos do EAN-13 na soma de verificação: o código é válido se a soma for múltipla de 10
+_PESOS_EAN = (1, 3) * 6 + (1,)
+
+# Tabelas de `bytes.translate()` da verificação em lote sem NumPy: dígito ASCII -> valor, dígito ASCII -> 3 * valor,
+# e soma -> 0 se for múltipla de 10 (1 caso contrário)
+_VALOR_DIGITO = bytes.maketrans(b"0123456789", bytes(range(10)))
+_TRIPLO_DIGITO = bytes.maketrans(b"0123456789", bytes(3 * d for d in range(10)))
+_SOMA_INVALIDA = bytes(1 if soma % 10 else 0 for soma in range(256))
+
+# Campos de uma linha de `registrar_produtos_em_lote()`, na ordem dos parâmetros de `registrar_produto()`
+CAMPOS_REGISTRO = ("nome", "marca", "categoria", "codigo", "peso", "preco", "preco_por_peso")
+
+# Índice de trigramas opcional, que acelera `pesquisar_produto(modo="trecho")`; ver `definir_indice_trigramas()`
+_indice_trigramas = None
+
+# Catálogo colunar opcional, que acelera `calcula_precos()`; ver `definir_catalogo_colunar()`
+_catalogo_colunar = None
+
+# Agendas de mudanças de preço {<código>: AgendaPrecos}, apenas dos produtos que têm mudanças agendadas
+_agendas_precos = {}
 
 __all__ = [
     "Produto",
     "consultar_produto_por_codigo",
     "registrar_produto",
+    "registrar_produtos_em_lote",
     "atualizar_produto",
+    "calcula_precos",
+    "agendar_preco",
+    "consultar_preco_vigente",
+    "aplicar_precos_agendados",
     "pesquisar_produto",
+    "iterar_pesquisa_produto",
+    "completar_produto",
     "listar_todos_produtos",
+    "iterar_todos_produtos",
     "salvar_produtos",
-    "carregar_produtos"
+    "carregar_produtos",
+    "definir_catalogo",
+    "definir_indice_trigramas",
+    "definir_catalogo_colunar",
+    "definir_volume_vendas",
+    "somar_volume_vendas"
 ]
 
 
 
 
-class Produto:
+class Produto(Rastreavel, entidade="produtos"):
     def __init__(self, nome: str, marca: str, categoria: str, codigo: str, peso: float, preco: float, preco_por_peso: float = None):
         """
         ESPECIFICAÇÃO DE FUNÇÃO:
@@ -62,14 +179,53 @@ class Produto:
 
         G) RESTRIÇÕES:
         - O construtor não realiza nenhuma validação interna dos dados; ele confia que os valores recebidos são corretos e válidos.
+        - Os atributos são gravados direto no `__dict__`: `__setattr__()` ignoraria atribuições de atributos novos, e passar por ele a cada atributo multiplicava o custo de criar produtos em massa.
+        """
+        self.__dict__.update(nome=nome, marca=marca, categoria=categoria, codigo=codigo, peso=peso, preco=preco,
+                             preco_por_peso=preco_por_peso)
+
+    def __setattr__(self, nome, valor):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __setattr__() (Método de Produto)
+
+        B) OBJETIVO:
+        Estender `Rastreavel.__setattr__()`, que marca o produto como modificado, mantendo em dia os índices de busca e o catálogo colunar.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: nome (string)
+        Nome do atributo.
+        PARÂMETRO 2: valor
+        Novo valor do atributo.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Se um campo de texto de um produto registrado mudou, os índices de busca refletem o novo valor.
+        - Se peso ou preço de um produto registrado mudou, o catálogo colunar, se ativado, reflete o novo valor.
+
+        E) DESCRIÇÃO:
+        1. Verifica se o atributo já existia e delega a atribuição (e a marcação) a `Rastreavel.__setattr__()`.
+        2. Se o atributo é um dos `CAMPOS_TEXTO` e a instância é a registrada em `_todos_produtos`, reindexa-a nos índices de busca.
+        3. Se o atributo é um dos `CAMPOS_NUMERICOS`, o catálogo colunar está ativado e a instância é a registrada, atualiza a sua linha no catálogo.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Atribuições do construtor não reindexam: produtos novos são indexados por `_indexar_novo()`.
         """
-        self.nome = nome
-        self.marca = marca
-        self.categoria = categoria
-        self.codigo = codigo
-        self.peso = peso
-        self.preco = preco
-        self.preco_por_peso = preco_por_peso
+        existia = nome in self.__dict__
+        super().__setattr__(nome, valor)
+        if existia and nome in CAMPOS_TEXTO and _todos_produtos.get(self.codigo) is self:
+            for indice in _indices_ativos():
+                indice.adicionar(self)
+        elif existia and nome in CAMPOS_NUMERICOS and _catalogo_colunar is not None and _todos_produtos.get(self.codigo) is self:
+            _catalogo_colunar.adicionar(self)
 
     def __str__(self, quantidade:float=None):
         """
@@ -152,15 +308,17 @@ class Produto:
         E) DESCRIÇÃO:
         1. Cria um dicionário.
         2. Mapeia cada atributo da instância (`self.nome`, `self.marca`, etc.) para uma chave correspondente no dicionário.
-        3. Retorna o dicionário populado com todos os dados do produto.
+        3. Se o produto tem mudanças de preço agendadas, inclui a agenda na chave "agenda_precos".
+        4. Retorna o dicionário populado com todos os dados do produto.
 
         F) HIPÓTESES:
         - Todos os atributos do objeto são de tipos diretamente serializáveis para JSON (string, número, booleano, None).
 
         G) RESTRIÇÕES:
         - Se novos atributos forem adicionados à classe `Produto`, este método precisará ser atualizado para incluí-los na serialização.
+        - A agenda de preços é procurada pelo código em `_agendas_precos`; produtos sem mudanças agendadas não ganham a chave.
         """        
-        return {
+        dados = {
             "nome": self.nome,
             "marca": self.marca,
             "categoria": self.categoria,
@@ -169,6 +327,10 @@ class Produto:
             "preco": self.preco,
             "preco_por_peso": self.preco_por_peso
         }
+        agenda = _agendas_precos.get(self.codigo)
+        if agenda is not None:
+            dados["agenda_precos"] = agenda.to_json()
+        return dados
     
 
 
@@ -281,7 +443,7 @@ def salvar_produtos():
     C) ACOPLAMENTO:
     PARÂMETROS: Nenhum.
 
-    RETORNO: Nenhum valor explícito é retornado. A função realiza uma operação de I/O, escrevendo em um arquivo.
+    RETORNO 1: Número de registros gravados (inteiro). Zero indica que nada havia mudado desde a última gravação.
 
     D) CONDIÇÕES DE ACOPLAMENTO:
     Assertiva(s) de entrada:
@@ -291,12 +453,11 @@ def salvar_produtos():
     - Um arquivo JSON, localizado no caminho definido pela constante `PRODUTOS_JSON`, é criado ou sobrescrito com os dados dos produtos.
 
     E) DESCRIÇÃO:
-    1. Inicializa um dicionário vazio `json_produtos`.
-    2. Itera sobre cada par de código-produto no dicionário global `_todos_produtos`.
-    3. Para cada objeto de produto, invoca seu método `to_json()` para obter sua representação em dicionário.
-    4. Adiciona este dicionário ao `json_produtos`, usando o código do produto como chave.
-    5. Abre o arquivo de destino em modo de escrita ("w") e com codificação "utf-8".
-    6. Utiliza a função `json.dump()` para escrever o conteúdo do dicionário `json_produtos` no arquivo, com formatação indentada.
+    1. Obtém o mecanismo de armazenamento atual (`obter_armazenamento()`).
+    2. Usa `selecionar_para_gravacao()` para escolher os objetos de `_todos_produtos` a gravar: nenhum, se nada foi modificado desde a última gravação; apenas os modificados, se o mecanismo suporta gravação parcial; ou todos, se o arquivo precisa ser reescrito (JSON em `PRODUTOS_JSON`).
+    3. Para cada objeto escolhido, invoca seu método `to_json()`, usando o código do produto como chave.
+    4. Entrega o dicionário resultante ao mecanismo de armazenamento, se houver algo a gravar.
+    5. Limpa as marcações de modificação da entidade "produtos" feitas até o início da gravação (objetos alterados durante a gravação continuam marcados) e retorna o número de registros gravados.
 
     F) HIPÓTESES:
     - Existe um dicionário global `_todos_produtos` para armazenamento em memória.
@@ -308,15 +469,18 @@ def salvar_produtos():
     - A função sobrescreve o arquivo de destino sem aviso ou backup.
     - Possíveis erros de I/O (ex: disco cheio) não são tratados e podem interromper o programa.
     """
-    json_produtos = {}
+    armazenamento = obter_armazenamento()
+    geracao = geracao_atual()
+    alterados = selecionar_para_gravacao("produtos", _todos_produtos, lambda p: p.codigo, armazenamento.suporta_parcial)
 
-    for codigo, p in _todos_produtos.items():
-        json_produtos[codigo] = p.to_json()
+    if alterados:
+        json_produtos = {codigo: p.to_json() for codigo, p in alterados.items()}
+        armazenamento.salvar("produtos", json_produtos)
 
-    with open(PRODUTOS_JSON, "w", encoding="utf-8") as f:
-        json.dump(json_produtos, f, ensure_ascii=False, indent=4)
+    limpar_modificados("produtos", ate=geracao)
+    return len(alterados)
 
-def carregar_produtos():
+def carregar_produtos(registros: dict = None):
     """
     ESPECIFICAÇÃO DE FUNÇÃO:
     A) NOME: carregar_produtos()
@@ -325,7 +489,8 @@ def carregar_produtos():
     Ler os dados de produtos de um arquivo JSON e carregá-los para a memória, populando o dicionário global `_todos_produtos`.
 
     C) ACOPLAMENTO:
-    PARÂMETROS: Nenhum.
+    PARÂMETRO 1: registros (dicionário, opcional)
+    Registros já lidos do armazenamento (ex: pela carga paralela de `carga_paralela.py`). Se omitido, são lidos do armazenamento atual.
 
     RETORNO: Nenhum valor explícito é retornado. A função modifica o estado do dicionário global `_todos_produtos`.
 
@@ -338,13 +503,12 @@ def carregar_produtos():
     - O dicionário global `_todos_produtos` é preenchido com as instâncias de `Produto` recriadas a partir dos dados do arquivo.
 
     E) DESCRIÇÃO:
-    1. Utiliza um bloco `try-except` para lidar com a possível ausência do arquivo.
-    2. Tenta abrir o arquivo definido em `PRODUTOS_JSON` em modo de leitura ("r").
-    3. Caso o arquivo não exista (`FileNotFoundError`), a função termina sua execução silenciosamente.
-    4. Se o arquivo for aberto com sucesso, utiliza `json.load()` para desserializar seu conteúdo.
-    5. Itera sobre cada par de código-produto no dicionário lido do arquivo.
-    6. Para cada item, invoca o método de classe `Produto.from_json()` para criar uma nova instância do objeto.
-    7. Armazena a instância recém-criada no dicionário global `_todos_produtos`, usando o código como chave.
+    1. Se `registros` não foi informado, solicita ao mecanismo de armazenamento atual (`obter_armazenamento()`) os registros da entidade "produtos".
+    2. Caso ainda não existam dados persistidos, o mecanismo retorna um dicionário vazio e nada é carregado.
+    3. Itera sobre cada par de código-produto no dicionário lido.
+    4. Para cada item, invoca o método de classe `Produto.from_json()` para criar uma nova instância do objeto.
+    5. Se o registro contém uma agenda de preços ("agenda_precos"), recria-a em `_agendas_precos`.
+    6. Acrescenta as instâncias recriadas ao dicionário global `_todos_produtos` de uma só vez, usando o código como chave; a geração do registro avança uma única vez, e os índices de busca são reconstruídos na próxima busca.
 
     F) HIPÓTESES:
     - Existe um dicionário global `_todos_produtos` para ser populado.
@@ -354,14 +518,14 @@ def carregar_produtos():
     G) RESTRIÇÕES:
     - A função não trata erros de formatação no JSON (`JSONDecodeError`) ou de chaves ausentes (`KeyError`), que podem interromper o carregamento.
     """
-    try:
-        with open(PRODUTOS_JSON, "r", encoding="utf-8") as f:
-            json_produtos = json.load(f)
-    except FileNotFoundError:
-        return
+    json_produtos = registros if registros is not None else obter_armazenamento().carregar("produtos")
 
+    carregados = {}
     for codigo, p_json in json_produtos.items():
-        _todos_produtos[codigo] = Produto.from_json(p_json)
+        carregados[codigo] = Produto.from_json(p_json)
+        if "agenda_precos" in p_json:
+            _agendas_precos[codigo] = AgendaPrecos.from_json(p_json["agenda_precos"])
+    _todos_produtos.update(carregados)
 
 
 
@@ -455,8 +619,9 @@ def consultar_produto_por_codigo(codigo: str):
     1. Valida se o parâmetro `codigo` não é nulo.
     2. Valida se o `codigo` é do tipo string.
     3. Procura pelo `codigo` como chave no dicionário `_todos_produtos`.
-    4. Se o produto não for encontrado, retorna um dicionário de erro.
-    5. Se o produto for encontrado, retorna um dicionário de sucesso com o objeto `Produto` correspondente.
+    4. Se não o encontrar e houver um catálogo definido por `definir_catalogo()`, consulta o catálogo; um produto encontrado é guardado em `_todos_produtos` (sem ser marcado como modificado) e nos índices de busca, para que consultas seguintes retornem o mesmo objeto.
+    5. Se o produto não for encontrado, retorna um dicionário de erro.
+    6. Se o produto for encontrado, retorna um dicionário de sucesso com o objeto `Produto` correspondente.
 
     F) HIPÓTESES:
     - Existe um dicionário global `_todos_produtos` que armazena todos os produtos cadastrados, usando o código como chave.
@@ -472,6 +637,12 @@ def consultar_produto_por_codigo(codigo: str):
 
     produto = _todos_produtos.get(codigo)
 
+    if produto is None and _catalogo is not None:
+        produto = _catalogo.consultar(codigo)
+        if produto is not None:
+            _todos_produtos[codigo] = produto
+            _indexar_novo(produto)
+
     if not produto:
         return {"retorno": 2, "mensagem": "Produto não encontrado"}
 
@@ -479,6 +650,61 @@ def consultar_produto_por_codigo(codigo: str):
 
 
 
+def _codigos_invalidos(codigos: list):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _codigos_invalidos()
+
+    B) OBJETIVO:
+    Verificar de uma só vez o dígito verificador de uma lista de códigos EAN-13.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: codigos (lista)
+    Códigos a verificar, todos com 13 dígitos ASCII.
+
+    RETORNO 1: Lista com as posições (em `codigos`, em ordem crescente) dos códigos cujo dígito verificador não confere.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Cada código tem exatamente 13 caracteres entre "0" e "9".
+
+    Assertiva(s) de saída:
+    - Um código é considerado válido exatamente quando `_valida_codigo_barras()` o aceita.
+
+    E) DESCRIÇÃO:
+    1. Concatena os códigos em um único bloco de bytes, em que o código i ocupa os bytes 13*i a 13*i+12.
+    2. Com NumPy, vê o bloco como uma matriz de n x 13 dígitos, multiplica-a pelos pesos `_PESOS_EAN` e seleciona as linhas cuja soma não é múltipla de 10.
+    3. Sem NumPy:
+       a. Separa cada coluna de dígitos com um fatiamento de passo 13 e converte-a em valores (ou no triplo, nas colunas de peso 3) com `bytes.translate()`.
+       b. Soma as 13 colunas de cada código com `map(sum, zip(...))`; a soma máxima (225) cabe em um byte.
+       c. Converte as somas em 0 (múltipla de 10) ou 1 e localiza os 1 com `bytes.find()`.
+
+    F) HIPÓTESES:
+    - A soma ponderada dos 12 primeiros dígitos mais o dígito verificador é múltipla de 10 exatamente quando o dígito confere.
+
+    G) RESTRIÇÕES:
+    - Os laços por dígito e por código rodam em C; o custo em Python é proporcional ao número de códigos inválidos.
+    """
+    if not codigos:
+        return []
+    bloco = "".join(codigos).encode("ascii")
+
+    if numpy is not None:
+        digitos = (numpy.frombuffer(bloco, dtype=numpy.uint8) - ord("0")).reshape(-1, 13)
+        somas = digitos @ numpy.array(_PESOS_EAN)
+        return numpy.flatnonzero(somas % 10).tolist()
+
+    colunas = [bloco[j::13].translate(_TRIPLO_DIGITO if peso == 3 else _VALOR_DIGITO)
+               for j, peso in enumerate(_PESOS_EAN)]
+    somas = bytes(map(sum, zip(*colunas))).translate(_SOMA_INVALIDA)
+    invalidos = []
+    posicao = somas.find(1)
+    while posicao != -1:
+        invalidos.append(posicao)
+        posicao = somas.find(1, posicao + 1)
+    return invalidos
+
+
 def registrar_produto(nome: str, marca: str, categoria: str, codigo: str, peso: float, preco: float, preco_por_peso: float = None):
     """
     ESPECIFICAÇÃO DE FUNÇÃO:
@@ -533,7 +759,7 @@ def registrar_produto(nome: str, marca: str, categoria: str, codigo: str, peso:
     3. Utiliza a função auxiliar `_valida_codigo_barras` para verificar a validade do código.
     4. Verifica se o `codigo` já existe no dicionário `_todos_produtos` para evitar duplicatas.
     5. Se todas as validações passarem, cria uma nova instância da classe `Produto`.
-    6. Adiciona o novo produto ao dicionário `_todos_produtos`.
+    6. Adiciona o novo produto ao dicionário `_todos_produtos` e aos índices de busca.
     7. Retorna um dicionário de sucesso com o objeto recém-criado.
 
     F) HIPÓTESES:
@@ -558,11 +784,135 @@ def registrar_produto(nome: str, marca: str, categoria: str, codigo: str, peso:
         return {"retorno": 5, "mensagem": "Produto já cadastrado com este código"}
 
     produto = Produto(nome, marca, categoria, codigo, peso, preco, preco_por_peso)
+    marcar_modificado("produtos", produto)
     _todos_produtos[codigo] = produto
+    _indexar_novo(produto)
 
     return {"retorno": 0, "mensagem": "Produto registrado com sucesso", "dados": produto}
 
 
+def registrar_produtos_em_lote(produtos):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: registrar_produtos_em_lote()
+
+    B) OBJETIVO:
+    Cadastrar muitos produtos de uma vez (ex: o catálogo de um fornecedor), com as mesmas validações de `registrar_produto()`, mas verificando os códigos de barras e as duplicidades em lote.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: produtos (iterável)
+    Linhas a cadastrar, cada uma um dicionário com as chaves de `CAMPOS_REGISTRO` ("preco_por_peso" é opcional) ou uma sequência com os valores nessa ordem. Pode ser um gerador ou um `csv.DictReader`, desde que os valores numéricos já estejam convertidos.
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR PARÂMETRO NULO:
+    {"retorno": 4, "mensagem": "Parâmetro nulo"}
+
+    RETORNO 2: DICIONÁRIO DE RESULTADO:
+    {"retorno": 0, "mensagem": "<N> produto(s) registrado(s), <M> rejeitado(s)", "dados": {
+        "registrados": <N>, "rejeitados": <M>, "erros": [(<posição da linha>, <retorno>, <mensagem>), ...]}}
+    Os códigos e mensagens de erro são os de `registrar_produto()`, mais:
+    (<posição>, 3, "Linha inválida"): a linha não é dicionário nem sequência de 6 ou 7 valores;
+    (<posição>, 5, "Código repetido no lote"): o código já apareceu em uma linha anterior do mesmo lote.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Cada linha aceita resulta no mesmo produto que `registrar_produto()` criaria, na ordem das linhas.
+    - Uma linha recusada não impede o cadastro das demais.
+
+    E) DESCRIÇÃO:
+    1. Percorre as linhas uma vez, convertendo-as em tuplas de valores e recusando as malformadas, as com parâmetro obrigatório nulo, as com código que não é string e as com código que não tem 13 dígitos.
+    2. Códigos com dígitos não ASCII são verificados um a um por `_valida_codigo_barras()`; os demais, de uma só vez por `_codigos_invalidos()`.
+    3. Obtém os códigos já cadastrados como a interseção entre os códigos do lote e as chaves de `_todos_produtos`, e detecta repetições no lote comparando o tamanho do conjunto de códigos com o da lista.
+    4. Cria os produtos das linhas restantes, recusando os códigos cadastrados e, se houver repetições, as ocorrências seguintes à primeira.
+    5. Marca os produtos criados como modificados com `marcar_modificados()` e acrescenta-os a `_todos_produtos` de uma vez.
+    6. Indexa os produtos um a um apenas nos índices de busca que estavam em dia com a geração do registro anterior ao lote, e se o lote for menor que o catálogo; nos demais casos, `_sincronizar_indice()` reconstrói cada índice na próxima busca que o usar.
+    7. Retorna as contagens e os erros ordenados pela posição da linha.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - O iterável é consumido uma única vez, mas as linhas válidas ficam na memória até o fim do lote.
+    - O coletor de ciclos (`gc`) fica pausado durante o lote: as linhas e os produtos não formam ciclos, e as coletas disparadas pelos milhões de objetos novos percorriam o catálogo inteiro repetidas vezes. A pausa vale para o processo inteiro, inclusive outras threads, enquanto o lote durar; o estado anterior (`gc.isenabled()`) é restaurado no `finally`, mesmo se o iterável lançar uma exceção, e um coletor já desligado por quem chamou continua desligado.
+    - Os erros são tuplas, e não dicionários, para que um arquivo com muitas linhas recusadas não multiplique o uso de memória.
+    - Com NumPy instalado, a verificação dos dígitos usa uma multiplicação de matrizes; sem ele, fatiamentos e `bytes.translate()`. O resultado é o mesmo.
+    """
+    if produtos is None:
+        return {"retorno": 4, "mensagem": "Parâmetro nulo"}
+
+    coletor_ativo = gc.isenabled()
+    gc.disable()
+    try:
+        erros = []
+        linhas = []
+        codigos_verificados = []
+        for posicao, linha in enumerate(produtos):
+            if isinstance(linha, dict):
+                valores = (linha.get("nome"), linha.get("marca"), linha.get("categoria"), linha.get("codigo"),
+                           linha.get("peso"), linha.get("preco"), linha.get("preco_por_peso"))
+            elif isinstance(linha, (tuple, list)) and 6 <= len(linha) <= 7:
+                valores = tuple(linha) if len(linha) == 7 else (*linha, None)
+            else:
+                erros.append((posicao, 3, "Linha inválida"))
+                continue
+
+            if None in valores[:6]:
+                erros.append((posicao, 4, "Parâmetro nulo"))
+                continue
+            codigo = valores[3]
+            if not isinstance(codigo, str):
+                erros.append((posicao, 3, "Parâmetro 'codigo' errado"))
+                continue
+            if len(codigo) != 13 or not codigo.isdigit():
+                erros.append((posicao, 3, "Código de barras inválido"))
+                continue
+            if not codigo.isascii():
+                if not _valida_codigo_barras(codigo):
+                    erros.append((posicao, 3, "Código de barras inválido"))
+                    continue
+                # Já verificado; um código ASCII válido ocupa o seu lugar na verificação em lote
+                codigo = "0" * 13
+            linhas.append((posicao, valores))
+            codigos_verificados.append(codigo)
+
+        invalidos = set(_codigos_invalidos(codigos_verificados))
+        codigos = [valores[3] for _, valores in linhas]
+        cadastrados = _todos_produtos.keys() & set(codigos)
+        repetidos = len(set(codigos)) != len(codigos)
+
+        novos = {}
+        for i, (posicao, valores) in enumerate(linhas):
+            codigo = valores[3]
+            if i in invalidos:
+                erros.append((posicao, 3, "Código de barras inválido"))
+            elif codigo in cadastrados:
+                erros.append((posicao, 5, "Produto já cadastrado com este código"))
+            elif repetidos and codigo in novos:
+                erros.append((posicao, 5, "Código repetido no lote"))
+            else:
+                novos[codigo] = Produto(*valores)
+
+        antes = len(_todos_produtos)
+        geracao = _todos_produtos.geracao
+        marcar_modificados("produtos", novos.values())
+        _todos_produtos.update(novos)
+        if len(novos) < antes:
+            for indice in _indices_ativos():
+                if _geracoes_indices.get(indice) == geracao:
+                    for produto in novos.values():
+                        indice.adicionar(produto)
+                    _geracoes_indices[indice] = _todos_produtos.geracao
+
+        erros.sort()
+        return {"retorno": 0, "mensagem": f"{len(novos)} produto(s) registrado(s), {len(erros)} rejeitado(s)",
+                "dados": {"registrados": len(novos), "rejeitados": len(erros), "erros": erros}}
+    finally:
+        if coletor_ativo:
+            gc.enable()
+
+
 
 def atualizar_produto(codigo: str, dados: dict):
     """
@@ -609,8 +959,9 @@ def atualizar_produto(codigo: str, dados: dict):
     4. Define uma lista de campos que são permitidos para atualização.
     5. Itera sobre o dicionário `dados`.
     6. Para cada campo, verifica se ele pertence à lista de campos permitidos. Se não, retorna erro.
-    7. Se o campo for válido, utiliza a função `setattr` para atualizar o valor no objeto `Produto`.
-    8. Após iterar por todos os campos, retorna um dicionário de sucesso com o objeto atualizado.
+    7. Se o campo for válido, utiliza a função `setattr` para atualizar o valor no objeto `Produto`; `Produto.__setattr__()` reindexa o produto quando nome, marca ou categoria mudam.
+    8. Se o preço mudou e o produto tem agenda de preços, registra a mudança na agenda com a data de hoje, para que ela não seja sobrescrita por uma mudança agendada já vencida e valha nas consultas de datas passadas.
+    9. Após iterar por todos os campos, retorna um dicionário de sucesso com o objeto atualizado.
 
     F) HIPÓTESES:
     - Existe um dicionário global `_todos_produtos`.
@@ -637,118 +988,1064 @@ def atualizar_produto(codigo: str, dados: dict):
             return {"retorno": 3, "mensagem": f"Campo inválido para atualização: {chave}"}
         setattr(produto, chave, valor)
 
+    agenda = _agendas_precos.get(codigo)
+    if agenda is not None and ("preco" in dados or "preco_por_peso" in dados):
+        agenda.registrar(date.today().strftime("%Y/%m/%d"), produto.preco, produto.preco_por_peso)
+
     return {"retorno": 0, "mensagem": "Produto atualizado com sucesso", "dados": produto}
 
 
+def calcula_precos(codigos: list, quantidades: list, datas: list = None):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: calcula_precos()
+
+    B) OBJETIVO:
+    Calcular em uma só chamada o preço de muitos itens de produtos registrados (ex: um carrinho inteiro ou todo um histórico de vendas), com a mesma regra de `Produto.calcula_preco()`.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: codigos (lista)
+    Código EAN-13 do produto de cada item.
+    PARÂMETRO 2: quantidades (lista)
+    Quantidade de cada item, na mesma ordem de `codigos`.
+    PARÂMETRO 3: datas (lista, opcional)
+    Data "AAAA/MM/DD" de cada item (ex: a data da venda). Se informada, os produtos com agenda de preços são cobrados pelo preço vigente na data.
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR PARÂMETRO NULO:
+    {"retorno": 4, "mensagem": "Parâmetro nulo"}
+
+    RETORNO 2: DICIONÁRIO DE ERRO POR TAMANHOS DIFERENTES:
+    {"retorno": 3, "mensagem": "Parâmetro 'quantidades' errado"} (ou 'datas')
+
+    RETORNO 3: DICIONÁRIO DE ERRO POR QUANTIDADE INVÁLIDA:
+    {"retorno": 1, "mensagem": "Quantidade deve ser maior que zero."}
+
+    RETORNO 4: DICIONÁRIO DE ERRO POR PRODUTO NÃO ENCONTRADO:
+    {"retorno": 2, "mensagem": "Produto não encontrado"}
+
+    RETORNO 5: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Preços calculados com sucesso.", "dados": [<preço do item 1>, ...]}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `codigos` e `quantidades` são sequências do mesmo tamanho; as quantidades são numéricas.
+
+    Assertiva(s) de saída:
+    - Em caso de sucesso, o preço de cada item é o que `calcula_preco()` retornaria para o produto registrado com aquele código (ou, com `datas`, com o preço vigente na data do item).
+
+    E) DESCRIÇÃO:
+    1. Valida que os parâmetros não são nulos e que as sequências têm o mesmo tamanho.
+    2. Valida que a menor quantidade é maior que zero.
+    3. Se o catálogo colunar estiver ativado, sincroniza-o com `_sincronizar_indice()` e calcula todos os preços com `CatalogoColunar.calcula_precos()`; um código fora do catálogo resulta em erro.
+    4. Caso contrário, busca cada produto em `_todos_produtos` e chama `calcula_preco()`.
+    5. Se `datas` foi informada e há agendas de preços, recalcula os itens dos produtos com agenda pelo preço vigente na data (`AgendaPrecos.vigente()`); os demais produtos nunca mudaram de preço por agenda e mantêm o preço atual.
+    6. Retorna a lista de preços, na ordem dos itens.
+
+    F) HIPÓTESES:
+    - Os itens são de produtos registrados em `_todos_produtos`; produtos apenas do catálogo de `definir_catalogo()` não são consultados.
+
+    G) RESTRIÇÕES:
+    - Nenhum preço é retornado se um único item for inválido.
+    - Com o catálogo colunar, os preços são sempre `float`; sem ele, mantêm o tipo de `calcula_preco()`.
+    """
+    if codigos is None or quantidades is None:
+        return {"retorno": 4, "mensagem": "Parâmetro nulo"}
+
+    if len(codigos) != len(quantidades):
+        return {"retorno": 3, "mensagem": "Parâmetro 'quantidades' errado"}
+
+    if datas is not None and len(datas) != len(codigos):
+        return {"retorno": 3, "mensagem": "Parâmetro 'datas' errado"}
+
+    if quantidades and min(quantidades) <= 0:
+        return {"retorno": 1, "mensagem": "Quantidade deve ser maior que zero."}
+
+    if _catalogo_colunar is not None:
+        _sincronizar_indice(_catalogo_colunar)
+        try:
+            precos = _catalogo_colunar.calcula_precos(codigos, quantidades)
+        except KeyError:
+            return {"retorno": 2, "mensagem": "Produto não encontrado"}
+    else:
+        precos = []
+        for codigo, quantidade in zip(codigos, quantidades):
+            produto = _todos_produtos.get(codigo)
+            if produto is None:
+                return {"retorno": 2, "mensagem": "Produto não encontrado"}
+            precos.append(produto.calcula_preco(quantidade)["dados"])
+
+    if datas is not None and _agendas_precos:
+        for i, codigo in enumerate(codigos):
+            agenda = _agendas_precos.get(codigo)
+            if agenda is not None and datas[i] is not None:
+                preco, preco_por_peso = agenda.vigente(datas[i])
+                precos[i] = (preco if preco_por_peso is None else preco_por_peso) * quantidades[i]
+
+    return {"retorno": 0, "mensagem": "Preços calculados com sucesso.", "dados": precos}
+
+
+def _data_invalida(data):
+    """Indica se `data` não é uma string de data válida no formato "AAAA/MM/DD", com dia e mês de dois dígitos."""
+    try:
+        return datetime.strptime(data, "%Y/%m/%d").strftime("%Y/%m/%d") != data
+    except (TypeError, ValueError):
+        return True
+
 
-def pesquisar_produto(texto: str, filtros: dict = {}):
+def agendar_preco(codigo: str, data: str, preco: float, preco_por_peso: float = None):
     """
     ESPECIFICAÇÃO DE FUNÇÃO:
-    A) NOME: pesquisar_produto()
+    A) NOME: agendar_preco()
 
     B) OBJETIVO:
-    Realizar uma busca flexível por produtos, combinando uma pesquisa por texto (em nome, marca e categoria) com filtros exatos em outros atributos.
+    Agendar uma mudança de preço de um produto para uma data, passada ou futura, sem alterar o preço atual.
 
     C) ACOPLAMENTO:
-    PARÂMETRO 1: texto (string)
-    Termo de busca a ser procurado nos campos `nome`, `marca` e `categoria`. A busca é insensível a maiúsculas/minúsculas.
-    PARÂMETRO 2: filtros (dicionário, opcional)
-    Dicionário para aplicar filtros de correspondência exata. Ex: `{"marca": "Marca Exemplo"}`.
+    PARÂMETRO 1: codigo (string)
+    Código do produto.
+    PARÂMETRO 2: data (string)
+    Data de início da vigência, no formato "AAAA/MM/DD".
+    PARÂMETRO 3: preco (float)
+    Preço por unidade a partir da data.
+    PARÂMETRO 4: preco_por_peso (float, opcional)
+    Preço por unidade de peso a partir da data, se aplicável.
 
     RETORNO 1: DICIONÁRIO DE ERRO POR PARÂMETRO NULO:
     {"retorno": 4, "mensagem": "Parâmetro nulo"}
 
-    RETORNO 2: DICIONÁRIO DE SUCESSO:
-    {"retorno": 0, "mensagem": "<N> produto(s) encontrado(s)", "dados": [<lista de objetos Produto>]}
+    RETORNO 2: DICIONÁRIO DE ERRO POR PARÂMETRO INCORRETO:
+    {"retorno": 3, "mensagem": "Parâmetro '<nome>' errado"}
+
+    RETORNO 3: DICIONÁRIO DE ERRO POR PRODUTO NÃO ENCONTRADO:
+    {"retorno": 2, "mensagem": "Produto não encontrado"}
+
+    RETORNO 4: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Preço agendado com sucesso", "dados": <número de mudanças agendadas do produto>}
 
     D) CONDIÇÕES DE ACOPLAMENTO:
     Assertiva(s) de entrada:
-    - `texto` é uma string.
-    - `filtros` é um dicionário onde as chaves são nomes de atributos válidos.
+    - Nenhuma.
 
     Assertiva(s) de saída:
-    - O retorno é um dicionário contendo o status e uma lista de objetos `Produto` que satisfazem os critérios de busca. A lista pode estar vazia.
+    - Em caso de sucesso, a mudança consta na agenda do produto, e o produto está marcado como modificado.
 
     E) DESCRIÇÃO:
-    1. Verifica se o parâmetro `texto` é nulo.
-    2. Converte o `texto` de busca para minúsculas para uma comparação case-insensitive.
-    3. Inicializa uma lista vazia para armazenar os resultados.
-    4. Itera sobre todos os produtos no dicionário `_todos_produtos`.
-    5. Para cada produto, verifica se o texto de busca está contido em seu nome, marca ou categoria (também convertidos para minúsculas).
-    6. Se o texto for encontrado, a função então verifica se o produto atende a todos os filtros definidos no dicionário `filtros`.
-    7. A verificação de filtros compara o valor do atributo no produto com o valor no dicionário de filtros. Se algum filtro não corresponder, o produto é descartado.
-    8. Se o produto passar tanto na busca por texto quanto nos filtros, ele é adicionado à lista de resultados.
-    9. Ao final, retorna um dicionário de sucesso com a contagem de resultados e a lista de produtos encontrados.
+    1. Valida os parâmetros: nulos, tipo do código, formato da data e tipo dos preços.
+    2. Busca o produto em `_todos_produtos`.
+    3. Marca o produto como modificado antes de alterar a agenda, que é gravada com ele.
+    4. Se o produto ainda não tem agenda, cria uma, com o preço atual como preço anterior a qualquer mudança.
+    5. Inclui a mudança com `AgendaPrecos.agendar()`.
 
     F) HIPÓTESES:
-    - Existe um dicionário global `_todos_produtos`.
-    - Os produtos possuem os atributos `nome`, `marca` e `categoria` como strings para a busca por texto.
+    - Nenhuma.
 
     G) RESTRIÇÕES:
-    - A busca por texto é sempre case-insensitive, enquanto os filtros exigem correspondência exata.
-    - A performance pode ser impactada em bases de dados muito grandes, pois a busca é sequencial.
+    - O preço do produto só muda quando `aplicar_precos_agendados()` é executado em uma data a partir da vigência.
+    - Uma mudança com data passada, anterior à última mudança aplicada, vale apenas para as consultas de datas passadas.
     """
-    if texto is None:
+    if codigo is None or data is None or preco is None:
         return {"retorno": 4, "mensagem": "Parâmetro nulo"}
 
-    texto_lower = texto.lower()
-    resultados = []
+    if not isinstance(codigo, str):
+        return {"retorno": 3, "mensagem": "Parâmetro 'codigo' errado"}
 
-    for produto in _todos_produtos.values():
-        if (texto_lower in produto.nome.lower() or
-            texto_lower in produto.marca.lower() or
-            texto_lower in produto.categoria.lower()):
+    if _data_invalida(data):
+        return {"retorno": 3, "mensagem": "Parâmetro 'data' errado"}
+
+    if not isinstance(preco, (int, float)):
+        return {"retorno": 3, "mensagem": "Parâmetro 'preco' errado"}
+
+    if preco_por_peso is not None and not isinstance(preco_por_peso, (int, float)):
+        return {"retorno": 3, "mensagem": "Parâmetro 'preco_por_peso' errado"}
+
+    produto = _todos_produtos.get(codigo)
+    if produto is None:
+        return {"retorno": 2, "mensagem": "Produto não encontrado"}
 
-            atende_filtros = True
-            for chave, valor in filtros.items():
-                if not hasattr(produto, chave) or getattr(produto, chave) != valor:
-                    atende_filtros = False
-                    break
+    marcar_modificado("produtos", produto)
+    agenda = _agendas_precos.get(codigo)
+    if agenda is None:
+        agenda = _agendas_precos[codigo] = AgendaPrecos(produto.preco, produto.preco_por_peso)
+    agenda.agendar(data, preco, preco_por_peso)
 
-            if atende_filtros:
-                resultados.append(produto)
+    return {"retorno": 0, "mensagem": "Preço agendado com sucesso", "dados": len(agenda)}
 
-    return {"retorno": 0, "mensagem": f"{len(resultados)} produto(s) encontrado(s)", "dados": resultados}
 
-def listar_todos_produtos():
+def consultar_preco_vigente(codigo: str, data: str):
     """
     ESPECIFICAÇÃO DE FUNÇÃO:
-    A) NOME: listar_todos_produtos()
+    A) NOME: consultar_preco_vigente()
 
     B) OBJETIVO:
-    Retornar uma lista de todos os produtos registrados no sistema.
+    Consultar o preço de um produto em vigor em uma data, considerando as mudanças agendadas.
 
     C) ACOPLAMENTO:
-    Sem parâmetros de entrada.
+    PARÂMETRO 1: codigo (string)
+    Código do produto.
+    PARÂMETRO 2: data (string)
+    Data da consulta, no formato "AAAA/MM/DD".
 
-    RETORNO 1: DICIONÁRIO SE NÃO HOUVER PRODUTOS:
-    {"retorno": 1, "mensagem": "Nenhum produto registrado", "dados": []}
+    RETORNO 1: DICIONÁRIO DE ERRO POR PARÂMETRO NULO:
+    {"retorno": 4, "mensagem": "Parâmetro nulo"}
+
+    RETORNO 2: DICIONÁRIO DE ERRO POR PARÂMETRO INCORRETO:
+    {"retorno": 3, "mensagem": "Parâmetro '<nome>' errado"}
+
+    RETORNO 3: DICIONÁRIO DE ERRO POR PRODUTO NÃO ENCONTRADO:
+    {"retorno": 2, "mensagem": "Produto não encontrado"}
+
+    RETORNO 4: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Preço consultado com sucesso", "dados": {"preco": <preço>, "preco_por_peso": <preço por peso>}}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Nem o produto nem a agenda são alterados.
+
+    E) DESCRIÇÃO:
+    1. Valida os parâmetros e busca o produto em `_todos_produtos`.
+    2. Se o produto tem agenda, obtém o preço vigente na data com `AgendaPrecos.vigente()`, uma busca binária nas datas.
+    3. Caso contrário, o preço nunca mudou por agenda: retorna o preço atual.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Mudanças de preço anteriores à criação da agenda não são conhecidas: antes da primeira mudança agendada vale o preço que o produto tinha ao ganhar a agenda.
+    """
+    if codigo is None or data is None:
+        return {"retorno": 4, "mensagem": "Parâmetro nulo"}
+
+    if not isinstance(codigo, str):
+        return {"retorno": 3, "mensagem": "Parâmetro 'codigo' errado"}
+
+    if _data_invalida(data):
+        return {"retorno": 3, "mensagem": "Parâmetro 'data' errado"}
+
+    produto = _todos_produtos.get(codigo)
+    if produto is None:
+        return {"retorno": 2, "mensagem": "Produto não encontrado"}
+
+    agenda = _agendas_precos.get(codigo)
+    if agenda is None:
+        preco, preco_por_peso = produto.preco, produto.preco_por_peso
+    else:
+        preco, preco_por_peso = agenda.vigente(data)
+
+    return {"retorno": 0, "mensagem": "Preço consultado com sucesso",
+            "dados": {"preco": preco, "preco_por_peso": preco_por_peso}}
+
+
+def aplicar_precos_agendados(data: str = None):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: aplicar_precos_agendados()
+
+    B) OBJETIVO:
+    Aplicar aos produtos, em uma única passagem pelas agendas, todas as mudanças de preço que vigoram até a data e ainda não foram aplicadas.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: data (string, opcional)
+    Data de referência, no formato "AAAA/MM/DD". Se omitida, usa a data de hoje.
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR PARÂMETRO INCORRETO:
+    {"retorno": 3, "mensagem": "Parâmetro 'data' errado"}
 
     RETORNO 2: DICIONÁRIO DE SUCESSO:
-    {"retorno": 0, "mensagem": "Produtos listados com sucesso", "dados": [<lista de objetos Produto>]}
+    {"retorno": 0, "mensagem": "<n> preço(s) atualizado(s)", "dados": <número de produtos atualizados>}
 
     D) CONDIÇÕES DE ACOPLAMENTO:
     Assertiva(s) de entrada:
     - Nenhuma.
 
     Assertiva(s) de saída:
-    - O retorno é um dicionário com a chave "dados" contendo uma lista de objetos Produto. Pode estar vazia.
+    - Cada produto registrado com agenda tem o preço vigente na data, salvo alterações manuais posteriores à última mudança aplicada.
 
     E) DESCRIÇÃO:
-    1. Obtém todos os produtos registrados em `_todos_produtos`.
-    2. Retorna um dicionário com a lista ou uma mensagem informando que não há produtos registrados.
+    1. Valida a data, ou obtém a de hoje.
+    2. Percorre `_agendas_precos` uma vez; para cada agenda de um produto registrado, verifica com `AgendaPrecos.pendente()` se há uma mudança vencida ainda não aplicada.
+    3. Se houver, marca o produto como modificado antes de alterar a agenda, obtém a mudança com `AgendaPrecos.aplicar()` e atribui o preço e o preço por peso ao produto (`Produto.__setattr__()` atualiza o catálogo colunar).
+    4. Retorna o número de produtos atualizados.
 
     F) HIPÓTESES:
-    - Existe um dicionário global `_todos_produtos`.
+    - É executada ao iniciar o sistema e, em execuções longas, uma vez por dia.
 
     G) RESTRIÇÕES:
-    - A função retorna todos os objetos, o que pode consumir memória em bases grandes.
+    - O custo é proporcional ao número de produtos com agenda, não ao tamanho do catálogo; cada agenda é consultada com uma busca binária.
+    - Se várias mudanças venceram desde a última execução, apenas a mais recente é aplicada.
     """
-    produtos = [
-        p for p in _todos_produtos.values()
-    ]
+    if data is None:
+        data = date.today().strftime("%Y/%m/%d")
+    elif _data_invalida(data):
+        return {"retorno": 3, "mensagem": "Parâmetro 'data' errado"}
 
-    if not produtos:
-        return {'retorno': 1, 'mensagem': 'Nenhum produto registrado', 'dados': []}
+    atualizados = 0
+    for codigo, agenda in _agendas_precos.items():
+        produto = _todos_produtos.get(codigo)
+        if produto is None:
+            continue
+        if agenda.pendente(data):
+            marcar_modificado("produtos", produto)
+            produto.preco, produto.preco_por_peso = agenda.aplicar(data)
+            atualizados += 1
+
+    return {"retorno": 0, "mensagem": f"{atualizados} preço(s) atualizado(s)", "dados": atualizados}
+
+
+
+def _atende_filtros(produto: Produto, filtros: dict):
+    """Indica se o produto tem, em cada atributo de `filtros`, exatamente o valor pedido."""
+    for chave, valor in filtros.items():
+        if not hasattr(produto, chave) or getattr(produto, chave) != valor:
+            return False
+    return True
+
+
+def _indices_ativos():
+    """Retorna os índices mantidos no momento: o de palavras, o de facetas, o de prefixos, o de relevância e, se ativados, o de trigramas e o catálogo colunar."""
+    indices = (_indice_palavras, _indice_facetas, _indice_prefixos, _indice_relevancia)
+    if _indice_trigramas is not None:
+        indices += (_indice_trigramas,)
+    if _catalogo_colunar is not None:
+        indices += (_catalogo_colunar,)
+    return indices
+
+
+def _indexar_novo(produto: Produto):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _indexar_novo()
+
+    B) OBJETIVO:
+    Acrescentar aos índices de busca um produto que acabou de entrar em `_todos_produtos`.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: produto (Produto)
+    Produto recém-registrado.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - O código do produto não estava em `_todos_produtos` antes desta inclusão, que avançou a geração do registro em uma unidade.
+
+    Assertiva(s) de saída:
+    - Cada índice ativo contém o produto e está em dia com a geração atual, ou continua defasado para ser reconstruído na próxima busca.
+
+    E) DESCRIÇÃO:
+    1. Para cada índice ativo, verifica se ele estava em dia com a geração anterior à inclusão.
+    2. Se estava, indexa o produto e registra a geração atual para o índice.
+    3. Caso contrário, o registro foi alterado de outra forma desde a última sincronização e o índice é deixado para `_sincronizar_indice()`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Nenhuma.
+    """
+    geracao = _todos_produtos.geracao
+    for indice in _indices_ativos():
+        if _geracoes_indices.get(indice) == geracao - 1:
+            indice.adicionar(produto)
+            _geracoes_indices[indice] = geracao
+
+
+def _sincronizar_indice(indice):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _sincronizar_indice()
+
+    B) OBJETIVO:
+    Garantir que um índice de busca cubra os produtos de `_todos_produtos` antes de uma busca.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: indice (IndiceTokens, IndiceFacetas, IndicePrefixos, IndiceRelevancia, IndiceTrigramas ou CatalogoColunar)
+    Índice a sincronizar.
+
+    RETORNO: Nenhum.
 
-    return {'retorno': 0, 'mensagem': 'Produtos listados com sucesso', 'dados': produtos}
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - O índice contém exatamente os produtos de `_todos_produtos`.
+
+    E) DESCRIÇÃO:
+    1. Compara a geração de `_todos_produtos` com a registrada para o índice na última sincronização.
+    2. Se forem diferentes, reconstrói o índice a partir de `_todos_produtos`, na ordem do registro, e registra a geração atual.
+
+    F) HIPÓTESES:
+    - Produtos registrados por `registrar_produto()`, em lote ou pelo catálogo já foram indexados um a um e não avançam a geração além da registrada para o índice.
+
+    G) RESTRIÇÕES:
+    - A geração avança a cada alteração do dicionário, inclusive as feitas diretamente nele; assim, um registro esvaziado e preenchido com o mesmo número de produtos também provoca a reconstrução, o que a comparação de tamanhos não detectava.
+    - A reconstrução cobre os produtos postos diretamente no dicionário, como os de `carregar_produtos()`; ela ocorre na primeira busca após a carga, não durante a carga.
+    """
+    if _geracoes_indices.get(indice) != _todos_produtos.geracao:
+        indice.reconstruir(_todos_produtos.values())
+        _geracoes_indices[indice] = _todos_produtos.geracao
+
+
+def pesquisar_produto(texto: str, filtros: dict = {}, modo: str = "trecho", facetas: bool = False, limite: int = None, deslocamento: int = 0, cursor: tuple = None, por_vendas: bool = False):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: pesquisar_produto()
+
+    B) OBJETIVO:
+    Realizar uma busca flexível por produtos, combinando uma pesquisa por texto (em nome, marca e categoria) com filtros exatos em outros atributos.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: texto (string)
+    Termo de busca a ser procurado nos campos `nome`, `marca` e `categoria`. A busca é insensível a maiúsculas/minúsculas.
+    PARÂMETRO 2: filtros (dicionário, opcional)
+    Dicionário para aplicar filtros de correspondência exata. Ex: `{"marca": "Marca Exemplo"}`.
+    PARÂMETRO 3: modo (string, opcional)
+    "trecho" (padrão): o texto pode aparecer em qualquer posição de um dos campos ("gurt" encontra "Iogurte").
+    "palavras": cada palavra do texto precisa ser uma palavra inteira de algum dos campos, ignorando acentos; usa o índice invertido.
+    "relevancia": basta uma palavra inteira do texto em algum dos campos, e os resultados vêm do mais relevante para o menos relevante (BM25 por campo, com peso maior para o nome).
+    PARÂMETRO 4: facetas (bool, opcional)
+    Se `True`, o retorno inclui o número de produtos encontrados de cada categoria e de cada marca.
+    PARÂMETRO 5: limite (inteiro, opcional)
+    Tamanho da página. Se informado, o retorno inclui o cursor da página seguinte.
+    PARÂMETRO 6: deslocamento (inteiro, opcional)
+    Número de resultados saltados antes da página.
+    PARÂMETRO 7: cursor (tupla, opcional)
+    Cursor retornado pela página anterior; a busca continua depois dele.
+    PARÂMETRO 8: por_vendas (bool, opcional)
+    No modo "relevancia", se `True`, aumenta a pontuação dos produtos mais vendidos (volume de `definir_volume_vendas()`).
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR PARÂMETRO NULO:
+    {"retorno": 4, "mensagem": "Parâmetro nulo"}
+
+    RETORNO 2: DICIONÁRIO DE ERRO POR MODO OU PAGINAÇÃO INVÁLIDOS:
+    {"retorno": 3, "mensagem": "Parâmetro '<nome_do_parametro>' errado"}
+
+    RETORNO 3: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "<N> produto(s) encontrado(s)", "dados": [<lista de objetos Produto>]}
+    Com `facetas=True`, também a chave "facetas": {"categoria": {<valor>: <N>}, "marca": {<valor>: <N>}}, do valor mais frequente para o menos frequente.
+    Com `limite`, também a chave "cursor": <cursor da página seguinte, ou None na última página>.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `texto` é uma string.
+    - `filtros` é um dicionário onde as chaves são nomes de atributos válidos.
+
+    Assertiva(s) de saída:
+    - O retorno é um dicionário contendo o status e uma lista de objetos `Produto` que satisfazem os critérios de busca. A lista pode estar vazia.
+
+    E) DESCRIÇÃO:
+    1. Verifica se o parâmetro `texto` é nulo, se o `modo` é conhecido e se os parâmetros de paginação são válidos.
+    2. Obtém os resultados de `_iterar_pesquisa()`, que usa os índices de facetas, de palavras, de relevância e de trigramas e verifica texto e filtros em cada candidato; no modo "relevancia", informa quantos resultados a página consome, para que apenas os mais relevantes sejam ordenados.
+    3. Sem `limite`, reúne todos os resultados depois do `deslocamento`/`cursor`; com `limite`, reúne apenas a página com `paginar()` e guarda o cursor da página seguinte.
+    4. Se `facetas` for verdadeiro, conta com `IndiceFacetas.contar()` todos os resultados da busca (não apenas os da página), por valor de cada campo de `CAMPOS_FACETAS`:
+       a. Se a página reuniu todos os resultados, conta os seus códigos.
+       b. No modo "trecho" sem texto e apenas com filtros de categoria e marca, conta os códigos selecionados pelo índice de facetas, ou todo o índice se não houver filtro.
+       c. Nos demais casos, conta os códigos de uma nova busca à medida que ela os produz, sem reuni-los em uma lista.
+    5. Ao final, retorna um dicionário de sucesso com a contagem de resultados e a lista de produtos encontrados.
+
+    F) HIPÓTESES:
+    - Existe um dicionário global `_todos_produtos`.
+    - Os produtos possuem os atributos `nome`, `marca` e `categoria` como strings para a busca por texto.
+
+    G) RESTRIÇÕES:
+    - A busca por texto é sempre case-insensitive, enquanto os filtros exigem correspondência exata.
+    - Com filtro de categoria ou marca, a busca é proporcional ao número de produtos do menor grupo filtrado; sem texto (""), é proporcional ao número de resultados.
+    - O modo "trecho" é sequencial e proporcional ao tamanho do catálogo, a menos que o índice de trigramas esteja ativo; com ele, é proporcional ao número de candidatos e retorna exatamente os mesmos produtos, na mesma ordem.
+    - O modo "palavras" é proporcional ao número de produtos que contêm a palavra mais rara do texto.
+    - No modo "palavras", um texto sem palavras não encontra nada, e os resultados vêm em ordem de código em vez da ordem de registro.
+    - O modo "relevancia" pontua todos os produtos que contêm alguma palavra do texto, mas com `limite` só ordena os `deslocamento + limite + 1` primeiros (seleção por heap); um texto sem palavras não encontra nada.
+    - Com `limite`, só são verificados os candidatos até o fim da página; as facetas, porém, percorrem a busca inteira (exceto no caso 4b), mas sem guardar os produtos encontrados.
+    """
+    if texto is None:
+        return {"retorno": 4, "mensagem": "Parâmetro nulo"}
+
+    if modo not in ("trecho", "palavras", "relevancia"):
+        return {"retorno": 3, "mensagem": "Parâmetro 'modo' errado"}
+
+    erro = parametro_invalido(limite, deslocamento, cursor)
+    if erro is not None:
+        return {"retorno": 3, "mensagem": f"Parâmetro '{erro}' errado"}
+
+    quantidade = None if limite is None else deslocamento + limite + 1
+    pares = _iterar_pesquisa(texto, filtros, modo, cursor, por_vendas, quantidade)
+    if limite is None:
+        resultados = list(fatiar(pares, None, deslocamento))
+    else:
+        resultados, proximo = paginar(pares, limite, deslocamento)
+
+    resposta = {"retorno": 0, "mensagem": f"{len(resultados)} produto(s) encontrado(s)", "dados": resultados}
+    if limite is not None:
+        resposta["cursor"] = proximo
+    if facetas:
+        if deslocamento == 0 and cursor is None and (limite is None or proximo is None):
+            codigos = (p.codigo for p in resultados)
+        elif modo == "trecho" and not texto and all(campo in CAMPOS_FACETAS for campo in filtros):
+            _sincronizar_indice(_indice_facetas)
+            codigos = _indice_facetas.selecionar(filtros)
+        else:
+            codigos = (p.codigo for _, p in _iterar_pesquisa(texto, filtros, modo))
+        resposta["facetas"] = _indice_facetas.contar(codigos)
+    return resposta
+
+
+def _iterar_pesquisa(texto: str, filtros: dict, modo: str, cursor: tuple = None, por_vendas: bool = False, quantidade: int = None):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _iterar_pesquisa()
+
+    B) OBJETIVO:
+    Produzir sob demanda os resultados de uma busca de `pesquisar_produto()`, cada um com o seu cursor.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: texto (string)
+    Texto procurado.
+    PARÂMETRO 2: filtros (dicionário)
+    Filtros exatos por atributo.
+    PARÂMETRO 3: modo (string)
+    "trecho", "palavras" ou "relevancia".
+    PARÂMETRO 4: cursor (tupla, opcional)
+    Cursor do último resultado de uma página anterior; a busca continua depois dele.
+    PARÂMETRO 5: por_vendas (bool, opcional)
+    No modo "relevancia", aumenta a pontuação dos produtos mais vendidos.
+    PARÂMETRO 6: quantidade (inteiro, opcional)
+    No modo "relevancia", número de resultados que serão consumidos depois do cursor; se omitido, ordena todos.
+
+    RETORNO 1: Gerador de pares (<cursor>, <Produto>), na ordem de `pesquisar_produto()`.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Os parâmetros já foram validados.
+
+    Assertiva(s) de saída:
+    - Interromper o consumo interrompe a busca: a primeira página não verifica o catálogo inteiro.
+
+    E) DESCRIÇÃO:
+    1. Sincroniza o índice de facetas e obtém dele os códigos que atendem aos filtros sobre categoria e marca, se houver algum.
+    2. No modo "palavras":
+       a. Sincroniza o índice de palavras e obtém os códigos que contêm todas as palavras do texto, intersectados com os das facetas.
+       b. Ordena os códigos e, se houver cursor, começa pelo primeiro código maior que o dele (busca binária).
+       c. Produz os produtos ainda registrados sob esses códigos que atendem aos filtros, com o cursor (<posição na lista>, <código>).
+    3. No modo "relevancia", produz os resultados de `_ranquear()`.
+    4. No modo "trecho":
+       a. Converte o texto para minúsculas.
+       b. Se o índice de trigramas estiver ativo e o texto tiver ao menos 3 caracteres, sincroniza o índice e obtém dele os códigos candidatos, na ordem do registro.
+       c. Se houver códigos das facetas, eles restringem os candidatos: filtram os do índice de trigramas ou, sem eles, passam a ser os candidatos, na ordem do registro.
+       d. Com candidatos, o cursor de cada um é (<posição no índice de facetas>, <código>), e o cursor recebido descarta os de posição menor ou igual à dele; sem candidatos, percorre `_todos_produtos` com `iterar_registro()` a partir do cursor.
+       e. Produz os candidatos que contêm o texto em nome, marca ou categoria (em minúsculas) e atendem aos filtros.
+
+    F) HIPÓTESES:
+    - As posições do índice de facetas seguem a ordem de `_todos_produtos`.
+
+    G) RESTRIÇÕES:
+    - É um gerador: os índices são sincronizados no primeiro item pedido, não na chamada.
+    """
+    _sincronizar_indice(_indice_facetas)
+    selecionados = _indice_facetas.selecionar(filtros)
+
+    if modo == "palavras":
+        _sincronizar_indice(_indice_palavras)
+        codigos = _indice_palavras.buscar(texto)
+        if selecionados is not None:
+            codigos &= selecionados
+        codigos = sorted(codigos)
+        inicio = 0 if cursor is None else bisect_right(codigos, cursor[1])
+        for posicao in range(inicio, len(codigos)):
+            produto = _todos_produtos.get(codigos[posicao])
+            if produto is not None and _atende_filtros(produto, filtros):
+                yield (posicao, produto.codigo), produto
+        return
+
+    if modo == "relevancia":
+        yield from _ranquear(texto, filtros, selecionados, cursor, por_vendas, quantidade)
+        return
+
+    texto_lower = texto.lower()
+
+    codigos = None
+    if _indice_trigramas is not None:
+        _sincronizar_indice(_indice_trigramas)
+        codigos = _indice_trigramas.candidatos(texto_lower)
+    if selecionados is not None:
+        if codigos is None:
+            codigos = _indice_facetas.ordenar(selecionados)
+        else:
+            codigos = [c for c in codigos if c in selecionados]
+    if codigos is None:
+        candidatos = iterar_registro(_todos_produtos, cursor)
+    else:
+        posicao = _indice_facetas.posicao
+        if cursor is not None:
+            ultima = posicao(cursor[1], cursor[0])
+            codigos = [c for c in codigos if posicao(c) > ultima]
+        candidatos = (((posicao(c), c), _todos_produtos[c]) for c in codigos if c in _todos_produtos)
+
+    for cursor_produto, produto in candidatos:
+        if (not texto_lower or
+            texto_lower in produto.nome.lower() or
+            texto_lower in produto.marca.lower() or
+            texto_lower in produto.categoria.lower()):
+
+            if _atende_filtros(produto, filtros):
+                yield cursor_produto, produto
+
+
+def _ranquear(texto: str, filtros: dict, selecionados: set, cursor: tuple, por_vendas: bool, quantidade: int):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _ranquear()
+
+    B) OBJETIVO:
+    Produzir os resultados da busca por relevância, do mais relevante para o menos relevante, ordenando apenas os que serão consumidos.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: texto (string)
+    Texto procurado.
+    PARÂMETRO 2: filtros (dicionário)
+    Filtros exatos por atributo.
+    PARÂMETRO 3: selecionados (conjunto ou None)
+    Códigos que atendem aos filtros de facetas, ou `None` se não houver filtro de facetas.
+    PARÂMETRO 4: cursor (tupla ou None)
+    Cursor (<posição no ranking>, <código>) do último resultado de uma página anterior.
+    PARÂMETRO 5: por_vendas (bool)
+    Se `True`, multiplica cada pontuação por 1 + `PESO_VENDAS` * log(1 + quantidade vendida).
+    PARÂMETRO 6: quantidade (inteiro ou None)
+    Número de resultados que serão consumidos depois do cursor; se `None`, ordena todos.
+
+    RETORNO 1: Gerador de pares (<cursor>, <Produto>).
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Os parâmetros já foram validados.
+
+    Assertiva(s) de saída:
+    - Empates de pontuação são desfeitos pelo código, para que as páginas sigam a mesma ordem.
+
+    E) DESCRIÇÃO:
+    1. Sincroniza o índice de relevância e obtém a pontuação dos produtos com alguma palavra do texto, restrita aos `selecionados`.
+    2. Monta os pares (<-pontuação>, <código>) dos produtos registrados que atendem aos filtros, aplicando o aumento por vendas se pedido.
+    3. Com `quantidade`, seleciona com `heapq.nsmallest()` os pares até a posição do cursor mais `quantidade`; sem ela, ordena todos.
+    4. Se houver cursor, retoma depois da sua posição quando o código continua nela; senão, procura o código entre os selecionados e, não o encontrando, retoma na posição guardada. Se a retomada ficou adiante do previsto, amplia a seleção.
+    5. Produz cada produto com o cursor (<posição>, <código>).
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - A pontuação percorre todas as ocorrências das palavras do texto, mas a ordenação custa O(n log k) em vez de O(n log n).
+    - Se as vendas mudarem entre duas páginas, a página seguinte segue o novo ranking a partir da posição do cursor.
+    """
+    _sincronizar_indice(_indice_relevancia)
+    pontuacao = _indice_relevancia.pontuar(texto, selecionados)
+    if por_vendas:
+        vendas = _indice_prefixos.pontuacao
+        pontuacao = {c: p * (1 + PESO_VENDAS * math.log1p(vendas(c))) for c, p in pontuacao.items()}
+    pares = [(-p, c) for c, p in pontuacao.items()
+             if c in _todos_produtos and (not filtros or _atende_filtros(_todos_produtos[c], filtros))]
+
+    inicio = 0 if cursor is None else cursor[0] + 1
+    if quantidade is None:
+        ordenados = sorted(pares)
+    else:
+        ordenados = heapq.nsmallest(inicio + quantidade, pares)
+    if cursor is not None:
+        posicao, codigo = cursor
+        if not (posicao < len(ordenados) and ordenados[posicao][1] == codigo):
+            encontrados = [i for i, (_, c) in enumerate(ordenados) if c == codigo]
+            inicio = encontrados[0] + 1 if encontrados else posicao
+            if quantidade is not None and inicio + quantidade > len(ordenados):
+                ordenados = heapq.nsmallest(inicio + quantidade, pares)
+
+    for posicao in range(inicio, len(ordenados)):
+        codigo = ordenados[posicao][1]
+        yield (posicao, codigo), _todos_produtos[codigo]
+
+
+def iterar_pesquisa_produto(texto: str, filtros: dict = {}, modo: str = "trecho", limite: int = None, deslocamento: int = 0, cursor: tuple = None, por_vendas: bool = False):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: iterar_pesquisa_produto()
+
+    B) OBJETIVO:
+    Variante sob demanda de `pesquisar_produto()`: percorrer os resultados de uma busca sem montar a lista completa.
+
+    C) ACOPLAMENTO:
+    PARÂMETROS 1 a 3: texto, filtros e modo
+    Como em `pesquisar_produto()`.
+    PARÂMETRO 4: limite (inteiro, opcional)
+    Número máximo de produtos produzidos. Se omitido, vai até o último resultado.
+    PARÂMETRO 5: deslocamento (inteiro, opcional)
+    Número de resultados saltados antes do primeiro produzido.
+    PARÂMETRO 6: cursor (tupla, opcional)
+    Cursor retornado por `pesquisar_produto(limite=...)`; a busca continua depois dele.
+    PARÂMETRO 7: por_vendas (bool, opcional)
+    Como em `pesquisar_produto()`.
+
+    RETORNO 1: Gerador de objetos `Produto`.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - O registro de produtos não é alterado enquanto o gerador é consumido.
+
+    Assertiva(s) de saída:
+    - Os produtos vêm na mesma ordem de `pesquisar_produto()`.
+
+    E) DESCRIÇÃO:
+    1. Valida o texto, o modo e os parâmetros de paginação.
+    2. Retorna os produtos de `_iterar_pesquisa()`, fatiados por `deslocamento` e `limite`; no modo "relevancia", só os `deslocamento + limite` primeiros são ordenados.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Lança `ValueError` se um parâmetro for nulo ou inválido, já que um gerador não retorna dicionário de erro.
+    """
+    if texto is None:
+        raise ValueError("Parâmetro nulo")
+    if modo not in ("trecho", "palavras", "relevancia"):
+        raise ValueError("Parâmetro 'modo' errado")
+    erro = parametro_invalido(limite, deslocamento, cursor)
+    if erro is not None:
+        raise ValueError(f"Parâmetro '{erro}' errado")
+    quantidade = None if limite is None else deslocamento + limite
+    return fatiar(_iterar_pesquisa(texto, filtros, modo, cursor, por_vendas, quantidade), limite, deslocamento)
+
+
+def completar_produto(prefixo: str, k: int = 10, por_vendas: bool = False):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: completar_produto()
+
+    B) OBJETIVO:
+    Sugerir produtos enquanto o cliente digita: completar o início do nome ou da marca, para que ele não precise digitar o código de barras nem fazer uma busca completa.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: prefixo (string)
+    Início do nome ou da marca; acentos e maiúsculas são ignorados ("cafe" completa "Café em Pó").
+    PARÂMETRO 2: k (inteiro, opcional)
+    Número máximo de sugestões. Padrão: 10.
+    PARÂMETRO 3: por_vendas (bool, opcional)
+    Se `True`, as sugestões vêm do mais vendido para o menos vendido, segundo o volume informado com `definir_volume_vendas()` e `somar_volume_vendas()`; as sem vendas vêm depois, em ordem alfabética.
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR PARÂMETRO NULO:
+    {"retorno": 4, "mensagem": "Parâmetro nulo"}
+
+    RETORNO 2: DICIONÁRIO DE ERRO POR QUANTIDADE INVÁLIDA:
+    {"retorno": 3, "mensagem": "Parâmetro 'k' errado"}
+
+    RETORNO 3: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "<N> sugestão(ões) encontrada(s)", "dados": [<lista de objetos Produto>]}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `prefixo` é uma string e `k` é um inteiro positivo.
+
+    Assertiva(s) de saída:
+    - A lista contém até `k` produtos distintos, cujo nome ou marca começa com o prefixo.
+
+    E) DESCRIÇÃO:
+    1. Verifica se o prefixo é nulo e se `k` é um inteiro positivo.
+    2. Sincroniza o índice de prefixos com `_sincronizar_indice()`.
+    3. Obtém do índice os códigos completados, em ordem alfabética ou pelo volume de vendas.
+    4. Retorna os produtos ainda registrados sob esses códigos.
+
+    F) HIPÓTESES:
+    - O índice de prefixos acompanha `registrar_produto()` e `atualizar_produto()`.
+
+    G) RESTRIÇÕES:
+    - Sem `por_vendas`, o custo é O(log n + k), independente do tamanho do catálogo; com ele, o índice escolhe entre percorrer os produtos que começam com o prefixo e percorrer o ranking de vendas, o que for mais curto.
+    - Só o início de cada campo é completado: "integral" não sugere "Leite Integral" (para isso, use `pesquisar_produto()`).
+    """
+    if prefixo is None:
+        return {"retorno": 4, "mensagem": "Parâmetro nulo"}
+
+    if not isinstance(k, int) or k < 1:
+        return {"retorno": 3, "mensagem": "Parâmetro 'k' errado"}
+
+    _sincronizar_indice(_indice_prefixos)
+    sugestoes = [_todos_produtos[c] for c in _indice_prefixos.completar(prefixo, k, por_vendas) if c in _todos_produtos]
+    return {"retorno": 0, "mensagem": f"{len(sugestoes)} sugestão(ões) encontrada(s)", "dados": sugestoes}
+
+
+def listar_todos_produtos(limite: int = None, deslocamento: int = 0, cursor: tuple = None):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: listar_todos_produtos()
+
+    B) OBJETIVO:
+    Retornar uma lista de todos os produtos registrados no sistema, inteira ou uma página de cada vez.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: limite (inteiro, opcional)
+    Tamanho da página. Se omitido, lista todos os produtos a partir do `deslocamento`/`cursor`.
+    PARÂMETRO 2: deslocamento (inteiro, opcional)
+    Número de produtos saltados antes da página.
+    PARÂMETRO 3: cursor (tupla, opcional)
+    Cursor retornado pela página anterior; a listagem continua depois dele.
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR PAGINAÇÃO INVÁLIDA:
+    {"retorno": 3, "mensagem": "Parâmetro '<nome_do_parametro>' errado"}
+
+    RETORNO 2: DICIONÁRIO SE NÃO HOUVER PRODUTOS:
+    {"retorno": 1, "mensagem": "Nenhum produto registrado", "dados": []}
+
+    RETORNO 3: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Produtos listados com sucesso", "dados": [<lista de objetos Produto>]}
+    Com `limite`, também a chave "cursor": <cursor da página seguinte, ou None na última página>.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - O retorno é um dicionário com a chave "dados" contendo uma lista de objetos Produto. Pode estar vazia.
+
+    E) DESCRIÇÃO:
+    1. Valida os parâmetros de paginação.
+    2. Se não houver produtos registrados, retorna uma mensagem informando.
+    3. Percorre `_todos_produtos` com `iterar_registro()` a partir do cursor.
+    4. Sem `limite`, reúne todos os produtos depois do `deslocamento`; com `limite`, reúne apenas a página com `paginar()` e guarda o cursor da página seguinte.
+
+    F) HIPÓTESES:
+    - Existe um dicionário global `_todos_produtos`.
+
+    G) RESTRIÇÕES:
+    - Sem `limite`, a função retorna todos os objetos, o que pode consumir memória em bases grandes; com `limite`, o custo é o de uma página (mais o salto do `deslocamento`).
+    """
+    erro = parametro_invalido(limite, deslocamento, cursor)
+    if erro is not None:
+        return {'retorno': 3, 'mensagem': f"Parâmetro '{erro}' errado"}
+
+    if not _todos_produtos:
+        return {'retorno': 1, 'mensagem': 'Nenhum produto registrado', 'dados': []}
+
+    pares = iterar_registro(_todos_produtos, cursor)
+    if limite is None:
+        return {'retorno': 0, 'mensagem': 'Produtos listados com sucesso', 'dados': list(fatiar(pares, None, deslocamento))}
+
+    produtos, proximo = paginar(pares, limite, deslocamento)
+    return {'retorno': 0, 'mensagem': 'Produtos listados com sucesso', 'dados': produtos, 'cursor': proximo}
+
+
+def iterar_todos_produtos(limite: int = None, deslocamento: int = 0, cursor: tuple = None):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: iterar_todos_produtos()
+
+    B) OBJETIVO:
+    Variante sob demanda de `listar_todos_produtos()`: percorrer os produtos registrados sem montar uma lista.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: limite (inteiro, opcional)
+    Número máximo de produtos produzidos. Se omitido, vai até o último produto.
+    PARÂMETRO 2: deslocamento (inteiro, opcional)
+    Número de produtos saltados antes do primeiro produzido.
+    PARÂMETRO 3: cursor (tupla, opcional)
+    Cursor retornado por `listar_todos_produtos(limite=...)`; o percurso continua depois dele.
+
+    RETORNO 1: Gerador de objetos `Produto`, na ordem do registro.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - O registro de produtos não é alterado enquanto o gerador é consumido.
+
+    Assertiva(s) de saída:
+    - Nenhuma lista do tamanho do catálogo é criada.
+
+    E) DESCRIÇÃO:
+    1. Valida os parâmetros de paginação.
+    2. Retorna os produtos de `iterar_registro()`, fatiados por `deslocamento` e `limite`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Lança `ValueError` se um parâmetro for inválido, já que um gerador não retorna dicionário de erro.
+    """
+    erro = parametro_invalido(limite, deslocamento, cursor)
+    if erro is not None:
+        raise ValueError(f"Parâmetro '{erro}' errado")
+    return fatiar(iterar_registro(_todos_produtos, cursor), limite, deslocamento)
+
+
+def definir_catalogo(catalogo):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: definir_catalogo()
+
+    B) OBJETIVO:
+    Ativar (ou desativar) um catálogo de produtos consultado por `consultar_produto_por_codigo()` quando o produto não está em `_todos_produtos`.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: catalogo (objeto com método `consultar(codigo)`, ou None)
+    Catálogo a ser usado, normalmente um `CatalogoProdutos`. `None` desativa a consulta.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `catalogo` implementa o método `consultar()`, que retorna um `Produto` ou `None`, ou é `None`.
+
+    Assertiva(s) de saída:
+    - As próximas consultas por código recorrem ao catálogo informado.
+
+    E) DESCRIÇÃO:
+    1. Atualiza a variável global `_catalogo`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Permite iniciar sem `carregar_produtos()`, para terminais somente de consulta e relatórios. Com o armazenamento JSON, gravar produtos nesse modo reescreveria o arquivo apenas com os produtos consultados.
+    """
+    global _catalogo
+    _catalogo = catalogo
+
+
+def definir_indice_trigramas(ativo: bool):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: definir_indice_trigramas()
+
+    B) OBJETIVO:
+    Ativar ou desativar o índice de trigramas que acelera a busca por trecho de `pesquisar_produto()`.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: ativo (booleano)
+    `True` para manter o índice; `False` para descartá-lo e voltar à busca sequencial.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Com `ativo`, registros e alterações de produtos passam a atualizar o índice.
+
+    E) DESCRIÇÃO:
+    1. Se `ativo` e ainda não houver índice, cria um `IndiceTrigramas` vazio; se o registro também estiver vazio, o índice já está em dia com ele; caso contrário, é preenchido na primeira busca por `_sincronizar_indice()`.
+    2. Se não `ativo`, descarta o índice.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - O índice ocupa memória proporcional ao número de trigramas distintos de cada produto; por isso é opcional.
+    """
+    global _indice_trigramas
+    if not ativo:
+        _indice_trigramas = None
+    elif _indice_trigramas is None:
+        _indice_trigramas = IndiceTrigramas()
+        if not _todos_produtos:
+            _geracoes_indices[_indice_trigramas] = _todos_produtos.geracao
+
+
+def definir_catalogo_colunar(ativo: bool):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: definir_catalogo_colunar()
+
+    B) OBJETIVO:
+    Ativar ou desativar o catálogo colunar, que guarda peso e preços dos produtos em colunas contíguas e acelera `calcula_precos()`.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: ativo (booleano)
+    `True` para manter o catálogo; `False` para descartá-lo e voltar ao cálculo produto a produto.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Com `ativo`, registros e alterações de produtos passam a atualizar o catálogo.
+
+    E) DESCRIÇÃO:
+    1. Se `ativo` e ainda não houver catálogo, cria um `CatalogoColunar` vazio; se o registro também estiver vazio, o catálogo já está em dia com ele; caso contrário, é preenchido no primeiro `calcula_precos()` por `_sincronizar_indice()`.
+    2. Se não `ativo`, descarta o catálogo.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Os objetos `Produto` continuam sendo a fonte dos dados (carrinhos e estoques os referenciam diretamente); o catálogo é uma cópia das colunas numéricas, por isso é opcional.
+    """
+    global _catalogo_colunar
+    if not ativo:
+        _catalogo_colunar = None
+    elif _catalogo_colunar is None:
+        _catalogo_colunar = CatalogoColunar()
+        if not _todos_produtos:
+            _geracoes_indices[_catalogo_colunar] = _todos_produtos.geracao
+
+
+def definir_volume_vendas(vendas: dict):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: definir_volume_vendas()
+
+    B) OBJETIVO:
+    Definir o volume de vendas que ordena as sugestões de `completar_produto(por_vendas=True)` e aumenta a relevância em `pesquisar_produto(por_vendas=True)`.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: vendas (dicionário)
+    Quantidade vendida de cada produto {<código>: <quantidade>} (ex: calculada a partir do histórico da unidade ativa). Um dicionário vazio descarta o volume anterior.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - O índice de prefixos ordena as sugestões pelo volume informado.
+
+    E) DESCRIÇÃO:
+    1. Repassa o volume ao índice de prefixos, que monta o ranking de uma só vez.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - O volume não é gravado com os produtos; quem o calcula deve chamá-la novamente após cada carga ou troca de unidade.
+    """
+    _indice_prefixos.definir_pontuacao(vendas)
+
+
+def somar_volume_vendas(itens: dict):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: somar_volume_vendas()
+
+    B) OBJETIVO:
+    Acrescentar as quantidades de uma venda ao volume que ordena as sugestões de `completar_produto(por_vendas=True)` e aumenta a relevância em `pesquisar_produto(por_vendas=True)`.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: itens (dicionário)
+    Quantidade vendida de cada produto {<código>: <quantidade>}.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - O ranking do índice de prefixos reflete as novas quantidades.
+
+    E) DESCRIÇÃO:
+    1. Soma a quantidade de cada item à pontuação do seu código no índice de prefixos.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - O custo é proporcional ao número de itens, e não ao número de produtos vendidos no histórico.
+    """
+    for codigo, quantidade in itens.items():
+        _indice_prefixos.somar_pontuacao(codigo, quantidade)
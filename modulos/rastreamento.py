@@ -0,0 +1,406 @@
+import threading
+
+
+__all__ = [
+    "Rastreavel",
+    "marcar_modificado",
+    "marcar_modificados",
+    "obter_modificados",
+    "limpar_modificados",
+    "geracao_atual",
+    "adicionar_observador",
+    "remover_observador",
+    "selecionar_para_gravacao",
+    "trava_registros"
+]
+
+
+ENTIDADES_RASTREADAS = ("produtos", "funcionarios", "estoques", "carrinhos", "unidades")
+
+# Para cada entidade, {<objeto>: <geração da última marcação>}
+_modificados = {entidade: {} for entidade in ENTIDADES_RASTREADAS}
+
+# Contador de marcações; permite limpar apenas as marcações anteriores a uma gravação
+_geracao = 0
+
+# Protege `_modificados` e `_geracao` quando a gravação ocorre em outra thread
+_trava = threading.Lock()
+
+_observadores = []
+
+# Mantida pela thread que altera os registros enquanto executa uma operação, e pela gravação em segundo plano
+# enquanto grava; assim a gravação nunca percorre um registro no meio de uma operação
+trava_registros = threading.Lock()
+
+
+def marcar_modificado(entidade: str, objeto):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: marcar_modificado()
+
+    B) OBJETIVO:
+    Registrar que um objeto de domínio foi criado ou está prestes a ser alterado, para que a próxima gravação o inclua.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: entidade (string)
+    Nome da entidade do objeto (um dos valores de `ENTIDADES_RASTREADAS`).
+    PARÂMETRO 2: objeto
+    Instância de `Produto`, `Funcionario`, `Estoque`, `Carrinho` ou `Localidade`.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - A função é chamada ANTES de a alteração ser aplicada ao objeto.
+
+    Assertiva(s) de saída:
+    - O objeto pertence ao conjunto de modificados da entidade, com uma geração maior que a de qualquer marcação anterior.
+    - Todos os observadores registrados foram notificados.
+
+    E) DESCRIÇÃO:
+    1. Incrementa o contador de gerações e registra o objeto entre os modificados da entidade com a nova geração.
+    2. Chama cada observador com a entidade e o objeto, ainda no estado anterior à alteração.
+
+    F) HIPÓTESES:
+    - Os objetos de domínio usam o hash padrão (por identidade).
+
+    G) RESTRIÇÕES:
+    - Lança `KeyError` para entidades desconhecidas.
+    """
+    global _geracao
+    with _trava:
+        _geracao += 1
+        _modificados[entidade][objeto] = _geracao
+    for observador in list(_observadores):
+        observador(entidade, objeto)
+
+
+class Rastreavel:
+    """Base das classes de domínio cujas instâncias são gravadas de forma incremental: `class Carrinho(Rastreavel, entidade="carrinhos")`."""
+
+    _entidade = None
+
+    def __init_subclass__(cls, entidade: str = None, **kwargs):
+        """Associa a subclasse ao nome da sua entidade em `ENTIDADES_RASTREADAS`."""
+        super().__init_subclass__(**kwargs)
+        if entidade is not None:
+            cls._entidade = entidade
+
+    def __setattr__(self, nome, valor):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __setattr__() (Método de Rastreavel)
+
+        B) OBJETIVO:
+        Marcar a instância como modificada sempre que um atributo já existente for reatribuído, para que a próxima gravação a inclua.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: nome (string)
+        Nome do atributo.
+        PARÂMETRO 2: valor
+        Novo valor do atributo.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - A subclasse foi declarada com o nome da sua entidade.
+
+        Assertiva(s) de saída:
+        - O atributo recebeu o novo valor.
+        - Se o atributo já existia, a instância consta entre os modificados da entidade da classe.
+
+        E) DESCRIÇÃO:
+        1. Verifica se o atributo já existe na instância (atribuições feitas pelo construtor não contam como modificação).
+        2. Se existir, chama `marcar_modificado()` antes da alteração.
+        3. Atribui o valor com `object.__setattr__`.
+
+        F) HIPÓTESES:
+        - Objetos novos são marcados pelas funções que os registram.
+
+        G) RESTRIÇÕES:
+        - Alterações internas em dicionários ou listas não passam por este método e precisam ser marcadas explicitamente.
+        """
+        if nome in self.__dict__:
+            marcar_modificado(self._entidade, self)
+        object.__setattr__(self, nome, valor)
+
+
+def marcar_modificados(entidade: str, objetos):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: marcar_modificados()
+
+    B) OBJETIVO:
+    Registrar de uma vez um conjunto de objetos criados ou prestes a serem alterados (ex: um lote de produtos importados).
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: entidade (string)
+    Nome da entidade dos objetos (um dos valores de `ENTIDADES_RASTREADAS`).
+    PARÂMETRO 2: objetos (iterável)
+    Instâncias da entidade.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - A função é chamada ANTES de as alterações serem aplicadas aos objetos.
+
+    Assertiva(s) de saída:
+    - O resultado é o mesmo de chamar `marcar_modificado()` para cada objeto, na ordem recebida.
+
+    E) DESCRIÇÃO:
+    1. Obtém a trava uma única vez e registra cada objeto com uma geração própria, crescente.
+    2. Se houver observadores, chama cada um com a entidade e cada objeto.
+
+    F) HIPÓTESES:
+    - Os objetos de domínio usam o hash padrão (por identidade).
+
+    G) RESTRIÇÕES:
+    - Lança `KeyError` para entidades desconhecidas.
+    - A gravação em outra thread espera o fim da marcação do lote inteiro.
+    """
+    global _geracao
+    objetos = list(objetos)
+    modificados = _modificados[entidade]
+    with _trava:
+        for objeto in objetos:
+            _geracao += 1
+            modificados[objeto] = _geracao
+    for observador in list(_observadores):
+        for objeto in objetos:
+            observador(entidade, objeto)
+
+
+def obter_modificados(entidade: str):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: obter_modificados()
+
+    B) OBJETIVO:
+    Consultar os objetos de uma entidade marcados como modificados desde a última gravação.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: entidade (string)
+    Nome da entidade.
+
+    RETORNO 1: Lista com os objetos modificados.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `entidade` é um dos valores de `ENTIDADES_RASTREADAS`.
+
+    Assertiva(s) de saída:
+    - O conjunto interno não é alterado.
+
+    E) DESCRIÇÃO:
+    1. Retorna uma cópia em lista do conjunto de modificados da entidade.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - A lista pode conter objetos que já não estão nos registros globais; cabe a quem grava filtrá-los.
+    """
+    with _trava:
+        return list(_modificados[entidade])
+
+
+def limpar_modificados(entidade: str = None, ate: int = None):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: limpar_modificados()
+
+    B) OBJETIVO:
+    Esquecer as marcações de modificação, normalmente após uma gravação bem-sucedida.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: entidade (string, opcional)
+    Nome da entidade a limpar. Se omitido, limpa todas.
+    PARÂMETRO 2: ate (inteiro, opcional)
+    Geração (obtida com `geracao_atual()` antes da gravação) até a qual as marcações são esquecidas. Se omitido, esquece todas.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `entidade`, se fornecida, é um dos valores de `ENTIDADES_RASTREADAS`.
+
+    Assertiva(s) de saída:
+    - Não resta nenhuma marcação com geração menor ou igual a `ate` (ou nenhuma marcação, se `ate` for omitido).
+    - Objetos marcados novamente depois de `ate` continuam marcados.
+
+    E) DESCRIÇÃO:
+    1. Seleciona a entidade fornecida ou, se omitida, todas.
+    2. Se `ate` for omitido, esvazia as marcações selecionadas.
+    3. Caso contrário, remove apenas as marcações com geração menor ou igual a `ate`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Nenhuma.
+    """
+    entidades = [entidade] if entidade is not None else ENTIDADES_RASTREADAS
+    with _trava:
+        for nome in entidades:
+            marcados = _modificados[nome]
+            if ate is None:
+                marcados.clear()
+                continue
+            for objeto in [o for o, geracao in marcados.items() if geracao <= ate]:
+                del marcados[objeto]
+
+
+def geracao_atual():
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: geracao_atual()
+
+    B) OBJETIVO:
+    Obter a geração da marcação mais recente, para que uma gravação limpe apenas as marcações que já existiam quando ela começou.
+
+    C) ACOPLAMENTO:
+    PARÂMETROS: Nenhum.
+
+    RETORNO 1: Geração atual (inteiro).
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Toda marcação feita depois desta chamada terá geração maior que o valor retornado.
+
+    E) DESCRIÇÃO:
+    1. Retorna o contador de gerações.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Nenhuma.
+    """
+    with _trava:
+        return _geracao
+
+
+def adicionar_observador(observador):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: adicionar_observador()
+
+    B) OBJETIVO:
+    Registrar uma função a ser chamada sempre que um objeto for marcado como modificado.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: observador (função)
+    Função com a assinatura `observador(entidade, objeto)`.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `observador` é chamável.
+
+    Assertiva(s) de saída:
+    - O observador passa a ser notificado em `marcar_modificado()`.
+
+    E) DESCRIÇÃO:
+    1. Adiciona o observador à lista, se ainda não estiver presente.
+
+    F) HIPÓTESES:
+    - O observador é rápido e não lança exceções.
+
+    G) RESTRIÇÕES:
+    - O observador é chamado antes da alteração; não deve alterar o objeto recebido.
+    """
+    if observador not in _observadores:
+        _observadores.append(observador)
+
+
+def remover_observador(observador):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: remover_observador()
+
+    B) OBJETIVO:
+    Deixar de notificar uma função registrada com `adicionar_observador()`.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: observador (função)
+    Função previamente registrada.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - O observador não está mais na lista.
+
+    E) DESCRIÇÃO:
+    1. Remove o observador da lista, se estiver presente.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Nenhuma.
+    """
+    if observador in _observadores:
+        _observadores.remove(observador)
+
+
+def selecionar_para_gravacao(entidade: str, registro: dict, chave, parcial: bool):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: selecionar_para_gravacao()
+
+    B) OBJETIVO:
+    Decidir quais objetos de um registro global precisam ser gravados, de acordo com as marcações de modificação e com a capacidade do mecanismo de armazenamento.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: entidade (string)
+    Nome da entidade.
+    PARÂMETRO 2: registro (dicionário)
+    Registro global da entidade (ex: `_todos_produtos`).
+    PARÂMETRO 3: chave (função)
+    Função que recebe um objeto e retorna sua chave no registro.
+    PARÂMETRO 4: parcial (booleano)
+    `True` se o mecanismo de armazenamento aceita gravar apenas parte dos registros.
+
+    RETORNO 1: DICIONÁRIO {<chave no registro>: <objeto>} com os objetos a gravar (vazio se nada mudou).
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `registro` contém apenas objetos da entidade informada.
+
+    Assertiva(s) de saída:
+    - As marcações não são alteradas; quem grava deve obter `geracao_atual()` antes de selecionar e chamar `limpar_modificados(entidade, ate=<geração>)` após o sucesso.
+
+    E) DESCRIÇÃO:
+    1. Filtra os objetos marcados, mantendo apenas os que ainda estão no registro sob a sua chave.
+    2. Se nenhum objeto mudou, retorna um dicionário vazio.
+    3. Se a gravação parcial é suportada, retorna apenas os objetos modificados.
+    4. Caso contrário, retorna o registro inteiro, pois o arquivo precisa ser reescrito por completo.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Remoções físicas de registros não são rastreadas; o sistema usa apenas remoções lógicas.
+    """
+    with _trava:
+        marcados = list(_modificados[entidade])
+
+    alterados = {}
+    for objeto in marcados:
+        k = chave(objeto)
+        if registro.get(k) is objeto:
+            alterados[k] = objeto
+
+    if not alterados or parcial:
+        return alterados
+    return dict(registro)
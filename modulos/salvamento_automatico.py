@@ -0,0 +1,319 @@
+import threading
+import time
+
+from .rastreamento import adicionar_observador, remover_observador, trava_registros
+
+
+__all__ = [
+    "SalvamentoAutomatico"
+]
+
+
+class SalvamentoAutomatico:
+
+    def __init__(self, salvar, intervalo: float = 30.0, limite_alteracoes: int = 100, espera_silencio: float = 0.2):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Configurar uma gravação em segundo plano, que agrupa rajadas de alterações em uma única chamada à função de gravação.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: salvar (função)
+        Função sem parâmetros que grava os registros modificados (ex: `salvar_dados` do programa principal).
+        PARÂMETRO 2: intervalo (float, opcional)
+        Tempo máximo, em segundos, entre a primeira alteração pendente e a gravação.
+        PARÂMETRO 3: limite_alteracoes (inteiro, opcional)
+        Número de alterações pendentes que antecipa a gravação.
+        PARÂMETRO 4: espera_silencio (float, opcional)
+        Tempo, em segundos, sem novas alterações exigido antes de gravar, para agrupar rajadas e não capturar uma operação pela metade.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `salvar` limpa as marcações apenas até a geração em que começou (como as funções `salvar_*`).
+
+        Assertiva(s) de saída:
+        - A instância está configurada, mas a thread ainda não foi iniciada.
+
+        E) DESCRIÇÃO:
+        1. Guarda a função de gravação e os parâmetros de agrupamento.
+        2. Inicializa a condição que sincroniza o observador, a thread de gravação e quem aguarda um ponto durável.
+        3. Inicializa os contadores de alterações marcadas e gravadas.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        self.salvar = salvar
+        self.intervalo = intervalo
+        self.limite_alteracoes = limite_alteracoes
+        self.espera_silencio = espera_silencio
+        self.ultimo_erro = None
+        self.gravacoes = 0
+        self.falhas = 0
+
+        self._condicao = threading.Condition()
+        self._thread = None
+        self._parar = False
+        self._solicitado = False
+        self._pendentes = 0
+        self._primeira = None
+        self._ultima = None
+        self._marcadas = 0
+        self._gravadas = 0
+
+    def iniciar(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: iniciar()
+
+        B) OBJETIVO:
+        Passar a observar as alterações e iniciar a thread de gravação.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - A instância ainda não foi iniciada.
+
+        Assertiva(s) de saída:
+        - Cada `marcar_modificado()` passa a ser contado como alteração pendente.
+
+        E) DESCRIÇÃO:
+        1. Registra `_ao_modificar()` como observador do rastreamento.
+        2. Cria e inicia a thread (daemon) que executa `_executar()`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Alterações feitas antes de `iniciar()` não são contadas, mas continuam marcadas e são gravadas junto com a primeira gravação.
+        """
+        adicionar_observador(self._ao_modificar)
+        self._thread = threading.Thread(target=self._executar, name="salvamento-automatico", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: float = None):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: parar()
+
+        B) OBJETIVO:
+        Encerrar a gravação em segundo plano, gravando antes as alterações pendentes.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: timeout (float, opcional)
+        Tempo máximo, em segundos, de espera pelo término da thread. Se omitido, espera indefinidamente.
+
+        RETORNO 1: `True` se a thread terminou, `False` se o tempo se esgotou.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O observador foi removido; novas alterações não são mais contadas.
+        - Se retornou `True`, a última gravação já terminou.
+
+        E) DESCRIÇÃO:
+        1. Remove o observador do rastreamento.
+        2. Sinaliza o encerramento à thread, que faz a gravação final sem aguardar o intervalo.
+        3. Aguarda o término da thread.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Se a gravação final falhar, o erro fica em `ultimo_erro` e as marcações são mantidas para uma gravação manual.
+        """
+        remover_observador(self._ao_modificar)
+        with self._condicao:
+            self._parar = True
+            self._condicao.notify_all()
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def aguardar_gravacao(self, timeout: float = None):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: aguardar_gravacao()
+
+        B) OBJETIVO:
+        Aguardar um ponto durável: que todas as alterações feitas até o momento da chamada estejam gravadas.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: timeout (float, opcional)
+        Tempo máximo de espera, em segundos. Se omitido, espera indefinidamente.
+
+        RETORNO 1: `True` se as alterações foram gravadas, `False` se o tempo se esgotou, se uma gravação falhou ou se a gravação foi encerrada antes.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - A instância foi iniciada.
+
+        Assertiva(s) de saída:
+        - Se retornou `True`, nenhuma alteração anterior à chamada depende mais da memória.
+
+        E) DESCRIÇÃO:
+        1. Registra quantas alterações já foram marcadas.
+        2. Se ainda não foram todas gravadas, pede à thread uma gravação imediata (sem aguardar o intervalo nem o limite).
+        3. Espera até que o contador de gravadas alcance o registrado, o tempo se esgote, uma gravação falhe ou a thread termine.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - A gravação pedida ainda respeita `espera_silencio`.
+        - Não deve ser chamado por quem mantém `trava_registros`, que a gravação precisa obter.
+        - Após uma falha, a thread continua tentando no ritmo normal; o erro fica em `ultimo_erro`.
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._condicao:
+            alvo = self._marcadas
+            falhas = self.falhas
+            while self._gravadas < alvo:
+                if self._thread is None or not self._thread.is_alive() or self.falhas != falhas:
+                    return False
+                self._solicitado = True
+                self._condicao.notify_all()
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._condicao.wait(restante)
+            return True
+
+    def _ao_modificar(self, entidade, objeto):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _ao_modificar()
+
+        B) OBJETIVO:
+        Contar uma alteração pendente; é o observador registrado no rastreamento.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: entidade (string)
+        Entidade do objeto marcado.
+        PARÂMETRO 2: objeto
+        Objeto marcado.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Chamado por `marcar_modificado()`.
+
+        Assertiva(s) de saída:
+        - A thread é acordada se o limite de alterações foi atingido.
+
+        E) DESCRIÇÃO:
+        1. Incrementa os contadores e registra o instante da alteração (e da primeira pendente).
+        2. Acorda a thread quando o número de pendentes atinge `limite_alteracoes`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Executa na thread que altera os dados; só retém a condição por instantes, nunca durante a gravação.
+        """
+        agora = time.monotonic()
+        with self._condicao:
+            self._marcadas += 1
+            self._pendentes += 1
+            self._ultima = agora
+            if self._primeira is None:
+                self._primeira = agora
+            if self._pendentes >= self.limite_alteracoes:
+                self._condicao.notify_all()
+
+    def _executar(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _executar()
+
+        B) OBJETIVO:
+        Laço da thread de gravação: decidir quando gravar e chamar a função de gravação fora da condição.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Executado pela thread criada em `iniciar()`.
+
+        Assertiva(s) de saída:
+        - Ao terminar, todas as alterações pendentes foram gravadas ou o erro está em `ultimo_erro`.
+
+        E) DESCRIÇÃO:
+        1. Aguarda até haver alterações pendentes ou o pedido de encerramento.
+        2. Aguarda o primeiro gatilho: intervalo decorrido desde a primeira pendente, limite de alterações atingido, ponto durável pedido ou encerramento.
+        3. Aguarda `espera_silencio` sem novas alterações (exceto no encerramento).
+        4. Zera as pendentes, registra quantas alterações a gravação cobre e libera a condição.
+        5. Chama `salvar()` com `trava_registros`, que a thread que altera os dados mantém durante cada operação; em caso de sucesso, atualiza o contador de gravadas e acorda quem aguarda um ponto durável.
+        6. Em caso de erro, guarda-o em `ultimo_erro` e volta a considerar as alterações pendentes, para tentar de novo no próximo ciclo.
+        7. Repete até o encerramento, quando faz uma última gravação e termina.
+
+        F) HIPÓTESES:
+        - A thread que altera os registros mantém `trava_registros` durante cada operação e a libera enquanto aguarda o usuário (como `main.py`).
+
+        G) RESTRIÇÕES:
+        - Enquanto a gravação ocorre, a próxima operação aguarda o seu término.
+        - Se uma gravação falhar, as marcações continuam, pois só são limpas até a geração em que a gravação começou, e a gravação é repetida.
+        - Após uma falha no encerramento, a thread termina sem repetir a gravação.
+        """
+        while True:
+            with self._condicao:
+                while not self._parar and self._pendentes == 0 and not self._solicitado:
+                    self._condicao.wait()
+
+                while not (self._parar or self._solicitado or self._pendentes >= self.limite_alteracoes):
+                    restante = self._primeira + self.intervalo - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._condicao.wait(restante)
+
+                while not self._parar and self._ultima is not None:
+                    restante = self._ultima + self.espera_silencio - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._condicao.wait(restante)
+
+                encerrando = self._parar
+                alvo = self._marcadas
+                pendentes = self._pendentes
+                self._pendentes = 0
+                self._primeira = None
+                self._solicitado = False
+
+            try:
+                with trava_registros:
+                    self.salvar()
+            except Exception as erro:
+                with self._condicao:
+                    self.ultimo_erro = erro
+                    self.falhas += 1
+                    self._pendentes += pendentes
+                    if self._primeira is None:
+                        self._primeira = time.monotonic()
+                    self._condicao.notify_all()
+                if encerrando:
+                    return
+                continue
+
+            with self._condicao:
+                self.gravacoes += 1
+                self._gravadas = max(self._gravadas, alvo)
+                self._condicao.notify_all()
+                if encerrando:
+                    return
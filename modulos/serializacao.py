@@ -0,0 +1,544 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+__all__ = [
+    "SerializadorCompacto",
+    "SerializadorLegivel",
+    "SerializadorOrjson",
+    "criar_serializador",
+    "definir_serializador",
+    "obter_serializador"
+]
+
+
+_serializador_atual = None
+
+# Quantidade aproximada de bytes acumulados antes de cada escrita no arquivo
+_TAMANHO_BLOCO = 1 << 16
+
+
+class SerializadorCompacto:
+    nome = "compacto"
+
+    def codificar(self, dados):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: codificar()
+
+        B) OBJETIVO:
+        Converter dados primitivos em um texto JSON sem espaços entre os elementos.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: dados
+        Estrutura de dicionários, listas, strings, números, booleanos e None.
+
+        RETORNO 1: String JSON.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `dados` é serializável em JSON.
+
+        Assertiva(s) de saída:
+        - `decodificar(codificar(dados)) == dados`.
+
+        E) DESCRIÇÃO:
+        1. Chama `json.dumps()` com separadores sem espaço, mantendo os caracteres acentuados.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        return json.dumps(dados, ensure_ascii=False, separators=(",", ":"))
+
+    def decodificar(self, texto):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: decodificar()
+
+        B) OBJETIVO:
+        Converter um texto JSON em dados primitivos.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: texto (string ou bytes)
+        Documento JSON.
+
+        RETORNO 1: Os dados representados pelo texto.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `texto` é um JSON válido, em qualquer formatação.
+
+        Assertiva(s) de saída:
+        - Nenhuma.
+
+        E) DESCRIÇÃO:
+        1. Chama `json.loads()`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lança `json.JSONDecodeError` (subclasse de `ValueError`) para textos inválidos.
+        """
+        return json.loads(texto)
+
+    def gravar(self, caminho: str, dados):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: gravar()
+
+        B) OBJETIVO:
+        Escrever dados primitivos em um arquivo JSON.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: caminho (string)
+        Arquivo de destino, criado ou sobrescrito.
+        PARÂMETRO 2: dados
+        Estrutura serializável em JSON.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O diretório de destino existe.
+
+        Assertiva(s) de saída:
+        - O arquivo contém `codificar(dados)` em UTF-8.
+
+        E) DESCRIÇÃO:
+        1. Abre o arquivo em modo binário e escreve os dados com `escrever()`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Para gravar com compressão, use `escrever()` sobre o arquivo de `compressao.abrir_escrita()`.
+        """
+        with open(caminho, "wb") as f:
+            self.escrever(f, dados)
+
+    def ler(self, caminho: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: ler()
+
+        B) OBJETIVO:
+        Ler um arquivo JSON inteiro.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: caminho (string)
+        Arquivo de origem.
+
+        RETORNO 1: Os dados do arquivo.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O arquivo existe e contém um JSON válido, em qualquer formatação.
+
+        Assertiva(s) de saída:
+        - Nenhuma.
+
+        E) DESCRIÇÃO:
+        1. Abre o arquivo em modo binário e lê os dados com `ler_arquivo()`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lança `FileNotFoundError` se o arquivo não existir.
+        """
+        with open(caminho, "rb") as f:
+            return self.ler_arquivo(f)
+
+    def escrever(self, arquivo, dados):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: escrever()
+
+        B) OBJETIVO:
+        Escrever dados primitivos em um arquivo binário aberto, registro a registro, sem montar o documento inteiro na memória.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: arquivo (arquivo binário aberto para escrita)
+        Destino, possivelmente um fluxo de compressão (ver `compressao.abrir_escrita()`).
+        PARÂMETRO 2: dados
+        Estrutura serializável em JSON; normalmente o dicionário {<chave>: <registro>} de uma entidade.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `dados` é serializável em JSON.
+
+        Assertiva(s) de saída:
+        - O arquivo recebeu o mesmo conteúdo de `codificar(dados)`, em UTF-8.
+
+        E) DESCRIÇÃO:
+        1. Se `dados` não for um dicionário, codifica-o inteiro e escreve-o.
+        2. Caso contrário, codifica cada par chave-registro com `codificar()` e acumula os bytes.
+        3. Escreve o acumulado sempre que ele passar de `_TAMANHO_BLOCO` bytes, e o restante ao final.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - A memória usada é limitada a um bloco mais um registro. `json.dump()` também escreveria em partes, mas usa o codificador em Python puro, bem mais lento que o de `json.dumps()` usado aqui em cada registro.
+        """
+        if not isinstance(dados, dict):
+            arquivo.write(self.codificar(dados).encode("utf-8"))
+            return
+        partes = ["{"]
+        tamanho = 0
+        separador = ""
+        for chave, valor in dados.items():
+            parte = separador + self.codificar(str(chave)) + ":" + self.codificar(valor)
+            separador = ","
+            partes.append(parte)
+            tamanho += len(parte)
+            if tamanho >= _TAMANHO_BLOCO:
+                arquivo.write("".join(partes).encode("utf-8"))
+                partes = []
+                tamanho = 0
+        partes.append("}")
+        arquivo.write("".join(partes).encode("utf-8"))
+
+    def ler_arquivo(self, arquivo):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: ler_arquivo()
+
+        B) OBJETIVO:
+        Ler um documento JSON inteiro de um arquivo binário aberto.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: arquivo (arquivo binário aberto para leitura)
+        Origem, possivelmente um fluxo de descompressão (ver `compressao.abrir_leitura()`).
+
+        RETORNO 1: Os dados do arquivo.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - O conteúdo é um JSON válido em UTF-8, em qualquer formatação.
+
+        Assertiva(s) de saída:
+        - Nenhuma.
+
+        E) DESCRIÇÃO:
+        1. Lê todos os bytes e decodifica-os com `decodificar()`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Para percorrer um arquivo grande sem lê-lo inteiro, use `ArmazenamentoJSON.iterar()`.
+        """
+        return self.decodificar(arquivo.read())
+
+
+class SerializadorLegivel(SerializadorCompacto):
+    nome = "legivel"
+
+    def codificar(self, dados):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: codificar()
+
+        B) OBJETIVO:
+        Converter dados primitivos em um texto JSON indentado, para inspeção e depuração.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: dados
+        Estrutura serializável em JSON.
+
+        RETORNO 1: String JSON com indentação de 4 espaços.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `dados` é serializável em JSON.
+
+        Assertiva(s) de saída:
+        - `decodificar(codificar(dados)) == dados`.
+
+        E) DESCRIÇÃO:
+        1. Chama `json.dumps()` com `indent=4`, o formato usado originalmente pelo sistema.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Gera arquivos bem maiores e é mais lento que o modo compacto; não deve ser usado em produção.
+        """
+        return json.dumps(dados, ensure_ascii=False, indent=4)
+
+    def escrever(self, arquivo, dados):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: escrever()
+
+        B) OBJETIVO:
+        Escrever dados primitivos, indentados, em um arquivo binário aberto.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: arquivo (arquivo binário aberto para escrita)
+        Destino, possivelmente um fluxo de compressão.
+        PARÂMETRO 2: dados
+        Estrutura serializável em JSON.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `dados` é serializável em JSON.
+
+        Assertiva(s) de saída:
+        - O arquivo recebeu o mesmo conteúdo de `codificar(dados)`, em UTF-8.
+
+        E) DESCRIÇÃO:
+        1. Codifica o documento inteiro com `codificar()` e escreve-o de uma vez.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Monta o texto completo na memória; aceitável por ser um modo de depuração.
+        """
+        arquivo.write(self.codificar(dados).encode("utf-8"))
+
+
+class SerializadorOrjson(SerializadorCompacto):
+    nome = "orjson"
+
+    def codificar(self, dados):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: codificar()
+
+        B) OBJETIVO:
+        Converter dados primitivos em um texto JSON compacto usando a biblioteca `orjson`.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: dados
+        Estrutura serializável em JSON.
+
+        RETORNO 1: String JSON.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `orjson` está instalado.
+
+        Assertiva(s) de saída:
+        - O texto é equivalente ao do modo compacto.
+
+        E) DESCRIÇÃO:
+        1. Chama `orjson.dumps()`, aceitando chaves não textuais, e decodifica os bytes em UTF-8.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - `orjson` grava `NaN` e infinitos como `null`.
+        """
+        return orjson.dumps(dados, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    def decodificar(self, texto):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: decodificar()
+
+        B) OBJETIVO:
+        Converter um texto JSON em dados primitivos usando a biblioteca `orjson`.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: texto (string ou bytes)
+        Documento JSON.
+
+        RETORNO 1: Os dados representados pelo texto.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `orjson` está instalado.
+
+        Assertiva(s) de saída:
+        - Nenhuma.
+
+        E) DESCRIÇÃO:
+        1. Chama `orjson.loads()`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lança `orjson.JSONDecodeError` (subclasse de `ValueError`) para textos inválidos.
+        """
+        return orjson.loads(texto)
+
+    def escrever(self, arquivo, dados):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: escrever()
+
+        B) OBJETIVO:
+        Escrever dados primitivos em um arquivo binário aberto, registro a registro, usando a biblioteca `orjson`.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: arquivo (arquivo binário aberto para escrita)
+        Destino, possivelmente um fluxo de compressão.
+        PARÂMETRO 2: dados
+        Estrutura serializável em JSON.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `orjson` está instalado.
+
+        Assertiva(s) de saída:
+        - O arquivo recebeu o mesmo conteúdo de `codificar(dados)`, em UTF-8.
+
+        E) DESCRIÇÃO:
+        1. Igual a `SerializadorCompacto.escrever()`, mas cada registro é codificado por `orjson.dumps()`, que já gera bytes.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        if not isinstance(dados, dict):
+            arquivo.write(orjson.dumps(dados, option=orjson.OPT_NON_STR_KEYS))
+            return
+        partes = [b"{"]
+        tamanho = 0
+        separador = b""
+        for chave, valor in dados.items():
+            parte = separador + orjson.dumps(str(chave)) + b":" + orjson.dumps(valor, option=orjson.OPT_NON_STR_KEYS)
+            separador = b","
+            partes.append(parte)
+            tamanho += len(parte)
+            if tamanho >= _TAMANHO_BLOCO:
+                arquivo.write(b"".join(partes))
+                partes = []
+                tamanho = 0
+        partes.append(b"}")
+        arquivo.write(b"".join(partes))
+
+
+def criar_serializador(modo: str = "auto"):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: criar_serializador()
+
+    B) OBJETIVO:
+    Construir um serializador a partir do nome do modo.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: modo (string, opcional)
+    "auto" (padrão), "compacto", "legivel" ou "orjson".
+
+    RETORNO 1: Instância de `SerializadorCompacto`, `SerializadorLegivel` ou `SerializadorOrjson`.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Retorna um objeto com a interface `codificar`/`decodificar`/`gravar`/`ler`.
+
+    E) DESCRIÇÃO:
+    1. No modo "auto", usa `orjson` se estiver instalado e, caso contrário, o modo compacto da biblioteca padrão.
+    2. Nos demais modos, instancia o serializador correspondente.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Lança `ValueError` para modos desconhecidos ou para "orjson" quando a biblioteca não está instalada.
+    """
+    if modo == "auto":
+        modo = "orjson" if orjson is not None else "compacto"
+    if modo == "compacto":
+        return SerializadorCompacto()
+    if modo == "legivel":
+        return SerializadorLegivel()
+    if modo == "orjson":
+        if orjson is None:
+            raise ValueError("A biblioteca orjson não está instalada")
+        return SerializadorOrjson()
+    raise ValueError(f"Modo de serialização desconhecido: {modo}")
+
+
+def definir_serializador(serializador):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: definir_serializador()
+
+    B) OBJETIVO:
+    Escolher o serializador usado pelos mecanismos de armazenamento que não receberam um serializador próprio.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: serializador (objeto serializador ou None)
+    Serializador a ser usado. `None` restaura o padrão (modo "auto").
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `serializador` implementa a interface comum ou é `None`.
+
+    Assertiva(s) de saída:
+    - As próximas chamadas a `obter_serializador()` retornam o serializador informado.
+
+    E) DESCRIÇÃO:
+    1. Atualiza a variável global `_serializador_atual`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Nenhuma.
+    """
+    global _serializador_atual
+    _serializador_atual = serializador
+
+
+def obter_serializador():
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: obter_serializador()
+
+    B) OBJETIVO:
+    Retornar o serializador em uso.
+
+    C) ACOPLAMENTO:
+    PARÂMETROS: Nenhum.
+
+    RETORNO 1: O serializador definido por `definir_serializador()` ou, na ausência dele, o criado no modo "auto".
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Nunca retorna `None`.
+
+    E) DESCRIÇÃO:
+    1. Se nenhum serializador foi definido, cria e guarda um no modo "auto".
+    2. Retorna o serializador atual.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Nenhuma.
+    """
+    global _serializador_atual
+    if _serializador_atual is None:
+        _serializador_atual = criar_serializador()
+    return _serializador_atual
@@ -0,0 +1,948 @@
+import os
+import struct
+from datetime import date, datetime
+from functools import lru_cache
+
+from . import carrinho as _modulo_carrinho
+from .agenda_precos import AgendaPrecos
+from .produto import Produto, _todos_produtos, _agendas_precos
+from .funcionario import Funcionario, _todos_funcionarios
+from .estoque import Estoque, _todos_estoques
+from .carrinho import Carrinho, _todos_carrinhos
+from .unidades import Localidade, _unidades
+from .vendas_paginadas import VendasPaginadas
+
+
+__all__ = [
+    "salvar_snapshot",
+    "carregar_snapshot"
+]
+
+
+SNAPSHOT_BINARIO = 'dados/mercado.snap'
+
+MAGICO = b"MCSN"
+VERSAO = 2
+_CABECALHO = struct.Struct("<4sH")
+_REAL = struct.Struct("<d")
+
+# Marcadores do campo numérico: preservam a distinção entre int, float e None
+_NUMERO_INTEIRO = 0
+_NUMERO_REAL = 1
+_NUMERO_NULO = 2
+
+
+class _Escritor:
+
+    def __init__(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Criar um codificador vazio, com o corpo do snapshot e a tabela de strings ainda sem conteúdo.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - `corpo` é um `bytearray` vazio e `tabela` é um dicionário vazio.
+
+        E) DESCRIÇÃO:
+        1. Inicializa o buffer do corpo.
+        2. Inicializa a tabela de strings, que associa cada string distinta ao seu índice.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Classe de uso interno do módulo.
+        """
+        self.corpo = bytearray()
+        self.tabela = {}
+
+    def natural(self, valor: int):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: natural()
+
+        B) OBJETIVO:
+        Escrever um inteiro não negativo em tamanho variável (7 bits por byte).
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: valor (inteiro)
+        Valor a escrever.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `valor` >= 0.
+
+        Assertiva(s) de saída:
+        - Valores menores que 128 ocupam um único byte.
+
+        E) DESCRIÇÃO:
+        1. Enquanto restarem mais de 7 bits, escreve os 7 bits baixos com o bit de continuação ligado.
+        2. Escreve o último grupo com o bit de continuação desligado.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        while valor >= 0x80:
+            self.corpo.append((valor & 0x7F) | 0x80)
+            valor >>= 7
+        self.corpo.append(valor)
+
+    def inteiro(self, valor: int):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: inteiro()
+
+        B) OBJETIVO:
+        Escrever um inteiro com sinal em tamanho variável.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: valor (inteiro)
+        Valor a escrever, positivo ou negativo.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Valores de módulo pequeno ocupam poucos bytes, qualquer que seja o sinal.
+
+        E) DESCRIÇÃO:
+        1. Intercala positivos e negativos (0, -1, 1, -2, ...) em naturais (0, 1, 2, 3, ...).
+        2. Escreve o resultado com `natural()`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        self.natural(valor * 2 if valor >= 0 else -valor * 2 - 1)
+
+    def numero(self, valor):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: numero()
+
+        B) OBJETIVO:
+        Escrever um campo numérico que pode ser inteiro, real ou nulo, preservando o tipo original.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: valor (int, float ou None)
+        Valor a escrever.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `valor` é `int`, `float` ou `None`.
+
+        Assertiva(s) de saída:
+        - Reais ocupam sempre 1 + 8 bytes (largura fixa); inteiros, 1 byte mais o tamanho variável.
+
+        E) DESCRIÇÃO:
+        1. Escreve um byte marcador com o tipo do valor.
+        2. Para inteiros, escreve o valor com `inteiro()`; para reais, escreve um double de 8 bytes.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        if valor is None:
+            self.corpo.append(_NUMERO_NULO)
+        elif isinstance(valor, int):
+            self.corpo.append(_NUMERO_INTEIRO)
+            self.inteiro(valor)
+        else:
+            self.corpo.append(_NUMERO_REAL)
+            self.corpo += _REAL.pack(valor)
+
+    def real(self, valor: float):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: real()
+
+        B) OBJETIVO:
+        Escrever um número real em largura fixa.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: valor (float)
+        Valor a escrever.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `valor` é conversível para `float`.
+
+        Assertiva(s) de saída:
+        - Exatamente 8 bytes são acrescentados ao corpo.
+
+        E) DESCRIÇÃO:
+        1. Escreve o valor como double little-endian.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        self.corpo += _REAL.pack(valor)
+
+    def texto(self, valor: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: texto()
+
+        B) OBJETIVO:
+        Escrever uma string como referência à tabela de strings, para que valores repetidos (categorias, marcas, EANs) sejam gravados uma única vez.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: valor (string ou None)
+        String a escrever.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - A string consta na tabela.
+
+        E) DESCRIÇÃO:
+        1. Se a string é nova, acrescenta-a à tabela com o próximo índice.
+        2. Escreve o índice somado de 1 (o valor 0 representa `None`).
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        if valor is None:
+            self.natural(0)
+            return
+        indice = self.tabela.get(valor)
+        if indice is None:
+            indice = self.tabela[valor] = len(self.tabela)
+        self.natural(indice + 1)
+
+    def serializar(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: serializar()
+
+        B) OBJETIVO:
+        Montar o conteúdo completo do arquivo de snapshot.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: Conteúdo do arquivo (bytes).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Todo o corpo já foi escrito.
+
+        Assertiva(s) de saída:
+        - O conteúdo começa pelo cabeçalho, seguido da tabela de strings e do corpo.
+
+        E) DESCRIÇÃO:
+        1. Escreve o cabeçalho (`MAGICO` e `VERSAO`).
+        2. Escreve o número de strings e, para cada uma, o tamanho em bytes e o conteúdo UTF-8.
+        3. Acrescenta o corpo.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        corpo = self.corpo
+        self.corpo = bytearray(_CABECALHO.pack(MAGICO, VERSAO))
+        self.natural(len(self.tabela))
+        for valor in self.tabela:
+            dados = valor.encode("utf-8")
+            self.natural(len(dados))
+            self.corpo += dados
+        self.corpo += corpo
+        return bytes(self.corpo)
+
+
+class _Leitor:
+
+    def __init__(self, dados: bytes):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Criar um decodificador sobre o conteúdo de um arquivo de snapshot, validando o cabeçalho e lendo a tabela de strings.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: dados (bytes)
+        Conteúdo completo do arquivo.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - A posição de leitura está no início do corpo.
+
+        E) DESCRIÇÃO:
+        1. Confere o identificador e a versão do formato.
+        2. Lê a tabela de strings.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lança `ValueError` se o arquivo não for um snapshot ou se a versão não for suportada.
+        """
+        if len(dados) < _CABECALHO.size:
+            raise ValueError("Arquivo não é um snapshot binário.")
+        magico, versao = _CABECALHO.unpack_from(dados, 0)
+        if magico != MAGICO:
+            raise ValueError("Arquivo não é um snapshot binário.")
+        if versao != VERSAO:
+            raise ValueError(f"Versão de snapshot não suportada: {versao}.")
+
+        self.dados = dados
+        self.posicao = _CABECALHO.size
+        self.tabela = [None]
+        for _ in range(self.natural()):
+            tamanho = self.natural()
+            self.tabela.append(str(self.dados[self.posicao:self.posicao + tamanho], "utf-8"))
+            self.posicao += tamanho
+
+    def natural(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: natural()
+
+        B) OBJETIVO:
+        Ler um inteiro não negativo escrito por `_Escritor.natural()`.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: O valor lido (inteiro).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - A posição de leitura está no início de um natural.
+
+        Assertiva(s) de saída:
+        - A posição avança para o campo seguinte.
+
+        E) DESCRIÇÃO:
+        1. Se o primeiro byte não tem o bit de continuação (o caso mais comum), retorna-o diretamente.
+        2. Caso contrário, acumula grupos de 7 bits enquanto o bit de continuação estiver ligado.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lança `IndexError` se o arquivo terminar no meio do campo.
+        """
+        dados = self.dados
+        posicao = self.posicao
+        byte = dados[posicao]
+        posicao += 1
+        if byte < 0x80:
+            self.posicao = posicao
+            return byte
+
+        resultado = byte & 0x7F
+        deslocamento = 7
+        while True:
+            byte = dados[posicao]
+            posicao += 1
+            resultado |= (byte & 0x7F) << deslocamento
+            if byte < 0x80:
+                self.posicao = posicao
+                return resultado
+            deslocamento += 7
+
+    def inteiro(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: inteiro()
+
+        B) OBJETIVO:
+        Ler um inteiro com sinal escrito por `_Escritor.inteiro()`.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: O valor lido (inteiro).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - A posição de leitura está no início de um inteiro.
+
+        Assertiva(s) de saída:
+        - A posição avança para o campo seguinte.
+
+        E) DESCRIÇÃO:
+        1. Lê um natural e desfaz a intercalação de sinais.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        valor = self.natural()
+        return valor >> 1 if not valor & 1 else -(valor >> 1) - 1
+
+    def numero(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: numero()
+
+        B) OBJETIVO:
+        Ler um campo numérico escrito por `_Escritor.numero()`.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: O valor lido (int, float ou None).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - A posição de leitura está no início de um campo numérico.
+
+        Assertiva(s) de saída:
+        - A posição avança para o campo seguinte.
+
+        E) DESCRIÇÃO:
+        1. Lê o byte marcador e, conforme ele, o inteiro, o double ou nada.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lança `ValueError` para marcadores desconhecidos.
+        """
+        marcador = self.dados[self.posicao]
+        self.posicao += 1
+        if marcador == _NUMERO_NULO:
+            return None
+        if marcador == _NUMERO_INTEIRO:
+            return self.inteiro()
+        if marcador == _NUMERO_REAL:
+            return self.real()
+        raise ValueError(f"Marcador numérico inválido: {marcador}.")
+
+    def real(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: real()
+
+        B) OBJETIVO:
+        Ler um número real de largura fixa.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: O valor lido (float).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - A posição de leitura está no início de um real.
+
+        Assertiva(s) de saída:
+        - A posição avança 8 bytes.
+
+        E) DESCRIÇÃO:
+        1. Desempacota um double little-endian.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        valor = _REAL.unpack_from(self.dados, self.posicao)[0]
+        self.posicao += _REAL.size
+        return valor
+
+    def texto(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: texto()
+
+        B) OBJETIVO:
+        Ler uma referência à tabela de strings.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: A string referenciada, ou `None`.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - A posição de leitura está no início de uma referência.
+
+        Assertiva(s) de saída:
+        - A posição avança para o campo seguinte.
+
+        E) DESCRIÇÃO:
+        1. Lê o índice e o busca na tabela (o índice 0 corresponde a `None`).
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        return self.tabela[self.natural()]
+
+
+@lru_cache(maxsize=4096)
+def _data_para_dia(data: str):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _data_para_dia()
+
+    B) OBJETIVO:
+    Converter uma data do sistema em um número de dia, adequado para codificação por diferença.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: data (string ou None)
+    Data no formato "AAAA/MM/DD".
+
+    RETORNO 1: Número ordinal do dia (inteiro >= 1), ou 0 para `None`.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `data` está no formato "AAAA/MM/DD" ou é `None`.
+
+    Assertiva(s) de saída:
+    - Datas consecutivas resultam em números consecutivos.
+
+    E) DESCRIÇÃO:
+    1. Retorna 0 para `None`.
+    2. Caso contrário, converte a data e retorna `date.toordinal()`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Lança `ValueError` para datas fora do formato.
+    - Os resultados são memorizados, pois as mesmas datas se repetem em milhares de vendas.
+    """
+    if data is None:
+        return 0
+    return datetime.strptime(data, "%Y/%m/%d").date().toordinal()
+
+
+@lru_cache(maxsize=4096)
+def _dia_para_data(dia: int):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _dia_para_data()
+
+    B) OBJETIVO:
+    Desfazer a conversão de `_data_para_dia()`.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: dia (inteiro)
+    Número ordinal do dia, ou 0.
+
+    RETORNO 1: Data no formato "AAAA/MM/DD", ou `None` para 0.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - `dia` >= 0.
+
+    Assertiva(s) de saída:
+    - Nenhuma.
+
+    E) DESCRIÇÃO:
+    1. Retorna `None` para 0 e, caso contrário, a data formatada.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Nenhuma.
+    """
+    if dia == 0:
+        return None
+    return date.fromordinal(dia).strftime("%Y/%m/%d")
+
+
+def _escrever_sequencia(escritor: _Escritor, valores: list):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _escrever_sequencia()
+
+    B) OBJETIVO:
+    Escrever uma lista de inteiros codificando cada um pela diferença em relação ao anterior.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: escritor (_Escritor)
+    Codificador de destino.
+    PARÂMETRO 2: valores (lista de inteiros)
+    Valores a escrever (IDs de vendas ou números de dia).
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Sequências crescentes ou quase constantes ocupam cerca de um byte por elemento.
+
+    E) DESCRIÇÃO:
+    1. Escreve o tamanho da lista.
+    2. Escreve cada valor menos o anterior (o primeiro, menos zero) com `inteiro()`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Nenhuma.
+    """
+    escritor.natural(len(valores))
+    anterior = 0
+    for valor in valores:
+        escritor.inteiro(valor - anterior)
+        anterior = valor
+
+
+def _ler_sequencia(leitor: _Leitor):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _ler_sequencia()
+
+    B) OBJETIVO:
+    Ler uma lista escrita por `_escrever_sequencia()`.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: leitor (_Leitor)
+    Decodificador de origem.
+
+    RETORNO 1: Lista de inteiros.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - A posição de leitura está no início de uma sequência.
+
+    Assertiva(s) de saída:
+    - Nenhuma.
+
+    E) DESCRIÇÃO:
+    1. Lê o tamanho e acumula as diferenças.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Nenhuma.
+    """
+    valores = []
+    atual = 0
+    for _ in range(leitor.natural()):
+        atual += leitor.inteiro()
+        valores.append(atual)
+    return valores
+
+
+def salvar_snapshot(caminho: str = SNAPSHOT_BINARIO):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: salvar_snapshot()
+
+    B) OBJETIVO:
+    Gravar todo o conjunto de dados em memória (produtos, funcionários, estoques, carrinhos e unidades) em um único arquivo binário compacto.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: caminho (string, opcional)
+    Caminho do arquivo de snapshot.
+
+    RETORNO 1: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Snapshot gravado com sucesso.", "dados": {<entidade>: <número de registros>}}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Todos os carrinhos do histórico estão em `_todos_carrinhos` (`carregar_carrinhos()` com `manter_em_memoria=True`).
+
+    Assertiva(s) de saída:
+    - O arquivo é substituído de forma atômica; uma queda durante a gravação preserva o snapshot anterior.
+
+    E) DESCRIÇÃO:
+    1. Codifica cada entidade, na ordem de dependência, como número de registros seguido dos registros:
+       a. Produto: nome, marca, categoria e código pela tabela de strings; peso, preço e preço por peso como campos numéricos; a agenda de preços, se houver, como número de entradas, cada uma com data e preços, e a posição da última aplicada.
+       b. Funcionário: código, nome, cargo e datas de contratação e desligamento.
+       c. Estoque: código, sequência do diário de estoques e, por produto, quantidades e capacidades.
+       d. Carrinho: em ordem de ID, com IDs e datas codificados pela diferença em relação ao carrinho anterior; funcionário, total e itens.
+       e. Unidade: código, nome, localização, status, estoque e funcionários por referência, os IDs e datas das vendas codificados por diferença, e a quantidade vendida de cada produto.
+    2. Monta o arquivo com `_Escritor.serializar()` e grava-o em um arquivo temporário.
+    3. Substitui o snapshot anterior com `os.replace()`.
+
+    F) HIPÓTESES:
+    - As datas do sistema estão no formato "AAAA/MM/DD".
+
+    G) RESTRIÇÕES:
+    - O snapshot é independente do mecanismo de armazenamento atual e não altera as marcações de modificação.
+    """
+    escritor = _Escritor()
+
+    escritor.natural(len(_todos_produtos))
+    for p in _todos_produtos.values():
+        escritor.texto(p.nome)
+        escritor.texto(p.marca)
+        escritor.texto(p.categoria)
+        escritor.texto(p.codigo)
+        escritor.numero(p.peso)
+        escritor.numero(p.preco)
+        escritor.numero(p.preco_por_peso)
+        agenda = _agendas_precos.get(p.codigo)
+        if agenda is None:
+            escritor.natural(0)
+            continue
+        escritor.natural(len(agenda.datas))
+        for data, (preco, preco_por_peso) in zip(agenda.datas, agenda.precos):
+            escritor.texto(data)
+            escritor.numero(preco)
+            escritor.numero(preco_por_peso)
+        escritor.natural(agenda.aplicada)
+
+    escritor.natural(len(_todos_funcionarios))
+    for f in _todos_funcionarios.values():
+        escritor.inteiro(f.codigo)
+        escritor.texto(f.nome)
+        escritor.texto(f.cargo)
+        escritor.natural(_data_para_dia(f.data_contratacao))
+        escritor.natural(_data_para_dia(f.data_desligamento))
+
+    escritor.natural(len(_todos_estoques))
+    for e in _todos_estoques.values():
+        escritor.texto(e.codigo)
+        escritor.numero(e.seq_diario)
+        escritor.natural(len(e.capacidades))
+        for p, cap in e.capacidades.items():
+            escritor.texto(p.codigo)
+            escritor.numero(e.estoque.get(p, 0))
+            escritor.numero(e.exposicao.get(p, 0))
+            escritor.numero(cap["estoque"])
+            escritor.numero(cap["exposicao"])
+
+    carrinhos = sorted(_todos_carrinhos.values(), key=lambda c: c.id)
+    escritor.natural(len(carrinhos))
+    id_anterior = dia_anterior = 0
+    for c in carrinhos:
+        dia = _data_para_dia(c.data_hora)
+        escritor.inteiro(c.id - id_anterior)
+        escritor.inteiro(dia - dia_anterior)
+        id_anterior, dia_anterior = c.id, dia
+        escritor.numero(c.funcionario.codigo if c.funcionario else None)
+        escritor.numero(c.total)
+        escritor.natural(len(c.itens))
+        for p, qtd in c.itens.items():
+            escritor.texto(p.codigo)
+            escritor.numero(qtd)
+
+    escritor.natural(len(_unidades))
+    for u in _unidades.values():
+        escritor.inteiro(u.codigo)
+        escritor.texto(u.nome)
+        escritor.real(u.localizacao[0])
+        escritor.real(u.localizacao[1])
+        escritor.natural(1 if u.ativo else 0)
+        escritor.texto(u.estoque.codigo)
+        escritor.natural(len(u.funcionarios))
+        for f in u.funcionarios:
+            escritor.inteiro(f.codigo)
+        _escrever_sequencia(escritor, u.vendas.ids())
+        _escrever_sequencia(escritor, [_data_para_dia(d) for d in u.vendas.datas()])
+        volume = u.volume_vendas()
+        escritor.natural(len(volume))
+        for codigo_produto, qtd in volume.items():
+            escritor.texto(codigo_produto)
+            escritor.numero(qtd)
+
+    conteudo = escritor.serializar()
+
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    temporario = caminho + ".tmp"
+    with open(temporario, 'wb') as f:
+        f.write(conteudo)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+    return {"retorno": 0, "mensagem": "Snapshot gravado com sucesso.", "dados": {
+        "produtos": len(_todos_produtos),
+        "funcionarios": len(_todos_funcionarios),
+        "estoques": len(_todos_estoques),
+        "carrinhos": len(carrinhos),
+        "unidades": len(_unidades)
+    }}
+
+
+def carregar_snapshot(caminho: str = SNAPSHOT_BINARIO):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: carregar_snapshot()
+
+    B) OBJETIVO:
+    Carregar para a memória todo o conjunto de dados gravado por `salvar_snapshot()`, populando os registros globais.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: caminho (string, opcional)
+    Caminho do arquivo de snapshot.
+
+    RETORNO 1: DICIONÁRIO DE ERRO POR ARQUIVO INEXISTENTE:
+    {"retorno": 1, "mensagem": "Snapshot não encontrado."}
+
+    RETORNO 2: DICIONÁRIO DE ERRO POR ARQUIVO INVÁLIDO:
+    {"retorno": 2, "mensagem": <descrição do erro>}
+
+    RETORNO 3: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Snapshot carregado com sucesso.", "dados": {<entidade>: <número de registros>}}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Nenhuma.
+
+    Assertiva(s) de saída:
+    - Os registros globais contêm os objetos do snapshot, que não são marcados como modificados.
+    - Em caso de erro, os registros globais não são alterados.
+
+    E) DESCRIÇÃO:
+    1. Lê o arquivo inteiro e valida o cabeçalho com `_Leitor`.
+    2. Decodifica as entidades na ordem em que foram gravadas, resolvendo as referências entre elas pelos objetos já decodificados.
+    3. Só após decodificar todo o arquivo, atualiza os registros globais e o último ID de carrinho conhecido.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Os registros já existentes com as mesmas chaves são substituídos; os demais são mantidos, como nas funções `carregar_*`.
+    """
+    if not os.path.exists(caminho):
+        return {"retorno": 1, "mensagem": "Snapshot não encontrado."}
+
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+
+    try:
+        leitor = _Leitor(conteudo)
+
+        produtos = {}
+        agendas = {}
+        for _ in range(leitor.natural()):
+            nome, marca, categoria, codigo = leitor.texto(), leitor.texto(), leitor.texto(), leitor.texto()
+            produtos[codigo] = Produto(nome, marca, categoria, codigo, leitor.numero(), leitor.numero(), leitor.numero())
+            entradas = leitor.natural()
+            if entradas:
+                precos = [[leitor.texto(), leitor.numero(), leitor.numero()] for _ in range(entradas)]
+                agendas[codigo] = AgendaPrecos.from_json({"precos": precos, "aplicada": leitor.natural()})
+
+        funcionarios = {}
+        for _ in range(leitor.natural()):
+            codigo, nome, cargo = leitor.inteiro(), leitor.texto(), leitor.texto()
+            contratacao = _dia_para_data(leitor.natural())
+            funcionarios[codigo] = Funcionario(nome, codigo, cargo, contratacao, _dia_para_data(leitor.natural()))
+
+        estoques = {}
+        for _ in range(leitor.natural()):
+            e = Estoque(codigo=leitor.texto(), seq_diario=leitor.numero())
+            for _ in range(leitor.natural()):
+                p = produtos[leitor.texto()]
+                e.estoque[p] = leitor.numero()
+                e.exposicao[p] = leitor.numero()
+                e.capacidades[p] = {"estoque": leitor.numero(), "exposicao": leitor.numero()}
+            estoques[e.codigo] = e
+
+        carrinhos = {}
+        id_atual = dia_atual = 0
+        for _ in range(leitor.natural()):
+            id_atual += leitor.inteiro()
+            dia_atual += leitor.inteiro()
+            codigo_funcionario = leitor.numero()
+            total = leitor.numero()
+            itens = {}
+            for _ in range(leitor.natural()):
+                p = produtos[leitor.texto()]
+                itens[p] = leitor.numero()
+            carrinhos[id_atual] = Carrinho(
+                id=id_atual,
+                data_hora=_dia_para_data(dia_atual),
+                itens=itens,
+                total=total,
+                funcionario=funcionarios.get(codigo_funcionario)
+            )
+
+        unidades = {}
+        for _ in range(leitor.natural()):
+            codigo, nome = leitor.inteiro(), leitor.texto()
+            localizacao = (leitor.real(), leitor.real())
+            ativo = leitor.natural() == 1
+            estoque = estoques[leitor.texto()]
+            lista_funcionarios = [funcionarios[leitor.inteiro()] for _ in range(leitor.natural())]
+            ids_vendas = _ler_sequencia(leitor)
+            datas_vendas = [_dia_para_data(d) for d in _ler_sequencia(leitor)]
+            volume = {}
+            for _ in range(leitor.natural()):
+                codigo_produto = leitor.texto()
+                volume[codigo_produto] = leitor.numero()
+            unidades[codigo] = Localidade(
+                nome=nome,
+                codigo=codigo,
+                estoque=estoque,
+                localizacao=localizacao,
+                funcionarios=lista_funcionarios,
+                vendas=VendasPaginadas(ids_vendas, datas_vendas),
+                ativo=ativo,
+                volume_vendas=volume
+            )
+    except (ValueError, KeyError, IndexError, struct.error) as erro:
+        return {"retorno": 2, "mensagem": f"Snapshot inválido: {erro}"}
+
+    _todos_produtos.update(produtos)
+    _agendas_precos.update(agendas)
+    _todos_funcionarios.update(funcionarios)
+    _todos_estoques.update(estoques)
+    _todos_carrinhos.update(carrinhos)
+    _unidades.update(unidades)
+    if carrinhos:
+        _modulo_carrinho._ultimo_id = max(_modulo_carrinho._ultimo_id, max(carrinhos))
+
+    return {"retorno": 0, "mensagem": "Snapshot carregado com sucesso.", "dados": {
+        "produtos": len(produtos),
+        "funcionarios": len(funcionarios),
+        "estoques": len(estoques),
+        "carrinhos": len(carrinhos),
+        "unidades": len(unidades)
+    }}
@@ -1,8 +1,11 @@
-import json
 from datetime import date, datetime
-from .funcionario import Funcionario
-from .estoque import Estoque
-from .carrinho import Carrinho
+from .armazenamento import obter_armazenamento
+from .rastreamento import Rastreavel, marcar_modificado, limpar_modificados, geracao_atual, selecionar_para_gravacao
+from .funcionario import Funcionario, _todos_funcionarios, salvar_funcionarios
+from .estoque import Estoque, _todos_estoques, salvar_estoques
+from .carrinho import Carrinho, _todos_carrinhos, salvar_carrinhos, totalizar_vendas
+from .produto import consultar_produto_por_codigo
+from .vendas_paginadas import VendasPaginadas
 
 
 __all__ = [
@@ -14,16 +17,76 @@ __all__ = [
     "atualiza_Unidade",
     "relatorio_Unidade",
     "salvar_unidades",
-    "carregar_unidades"
+    "carregar_unidades",
+    "migrar_unidades",
+    "definir_arquivo_vendas"
 ]
 
 
 UNIDADES_JSON = 'dados/unidades.json'
 
 _unidades = {}
+_arquivo_vendas = None
 
-class Localidade:
-    def __init__(self, nome: str, codigo: int, estoque: Estoque, localizacao: tuple[float, float], funcionarios: list[Funcionario], vendas:list[Carrinho], ativo:bool=True):
+
+def _resolver_referencia(valor, classe, registro: dict, campo: str, entidade: str):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: _resolver_referencia()
+
+    B) OBJETIVO:
+    Obter o objeto compartilhado referenciado por uma unidade, seja pelo identificador (formato normalizado) ou por uma cópia embutida (formato antigo).
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: valor
+    Identificador do objeto (código ou ID) ou dicionário com a cópia embutida.
+    PARÂMETRO 2: classe
+    Classe do objeto (`Estoque`, `Funcionario` ou `Carrinho`), usada para reconstruir cópias embutidas.
+    PARÂMETRO 3: registro (dicionário)
+    Registro global onde o objeto deve estar.
+    PARÂMETRO 4: campo (string)
+    Nome do atributo identificador ("codigo" ou "id").
+    PARÂMETRO 5: entidade (string)
+    Nome da entidade, usado para marcar objetos acrescentados ao registro.
+
+    RETORNO 1: O objeto encontrado ou reconstruído.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - O registro já foi carregado.
+
+    Assertiva(s) de saída:
+    - O objeto retornado está no registro global.
+
+    E) DESCRIÇÃO:
+    1. Se `valor` for um dicionário (formato antigo), extrai dele o identificador.
+    2. Se o identificador já estiver no registro, retorna o objeto registrado.
+    3. Se for uma cópia embutida ausente do registro, reconstrói o objeto com `classe.from_json()`, registra-o, marca-o como modificado e o retorna.
+    4. Se for um identificador ausente do registro, lança `ValueError`.
+
+    F) HIPÓTESES:
+    - As chaves dos registros são do mesmo tipo dos identificadores gravados.
+
+    G) RESTRIÇÕES:
+    - Função de uso interno deste módulo.
+    """
+    embutido = isinstance(valor, dict)
+    chave = valor[campo] if embutido else valor
+
+    objeto = registro.get(chave)
+    if objeto is not None:
+        return objeto
+    if not embutido:
+        raise ValueError(f"Referência {chave} não encontrada em {entidade}. Carregue-os antes das unidades.")
+
+    objeto = classe.from_json(valor)
+    marcar_modificado(entidade, objeto)
+    registro[chave] = objeto
+    return objeto
+
+
+class Localidade(Rastreavel, entidade="unidades"):
+    def __init__(self, nome: str, codigo: int, estoque: Estoque, localizacao: tuple[float, float], funcionarios: list[Funcionario], vendas:list[Carrinho], ativo:bool=True, volume_vendas: dict = None):
         """
         ESPECIFICAÇÃO DE FUNÇÃO:
         A) NOME: __init__()
@@ -47,12 +110,15 @@ class Localidade:
         PARÂMETRO 5: funcionarios (lista[Funcionario])
         Lista contendo instâncias da classe Funcionario que trabalham na unidade.
 
-        PARÂMETRO 6: vendas (lista[Carrinho])
-        Lista contendo instâncias da classe Carrinho que representam as vendas da unidade.
+        PARÂMETRO 6: vendas (VendasPaginadas ou lista[Carrinho])
+        Histórico de vendas da unidade. Uma lista de instâncias de Carrinho é convertida em `VendasPaginadas`.
 
         PARÂMETRO 7: ativo (booleano, opcional)
         Indica se a unidade está ativa. O valor padrão é True.
 
+        PARÂMETRO 8: volume_vendas (dicionário, opcional)
+        Quantidade vendida de cada produto no histórico {<código>: <quantidade>}, como gravada por `to_json()`. Se omitido, é calculada a partir do histórico na primeira chamada a `volume_vendas()`.
+
         RETORNO: Nenhum. Este é um método construtor.
 
         D) CONDIÇÕES DE ACOPLAMENTO:
@@ -81,8 +147,9 @@ class Localidade:
         self.estoque = estoque
         self.localizacao = localizacao
         self.funcionarios = funcionarios
-        self.vendas = vendas
+        self.vendas = vendas if isinstance(vendas, VendasPaginadas) else VendasPaginadas.de_carrinhos(vendas)
         self.ativo = ativo
+        self._volume_vendas = volume_vendas
 
     def to_json(self):
         """
@@ -90,31 +157,32 @@ class Localidade:
         A) NOME: to_json()
 
         B) OBJETIVO:
-        Converter (serializar) a instância atual do objeto `Localidade` em um dicionário Python, que pode ser facilmente convertido para o formato JSON.
+        Converter (serializar) a instância atual do objeto `Localidade` em um dicionário Python no formato normalizado, que referencia o estoque, os funcionários e as vendas apenas por seus identificadores.
 
         C) ACOPLAMENTO:
         PARÂMETROS: Nenhum.
 
         RETORNO 1: DICIONÁRIO SERIALIZÁVEL
-        Retorna um dicionário que representa o estado completo do objeto, incluindo seus objetos aninhados.
+        Retorna um dicionário com os atributos da unidade e as referências aos objetos compartilhados.
 
         D) CONDIÇÕES DE ACOPLAMENTO:
         Assertiva(s) de entrada:
         - `self` é uma instância válida da classe `Localidade`.
-        - Os objetos aninhados (em `self.estoque`, `self.funcionarios`, `self.vendas`) devem ter seus próprios métodos `to_json()`.
+        - O estoque, os funcionários e as vendas da unidade estão nos registros globais (`_todos_estoques`, `_todos_funcionarios`, `_todos_carrinhos`), que são persistidos separadamente.
 
         Assertiva(s) de saída:
-        - O dicionário retornado contém apenas tipos de dados primitivos (strings, números, booleanos, listas, dicionários), tornando-o compatível com JSON.
+        - O dicionário retornado contém apenas tipos de dados primitivos (strings, números, booleanos, listas), tornando-o compatível com JSON.
 
         E) DESCRIÇÃO:
         1. Cria um dicionário contendo os atributos de tipo primitivo da unidade: `nome`, `codigo`, `localizacao` e `ativo`.
-        2. Invoca o método `to_json()` do objeto `estoque` e armazena o resultado na chave "estoque".
-        3. Utiliza uma list comprehension para iterar sobre a lista de `funcionarios`, chamando o método `to_json()` para cada objeto `Funcionario` e criando uma lista de dicionários.
-        4. Realiza o mesmo processo para a lista de `vendas`, convertendo cada objeto `Carrinho` em um dicionário.
-        5. Retorna o dicionário completo e estruturado.
+        2. Armazena na chave "estoque" apenas o código do objeto `estoque`.
+        3. Armazena na chave "funcionarios" a lista de códigos dos funcionários.
+        4. Armazena na chave "vendas" a lista de IDs dos carrinhos vendidos e, na chave "datas_vendas", as datas correspondentes, obtidas sem carregar os carrinhos.
+        5. Armazena na chave "volume_vendas" a quantidade vendida de cada produto, obtida com `volume_vendas()`.
+        6. Retorna o dicionário.
 
         F) HIPÓTESES:
-        - As classes `Estoque`, `Funcionario` e `Carrinho` possuem um método `to_json()` implementado que serializa corretamente seus respectivos objetos.
+        - Nenhuma.
 
         G) RESTRIÇÕES:
         - A estrutura do dicionário de saída é fixa. Se novos atributos forem adicionados à classe, este método precisará ser atualizado para incluí-los na serialização.
@@ -123,9 +191,11 @@ class Localidade:
             "nome": self.nome,
             "codigo": self.codigo,
             "localizacao": self.localizacao,
-            "estoque": self.estoque.to_json(),
-            "funcionarios": [f.to_json() for f in self.funcionarios],
-            "vendas": [v.to_json() for v in self.vendas],
+            "estoque": self.estoque.codigo,
+            "funcionarios": [f.codigo for f in self.funcionarios],
+            "vendas": self.vendas.ids(),
+            "datas_vendas": self.vendas.datas(),
+            "volume_vendas": self.volume_vendas(),
             "ativo": self.ativo
         }
 
@@ -136,11 +206,11 @@ class Localidade:
         A) NOME: from_json()
 
         B) OBJETIVO:
-        Criar uma nova instância da classe `Localidade` a partir de um dicionário (geralmente obtido pela desserialização de um JSON), reconstruindo o objeto e seus componentes.
+        Criar uma nova instância da classe `Localidade` a partir de um dicionário (geralmente obtido pela desserialização de um JSON), ligando-a aos objetos já presentes nos registros globais em vez de criar cópias.
 
         C) ACOPLAMENTO:
         PARÂMETRO 1: data (dicionário)
-        Um dicionário contendo todos os dados necessários para recriar uma instância de `Localidade`.
+        Um dicionário no formato normalizado (gerado por `to_json`) ou no formato antigo, com cópias embutidas do estoque, funcionários e vendas.
 
         RETORNO 1: INSTÂNCIA DE LOCALIDADE
         Retorna uma nova instância da classe `Localidade` (`cls`), populada com os dados fornecidos.
@@ -148,32 +218,35 @@ class Localidade:
         D) CONDIÇÕES DE ACOPLAMENTO:
         Assertiva(s) de entrada:
         - `data` é um dicionário que contém as chaves necessárias ("nome", "codigo", "estoque", "funcionarios", "vendas", "localizacao").
-        - Os valores associados às chaves de objetos aninhados ("estoque", "funcionarios", "vendas") são representações de dicionário válidas para esses objetos.
+        - No formato normalizado, os estoques e funcionários referenciados já foram carregados nos registros globais; os carrinhos podem estar apenas no armazenamento.
 
         Assertiva(s) de saída:
-        - Uma instância completa e funcional da classe `Localidade` é retornada.
+        - Uma instância completa e funcional da classe `Localidade` é retornada, compartilhando os objetos dos registros globais.
 
         E) DESCRIÇÃO:
         1. Sendo um método de classe (`@classmethod`), ele opera sobre a classe (`cls`) em si, e não sobre uma instância.
-        2. Reconstrói o objeto `Estoque` chamando o método de classe `Estoque.from_json()`.
-        3. Reconstrói a lista de funcionários iterando sobre os dados em `data["funcionarios"]` e chamando `Funcionario.from_json()` para cada item.
-        4. Reconstrói a lista de vendas de forma análoga, usando `Carrinho.from_json()`.
-        5. Invoca o construtor da própria classe (`cls(...)`), passando os dados primitivos extraídos do dicionário (`nome`, `codigo`) e os objetos complexos recém-criados (`estoque`, `funcionarios`, `vendas`).
-        6. Garante que `localizacao` seja uma tupla.
-        7. Usa `data.get("ativo", True)` para obter o status, mantendo a compatibilidade com arquivos JSON mais antigos que possam não ter essa chave.
+        2. Resolve o estoque e cada funcionário com `_resolver_referencia()`, que aceita tanto um identificador quanto uma cópia embutida (formato antigo).
+        3. No formato normalizado, cria um `VendasPaginadas` apenas com os IDs e as datas das vendas, que serão buscadas no armazenamento sob demanda; no formato antigo, resolve cada venda embutida com `_resolver_referencia()`.
+        4. Invoca o construtor da própria classe (`cls(...)`), passando os dados primitivos extraídos do dicionário (`nome`, `codigo`) e os objetos resolvidos (`estoque`, `funcionarios`, `vendas`).
+        5. Garante que `localizacao` seja uma tupla.
+        6. Usa `data.get("ativo", True)` para obter o status, mantendo a compatibilidade com arquivos JSON mais antigos que possam não ter essa chave.
+        7. Repassa o volume de vendas gravado ("volume_vendas"), se houver; nos registros mais antigos, ele é calculado a partir do histórico quando for pedido.
         8. Retorna a nova instância criada.
 
         F) HIPÓTESES:
-        - As classes `Estoque`, `Funcionario` e `Carrinho` possuem um método de classe `from_json()` capaz de recriar suas instâncias a partir de um dicionário.
-        - A estrutura e as chaves do dicionário `data` correspondem exatamente ao que o método espera.
+        - As funções `carregar_estoques()` e `carregar_funcionarios()` foram executadas antes.
 
         G) RESTRIÇÕES:
         - O método levantará uma exceção `KeyError` se uma chave obrigatória (como "nome" ou "estoque") estiver faltando no dicionário `data`.
-        - Não há validação interna sobre os tipos ou valores dos dados dentro do dicionário `data`.
+        - Lança `ValueError` se um identificador de estoque ou funcionário não existir no registro correspondente; vendas inexistentes só são detectadas quando acessadas.
         """
-        estoque = Estoque.from_json(data["estoque"])
-        funcionarios = [Funcionario.from_json(f) for f in data["funcionarios"]]
-        vendas = [Carrinho.from_json(v) for v in data["vendas"]]
+        estoque = _resolver_referencia(data["estoque"], Estoque, _todos_estoques, "codigo", "estoques")
+        funcionarios = [_resolver_referencia(f, Funcionario, _todos_funcionarios, "codigo", "funcionarios")
+                        for f in data["funcionarios"]]
+        if all(isinstance(v, int) for v in data["vendas"]):
+            vendas = VendasPaginadas(data["vendas"], data.get("datas_vendas"))
+        else:
+            vendas = [_resolver_referencia(v, Carrinho, _todos_carrinhos, "id", "carrinhos") for v in data["vendas"]]
 
         return cls(
             nome=data["nome"],
@@ -182,7 +255,8 @@ class Localidade:
             estoque=estoque,
             funcionarios=funcionarios,
             vendas=vendas,
-            ativo=data.get("ativo", True)
+            ativo=data.get("ativo", True),
+            volume_vendas=data.get("volume_vendas")
         )
 
     def atualizar(self, atributo:str, valor):
@@ -235,6 +309,130 @@ class Localidade:
         setattr(self, atributo, valor)
         return {"retorno": 0, "mensagem": f"Atributo '{atributo}' atualizado com sucesso."}
 
+    def registrar_venda(self, carrinho: Carrinho):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: registrar_venda() (Método de Localidade)
+
+        B) OBJETIVO:
+        Acrescentar um carrinho finalizado ao histórico de vendas da unidade.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: carrinho (Carrinho)
+        O carrinho já finalizado e com a baixa de estoque realizada.
+
+        RETORNO 1: DICIONÁRIO DE SUCESSO:
+        {"retorno": 0, "mensagem": "Venda registrada na unidade"}
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `carrinho` é uma instância de `Carrinho`.
+
+        Assertiva(s) de saída:
+        - O carrinho é o último elemento de `self.vendas`.
+        - A unidade consta entre as unidades modificadas.
+        - Se houver um arquivo de vendas definido, a venda foi anexada à partição do seu mês.
+        - Se o volume de vendas da unidade já era conhecido, ele inclui as quantidades do carrinho.
+
+        E) DESCRIÇÃO:
+        1. Marca a unidade como modificada.
+        2. Acrescenta o carrinho ao histórico `self.vendas`, sem carregar as vendas anteriores.
+        3. Se o volume de vendas já foi calculado ou carregado, soma a ele a quantidade de cada item do carrinho; caso contrário, ele será calculado com o histórico completo, que já inclui esta venda.
+        4. Se `definir_arquivo_vendas()` tiver definido um arquivo, arquiva a venda nele.
+        5. Retorna um dicionário de sucesso.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Não valida se o carrinho já pertence ao histórico.
+        """
+        marcar_modificado("unidades", self)
+        self.vendas.append(carrinho)
+        if self._volume_vendas is not None:
+            for produto, quantidade in carrinho.itens.items():
+                self._volume_vendas[produto.codigo] = self._volume_vendas.get(produto.codigo, 0) + quantidade
+        if _arquivo_vendas is not None:
+            _arquivo_vendas.arquivar(self.codigo, carrinho)
+        return {"retorno": 0, "mensagem": "Venda registrada na unidade"}
+
+    def volume_vendas(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: volume_vendas() (Método de Localidade)
+
+        B) OBJETIVO:
+        Obter a quantidade vendida de cada produto no histórico da unidade, usada para ordenar as sugestões do autocompletar.
+
+        C) ACOPLAMENTO:
+        Nenhum parâmetro.
+
+        RETORNO 1: Dicionário {<código do produto>: <quantidade vendida>}.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - O dicionário reflete todas as vendas registradas na unidade.
+
+        E) DESCRIÇÃO:
+        1. Se o volume ainda não é conhecido (unidade criada sem ele, como as gravadas antes de ele ser persistido), percorre o histórico uma única vez, somando as quantidades de cada produto, e guarda o resultado com `object.__setattr__`, pois o cálculo não altera a unidade e não deve marcá-la como modificada.
+        2. Retorna o volume guardado, mantido em dia por `registrar_venda()`.
+
+        F) HIPÓTESES:
+        - O histórico só cresce por `registrar_venda()`.
+
+        G) RESTRIÇÕES:
+        - O dicionário retornado é o interno da unidade; quem precisar alterá-lo deve copiá-lo.
+        - O cálculo inicial carrega todos os carrinhos do histórico; depois disso, o custo é O(1).
+        """
+        if self._volume_vendas is None:
+            volume = {}
+            for venda in self.vendas:
+                for produto, quantidade in venda.itens.items():
+                    volume[produto.codigo] = volume.get(produto.codigo, 0) + quantidade
+            object.__setattr__(self, "_volume_vendas", volume)
+        return self._volume_vendas
+
+    def adicionar_funcionario(self, funcionario: Funcionario):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: adicionar_funcionario() (Método de Localidade)
+
+        B) OBJETIVO:
+        Vincular um funcionário à unidade.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: funcionario (Funcionario)
+        O funcionário a ser vinculado.
+
+        RETORNO 1: DICIONÁRIO DE SUCESSO:
+        {"retorno": 0, "mensagem": "Funcionário vinculado à unidade"}
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `funcionario` é uma instância de `Funcionario`.
+
+        Assertiva(s) de saída:
+        - O funcionário é o último elemento de `self.funcionarios`.
+        - A unidade consta entre as unidades modificadas.
+
+        E) DESCRIÇÃO:
+        1. Marca a unidade como modificada.
+        2. Acrescenta o funcionário à lista `self.funcionarios`.
+        3. Retorna um dicionário de sucesso.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Não valida se o funcionário já está vinculado.
+        """
+        marcar_modificado("unidades", self)
+        self.funcionarios.append(funcionario)
+        return {"retorno": 0, "mensagem": "Funcionário vinculado à unidade"}
+
 def salvar_unidades():
     """
     ESPECIFICAÇÃO DE FUNÇÃO:
@@ -246,7 +444,7 @@ def salvar_unidades():
     C) ACOPLAMENTO:
     PARÂMETROS: Nenhum.
 
-    RETORNO: Nenhum valor explícito é retornado. A função realiza uma operação de I/O, escrevendo em um arquivo.
+    RETORNO 1: Número de registros gravados (inteiro). Zero indica que nada havia mudado desde a última gravação.
 
     D) CONDIÇÕES DE ACOPLAMENTO:
     Assertiva(s) de entrada:
@@ -257,12 +455,13 @@ def salvar_unidades():
     - O arquivo contém a representação JSON de todas as unidades presentes no dicionário `_unidades`.
 
     E) DESCRIÇÃO:
-    1. Inicializa um dicionário temporário `json_unidades` para armazenar a versão serializável das unidades.
-    2. Itera sobre cada par chave-valor (código, objeto unidade) no dicionário global `_unidades`.
-    3. Para cada objeto de unidade, invoca o seu método `to_json()` para obter um dicionário que representa o estado do objeto.
-    4. Adiciona este dicionário ao `json_unidades`, usando o código original da unidade como chave.
-    5. Abre o arquivo de destino (definido em `UNIDADES_JSON`) em modo de escrita ("w") com codificação "utf-8".
-    6. Utiliza a função `json.dump()` para escrever o dicionário `json_unidades` no arquivo, formatando-o com indentação para melhor legibilidade.
+    1. Obtém o mecanismo de armazenamento atual (`obter_armazenamento()`).
+    2. Usa `selecionar_para_gravacao()` para escolher as unidades a gravar: nenhuma, se nada foi modificado desde a última gravação; apenas as modificadas, se o mecanismo suporta gravação parcial; ou todas, se o arquivo precisa ser reescrito (JSON em `UNIDADES_JSON`).
+    3. Para cada unidade escolhida, invoca seu método `to_json()` (formato normalizado), usando o código da unidade como chave.
+    4. Entrega o dicionário resultante ao mecanismo de armazenamento, se houver algo a gravar.
+    5. Limpa as marcações de modificação da entidade "unidades" feitas até o início da gravação (objetos alterados durante a gravação continuam marcados).
+    6. Se houver um arquivo de vendas definido, grava os seus manifestos pendentes com `gravar_manifestos()`, para que acompanhem os históricos gravados.
+    7. Retorna o número de registros gravados.
 
     F) HIPÓTESES:
     - Existe um dicionário global `_unidades` que serve como repositório em memória para os objetos `Localidade`.
@@ -271,18 +470,24 @@ def salvar_unidades():
     - O diretório que conterá o arquivo JSON (`dados/`) existe e o programa tem permissão de escrita no local.
 
     G) RESTRIÇÕES:
-    - A função sobrescreve completamente o arquivo `unidades.json` a cada chamada, sem criar backups.
+    - O estoque, os funcionários e as vendas são gravados apenas por referência; `salvar_estoques`, `salvar_funcionarios` e `salvar_carrinhos` devem ser chamadas para persisti-los.
+    - Quando há alterações, a função sobrescreve completamente o arquivo `unidades.json`, sem criar backups.
     - Erros de I/O (ex: disco cheio, permissão negada) não são tratados internamente e podem interromper o programa.
     """
-    json_unidades = {}
+    armazenamento = obter_armazenamento()
+    geracao = geracao_atual()
+    alterados = selecionar_para_gravacao("unidades", _unidades, lambda u: u.codigo, armazenamento.suporta_parcial)
 
-    for codigo, unidade in _unidades.items():
-        json_unidades[codigo] = unidade.to_json()
+    if alterados:
+        json_unidades = {codigo: u.to_json() for codigo, u in alterados.items()}
+        armazenamento.salvar("unidades", json_unidades)
 
-    with open(UNIDADES_JSON, "w", encoding="utf-8") as f:
-        json.dump(json_unidades, f, ensure_ascii=False, indent=4)
+    limpar_modificados("unidades", ate=geracao)
+    if _arquivo_vendas is not None:
+        _arquivo_vendas.gravar_manifestos()
+    return len(alterados)
 
-def carregar_unidades():
+def carregar_unidades(registros: dict = None):
     """
     ESPECIFICAÇÃO DE FUNÇÃO:
     A) NOME: carregar_unidades()
@@ -291,7 +496,8 @@ def carregar_unidades():
     Ler os dados de unidades de um arquivo JSON e carregá-los para a memória, populando o dicionário global `_unidades` com instâncias da classe `Localidade`.
 
     C) ACOPLAMENTO:
-    PARÂMETROS: Nenhum.
+    PARÂMETRO 1: registros (dicionário, opcional)
+    Registros já lidos do armazenamento (ex: pela carga paralela de `carga_paralela.py`). Se omitido, são lidos do armazenamento atual.
 
     RETORNO: Nenhum valor explícito é retornado. A função modifica o estado do dicionário global `_unidades`.
 
@@ -305,32 +511,87 @@ def carregar_unidades():
     - Se o arquivo não for encontrado, o dicionário `_unidades` permanece inalterado.
 
     E) DESCRIÇÃO:
-    1. Utiliza um bloco `try-except` para lidar com a ausência do arquivo.
-    2. Tenta abrir o arquivo definido em `UNIDADES_JSON` em modo de leitura ("r").
-    3. Se o arquivo for aberto com sucesso, utiliza `json.load()` para desserializar seu conteúdo em um dicionário `json_unidades`.
-    4. Caso o arquivo não exista (`FileNotFoundError`), a função termina sua execução silenciosamente.
-    5. Itera sobre cada par chave-valor (código, dados da unidade) no dicionário `json_unidades` lido do arquivo.
-    6. Para cada unidade, invoca o método de classe `Localidade.from_json()`, passando os dados da unidade para criar uma nova instância do objeto.
-    7. Armazena a instância recém-criada no dicionário global `_unidades`, usando seu código (convertido para inteiro) como chave.
+    1. Se `registros` não foi informado, solicita ao mecanismo de armazenamento atual (`obter_armazenamento()`) um iterador sobre os registros da entidade "unidades", que os lê um a um.
+    2. Se não houver dados persistidos, o iterador é vazio e nada é carregado.
+    3. Itera sobre cada par chave-valor (código, dados da unidade) entregue pelo iterador.
+    4. Para cada unidade, invoca o método de classe `Localidade.from_json()`, que liga a unidade aos objetos dos registros globais.
+    5. Se o registro estava no formato antigo (com cópias embutidas), marca a unidade como modificada para que a próxima gravação a normalize.
+    6. Armazena a instância recém-criada no dicionário global `_unidades`, usando seu código (convertido para inteiro) como chave.
 
     F) HIPÓTESES:
     - Existe um dicionário global `_unidades` destinado a armazenar os objetos `Localidade`.
     - A constante `UNIDADES_JSON` aponta para o caminho correto do arquivo de dados.
     - A classe `Localidade` implementa um método de classe `from_json(data)` capaz de reconstruir uma instância a partir de um dicionário.
     - A estrutura de dados dentro do arquivo JSON é consistente com a esperada pelo método `Localidade.from_json()`.
+    - Os estoques, funcionários e carrinhos já foram carregados.
 
     G) RESTRIÇÕES:
     - A função não realiza validação da integridade ou do esquema dos dados lidos do JSON.
     - Erros de formatação no JSON ou inconsistências de dados (ex: chaves faltando) podem levantar exceções (`JSONDecodeError`, `KeyError`) não tratadas, interrompendo o carregamento.
     """
-    try:
-        with open(UNIDADES_JSON, "r", encoding="utf-8") as f:
-            json_unidades = json.load(f)
-    except FileNotFoundError:
-        return
+    pares = registros.items() if registros is not None else obter_armazenamento().iterar("unidades")
+    for codigo, unidade_json in pares:
+        unidade = Localidade.from_json(unidade_json)
+        if isinstance(unidade_json["estoque"], dict):
+            # Formato antigo: será regravado no formato normalizado
+            marcar_modificado("unidades", unidade)
+        _unidades[int(codigo)] = unidade
+
+
+def migrar_unidades():
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: migrar_unidades()
+
+    B) OBJETIVO:
+    Converter, de uma só vez, os registros de unidades gravados no formato antigo (com cópias embutidas do estoque, funcionários e vendas) para o formato normalizado, que guarda apenas referências.
+
+    C) ACOPLAMENTO:
+    PARÂMETROS: Nenhum.
+
+    RETORNO 1: DICIONÁRIO DE AVISO SE NÃO HÁ O QUE MIGRAR:
+    {"retorno": 1, "mensagem": "Nenhuma unidade no formato antigo", "dados": 0}
+
+    RETORNO 2: DICIONÁRIO DE SUCESSO:
+    {"retorno": 0, "mensagem": "Unidades migradas com sucesso", "dados": <número de unidades migradas>}
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - Os produtos, funcionários, estoques e carrinhos já foram carregados.
+
+    Assertiva(s) de saída:
+    - Todos os registros de unidades no armazenamento estão no formato normalizado.
+    - Estoques, funcionários e carrinhos que só existiam embutidos nas unidades foram gravados nos seus próprios registros.
+
+    E) DESCRIÇÃO:
+    1. Lê os registros brutos da entidade "unidades" no armazenamento atual.
+    2. Seleciona os registros no formato antigo (cujo campo "estoque" é um dicionário). Se não houver nenhum, retorna o aviso.
+    3. Para cada um, usa a unidade já carregada em `_unidades` ou a cria com `Localidade.from_json()`, que acrescenta aos registros globais os objetos embutidos ausentes.
+    4. Marca cada unidade como modificada.
+    5. Grava estoques, funcionários e carrinhos antes das unidades, para que as referências gravadas sempre apontem para registros existentes.
+    6. Retorna o número de unidades migradas.
+
+    F) HIPÓTESES:
+    - Os identificadores dos objetos embutidos coincidem com os dos registros globais quando ambos existem.
+
+    G) RESTRIÇÕES:
+    - Quando um objeto existe tanto embutido quanto no registro global, a versão do registro global prevalece.
+    """
+    json_unidades = obter_armazenamento().carregar("unidades")
+    antigas = [codigo for codigo, u in json_unidades.items() if isinstance(u["estoque"], dict)]
+    if not antigas:
+        return {"retorno": 1, "mensagem": "Nenhuma unidade no formato antigo", "dados": 0}
+
+    for codigo in antigas:
+        unidade = _unidades.get(int(codigo)) or Localidade.from_json(json_unidades[codigo])
+        marcar_modificado("unidades", unidade)
+        _unidades[int(codigo)] = unidade
 
-    for codigo, unidade_json in json_unidades.items():
-        _unidades[int(codigo)] = Localidade.from_json(unidade_json)
+    salvar_estoques()
+    salvar_funcionarios()
+    salvar_carrinhos()
+    salvar_unidades()
+    return {"retorno": 0, "mensagem": "Unidades migradas com sucesso", "dados": len(antigas)}
 
 
 def adiciona_Unidade(codigo:int, nome:str, localizacao:tuple[float,float], estoque:Estoque=None, funcionarios:list[Funcionario]=None, vendas: list[Carrinho]=None):
@@ -389,10 +650,11 @@ def adiciona_Unidade(codigo:int, nome:str, localizacao:tuple[float,float], estoq
     2. Valida se os tipos de dados dos parâmetros estão corretos.
     3. Verifica no dicionário `_unidades` se o `codigo` fornecido já existe para evitar duplicatas.
     4. Garante que a string `nome` não está vazia.
-    5. Se os parâmetros opcionais (`estoque`, `funcionarios`, `vendas`) não forem fornecidos, inicializa-os com valores padrão (vazios).
-    6. Cria uma nova instância do objeto `Localidade` com os dados validados.
-    7. Adiciona a nova unidade ao dicionário global `_unidades`, usando o `codigo` como chave.
-    8. Retorna um dicionário indicando o sucesso da operação.
+    5. Se os parâmetros opcionais (`estoque`, `funcionarios`, `vendas`) não forem fornecidos, inicializa-os com valores padrão (vazios); o estoque padrão "EST<codigo>" é reaproveitado se já estiver registrado.
+    6. Registra nos registros globais (`_todos_estoques`, `_todos_funcionarios`, `_todos_carrinhos`) os objetos recebidos que ainda não estão lá, pois a unidade é persistida apenas com referências a eles.
+    7. Cria uma nova instância do objeto `Localidade` com os dados validados.
+    8. Adiciona a nova unidade ao dicionário global `_unidades`, usando o `codigo` como chave.
+    9. Retorna um dicionário indicando o sucesso da operação.
 
     F) HIPÓTESES:
     - Existe um dicionário global chamado `_unidades` que armazena as instâncias de `Localidade`.
@@ -418,12 +680,21 @@ def adiciona_Unidade(codigo:int, nome:str, localizacao:tuple[float,float], estoq
         return {'retorno': 2, 'mensagem': 'Nome obrigatório'}
 
     if estoque is None:
-        estoque = Estoque(codigo=f"EST{codigo}")
+        estoque = _todos_estoques.get(f"EST{codigo}") or Estoque(codigo=f"EST{codigo}")
     if funcionarios is None:
         funcionarios = []
     if vendas is None:
         vendas = []
 
+    # A unidade guarda apenas referências; os objetos precisam estar nos registros globais
+    for objeto, registro, chave, entidade in (
+            [(estoque, _todos_estoques, estoque.codigo, "estoques")]
+            + [(f, _todos_funcionarios, f.codigo, "funcionarios") for f in funcionarios]
+            + [(v, _todos_carrinhos, v.id, "carrinhos") for v in vendas]):
+        if chave not in registro:
+            marcar_modificado(entidade, objeto)
+            registro[chave] = objeto
+
     nova_unidade = Localidade(
         nome=nome,
         codigo=codigo,
@@ -433,6 +704,7 @@ def adiciona_Unidade(codigo:int, nome:str, localizacao:tuple[float,float], estoq
         vendas=vendas
     )
 
+    marcar_modificado("unidades", nova_unidade)
     _unidades[codigo] = nova_unidade
     return {'retorno': 0, 'mensagem': 'Unidade adicionada com sucesso'}
 
@@ -775,14 +1047,14 @@ def relatorio_Unidade(codigo:int, periodo:tuple[str,str], incluir_inativas:bool=
     4. Se `incluir_inativas` for `False`, verifica se a unidade está ativa. Se não estiver, retorna erro.
     5. Tenta converter as strings de data do `periodo` para objetos `date`. Se o formato for inválido, retorna erro.
     6. Valida se a data de início não é futura e não é posterior à data de fim.
-    7. Itera sobre as vendas da unidade, filtrando aquelas cuja data está dentro do período especificado.
+    7. Itera sobre as vendas da unidade dentro do período: se houver um arquivo de vendas definido, lê apenas as partições mensais que se sobrepõem ao período; caso contrário, ou se uma partição estiver corrompida (`ValueError`), usa `iterar_periodo()` do histórico, que busca no armazenamento apenas as páginas de vendas necessárias, e obtém os totais com `totalizar_vendas()`.
     8. Itera sobre os funcionários, filtrando eventos de contratação e desligamento que ocorreram no período.
     9. Se nenhuma movimentação (vendas ou funcionários) for encontrada, retorna um relatório vazio com a mensagem "Sem dados".
     10. Monta o dicionário de relatório com os dados coletados e retorna-o.
 
     F) HIPÓTESES:
     - Existe um dicionário global `_unidades`.
-    - Os objetos de unidade possuem listas `vendas` (com objetos `Carrinho`) e `funcionarios` (com objetos `Funcionario`).
+    - Os objetos de unidade possuem um histórico `vendas` (`VendasPaginadas`) e uma lista `funcionarios` (com objetos `Funcionario`).
     - Os objetos `Carrinho` e `Funcionario` possuem atributos de data ("data_hora", "data_contratacao", "data_desligamento") como strings no formato "AAAA/MM/DD".
 
     G) RESTRIÇÕES:
@@ -816,15 +1088,32 @@ def relatorio_Unidade(codigo:int, periodo:tuple[str,str], incluir_inativas:bool=
 
     vendas_no_periodo = []
     renda_no_periodo = 0
-    for venda in unidade_obj.vendas:
-        if venda.data_hora is None:
-            continue
-        data_venda = datetime.strptime(venda.data_hora, "%Y/%m/%d").date()
-        if data_inicio <= data_venda <= data_fim:
-            if venda.total is not None:
-                total = venda.total
-            else:
-                total = venda.calcula_total()
+    inicio, fim = data_inicio.strftime("%Y/%m/%d"), data_fim.strftime("%Y/%m/%d")
+    arquivadas = None
+    if _arquivo_vendas is not None:
+        try:
+            arquivadas = list(_arquivo_vendas.iterar_periodo(codigo, inicio, fim))
+        except ValueError:
+            # Partição corrompida: o histórico da unidade continua sendo a fonte das vendas
+            arquivadas = None
+    if arquivadas is not None:
+        nomes = {}
+        for venda in arquivadas:
+            for cod_produto in venda['itens']:
+                if cod_produto not in nomes:
+                    res = consultar_produto_por_codigo(cod_produto)
+                    nomes[cod_produto] = res['dados'].nome if res['retorno'] == 0 else cod_produto
+            vendas_no_periodo.append({
+                'id_venda': venda['id'],
+                'data': venda['data_hora'],
+                'itens': [(nomes[cod_produto], qtd) for cod_produto, qtd in venda['itens'].items()],
+                'total': venda['total']
+            })
+            renda_no_periodo += venda['total']
+    else:
+        vendas = list(unidade_obj.vendas.iterar_periodo(inicio, fim))
+        totais = totalizar_vendas(vendas)
+        for venda, total in zip(vendas, totais):
             vendas_no_periodo.append({
                 'id_venda': venda.id,
                 'data': venda.data_hora,
@@ -871,3 +1160,40 @@ def relatorio_Unidade(codigo:int, periodo:tuple[str,str], incluir_inativas:bool=
     if incluir_inativas:
         resultado['ativo'] = unidade_obj.ativo
     return resultado
+
+
+def definir_arquivo_vendas(arquivo):
+    """
+    ESPECIFICAÇÃO DE FUNÇÃO:
+    A) NOME: definir_arquivo_vendas()
+
+    B) OBJETIVO:
+    Ativar (ou desativar) o arquivo particionado que recebe as vendas registradas nas unidades e atende os relatórios.
+
+    C) ACOPLAMENTO:
+    PARÂMETRO 1: arquivo (ArquivoVendas, ou None)
+    Arquivo a ser usado. `None` desativa o arquivamento, e os relatórios voltam a percorrer o histórico das unidades.
+
+    RETORNO: Nenhum.
+
+    D) CONDIÇÕES DE ACOPLAMENTO:
+    Assertiva(s) de entrada:
+    - O arquivo está sincronizado com o histórico das unidades (ver `ArquivoVendas.sincronizar()`).
+
+    Assertiva(s) de saída:
+    - As próximas vendas registradas são arquivadas, e `relatorio_Unidade()` lê as vendas do arquivo.
+
+    E) DESCRIÇÃO:
+    1. Se já havia outro arquivo definido, grava os seus manifestos pendentes com `gravar_manifestos()`.
+    2. Atualiza a variável global `_arquivo_vendas`.
+
+    F) HIPÓTESES:
+    - Nenhuma.
+
+    G) RESTRIÇÕES:
+    - Há um único arquivo de vendas para todas as unidades do sistema.
+    """
+    global _arquivo_vendas
+    if _arquivo_vendas is not None and _arquivo_vendas is not arquivo:
+        _arquivo_vendas.gravar_manifestos()
+    _arquivo_vendas = arquivo
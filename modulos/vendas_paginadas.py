@@ -0,0 +1,453 @@
+from .armazenamento import obter_armazenamento
+from .carrinho import Carrinho, _todos_carrinhos
+
+
+__all__ = [
+    "VendasPaginadas"
+]
+
+
+TAMANHO_PAGINA = 500
+
+
+class VendasPaginadas:
+
+    def __init__(self, ids: list = None, datas: list = None, tamanho_pagina: int = TAMANHO_PAGINA):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __init__()
+
+        B) OBJETIVO:
+        Criar o histórico de vendas de uma unidade a partir apenas dos IDs dos carrinhos, sem carregá-los na memória.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: ids (lista de inteiros, opcional)
+        IDs dos carrinhos vendidos, em ordem cronológica.
+        PARÂMETRO 2: datas (lista de strings, opcional)
+        Datas ("AAAA/MM/DD") das vendas, na mesma ordem de `ids`. Usadas para filtrar por período sem ler os carrinhos; `None` indica data desconhecida.
+        PARÂMETRO 3: tamanho_pagina (inteiro, opcional)
+        Número de carrinhos buscados no armazenamento de cada vez.
+
+        RETORNO: Nenhum (é um método construtor).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Se `datas` for fornecida, tem o mesmo tamanho de `ids`.
+
+        Assertiva(s) de saída:
+        - Uma nova instância de `VendasPaginadas` é criada, sem nenhum carrinho residente.
+
+        E) DESCRIÇÃO:
+        1. Copia as listas de IDs e de datas (preenchendo as datas com `None` se não forem fornecidas).
+        2. Inicializa o dicionário de carrinhos residentes, que guarda as vendas acrescentadas nesta sessão, e o cache dos carrinhos lidos de um armazenamento sem índice (ver `_carregar_pagina()`).
+
+        F) HIPÓTESES:
+        - Os carrinhos referenciados estão persistidos no armazenamento atual ou presentes em `_todos_carrinhos`.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        self._ids = list(ids) if ids is not None else []
+        self._datas = list(datas) if datas is not None else [None] * len(self._ids)
+        self._residentes = {}
+        self._lidos = {}
+        self.tamanho_pagina = tamanho_pagina
+
+    @classmethod
+    def de_carrinhos(cls, carrinhos: list):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: de_carrinhos()
+
+        B) OBJETIVO:
+        Criar um histórico de vendas a partir de objetos `Carrinho` já presentes na memória.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: carrinhos (lista de Carrinho)
+        Carrinhos vendidos, em ordem cronológica.
+
+        RETORNO 1: Uma nova instância de `VendasPaginadas`.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Os elementos de `carrinhos` são instâncias de `Carrinho`.
+
+        Assertiva(s) de saída:
+        - Todos os carrinhos recebidos são residentes na instância retornada.
+
+        E) DESCRIÇÃO:
+        1. Cria uma instância vazia.
+        2. Acrescenta cada carrinho com `append()`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        vendas = cls()
+        for carrinho in carrinhos:
+            vendas.append(carrinho)
+        return vendas
+
+    def append(self, carrinho: Carrinho):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: append()
+
+        B) OBJETIVO:
+        Acrescentar uma venda ao final do histórico, mantendo o carrinho na memória.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: carrinho (Carrinho)
+        O carrinho vendido.
+
+        RETORNO: Nenhum.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `carrinho` é uma instância de `Carrinho`.
+
+        Assertiva(s) de saída:
+        - O carrinho é o último elemento do histórico e permanece residente.
+
+        E) DESCRIÇÃO:
+        1. Acrescenta o ID e a data atual do carrinho às listas internas.
+        2. Guarda o carrinho no dicionário de residentes.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Custo constante; não acessa o armazenamento.
+        """
+        self._ids.append(carrinho.id)
+        self._datas.append(carrinho.data_hora)
+        self._residentes[carrinho.id] = carrinho
+
+    def __len__(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __len__()
+
+        B) OBJETIVO:
+        Informar o número de vendas do histórico.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: Número de vendas (inteiro).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Nenhum carrinho é carregado.
+
+        E) DESCRIÇÃO:
+        1. Retorna o tamanho da lista de IDs.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        return len(self._ids)
+
+    def __iter__(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __iter__()
+
+        B) OBJETIVO:
+        Percorrer todas as vendas do histórico, em ordem, buscando os carrinhos ausentes da memória em páginas.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: GERADOR de objetos `Carrinho`.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Os carrinhos buscados no armazenamento não ficam retidos após o uso.
+
+        E) DESCRIÇÃO:
+        1. Divide a lista de IDs em páginas de `tamanho_pagina`.
+        2. Para cada página, obtém os carrinhos com `_carregar_pagina()`.
+        3. Entrega os carrinhos na ordem dos IDs.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lança `ValueError` se uma venda não for encontrada em lugar nenhum.
+        """
+        for inicio in range(0, len(self._ids), self.tamanho_pagina):
+            pagina = self._ids[inicio:inicio + self.tamanho_pagina]
+            carregados = self._carregar_pagina(pagina)
+            for id in pagina:
+                yield carregados[id]
+
+    def __getitem__(self, indice):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: __getitem__()
+
+        B) OBJETIVO:
+        Acessar uma venda (ou uma fatia do histórico) pela posição.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: indice (inteiro ou slice)
+        Posição da venda, aceitando índices negativos, ou fatia de posições.
+
+        RETORNO 1: Um objeto `Carrinho` (índice inteiro) ou uma lista de `Carrinho` (fatia).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Se inteiro, `indice` está dentro dos limites do histórico.
+
+        Assertiva(s) de saída:
+        - Apenas os carrinhos pedidos são buscados no armazenamento.
+
+        E) DESCRIÇÃO:
+        1. Seleciona os IDs correspondentes ao índice ou à fatia.
+        2. Obtém os carrinhos com `_carregar_pagina()`.
+        3. Retorna o carrinho ou a lista de carrinhos.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Lança `IndexError` para índices fora dos limites.
+        """
+        if isinstance(indice, slice):
+            ids = self._ids[indice]
+            carregados = self._carregar_pagina(ids)
+            return [carregados[id] for id in ids]
+
+        id = self._ids[indice]
+        return self._carregar_pagina([id])[id]
+
+    def ids(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: ids()
+
+        B) OBJETIVO:
+        Obter os IDs das vendas, na ordem do histórico.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: Lista de inteiros.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - A lista retornada é uma cópia.
+
+        E) DESCRIÇÃO:
+        1. Retorna uma cópia da lista de IDs.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        return list(self._ids)
+
+    def datas(self):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: datas()
+
+        B) OBJETIVO:
+        Obter as datas das vendas, na ordem do histórico, sem carregar os carrinhos.
+
+        C) ACOPLAMENTO:
+        PARÂMETROS: Nenhum.
+
+        RETORNO 1: Lista de strings "AAAA/MM/DD" (ou `None` para datas desconhecidas).
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Nenhuma.
+
+        Assertiva(s) de saída:
+        - Para carrinhos residentes, a data reflete o estado atual do objeto.
+
+        E) DESCRIÇÃO:
+        1. Retorna a data de cada posição com `_data()`.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Nenhuma.
+        """
+        return [self._data(posicao) for posicao in range(len(self._ids))]
+
+    def iterar_periodo(self, inicio: str, fim: str):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: iterar_periodo()
+
+        B) OBJETIVO:
+        Percorrer apenas as vendas realizadas dentro de um período, sem buscar no armazenamento as que sabidamente estão fora dele.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: inicio (string)
+        Data inicial do período, no formato "AAAA/MM/DD" (inclusiva).
+        PARÂMETRO 2: fim (string)
+        Data final do período, no formato "AAAA/MM/DD" (inclusiva).
+
+        RETORNO 1: GERADOR de objetos `Carrinho` cuja `data_hora` está no período.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - As datas estão no formato "AAAA/MM/DD", com mês e dia com dois dígitos.
+
+        Assertiva(s) de saída:
+        - Vendas sem data (carrinhos não finalizados) não são entregues.
+
+        E) DESCRIÇÃO:
+        1. Divide a lista de IDs em páginas de `tamanho_pagina`.
+        2. Em cada página, descarta as posições cuja data conhecida está fora do período.
+        3. Busca os carrinhos restantes com `_carregar_pagina()`.
+        4. Entrega, em ordem, os que de fato têm `data_hora` dentro do período.
+
+        F) HIPÓTESES:
+        - O formato "AAAA/MM/DD" permite comparar datas como strings.
+
+        G) RESTRIÇÕES:
+        - Vendas com data desconhecida (históricos antigos) precisam ser buscadas para serem filtradas.
+        """
+        for pos_inicio in range(0, len(self._ids), self.tamanho_pagina):
+            candidatos = []
+            for posicao in range(pos_inicio, min(pos_inicio + self.tamanho_pagina, len(self._ids))):
+                data = self._data(posicao)
+                if data is None or inicio <= data <= fim:
+                    candidatos.append(self._ids[posicao])
+            if not candidatos:
+                continue
+
+            carregados = self._carregar_pagina(candidatos)
+            for id in candidatos:
+                carrinho = carregados[id]
+                if carrinho.data_hora is not None and inicio <= carrinho.data_hora <= fim:
+                    yield carrinho
+
+    def _data(self, posicao: int):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _data()
+
+        B) OBJETIVO:
+        Obter a data da venda em uma posição do histórico.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: posicao (inteiro)
+        Posição da venda.
+
+        RETORNO 1: String "AAAA/MM/DD" ou `None`.
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - `posicao` está dentro dos limites do histórico.
+
+        Assertiva(s) de saída:
+        - Nenhum carrinho é carregado.
+
+        E) DESCRIÇÃO:
+        1. Se o carrinho da posição for residente, retorna a sua `data_hora` atual.
+        2. Caso contrário, retorna a data guardada na lista de datas.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Método de uso interno da classe.
+        """
+        residente = self._residentes.get(self._ids[posicao])
+        if residente is not None:
+            return residente.data_hora
+        return self._datas[posicao]
+
+    def _carregar_pagina(self, ids: list):
+        """
+        ESPECIFICAÇÃO DE FUNÇÃO:
+        A) NOME: _carregar_pagina()
+
+        B) OBJETIVO:
+        Obter os objetos `Carrinho` de um conjunto de IDs, consultando o armazenamento apenas para os que não estão na memória.
+
+        C) ACOPLAMENTO:
+        PARÂMETRO 1: ids (lista de inteiros)
+        IDs dos carrinhos desejados.
+
+        RETORNO 1: DICIONÁRIO {<id>: <Carrinho>}
+
+        D) CONDIÇÕES DE ACOPLAMENTO:
+        Assertiva(s) de entrada:
+        - Os produtos e funcionários referenciados pelos carrinhos já foram carregados.
+
+        Assertiva(s) de saída:
+        - O dicionário contém todos os IDs pedidos.
+        - Os carrinhos lidos do armazenamento não são acrescentados a `_todos_carrinhos`.
+
+        E) DESCRIÇÃO:
+        1. Procura cada ID entre os residentes, em `_todos_carrinhos` e no cache de carrinhos lidos.
+        2. Se o armazenamento atual consulta por índice (`suporta_parcial`), busca os que faltam de uma só vez com `consultar_varios()`, sem guardá-los.
+        3. Caso contrário (JSON), cada consulta percorreria o arquivo inteiro: busca de uma só vez todos os carrinhos do histórico que ainda não estão na memória e guarda-os no cache, para que as páginas seguintes não leiam o arquivo de novo.
+        4. Recria cada um com `Carrinho.from_json()`.
+        5. Lança `ValueError` se algum ID não for encontrado.
+
+        F) HIPÓTESES:
+        - Nenhuma.
+
+        G) RESTRIÇÕES:
+        - Com SQLite, a memória fica limitada à página pedida; com JSON, o histórico inteiro fica na memória após a primeira página, como na carga com `manter_carrinhos=True` que `main.py` usa nesse formato, e percorrê-lo lê o arquivo uma única vez.
+        - Alterações em carrinhos lidos do armazenamento não são rastreadas, pois eles não estão no registro global.
+        """
+        encontrados = {}
+        faltando = []
+        for id in ids:
+            carrinho = self._residentes.get(id)
+            if carrinho is None:
+                carrinho = _todos_carrinhos.get(id)
+            if carrinho is None:
+                carrinho = self._lidos.get(id)
+            if carrinho is None:
+                faltando.append(id)
+            else:
+                encontrados[id] = carrinho
+
+        if faltando:
+            armazenamento = obter_armazenamento()
+            if armazenamento.suporta_parcial:
+                lidos = {}
+                buscar = faltando
+            else:
+                lidos = self._lidos
+                pedidos = set(faltando)
+                buscar = faltando + [id for id in self._ids if id not in pedidos and id not in self._residentes
+                                     and id not in _todos_carrinhos and id not in lidos]
+            registros = armazenamento.consultar_varios("carrinhos", buscar)
+            for id in buscar:
+                dados = registros.get(str(id))
+                if dados is not None:
+                    lidos[id] = Carrinho.from_json(dados)
+            for id in faltando:
+                if id not in lidos:
+                    raise ValueError(f"Venda {id} não encontrada no armazenamento.")
+                encontrados[id] = lidos[id]
+
+        return encontrados
@@ -0,0 +1,153 @@
+from types import SimpleNamespace
+import pytest
+from modulos import rastreamento
+from modulos import produto
+from modulos import carrinho
+from modulos.agenda_precos import AgendaPrecos
+from modulos.arquivo_vendas import ArquivoVendas
+
+
+@pytest.fixture
+def limpar_bases_de_dados():
+    """
+    Limpa os produtos, as agendas de preços e as marcações de modificação antes e depois do teste.
+    """
+    produto._todos_produtos.clear()
+    produto._agendas_precos.clear()
+    rastreamento.limpar_modificados()
+    yield
+    produto._todos_produtos.clear()
+    produto._agendas_precos.clear()
+    rastreamento.limpar_modificados()
+
+
+class TestAgendaPrecos:
+
+    def test_vigente(self):
+        """Testa que vale a última mudança até a data, inclusive, e o preço inicial antes da primeira."""
+        agenda = AgendaPrecos(5.0)
+        agenda.agendar("2024/03/01", 7.0)
+        agenda.agendar("2024/01/01", 6.0)
+        agenda.agendar("2024/06/01", 2.0, preco_por_peso=40.0)
+        assert len(agenda) == 3
+        assert agenda.datas == ["", "2024/01/01", "2024/03/01", "2024/06/01"]
+        assert agenda.vigente("2023/12/31") == (5.0, None)
+        assert agenda.vigente("2024/01/01") == (6.0, None)
+        assert agenda.vigente("2024/05/31") == (7.0, None)
+        assert agenda.vigente("2025/01/01") == (2.0, 40.0)
+
+    def test_agendar_mesma_data_substitui(self):
+        """Testa que agendar de novo na mesma data substitui o preço, sem repetir a data."""
+        agenda = AgendaPrecos(5.0)
+        agenda.agendar("2024/01/01", 6.0)
+        agenda.agendar("2024/01/01", 6.5)
+        assert len(agenda) == 1
+        assert agenda.vigente("2024/01/01") == (6.5, None)
+
+    def test_aplicar(self):
+        """Testa que cada mudança vencida é aplicada uma única vez, saltando as intermediárias."""
+        agenda = AgendaPrecos(5.0)
+        agenda.agendar("2024/01/01", 6.0)
+        agenda.agendar("2024/02/01", 7.0)
+        agenda.agendar("2024/09/01", 8.0)
+        assert agenda.aplicar("2023/12/31") is None
+        assert agenda.aplicar("2024/03/15") == (7.0, None)
+        assert agenda.aplicar("2024/03/16") is None
+        assert agenda.aplicar("2024/09/01") == (8.0, None)
+
+    def test_pendente(self):
+        """Testa que `pendente()` antecipa o resultado de `aplicar()` sem alterar a agenda."""
+        agenda = AgendaPrecos(5.0)
+        agenda.agendar("2024/01/01", 6.0)
+        assert not agenda.pendente("2023/12/31")
+        assert agenda.pendente("2024/01/01")
+        assert agenda.aplicada == 0
+        agenda.aplicar("2024/01/01")
+        assert not agenda.pendente("2024/06/01")
+
+    def test_aplicar_apos_alteracoes(self):
+        """Testa que uma mudança retroativa não é reaplicada e que substituir a mudança aplicada a aplica de novo."""
+        agenda = AgendaPrecos(5.0)
+        agenda.agendar("2024/02/01", 7.0)
+        assert agenda.aplicar("2024/03/01") == (7.0, None)
+        agenda.agendar("2024/01/01", 6.0)
+        assert agenda.aplicar("2024/03/01") is None
+        assert agenda.vigente("2024/01/15") == (6.0, None)
+        agenda.agendar("2024/02/01", 7.5)
+        assert agenda.aplicar("2024/03/01") == (7.5, None)
+
+    def test_registrar_alteracao_manual(self):
+        """Testa que uma alteração manual registrada não é sobrescrita por uma mudança já vencida."""
+        agenda = AgendaPrecos(5.0)
+        agenda.agendar("2024/02/01", 7.0)
+        agenda.registrar("2024/03/01", 9.0)
+        assert agenda.aplicar("2024/03/10") is None
+        assert agenda.vigente("2024/02/15") == (7.0, None)
+        assert agenda.vigente("2024/03/10") == (9.0, None)
+
+    def test_json(self):
+        """Testa que a agenda sobrevive à conversão para JSON."""
+        agenda = AgendaPrecos(5.0)
+        agenda.agendar("2024/01/01", 2.0, preco_por_peso=40.0)
+        agenda.aplicar("2024/01/01")
+        copia = AgendaPrecos.from_json(agenda.to_json())
+        assert (copia.datas, copia.precos, copia.aplicada) == (agenda.datas, agenda.precos, agenda.aplicada)
+
+
+class TestAgendaNoProduto:
+
+    def test_produto_marcado_antes_de_alterar_a_agenda(self, limpar_bases_de_dados):
+        """Testa que o observador de modificações recebe o produto ainda com a agenda e o preço anteriores."""
+        produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)
+        rastreamento.limpar_modificados()
+        vistos = []
+
+        def observador(entidade, objeto):
+            vistos.append(objeto.to_json())
+
+        rastreamento.adicionar_observador(observador)
+        try:
+            produto.agendar_preco("7890000000017", "2024/02/01", 8.0)
+            produto.agendar_preco("7890000000017", "2024/03/01", 9.0)
+            produto.aplicar_precos_agendados("2024/02/01")
+        finally:
+            rastreamento.remover_observador(observador)
+
+        assert "agenda_precos" not in vistos[0]
+        assert [len(v["agenda_precos"]["precos"]) for v in vistos[1:3]] == [2, 3]
+        assert (vistos[2]["preco"], vistos[2]["agenda_precos"]["aplicada"]) == (5.0, 0)
+
+    def test_aplicar_sem_mudanca_pendente_nao_marca(self, limpar_bases_de_dados):
+        """Testa que aplicar a agenda sem mudanças vencidas não marca o produto como modificado."""
+        produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)
+        produto.agendar_preco("7890000000017", "2024/02/01", 8.0)
+        rastreamento.limpar_modificados()
+        assert produto.aplicar_precos_agendados("2024/01/31")["dados"] == 0
+        assert rastreamento.obter_modificados("produtos") == []
+
+
+class TestArquivoComAgenda:
+
+    def test_vendas_sem_total_arquivadas_pelo_preco_da_data(self, limpar_bases_de_dados, tmp_path):
+        """
+        Testa que o arquivo de vendas cobra as vendas sem total pelo preço vigente na data de cada uma, ao arquivar
+        e ao reconstruir, sem alterar nem marcar os carrinhos.
+        """
+        arroz = produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)["dados"]
+        produto.agendar_preco("7890000000017", "2024/02/01", 8.0)
+        produto.aplicar_precos_agendados("2024/02/01")
+        assert arroz.preco == 8.0
+        vendas = [carrinho.Carrinho(1, data_hora="2024/01/10", itens={arroz: 2}),
+                  carrinho.Carrinho(2, data_hora="2024/02/10", itens={arroz: 2})]
+        rastreamento.limpar_modificados()
+
+        arquivo = ArquivoVendas(str(tmp_path / "vendas"))
+        for venda in vendas:
+            assert arquivo.arquivar(1, venda)["retorno"] == 0
+        assert [v["total"] for v in arquivo.iterar_periodo(1, "2024/01/01", "2024/02/28")] == [10.0, 16.0]
+
+        assert arquivo.reconstruir(SimpleNamespace(codigo=1, vendas=vendas)) == 2
+        assert [v["total"] for v in arquivo.iterar_periodo(1, "2024/01/01", "2024/02/28")] == [10.0, 16.0]
+        assert arquivo.resumo_periodo(1, "2024/01/01", "2024/02/28") == {"quantidade": 2, "total": 26.0}
+        assert [venda.total for venda in vendas] == [None, None]
+        assert rastreamento.obter_modificados("carrinhos") == []
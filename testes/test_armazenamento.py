@@ -0,0 +1,197 @@
+import io
+import json
+import pytest
+from modulos import armazenamento
+from modulos import produto
+from modulos import funcionario
+from modulos import carrinho
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados():
+    """
+    Limpa os registros globais e restaura o armazenamento padrão
+    antes e depois de cada teste.
+    """
+    produto._todos_produtos.clear()
+    funcionario._todos_funcionarios.clear()
+    carrinho._todos_carrinhos.clear()
+    yield
+    armazenamento.definir_armazenamento(None)
+    produto._todos_produtos.clear()
+    funcionario._todos_funcionarios.clear()
+    carrinho._todos_carrinhos.clear()
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """Retorna um ArmazenamentoSQLite em um arquivo temporário."""
+    a = armazenamento.ArmazenamentoSQLite(str(tmp_path / "teste.db"))
+    yield a
+    a.fechar()
+
+
+# --- Testes para ArmazenamentoSQLite ---
+class TestArmazenamentoSQLite:
+
+    def test_salvar_e_carregar(self, banco):
+        """Testa a gravação e a leitura completa de uma entidade."""
+        registros = {"1": {"nome": "A"}, "2": {"nome": "B"}}
+        assert banco.salvar("produtos", registros) == 2
+        assert banco.carregar("produtos") == registros
+
+    def test_upsert_so_grava_alterados(self, banco):
+        """Testa que registros sem alteração não são regravados."""
+        banco.salvar("produtos", {"1": {"nome": "A"}, "2": {"nome": "B"}})
+        escritos = banco.salvar("produtos", {"1": {"nome": "A"}, "2": {"nome": "C"}})
+        assert escritos == 1
+        assert banco.consultar("produtos", "2") == {"nome": "C"}
+
+    def test_gravacao_parcial_preserva_demais(self, banco):
+        """Testa que salvar um subconjunto não apaga os outros registros."""
+        banco.salvar("produtos", {"1": {"nome": "A"}, "2": {"nome": "B"}})
+        banco.salvar("produtos", {"3": {"nome": "C"}})
+        assert list(banco.carregar("produtos")) == ["1", "2", "3"]
+
+    def test_consulta_pontual(self, banco):
+        """Testa as leituras pontuais por chave."""
+        banco.salvar("carrinhos", {i: {"id": i} for i in range(1, 11)})
+        assert banco.consultar("carrinhos", 5) == {"id": 5}
+        assert banco.consultar("carrinhos", 99) is None
+        assert banco.consultar_varios("carrinhos", [2, 4, 99]) == {"2": {"id": 2}, "4": {"id": 4}}
+
+    def test_entidades_isoladas(self, banco):
+        """Testa que a mesma chave em entidades diferentes não colide."""
+        banco.salvar("produtos", {"1": {"tipo": "produto"}})
+        banco.salvar("funcionarios", {"1": {"tipo": "funcionario"}})
+        assert banco.consultar("produtos", "1") == {"tipo": "produto"}
+        assert banco.consultar("funcionarios", "1") == {"tipo": "funcionario"}
+
+    def test_remover(self, banco):
+        """Testa a remoção de registros pela chave."""
+        banco.salvar("produtos", {"1": {}, "2": {}})
+        assert banco.remover("produtos", ["1"]) == 1
+        assert list(banco.carregar("produtos")) == ["2"]
+
+    def test_maior_chave_inteira(self, banco):
+        """Testa que a maior chave é comparada como número, e não como texto."""
+        assert banco.maior_chave_inteira("carrinhos") == 0
+        banco.salvar("carrinhos", {i: {"id": i} for i in (2, 10, 9)})
+        assert banco.maior_chave_inteira("carrinhos") == 10
+
+
+# --- Testes para ArmazenamentoJSON ---
+class TestArmazenamentoJSON:
+
+    def test_arquivo_inexistente(self, tmp_path):
+        """Testa que a leitura de um arquivo ausente retorna um dicionário vazio."""
+        a = armazenamento.ArmazenamentoJSON({"produtos": str(tmp_path / "nao_existe.json")})
+        assert a.carregar("produtos") == {}
+
+    def test_salvar_e_consultar(self, tmp_path):
+        """Testa a gravação e a leitura pontual em arquivo JSON."""
+        a = armazenamento.ArmazenamentoJSON({"produtos": str(tmp_path / "produtos.json")})
+        a.salvar("produtos", {"1": {"nome": "A"}})
+        assert a.consultar("produtos", "1") == {"nome": "A"}
+
+    def test_maior_chave_inteira(self, tmp_path):
+        """Testa a maior chave numérica de um arquivo JSON, ausente ou preenchido."""
+        a = armazenamento.ArmazenamentoJSON({"carrinhos": str(tmp_path / "carrinhos.json")})
+        assert a.maior_chave_inteira("carrinhos") == 0
+        a.salvar("carrinhos", {"2": {}, "10": {}, "9": {}})
+        assert a.maior_chave_inteira("carrinhos") == 10
+
+    def test_falha_na_escrita_preserva_arquivo(self, tmp_path):
+        """Testa que uma escrita interrompida não trunca o arquivo gravado antes."""
+        a = armazenamento.ArmazenamentoJSON({"produtos": str(tmp_path / "produtos.json")})
+        a.salvar("produtos", {"1": {"nome": "A"}})
+
+        class Interrompido:
+            def escrever(self, arquivo, dados):
+                arquivo.write(b'{"1": {"no')
+                raise OSError("disco cheio")
+
+        a.serializador = Interrompido()
+        with pytest.raises(OSError):
+            a.salvar("produtos", {"1": {"nome": "B"}})
+        a.serializador = None
+        assert a.carregar("produtos") == {"1": {"nome": "A"}}
+
+
+# --- Testes para a leitura incremental de JSON ---
+class TestLeituraIncremental:
+
+    def test_blocos_pequenos(self):
+        """Testa que registros divididos entre vários blocos são reconstruídos corretamente."""
+        registros = {str(i): {"id": i, "nome": f"registro {i}", "valores": [1.5, -2, None, True]} for i in range(50)}
+        arquivo = io.StringIO(json.dumps(registros, indent=4, ensure_ascii=False))
+        assert dict(armazenamento._iterar_objeto_json(arquivo, tamanho_bloco=7)) == registros
+
+    def test_numero_no_limite_do_bloco(self):
+        """Testa que um número cortado no fim de um bloco não é lido pela metade."""
+        arquivo = io.StringIO('{"a": 12345, "b": 678}')
+        assert list(armazenamento._iterar_objeto_json(arquivo, tamanho_bloco=8)) == [("a", 12345), ("b", 678)]
+
+    def test_arquivo_vazio_e_objeto_vazio(self):
+        """Testa os casos sem registros."""
+        assert list(armazenamento._iterar_objeto_json(io.StringIO(""))) == []
+        assert list(armazenamento._iterar_objeto_json(io.StringIO("  {  }  "))) == []
+
+    def test_json_truncado(self):
+        """Testa que um arquivo interrompido no meio de um registro gera erro."""
+        with pytest.raises(ValueError):
+            list(armazenamento._iterar_objeto_json(io.StringIO('{"1": {"id": 1}, "2": {"id"'), tamanho_bloco=4))
+
+    def test_iterar_json_e_sqlite(self, tmp_path, banco):
+        """Testa que os dois mecanismos iteram os registros na ordem de gravação."""
+        registros = {"3": {"id": 3}, "1": {"id": 1}}
+        a = armazenamento.ArmazenamentoJSON({"carrinhos": str(tmp_path / "carrinhos.json")})
+        a.salvar("carrinhos", registros)
+        banco.salvar("carrinhos", registros)
+        assert list(a.iterar("carrinhos")) == list(registros.items())
+        assert list(banco.iterar("carrinhos")) == list(registros.items())
+        assert list(armazenamento.ArmazenamentoJSON({"carrinhos": str(tmp_path / "x.json")}).iterar("carrinhos")) == []
+
+
+# --- Testes de integração com os módulos ---
+class TestIntegracaoModulos:
+
+    def test_salvar_carregar_produtos_sqlite(self, banco):
+        """Testa que salvar_produtos/carregar_produtos usam o armazenamento definido."""
+        armazenamento.definir_armazenamento(banco)
+        produto.registrar_produto("Nescau", "Nestlé", "Achocolatados", "7894900011517", 0.4, 8.50)
+        produto.salvar_produtos()
+
+        produto._todos_produtos.clear()
+        produto.carregar_produtos()
+        assert produto._todos_produtos["7894900011517"].nome == "Nescau"
+
+    def test_migrar_armazenamento(self, tmp_path, banco):
+        """Testa a cópia dos registros de JSON para SQLite."""
+        origem = armazenamento.ArmazenamentoJSON({"funcionarios": str(tmp_path / "funcionarios.json")})
+        origem.salvar("funcionarios", {"1000": {"nome": "Ana"}})
+
+        resultado = armazenamento.migrar_armazenamento(origem, banco, entidades=["funcionarios"])
+        assert resultado["retorno"] == 0
+        assert resultado["dados"] == {"funcionarios": 1}
+        assert banco.consultar("funcionarios", 1000) == {"nome": "Ana"}
+
+    def test_criar_armazenamento_tipo_invalido(self):
+        """Testa a falha ao pedir um tipo de armazenamento desconhecido."""
+        with pytest.raises(ValueError):
+            armazenamento.criar_armazenamento("xml")
+
+    def test_carregar_carrinhos_com_callback(self, tmp_path):
+        """Testa o carregamento de carrinhos registro a registro, com e sem retenção em memória."""
+        a = armazenamento.ArmazenamentoJSON({"carrinhos": str(tmp_path / "carrinhos.json")})
+        a.salvar("carrinhos", {str(i): {"id": i, "data_hora": "2024/01/01", "itens": {}, "total": 0.0,
+                                        "funcionario": None} for i in range(1, 6)})
+        armazenamento.definir_armazenamento(a)
+
+        vistos = []
+        assert carrinho.carregar_carrinhos(callback=lambda c: vistos.append(c.id), manter_em_memoria=False) == 5
+        assert vistos == [1, 2, 3, 4, 5]
+        assert carrinho._todos_carrinhos == {}
+
+        carrinho.carregar_carrinhos()
+        assert sorted(carrinho._todos_carrinhos) == [1, 2, 3, 4, 5]
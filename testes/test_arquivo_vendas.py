@@ -0,0 +1,169 @@
+import json
+import pytest
+from modulos import rastreamento
+from modulos import produto
+from modulos import carrinho
+from modulos import unidades
+from modulos.arquivo_vendas import ArquivoVendas
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados():
+    """
+    Limpa os registros globais, as marcações de modificação e o arquivo de vendas antes e depois de cada teste.
+    """
+    for registro in (produto._todos_produtos, carrinho._todos_carrinhos, unidades._unidades):
+        registro.clear()
+    rastreamento.limpar_modificados()
+    yield
+    unidades.definir_arquivo_vendas(None)
+    for registro in (produto._todos_produtos, carrinho._todos_carrinhos, unidades._unidades):
+        registro.clear()
+    rastreamento.limpar_modificados()
+
+
+@pytest.fixture
+def arroz():
+    """Registra um produto e o retorna."""
+    return produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)["dados"]
+
+
+@pytest.fixture
+def unidade(arroz):
+    """Cria uma unidade com vendas em janeiro, fevereiro e março de 2024."""
+    unidades.adiciona_Unidade(1, "Centro", (0.0, 0.0))
+    u = unidades._unidades[1]
+    datas = ["2024/01/10", "2024/01/20", "2024/02/05", "2024/02/25", "2024/03/15"]
+    for i, data in enumerate(datas, start=1):
+        u.registrar_venda(carrinho.Carrinho(i, data_hora=data, itens={arroz: i}, total=5.0 * i))
+    return u
+
+
+@pytest.fixture
+def arquivo(tmp_path, unidade):
+    """Arquivo de vendas temporário, sincronizado com a unidade e definido como o arquivo atual."""
+    a = ArquivoVendas(str(tmp_path / "vendas"))
+    a.sincronizar([unidade])
+    unidades.definir_arquivo_vendas(a)
+    return a
+
+
+class TestArquivoVendas:
+
+    def test_particiona_por_mes(self, arquivo, tmp_path):
+        """Testa que cada mês tem a sua partição e a sua entrada no manifesto."""
+        pasta = tmp_path / "vendas" / "1"
+        assert sorted(p.name for p in pasta.glob("*.jsonl")) == ["2024-01.jsonl", "2024-02.jsonl", "2024-03.jsonl"]
+        fevereiro = arquivo.manifesto(1)["meses"]["2024-02"]
+        assert fevereiro == {"quantidade": 2, "total": 35.0, "data_min": "2024/02/05", "data_max": "2024/02/25"}
+
+    def test_registrar_venda_arquiva(self, arquivo, arroz, tmp_path):
+        """Testa que uma venda registrada na unidade é anexada à partição do seu mês."""
+        unidades._unidades[1].registrar_venda(carrinho.Carrinho(6, data_hora="2024/04/01", itens={arroz: 1}, total=5.0))
+        assert arquivo.manifesto(1)["meses"]["2024-04"]["quantidade"] == 1
+        linhas = (tmp_path / "vendas" / "1" / "2024-04.jsonl").read_text(encoding="utf-8").splitlines()
+        assert json.loads(linhas[0])["id"] == 6
+
+    def test_particoes_do_periodo(self, arquivo):
+        """Testa que apenas os meses que se sobrepõem ao período são selecionados."""
+        assert arquivo.particoes(1, "2024/02/01", "2024/02/10") == ["2024-02"]
+        assert arquivo.particoes(1, "2024/01/15", "2024/02/01") == ["2024-01"]
+        assert arquivo.particoes(1, "2024/05/01", "2024/05/31") == []
+
+    def test_iterar_periodo_filtra_bordas(self, arquivo):
+        """Testa que as vendas das partições de borda são filtradas pela data."""
+        assert [v["id"] for v in arquivo.iterar_periodo(1, "2024/01/15", "2024/02/10")] == [2, 3]
+
+    def test_resumo_usa_manifesto(self, arquivo, tmp_path):
+        """Testa que meses inteiramente no período são resumidos sem ler a partição."""
+        (tmp_path / "vendas" / "1" / "2024-02.jsonl").unlink()
+        assert arquivo.resumo_periodo(1, "2024/01/15", "2024/03/31") == {"quantidade": 4, "total": 70.0}
+
+    def test_sincronizar_refaz_apenas_divergentes(self, arquivo, unidade, arroz):
+        """Testa que só é refeito o arquivo cuja contagem difere do histórico."""
+        assert arquivo.sincronizar([unidade]) == []
+        unidade.vendas.append(carrinho.Carrinho(7, data_hora="2024/03/20", itens={arroz: 1}, total=5.0))
+        assert arquivo.sincronizar([unidade]) == [1]
+        assert arquivo.manifesto(1)["meses"]["2024-03"]["quantidade"] == 2
+
+    def test_manifesto_persistido(self, arquivo, tmp_path):
+        """Testa que uma nova instância lê o manifesto gravado em disco."""
+        assert ArquivoVendas(str(tmp_path / "vendas")).manifesto(1) == arquivo.manifesto(1)
+
+    def test_linha_incompleta_ignorada(self, arquivo, tmp_path):
+        """Testa que uma linha interrompida no fim da partição é ignorada."""
+        with open(tmp_path / "vendas" / "1" / "2024-03.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"id": 9, "data_h')
+        assert [v["id"] for v in arquivo.iterar_periodo(1, "2024/03/01", "2024/03/31")] == [5]
+
+    def test_linha_incompleta_removida_ao_arquivar(self, arquivo, arroz, tmp_path):
+        """Testa que a linha interrompida é removida antes que a venda seguinte seja anexada depois dela."""
+        particao = tmp_path / "vendas" / "1" / "2024-03.jsonl"
+        with open(particao, "a", encoding="utf-8") as f:
+            f.write('{"id": 9, "data_h')
+        unidades._unidades[1].registrar_venda(carrinho.Carrinho(6, data_hora="2024/03/20", itens={arroz: 1}, total=5.0))
+        assert [json.loads(linha)["id"] for linha in particao.read_text(encoding="utf-8").splitlines()] == [5, 6]
+        assert [v["id"] for v in arquivo.iterar_periodo(1, "2024/03/01", "2024/03/31")] == [5, 6]
+
+    def test_linha_corrompida_lanca_erro(self, arquivo, tmp_path):
+        """Testa que uma linha corrompida no meio da partição lança erro, em vez de encerrar a leitura do mês."""
+        particao = tmp_path / "vendas" / "1" / "2024-02.jsonl"
+        linhas = particao.read_text(encoding="utf-8").splitlines(keepends=True)
+        particao.write_text("{corrompida\n" + "".join(linhas), encoding="utf-8")
+        with pytest.raises(ValueError, match="Linha 1 corrompida na partição 2024-02"):
+            list(arquivo.iterar_periodo(1, "2024/02/01", "2024/02/10"))
+
+    def test_manifesto_gravado_nos_pontos_de_gravacao(self, arquivo, arroz, tmp_path):
+        """Testa que arquivar não regrava o manifesto, que é gravado ao salvar as unidades."""
+        em_disco = lambda: ArquivoVendas(str(tmp_path / "vendas")).manifesto(1)
+        antes = em_disco()
+        unidade = unidades._unidades[1]
+        unidade.registrar_venda(carrinho.Carrinho(6, data_hora="2024/04/01", itens={arroz: 1}, total=5.0))
+        unidade.registrar_venda(carrinho.Carrinho(7, itens={arroz: 1}, total=5.0))
+        assert em_disco() == antes
+        unidades.salvar_unidades()
+        assert em_disco() == arquivo.manifesto(1)
+        assert em_disco()["ignoradas"] == 1 and em_disco()["meses"]["2024-04"]["quantidade"] == 1
+        assert arquivo.gravar_manifestos() == 0
+
+    def test_sincronizar_confere_ultimo_mes(self, arquivo, unidade, tmp_path):
+        """Testa que uma venda anexada à partição sem chegar ao manifesto nem ao histórico faz o arquivo ser refeito."""
+        with open(tmp_path / "vendas" / "1" / "2024-03.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps({"id": 9, "data_hora": "2024/03/30", "itens": {}, "total": 1.0}) + "\n")
+        assert arquivo.sincronizar([unidade]) == [1]
+        assert [v["id"] for v in arquivo.iterar_periodo(1, "2024/03/01", "2024/03/31")] == [5]
+
+    def test_sincronizar_confere_data_maxima(self, arquivo, unidade):
+        """Testa que o arquivo é refeito se a última data arquivada não for a última do histórico."""
+        arquivo.manifesto(1)["meses"]["2024-03"]["data_max"] = "2024/03/31"
+        assert arquivo.sincronizar([unidade]) == [1]
+        assert arquivo.manifesto(1)["meses"]["2024-03"]["data_max"] == "2024/03/15"
+
+
+class TestRelatorioComArquivo:
+
+    def test_relatorio_le_apenas_o_periodo(self, arquivo, unidade, tmp_path):
+        """Testa que o relatório usa o arquivo e não precisa das outras partições nem do histórico."""
+        (tmp_path / "vendas" / "1" / "2024-01.jsonl").unlink()
+        (tmp_path / "vendas" / "1" / "2024-03.jsonl").unlink()
+        unidade.vendas = []
+
+        resultado = unidades.relatorio_Unidade(1, ("2024/02/01", "2024/02/28"))
+        assert resultado["retorno"] == 0
+        vendas = resultado["dados"]["vendas_no_periodo"]
+        assert [v["id_venda"] for v in vendas] == [3, 4]
+        assert vendas[0]["itens"] == [("Arroz", 3)]
+        assert vendas[0]["total"] == 15.0
+
+    def test_relatorio_igual_sem_arquivo(self, arquivo):
+        """Testa que o relatório com o arquivo é igual ao obtido percorrendo o histórico."""
+        com_arquivo = unidades.relatorio_Unidade(1, ("2024/01/15", "2024/03/01"))
+        unidades.definir_arquivo_vendas(None)
+        sem_arquivo = unidades.relatorio_Unidade(1, ("2024/01/15", "2024/03/01"))
+        assert com_arquivo == sem_arquivo
+
+    def test_relatorio_com_particao_corrompida_usa_historico(self, arquivo, tmp_path):
+        """Testa que, com uma partição corrompida, o relatório é montado a partir do histórico da unidade."""
+        esperado = unidades.relatorio_Unidade(1, ("2024/01/15", "2024/03/01"))
+        (tmp_path / "vendas" / "1" / "2024-02.jsonl").write_text("{corrompida\n", encoding="utf-8")
+        assert unidades.relatorio_Unidade(1, ("2024/01/15", "2024/03/01")) == esperado
@@ -0,0 +1,133 @@
+import pytest
+from modulos import armazenamento
+from modulos import rastreamento
+from modulos import produto
+from modulos import funcionario
+from modulos import estoque
+from modulos import carrinho
+from modulos import unidades
+from modulos.carga_paralela import carregar_em_paralelo, formatar_tempos
+
+
+REGISTROS = (produto._todos_produtos, funcionario._todos_funcionarios, estoque._todos_estoques,
+             carrinho._todos_carrinhos, unidades._unidades)
+
+
+def limpar():
+    """Esvazia os registros globais e as marcações de modificação."""
+    for registro in REGISTROS:
+        registro.clear()
+    rastreamento.limpar_modificados()
+    carrinho._ultimo_id = 0
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados():
+    """
+    Limpa os registros globais antes e depois de cada teste.
+    """
+    limpar()
+    yield
+    armazenamento.definir_armazenamento(None)
+    limpar()
+
+
+@pytest.fixture
+def dados_gravados(tmp_path):
+    """Grava em JSON temporário uma unidade com estoque, funcionário e duas vendas, e esvazia a memória."""
+    arquivos = {entidade: str(tmp_path / f"{entidade}.json") for entidade in armazenamento.ENTIDADES}
+    armazenamento.definir_armazenamento(armazenamento.ArmazenamentoJSON(arquivos))
+
+    arroz = produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)["dados"]
+    unidades.adiciona_Unidade(1, "Centro", (0.0, 0.0))
+    unidade = unidades._unidades[1]
+    unidade.estoque.registrar_produto(arroz, 10, 10)
+    caixa = funcionario.Funcionario("Ana", 101, "Caixa", "2023/01/10")
+    rastreamento.marcar_modificado("funcionarios", caixa)
+    funcionario._todos_funcionarios[101] = caixa
+    unidade.adicionar_funcionario(caixa)
+    for id in (1, 2):
+        c = carrinho.criar_carrinho()["dados"]
+        c.adiciona_no_carrinho(arroz, id)
+        c.finaliza_carrinho(funcionario=caixa)
+        unidade.registrar_venda(c)
+
+    for salvar in (produto.salvar_produtos, funcionario.salvar_funcionarios, estoque.salvar_estoques,
+                   carrinho.salvar_carrinhos, unidades.salvar_unidades):
+        salvar()
+    limpar()
+
+
+def estado():
+    """Resume o conteúdo dos registros globais para comparação."""
+    return [{str(chave): objeto.to_json() for chave, objeto in registro.items()} for registro in REGISTROS]
+
+
+def carregar_sequencial():
+    """Carrega as entidades uma após a outra, como antes da carga paralela."""
+    produto.carregar_produtos()
+    funcionario.carregar_funcionarios()
+    estoque.carregar_estoques()
+    carrinho.carregar_carrinhos()
+    unidades.carregar_unidades()
+
+
+class TestCargaParalela:
+
+    @pytest.mark.parametrize("modo", ["thread", "processo"])
+    def test_mesmo_estado_da_carga_sequencial(self, dados_gravados, modo):
+        """Testa que a carga paralela produz os mesmos registros que a sequencial."""
+        carregar_sequencial()
+        esperado = estado()
+        limpar()
+
+        resultado = carregar_em_paralelo(modo=modo)
+        assert resultado["retorno"] == 0
+        assert estado() == esperado
+
+    def test_referencias_resolvidas(self, dados_gravados):
+        """Testa que as unidades referenciam os mesmos objetos dos registros globais."""
+        carregar_em_paralelo()
+        unidade = unidades._unidades[1]
+        assert unidade.estoque is estoque._todos_estoques[unidade.estoque.codigo]
+        assert unidade.funcionarios[0] is funcionario._todos_funcionarios[101]
+        assert next(iter(unidade.vendas[0].itens)) is produto._todos_produtos["7890000000017"]
+
+    def test_sem_manter_carrinhos(self, dados_gravados):
+        """Testa que, sem manter os carrinhos, eles não são lidos no pool nem guardados, mas os IDs são preservados."""
+        resultado = carregar_em_paralelo(manter_carrinhos=False)
+        assert carrinho._todos_carrinhos == {}
+        assert "carrinhos" not in resultado["dados"]["leitura"]
+        assert carrinho.criar_carrinho()["dados"].id == 3
+
+    def test_historico_lido_registro_a_registro(self, dados_gravados, monkeypatch):
+        """Testa que só os registros pequenos são lidos por inteiro; carrinhos e unidades vêm do iterador."""
+        banco = armazenamento.obter_armazenamento()
+        lidas_por_inteiro = []
+        carregar = banco.carregar
+        monkeypatch.setattr(banco, "carregar", lambda entidade: lidas_por_inteiro.append(entidade) or carregar(entidade))
+
+        resultado = carregar_em_paralelo()
+        assert resultado["retorno"] == 0
+        assert sorted(lidas_por_inteiro) == ["estoques", "funcionarios", "produtos"]
+        assert len(carrinho._todos_carrinhos) == 2 and list(unidades._unidades) == [1]
+
+    def test_tempos_por_etapa(self, dados_gravados):
+        """Testa que os tempos são medidos para todas as entidades e formatados em uma linha cada."""
+        tempos = carregar_em_paralelo()["dados"]
+        assert set(tempos["resolucao"]) == set(armazenamento.ENTIDADES)
+        linhas = formatar_tempos(tempos).splitlines()
+        assert len(linhas) == len(armazenamento.ENTIDADES) + 2
+        assert linhas[-1].startswith("total")
+
+    def test_modo_desconhecido(self):
+        """Testa que um modo de carga inválido é recusado."""
+        assert carregar_em_paralelo(modo="fibra")["retorno"] == 1
+
+    def test_referencias_ausentes(self, dados_gravados):
+        """Testa que produtos ausentes são reunidos em um único relatório, com os estoques e vendas que os citam."""
+        armazenamento.obter_armazenamento().salvar("produtos", {})
+        resultado = carregar_em_paralelo()
+        assert resultado["retorno"] == 2
+        assert "produtos 7890000000017: 3 referência(s)" in resultado["mensagem"]
+        assert "resolucao" in resultado["dados"]
@@ -0,0 +1,52 @@
+import math
+import pytest
+from modulos.produto import Produto
+from modulos.catalogo_colunar import CatalogoColunar
+
+
+def produto(codigo, preco, preco_por_peso=None, peso=1.0):
+    """Cria um produto avulso, fora do registro global."""
+    return Produto("Produto", "Marca", "Categoria", codigo, peso, preco, preco_por_peso)
+
+
+class TestCatalogoColunar:
+
+    def test_adicionar_e_atualizar(self):
+        """Testa que cada produto ocupa uma linha e que atualizar um produto sobrescreve a sua linha."""
+        catalogo = CatalogoColunar()
+        catalogo.adicionar(produto("7890000000017", 5.0))
+        catalogo.adicionar(produto("7890000000024", 2.0, preco_por_peso=40.0, peso=0.5))
+        assert len(catalogo) == 2
+        assert "7890000000024" in catalogo and "7890000000031" not in catalogo
+        assert catalogo.linha("7890000000024") == 1 and catalogo.linha("7890000000031") is None
+        assert list(catalogo.preco) == [5.0, 2.0]
+        assert math.isnan(catalogo.preco_por_peso[0]) and catalogo.preco_por_peso[1] == 40.0
+
+        catalogo.adicionar(produto("7890000000017", 6.0))
+        assert len(catalogo) == 2
+        assert list(catalogo.preco) == [6.0, 2.0]
+
+    def test_reconstruir(self):
+        """Testa que a reconstrução descarta as linhas anteriores."""
+        catalogo = CatalogoColunar()
+        catalogo.adicionar(produto("7890000000017", 5.0))
+        catalogo.reconstruir([produto("7890000000024", 2.0), produto("7890000000031", 3.0)])
+        assert catalogo.codigos == ["7890000000024", "7890000000031"]
+        assert list(catalogo.preco) == [2.0, 3.0]
+
+    def test_calcula_precos_igual_a_calcula_preco(self):
+        """Testa que o cálculo em lote segue a regra de `Produto.calcula_preco`, com e sem preço por peso."""
+        produtos = [produto("7890000000017", 5.0), produto("7890000000024", 2.0, preco_por_peso=40.0)]
+        catalogo = CatalogoColunar()
+        catalogo.reconstruir(produtos)
+        itens = [(produtos[1], 0.25), (produtos[0], 3), (produtos[1], 1.5), (produtos[0], 1)]
+        precos = catalogo.calcula_precos([p.codigo for p, _ in itens], [q for _, q in itens])
+        assert precos == [p.calcula_preco(q)['dados'] for p, q in itens]
+        assert all(isinstance(preco, float) for preco in precos)
+        assert catalogo.calcula_precos([], []) == []
+
+    def test_codigo_desconhecido(self):
+        """Testa que um código fora do catálogo lança `KeyError`."""
+        catalogo = CatalogoColunar()
+        with pytest.raises(KeyError):
+            catalogo.calcula_precos(["7890000000017"], [1])
@@ -0,0 +1,112 @@
+import pytest
+from modulos import armazenamento
+from modulos import rastreamento
+from modulos import produto
+from modulos import estoque
+from modulos.catalogo_produtos import CatalogoProdutos, gerar_catalogo
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados():
+    """
+    Limpa o registro de produtos, as marcações e o catálogo ativo antes e depois de cada teste.
+    """
+    produto._todos_produtos.clear()
+    produto._agendas_precos.clear()
+    estoque._todos_estoques.clear()
+    rastreamento.limpar_modificados()
+    yield
+    produto.definir_catalogo(None)
+    armazenamento.definir_armazenamento(None)
+    produto._todos_produtos.clear()
+    produto._agendas_precos.clear()
+    estoque._todos_estoques.clear()
+    rastreamento.limpar_modificados()
+
+
+@pytest.fixture
+def catalogo(tmp_path):
+    """
+    Grava alguns produtos no armazenamento, gera o catálogo a partir dele e o abre,
+    deixando o registro de produtos vazio.
+    """
+    arquivos = {nome: str(tmp_path / f"{nome}.json") for nome in armazenamento.ENTIDADES}
+    armazenamento.definir_armazenamento(armazenamento.ArmazenamentoJSON(arquivos))
+    produto.registrar_produto("Nescau", "Nestlé", "Achocolatados", "7894900011517", 0.4, 8.50)
+    produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)
+    produto.registrar_produto("Feijão", "Tio João", "Grãos", "7890000000024", 1.0, 7.00)
+    produto.registrar_produto("Banana", "Sítio", "Hortifruti", "2000000000015", 1.0, 6.0, 5.99)
+    produto.salvar_produtos()
+    produto._todos_produtos.clear()
+
+    caminho = str(tmp_path / "produtos.catalogo")
+    assert gerar_catalogo(caminho) == {"retorno": 0, "mensagem": "Catálogo gerado com sucesso.", "dados": 4}
+    c = CatalogoProdutos(caminho)
+    yield c
+    c.fechar()
+
+
+class TestCatalogoProdutos:
+
+    def test_consulta_materializa_apenas_o_encontrado(self, catalogo):
+        """Testa que a consulta cria o produto com todos os campos, sem carregar os demais."""
+        p = catalogo.consultar("7890000000024")
+        assert (p.nome, p.marca, p.categoria, p.codigo, p.peso, p.preco, p.preco_por_peso) == \
+            ("Feijão", "Tio João", "Grãos", "7890000000024", 1.0, 7.00, None)
+        assert catalogo.consultar("2000000000015").preco_por_peso == 5.99
+        assert produto._todos_produtos == {}
+
+    def test_todos_os_codigos_sao_encontrados(self, catalogo):
+        """Testa a busca binária no primeiro, no último e nos registros intermediários."""
+        assert len(catalogo) == 4
+        for codigo in ("2000000000015", "7890000000017", "7890000000024", "7894900011517"):
+            assert catalogo.consultar(codigo).codigo == codigo
+
+    def test_codigo_inexistente(self, catalogo):
+        """Testa códigos ausentes, menores ou maiores que todos, e inválidos."""
+        for codigo in ("0000000000000", "7890000000020", "9999999999999", "123", None):
+            assert catalogo.consultar(codigo) is None
+        assert "7890000000020" not in catalogo
+        assert "7890000000017" in catalogo
+
+    def test_consultar_produto_por_codigo_usa_catalogo(self, catalogo):
+        """Testa que, com o catálogo ativo, a consulta comum encontra o produto e o reutiliza."""
+        assert produto.consultar_produto_por_codigo("7894900011517")["retorno"] == 2
+        produto.definir_catalogo(catalogo)
+        primeiro = produto.consultar_produto_por_codigo("7894900011517")["dados"]
+        assert primeiro.nome == "Nescau"
+        assert produto.consultar_produto_por_codigo("7894900011517")["dados"] is primeiro
+        assert rastreamento.obter_modificados("produtos") == []
+
+    def test_alteracoes_em_memoria_entram_no_catalogo(self, tmp_path, catalogo):
+        """Testa que produtos ainda não gravados são incluídos ao gerar o catálogo."""
+        produto.registrar_produto("Café", "Pilão", "Bebidas", "7896089012453", 0.5, 15.90)
+        caminho = str(tmp_path / "novo.catalogo")
+        gerar_catalogo(caminho)
+        novo = CatalogoProdutos(caminho)
+        try:
+            assert len(novo) == 5
+            assert novo.consultar("7896089012453").marca == "Pilão"
+        finally:
+            novo.fechar()
+
+    def test_produto_com_precos_agendados_recusado(self, tmp_path, catalogo):
+        """Testa que produtos com preços agendados, gravados ou em memória, não geram catálogo nem alteram o anterior."""
+        caminho = tmp_path / "produtos.catalogo"
+        anterior = caminho.read_bytes()
+        produto.carregar_produtos()
+        produto.agendar_preco("7890000000017", "2024/02/01", 6.0)
+        esperado = {"retorno": 1, "mensagem": "Produto com preços agendados não cabe no catálogo.", "dados": "7890000000017"}
+        assert gerar_catalogo(str(caminho)) == esperado
+
+        produto.salvar_produtos()
+        produto._todos_produtos.clear()
+        assert gerar_catalogo(str(caminho)) == esperado
+        assert caminho.read_bytes() == anterior
+
+    def test_arquivo_invalido(self, tmp_path):
+        """Testa que um arquivo que não é catálogo é recusado."""
+        caminho = tmp_path / "lixo.catalogo"
+        caminho.write_bytes(b"nao e um catalogo")
+        with pytest.raises(ValueError):
+            CatalogoProdutos(str(caminho))
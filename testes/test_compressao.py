@@ -0,0 +1,115 @@
+import io
+import os
+import time
+import pytest
+from modulos import armazenamento
+from modulos import serializacao
+from modulos.compressao import (COMPRESSOES, abrir_escrita, abrir_leitura, caminho_comprimido,
+                                detectar_compressao, localizar_arquivo)
+from modulos.serializacao import SerializadorCompacto, SerializadorLegivel, criar_serializador
+
+
+DADOS = {"7890000000017": {"nome": "Açúcar", "preco": 4.99, "itens": [1, 2], "ativo": True, "peso": None},
+         "7890000000024": {"nome": "Café", "preco": 12.5, "itens": [], "ativo": False, "peso": 0.5}}
+
+MODOS = ["compacto", "legivel"] + (["orjson"] if serializacao.orjson is not None else [])
+
+
+def criar_armazenamento_json(tmp_path, compressao=None):
+    """Cria um armazenamento JSON com o arquivo de produtos em um diretório temporário."""
+    return armazenamento.ArmazenamentoJSON({"produtos": str(tmp_path / "produtos.json")}, compressao=compressao)
+
+
+class TestCompressao:
+
+    @pytest.mark.parametrize("compressao", list(COMPRESSOES))
+    def test_detecta_pelo_conteudo(self, compressao, tmp_path):
+        """Testa que a compressão é reconhecida pelos bytes iniciais, mesmo sem a extensão no nome."""
+        caminho = str(tmp_path / "dados.json")
+        with abrir_escrita(caminho, compressao) as f:
+            f.write(b"{}")
+        assert detectar_compressao(caminho) == compressao
+        with abrir_leitura(caminho) as f:
+            assert f.read() == b"{}"
+
+    def test_arquivo_sem_compressao(self, tmp_path):
+        """Testa que um JSON comum não é tomado por comprimido."""
+        caminho = tmp_path / "dados.json"
+        caminho.write_bytes(b'{"a":1}')
+        assert detectar_compressao(str(caminho)) is None
+
+    def test_caminho_comprimido(self):
+        """Testa a extensão acrescentada por compressão e a recusa de nomes desconhecidos."""
+        assert caminho_comprimido("dados/produtos.json") == "dados/produtos.json"
+        assert caminho_comprimido("dados/produtos.json", "gzip") == "dados/produtos.json.gz"
+        assert caminho_comprimido("dados/produtos.json", "lzma") == "dados/produtos.json.xz"
+        with pytest.raises(ValueError):
+            caminho_comprimido("dados/produtos.json", "zip")
+        with pytest.raises(ValueError):
+            abrir_escrita("dados/produtos.json", "zip")
+
+    def test_localizar_mais_recente(self, tmp_path):
+        """Testa que, havendo várias versões do arquivo, a modificada por último é escolhida."""
+        caminho = str(tmp_path / "produtos.json")
+        assert localizar_arquivo(caminho) is None
+        open(caminho, "wb").close()
+        open(caminho + ".gz", "wb").close()
+        agora = time.time()
+        os.utime(caminho, (agora - 10, agora - 10))
+        assert localizar_arquivo(caminho) == caminho + ".gz"
+
+
+class TestArmazenamentoComprimido:
+
+    @pytest.mark.parametrize("compressao", [None] + list(COMPRESSOES))
+    def test_ida_e_volta(self, compressao, tmp_path):
+        """Testa gravação, carga, iteração e consulta com cada compressão."""
+        a = criar_armazenamento_json(tmp_path, compressao)
+        a.salvar("produtos", DADOS)
+        assert os.path.exists(caminho_comprimido(str(tmp_path / "produtos.json"), compressao))
+        assert a.carregar("produtos") == DADOS
+        assert dict(a.iterar("produtos")) == DADOS
+        assert a.consultar("produtos", "7890000000024") == DADOS["7890000000024"]
+
+    def test_troca_de_compressao(self, tmp_path):
+        """Testa que arquivos gravados com outra compressão continuam legíveis e são substituídos na gravação."""
+        criar_armazenamento_json(tmp_path).salvar("produtos", DADOS)
+        a = criar_armazenamento_json(tmp_path, "gzip")
+        assert a.carregar("produtos") == DADOS
+
+        a.salvar("produtos", {})
+        assert not os.path.exists(tmp_path / "produtos.json")
+        assert a.carregar("produtos") == {}
+
+        # De volta para o formato sem compressão: o .gz antigo é removido
+        criar_armazenamento_json(tmp_path).salvar("produtos", DADOS)
+        assert sorted(os.listdir(tmp_path)) == ["produtos.json"]
+
+    def test_compressao_desconhecida(self, tmp_path):
+        """Testa que o armazenamento recusa compressões inválidas."""
+        with pytest.raises(ValueError):
+            criar_armazenamento_json(tmp_path, "zip")
+        with pytest.raises(ValueError):
+            armazenamento.criar_armazenamento("json", compressao="zip")
+
+
+class TestEscritaEmFluxo:
+
+    @pytest.mark.parametrize("modo", MODOS)
+    def test_escrever_igual_a_codificar(self, modo):
+        """Testa que a escrita em blocos gera o mesmo texto de codificar(), inclusive passando de um bloco."""
+        s = criar_serializador(modo)
+        grande = {str(i): {"nome": f"Produto {i}", "itens": list(range(20))} for i in range(3000)}
+        for dados in (grande, {}, [1, 2, 3]):
+            arquivo = io.BytesIO()
+            s.escrever(arquivo, dados)
+            assert arquivo.getvalue().decode("utf-8") == s.codificar(dados)
+            assert s.ler_arquivo(io.BytesIO(arquivo.getvalue())) == dados
+
+    def test_legivel_em_arquivo_comprimido(self, tmp_path):
+        """Testa que o modo legível também grava através do compressor."""
+        caminho = str(tmp_path / "dados.json.gz")
+        with abrir_escrita(caminho, "gzip") as f:
+            SerializadorLegivel().escrever(f, DADOS)
+        with abrir_leitura(caminho) as f:
+            assert SerializadorCompacto().ler_arquivo(f) == DADOS
@@ -0,0 +1,113 @@
+import pytest
+from modulos import rastreamento
+from modulos import produto
+from modulos import funcionario
+from modulos import estoque
+from modulos import carrinho
+from modulos.contexto_carga import ContextoCarga, ErroReferencias
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados():
+    """
+    Prepara dois produtos e um funcionário nos registros globais e limpa tudo depois de cada teste.
+    """
+    for registro in (produto._todos_produtos, funcionario._todos_funcionarios, estoque._todos_estoques,
+                     carrinho._todos_carrinhos):
+        registro.clear()
+    produto._todos_produtos["7890000000017"] = produto.Produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.0)
+    produto._todos_produtos["7890000000024"] = produto.Produto("Café", "Melitta", "Bebidas", "7890000000024", 0.5, 12.5)
+    funcionario._todos_funcionarios[101] = funcionario.Funcionario("Ana", 101, "Caixa", "2023/01/10")
+    rastreamento.limpar_modificados()
+    yield
+    for registro in (produto._todos_produtos, funcionario._todos_funcionarios, estoque._todos_estoques,
+                     carrinho._todos_carrinhos):
+        registro.clear()
+    rastreamento.limpar_modificados()
+    carrinho._ultimo_id = 0
+
+
+def carrinho_json(id, itens, funcionario=101):
+    """Monta o registro gravado de um carrinho finalizado."""
+    return {"id": id, "data_hora": "2024/01/10", "itens": itens, "total": 10.0, "funcionario": funcionario}
+
+
+class TestContextoCarga:
+
+    def test_resolver_itens(self):
+        """Testa que os códigos viram os objetos dos registros globais, sem pendências."""
+        contexto = ContextoCarga()
+        itens = contexto.resolver_itens({"7890000000017": 2, "7890000000024": 1}, "carrinho 1")
+        assert itens == {produto._todos_produtos["7890000000017"]: 2, produto._todos_produtos["7890000000024"]: 1}
+        assert not contexto.possui_pendencias()
+        contexto.verificar()
+
+    def test_acumula_pendencias(self):
+        """Testa que códigos ausentes são omitidos e acumulados, com todas as origens."""
+        contexto = ContextoCarga()
+        itens = contexto.resolver_itens({"7890000000017": 2, "7890000000031": 1}, "carrinho 1")
+        contexto.resolver_itens({"7890000000031": 3}, "carrinho 2")
+        assert contexto.funcionario(999, "carrinho 2") is None
+        assert list(itens) == [produto._todos_produtos["7890000000017"]]
+        assert contexto.pendencias == {"produtos": {"7890000000031": ["carrinho 1", "carrinho 2"]},
+                                       "funcionarios": {999: ["carrinho 2"]}}
+        with pytest.raises(ErroReferencias) as erro:
+            contexto.verificar()
+        assert "produtos 7890000000031: 2 referência(s)" in str(erro.value)
+        assert erro.value.pendencias is contexto.pendencias
+
+    def test_consulta_catalogo(self, monkeypatch):
+        """Testa que um produto ausente da memória ainda é procurado no catálogo em disco."""
+        cafe = produto._todos_produtos.pop("7890000000024")
+
+        class Catalogo:
+            def consultar(self, codigo):
+                return cafe if codigo == cafe.codigo else None
+
+        monkeypatch.setattr(produto, "_catalogo", Catalogo())
+        contexto = ContextoCarga()
+        assert contexto.produto("7890000000024", "estoque E1") is cafe
+        assert not contexto.possui_pendencias()
+
+
+class TestCargaComContexto:
+
+    def test_carrinho_from_json(self):
+        """Testa que o carrinho desserializado usa os objetos globais e não é marcado como modificado."""
+        c = carrinho.Carrinho.from_json(carrinho_json(1, {"7890000000017": 2}))
+        assert c.itens == {produto._todos_produtos["7890000000017"]: 2}
+        assert c.funcionario is funcionario._todos_funcionarios[101]
+        assert c.to_json() == carrinho_json(1, {"7890000000017": 2})
+        assert not rastreamento.obter_modificados("carrinhos")
+
+    def test_carrinho_from_json_lista_todos_os_ausentes(self):
+        """Testa que, sem contexto, o carrinho lança um único erro com todos os códigos ausentes."""
+        with pytest.raises(ValueError) as erro:
+            carrinho.Carrinho.from_json(carrinho_json(1, {"7890000000031": 1, "7890000000048": 1}, funcionario=999))
+        mensagem = str(erro.value)
+        assert "7890000000031" in mensagem and "7890000000048" in mensagem and "999" in mensagem
+
+    def test_carregar_carrinhos_relatorio_unico(self):
+        """Testa que a carga percorre todo o histórico e só então falha, sem registrar carrinhos incompletos."""
+        registros = {"1": carrinho_json(1, {"7890000000031": 1}),
+                     "2": carrinho_json(2, {"7890000000017": 1}),
+                     "3": carrinho_json(3, {"7890000000048": 1})}
+        with pytest.raises(ErroReferencias) as erro:
+            carrinho.carregar_carrinhos(registros=registros)
+        assert set(erro.value.pendencias["produtos"]) == {"7890000000031", "7890000000048"}
+        assert carrinho._todos_carrinhos == {}
+
+    def test_carregar_com_contexto_compartilhado(self):
+        """Testa que, com um contexto recebido, a carga registra o que foi resolvido e deixa a verificação para quem chamou."""
+        contexto = ContextoCarga()
+        estoque.carregar_estoques(registros={"E1": {"codigo": "E1",
+                                                    "capacidades": {"7890000000017": 10, "7890000000031": 5},
+                                                    "estoque": {"7890000000017": 4}, "exposicao": {}}},
+                                  contexto=contexto)
+        carrinho.carregar_carrinhos(registros={"1": carrinho_json(1, {"7890000000031": 1})}, contexto=contexto)
+
+        arroz = produto._todos_produtos["7890000000017"]
+        e1 = estoque._todos_estoques["E1"]
+        assert e1.capacidades == {arroz: 10} and e1.estoque == {arroz: 4} and e1.exposicao == {arroz: 0}
+        assert carrinho._todos_carrinhos[1].itens == {}
+        assert contexto.pendencias["produtos"] == {"7890000000031": ["estoque E1", "carrinho 1"]}
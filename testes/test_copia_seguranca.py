@@ -0,0 +1,124 @@
+import json
+import threading
+import pytest
+from modulos import armazenamento
+from modulos import rastreamento
+from modulos import produto
+from modulos import funcionario
+from modulos import estoque
+from modulos import carrinho
+from modulos import unidades
+from modulos.copia_seguranca import CopiaSeguranca
+
+
+REGISTROS = {"produtos": produto._todos_produtos, "funcionarios": funcionario._todos_funcionarios,
+             "estoques": estoque._todos_estoques, "carrinhos": carrinho._todos_carrinhos,
+             "unidades": unidades._unidades}
+
+
+def limpar():
+    """Esvazia os registros globais, as marcações de modificação e os observadores."""
+    for registro in REGISTROS.values():
+        registro.clear()
+    rastreamento.limpar_modificados()
+    rastreamento._observadores.clear()
+    carrinho._ultimo_id = 0
+
+
+def estado():
+    """Resume o conteúdo dos registros globais no formato gravado."""
+    return {entidade: {str(k): objeto.to_json() for k, objeto in registro.items()}
+            for entidade, registro in REGISTROS.items()}
+
+
+class DestinoControlado:
+    """Destino em memória que pode segurar a thread de gravação antes de gravar uma entidade."""
+
+    def __init__(self, segurar_em=None, falhar=False):
+        self.registros = {}
+        self.segurar_em = segurar_em
+        self.falhar = falhar
+        self.chegou = threading.Event()
+        self.liberar = threading.Event()
+
+    def salvar(self, entidade, registros):
+        if entidade == self.segurar_em:
+            self.chegou.set()
+            assert self.liberar.wait(5)
+        if self.falhar:
+            raise OSError("disco cheio")
+        self.registros[entidade] = registros
+        return len(registros)
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados():
+    """
+    Limpa os registros globais antes e depois de cada teste e monta uma unidade com estoque, um funcionário e duas vendas.
+    """
+    limpar()
+    arroz = produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)["dados"]
+    cafe = produto.registrar_produto("Café", "Melitta", "Bebidas", "7890000000024", 0.5, 12.5)["dados"]
+    funcionario.adiciona_funcionario("Ana", 101, "Caixa", "2023/01/10")
+    unidades.adiciona_Unidade(1, "Centro", (-23.5, -46.6), funcionarios=[funcionario._todos_funcionarios[101]])
+    unidade = unidades._unidades[1]
+    unidade.estoque.registrar_produto(arroz, 100, 20)
+    unidade.estoque.registrar_produto(cafe, 50, 10)
+    unidade.estoque.adicionar_produto(arroz, 40, "estoque")
+    unidade.estoque.adicionar_produto(cafe, 10, "exposicao")
+    for itens in ({arroz: 2, cafe: 1}, {cafe: 3}):
+        c = carrinho.criar_carrinho()["dados"]
+        for p, q in itens.items():
+            c.adiciona_no_carrinho(p, q)
+        c.finaliza_carrinho(funcionario=funcionario._todos_funcionarios[101])
+        unidade.registrar_venda(c)
+    yield
+    limpar()
+
+
+class TestCopiaSeguranca:
+
+    def test_copia_igual_ao_estado(self, tmp_path):
+        """Testa que, sem alterações concorrentes, a cópia gravada em arquivos JSON é igual ao estado em memória."""
+        esperado = json.loads(json.dumps(estado()))
+        arquivos = {entidade: str(tmp_path / f"{entidade}.json") for entidade in armazenamento.ENTIDADES}
+        destino = armazenamento.ArmazenamentoJSON(arquivos)
+        copia = CopiaSeguranca(destino)
+        copia.iniciar()
+        assert copia.aguardar(5)
+        assert {entidade: destino.carregar(entidade) for entidade in armazenamento.ENTIDADES} == esperado
+        assert copia.gravados == {entidade: len(registros) for entidade, registros in esperado.items()}
+        assert copia.preservados == 0
+        assert rastreamento._observadores == []
+
+    def test_alteracoes_durante_a_gravacao(self):
+        """Testa que vendas feitas enquanto a cópia é gravada não aparecem nela e continuam valendo na memória."""
+        congelado = estado()
+        destino = DestinoControlado(segurar_em="produtos")
+        copia = CopiaSeguranca(destino)
+        copia.iniciar()
+        assert destino.chegou.wait(5)
+
+        # Uma venda completa com a gravação parada nos produtos: estoque, unidade e um carrinho novo
+        unidade = unidades._unidades[1]
+        cafe = produto._todos_produtos["7890000000024"]
+        c = carrinho.criar_carrinho()["dados"]
+        c.adiciona_no_carrinho(cafe, 2)
+        assert unidade.estoque.retirar_venda(c.itens)["retorno"] == 0
+        c.finaliza_carrinho(funcionario=funcionario._todos_funcionarios[101])
+        unidade.registrar_venda(c)
+        vivo = estado()
+
+        destino.liberar.set()
+        assert copia.aguardar(5)
+        assert destino.registros == congelado
+        assert estado() == vivo != congelado
+        assert copia.preservados == 2
+
+    def test_falha_no_destino(self):
+        """Testa que uma falha de gravação é informada e o observador é removido."""
+        copia = CopiaSeguranca(DestinoControlado(falhar=True))
+        copia.iniciar()
+        assert not copia.aguardar(5)
+        assert isinstance(copia.ultimo_erro, OSError)
+        assert rastreamento._observadores == []
@@ -0,0 +1,266 @@
+import json
+import pytest
+from modulos import diario_estoque
+from modulos import estoque
+from modulos import produto
+from modulos import unidades
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados():
+    """
+    Limpa os registros globais e desativa o diário antes e depois de cada teste.
+    """
+    produto._todos_produtos.clear()
+    estoque._todos_estoques.clear()
+    unidades._unidades.clear()
+    yield
+    estoque.definir_diario(None)
+    produto._todos_produtos.clear()
+    estoque._todos_estoques.clear()
+    unidades._unidades.clear()
+
+
+@pytest.fixture
+def produtos():
+    """Registra dois produtos e retorna os objetos."""
+    produto.registrar_produto("Nescau", "Nestlé", "Achocolatados", "7894900011517", 0.4, 8.50)
+    produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)
+    return produto._todos_produtos["7894900011517"], produto._todos_produtos["7890000000017"]
+
+
+@pytest.fixture
+def diario(tmp_path):
+    """Retorna um DiarioEstoque ativo com arquivos temporários."""
+    d = diario_estoque.DiarioEstoque(str(tmp_path / "estoques.diario"),
+                                     str(tmp_path / "estoques.snapshot.json"),
+                                     limite_compactacao=0)
+    estoque.definir_diario(d)
+    yield d
+    d.fechar()
+
+
+def simular_reinicio(diario_antigo, produtos_salvos):
+    """Descarta o estado em memória, mantendo só o catálogo de produtos."""
+    diario_antigo.fechar()
+    estoque.definir_diario(None)
+    estoque._todos_estoques.clear()
+    for p in produtos_salvos:
+        produto._todos_produtos[p.codigo] = p
+    return diario_estoque.DiarioEstoque(diario_antigo.caminho_diario, diario_antigo.caminho_snapshot,
+                                        limite_compactacao=0)
+
+
+class TestDiarioEstoque:
+
+    def test_operacoes_sao_anexadas(self, diario, produtos):
+        """Testa que cada mutação gera exatamente uma linha no diário."""
+        nescau, _ = produtos
+        e = estoque.Estoque("E1")
+        e.registrar_produto(nescau, 50, 20)
+        e.adicionar_produto(nescau, 10)
+        e.mover_para_exposicao(nescau, 4)
+        e.retirar_venda({nescau: 3})
+
+        with open(diario.caminho_diario, encoding="utf-8") as f:
+            linhas = [json.loads(l) for l in f]
+        assert [l[2] for l in linhas] == ["R", "A", "M", "V"]
+        assert linhas[-1] == [4, "E1", "V", {"7894900011517": 3}]
+
+    def test_operacao_com_erro_nao_e_registrada(self, diario, produtos):
+        """Testa que operações recusadas não vão para o diário."""
+        nescau, _ = produtos
+        e = estoque.Estoque("E1")
+        e.registrar_produto(nescau, 5, 5)
+        assert e.adicionar_produto(nescau, 100)["retorno"] != 0
+        with open(diario.caminho_diario, encoding="utf-8") as f:
+            assert len(f.readlines()) == 1
+
+    def test_venda_invalida_nao_altera_estoque(self, produtos):
+        """Testa que uma venda com um item inválido não baixa nenhum item."""
+        nescau, arroz = produtos
+        e = estoque.Estoque("E1")
+        e.registrar_produto(nescau, 50, 20)
+        e.registrar_produto(arroz, 50, 20)
+        e.adicionar_produto(nescau, 5, "exposicao")
+        e.adicionar_produto(arroz, 1, "exposicao")
+        assert e.retirar_venda({nescau: 2, arroz: 3})["retorno"] == 2
+        assert e.exposicao[nescau] == 5
+
+    def test_recuperar_refaz_diario(self, diario, produtos):
+        """Testa a recuperação de uma sessão interrompida sem snapshot."""
+        nescau, arroz = produtos
+        e = estoque.registrar_estoque("E1")["dados"]
+        e.registrar_produto(nescau, 50, 20)
+        e.adicionar_produto(nescau, 10, "exposicao")
+        e.retirar_venda({nescau: 3})
+
+        novo = simular_reinicio(diario, produtos)
+        assert novo.recuperar()["dados"] == 3
+        recuperado = estoque._todos_estoques["E1"]
+        assert recuperado.exposicao[nescau] == 7
+
+    def test_recuperar_snapshot_mais_cauda(self, diario, produtos):
+        """Testa que só as operações posteriores ao snapshot são refeitas."""
+        nescau, _ = produtos
+        e = estoque.registrar_estoque("E1")["dados"]
+        e.registrar_produto(nescau, 50, 20)
+        e.adicionar_produto(nescau, 10, "exposicao")
+        assert diario.compactar()["dados"] == 1
+        e.retirar_venda({nescau: 4})
+
+        novo = simular_reinicio(diario, produtos)
+        assert novo.recuperar()["dados"] == 1
+        assert estoque._todos_estoques["E1"].exposicao[nescau] == 6
+
+    def test_recuperar_ignora_linha_incompleta(self, diario, produtos):
+        """Testa que uma última linha cortada por uma queda é descartada."""
+        nescau, _ = produtos
+        e = estoque.registrar_estoque("E1")["dados"]
+        e.registrar_produto(nescau, 50, 20)
+        diario.fechar()
+        with open(diario.caminho_diario, "a", encoding="utf-8") as f:
+            f.write('[2,"E1","A","78949')
+
+        novo = simular_reinicio(diario, produtos)
+        assert novo.recuperar()["dados"] == 1
+        assert estoque._todos_estoques["E1"].estoque[nescau] == 0
+
+    def test_operacao_apos_linha_incompleta(self, diario, produtos):
+        """Testa que, após uma queda, as operações novas não se juntam à linha cortada e são recuperadas depois."""
+        _, arroz = produtos
+        e = estoque.registrar_estoque("E1")["dados"]
+        e.registrar_produto(arroz, 50, 20)
+        e.adicionar_produto(arroz, 10)
+        diario.fechar()
+        with open(diario.caminho_diario, "a", encoding="utf-8") as f:
+            f.write('[3,"E1","A","789')
+
+        novo = simular_reinicio(diario, produtos)
+        assert novo.recuperar()["dados"] == 2
+        estoque.definir_diario(novo)
+        recuperado = estoque._todos_estoques["E1"]
+        recuperado.adicionar_produto(arroz, 5)
+        recuperado.adicionar_produto(arroz, 7)
+
+        outro = simular_reinicio(novo, produtos)
+        assert outro.recuperar()["dados"] == 4
+        assert estoque._todos_estoques["E1"].estoque[arroz] == 22
+        with open(diario.caminho_diario, encoding="utf-8") as f:
+            assert [json.loads(l)[0] for l in f] == [1, 2, 3, 4]
+
+    def test_queda_durante_compactacao(self, diario, produtos):
+        """Testa que operações já incluídas no snapshot não são aplicadas duas vezes."""
+        nescau, _ = produtos
+        e = estoque.registrar_estoque("E1")["dados"]
+        e.registrar_produto(nescau, 50, 20)
+        e.adicionar_produto(nescau, 10)
+        with open(diario.caminho_diario, encoding="utf-8") as f:
+            conteudo = f.read()
+        diario.compactar()
+        # Simula uma queda antes do truncamento do diário
+        with open(diario.caminho_diario, "w", encoding="utf-8") as f:
+            f.write(conteudo)
+
+        novo = simular_reinicio(diario, produtos)
+        assert novo.recuperar()["dados"] == 0
+        assert estoque._todos_estoques["E1"].estoque[nescau] == 10
+
+    def test_sequencia_continua_apos_reinicio(self, diario, produtos):
+        """Testa que um novo diário continua a numeração das operações."""
+        nescau, _ = produtos
+        e = estoque.registrar_estoque("E1")["dados"]
+        e.registrar_produto(nescau, 50, 20)
+        diario.fechar()
+
+        novo = diario_estoque.DiarioEstoque(diario.caminho_diario, diario.caminho_snapshot)
+        estoque.definir_diario(novo)
+        e.adicionar_produto(nescau, 1)
+        novo.fechar()
+        with open(diario.caminho_diario, encoding="utf-8") as f:
+            assert [json.loads(l)[0] for l in f] == [1, 2]
+
+    def test_compactacao_automatica(self, tmp_path, produtos):
+        """Testa que o diário é compactado ao atingir o limite de operações."""
+        nescau, _ = produtos
+        d = diario_estoque.DiarioEstoque(str(tmp_path / "d"), str(tmp_path / "s.json"), limite_compactacao=3)
+        estoque.definir_diario(d)
+        e = estoque.registrar_estoque("E1")["dados"]
+        e.registrar_produto(nescau, 50, 20)
+        e.adicionar_produto(nescau, 1)
+        e.adicionar_produto(nescau, 1)
+        d.fechar()
+        assert (tmp_path / "d").read_text(encoding="utf-8") == ""
+        with open(tmp_path / "s.json", encoding="utf-8") as f:
+            assert json.load(f)["estoques"]["E1"]["estoque"] == {"7894900011517": 2}
+
+
+class TestRecuperacaoComEstoquesGravados:
+
+    @pytest.fixture(autouse=True)
+    def armazenamento_temporario(self, tmp_path):
+        """Usa um armazenamento JSON em diretório temporário."""
+        from modulos import armazenamento, rastreamento
+        arquivos = {nome: str(tmp_path / f"{nome}.json") for nome in armazenamento.ENTIDADES}
+        armazenamento.definir_armazenamento(armazenamento.ArmazenamentoJSON(arquivos))
+        rastreamento.limpar_modificados()
+        yield
+        armazenamento.definir_armazenamento(None)
+        rastreamento.limpar_modificados()
+
+    def reiniciar_e_carregar(self, diario_antigo, produtos_salvos):
+        """Simula o reinício e carrega os estoques gravados, como `carregar_dados()`."""
+        novo = simular_reinicio(diario_antigo, produtos_salvos)
+        estoque.carregar_estoques()
+        return novo
+
+    def test_estoque_gravado_sem_diario_prevalece_sobre_snapshot(self, diario, produtos):
+        """
+        Testa que um estoque gravado sem diário ativo (dados de teste regenerados ou importados) não é
+        substituído por um snapshot mais antigo.
+        """
+        nescau, _ = produtos
+        e = estoque.registrar_estoque("E1")["dados"]
+        e.registrar_produto(nescau, 50, 20)
+        e.adicionar_produto(nescau, 10)
+        diario.compactar()
+
+        estoque.definir_diario(None)
+        e.adicionar_produto(nescau, 20)
+        estoque.salvar_estoques()
+        assert "seq_diario" not in e.to_json()
+
+        novo = self.reiniciar_e_carregar(diario, produtos)
+        assert novo.recuperar()["dados"] == 0
+        assert estoque._todos_estoques["E1"].estoque[nescau] == 30
+
+    def test_refaz_apenas_operacoes_posteriores_a_gravacao(self, diario, produtos):
+        """Testa que a gravação guarda a sequência do diário e que só as operações seguintes são refeitas."""
+        nescau, _ = produtos
+        e = estoque.registrar_estoque("E1")["dados"]
+        e.registrar_produto(nescau, 50, 20)
+        e.adicionar_produto(nescau, 10)
+        diario.compactar()
+        e.adicionar_produto(nescau, 5)
+        estoque.salvar_estoques()
+        e.adicionar_produto(nescau, 1)
+
+        novo = self.reiniciar_e_carregar(diario, produtos)
+        assert estoque._todos_estoques["E1"].seq_diario == 3
+        assert novo.recuperar()["dados"] == 1
+        assert estoque._todos_estoques["E1"].estoque[nescau] == 16
+        assert novo.seq_atual() == 4
+
+    def test_snapshot_mais_recente_que_a_gravacao(self, diario, produtos):
+        """Testa que um estoque gravado antes do snapshot é substituído por ele antes de refazer o diário."""
+        nescau, _ = produtos
+        e = estoque.registrar_estoque("E1")["dados"]
+        e.registrar_produto(nescau, 50, 20)
+        estoque.salvar_estoques()
+        e.adicionar_produto(nescau, 10)
+        diario.compactar()
+        e.adicionar_produto(nescau, 2)
+
+        novo = self.reiniciar_e_carregar(diario, produtos)
+        assert novo.recuperar()["dados"] == 1
+        assert estoque._todos_estoques["E1"].estoque[nescau] == 12
@@ -0,0 +1,202 @@
+import pytest
+from modulos import armazenamento
+from modulos import rastreamento
+from modulos import produto
+from modulos import funcionario
+from modulos import estoque
+from modulos import carrinho
+from modulos import unidades
+from modulos.exportacao import COLUNAS, exportar, importar
+
+
+REGISTROS = {"produtos": produto._todos_produtos, "funcionarios": funcionario._todos_funcionarios,
+             "estoques": estoque._todos_estoques, "carrinhos": carrinho._todos_carrinhos,
+             "unidades": unidades._unidades}
+SALVAR = (produto.salvar_produtos, funcionario.salvar_funcionarios, estoque.salvar_estoques,
+          carrinho.salvar_carrinhos, unidades.salvar_unidades)
+
+
+def limpar():
+    """Esvazia os registros globais e as marcações de modificação."""
+    for registro in REGISTROS.values():
+        registro.clear()
+    rastreamento.limpar_modificados()
+    carrinho._ultimo_id = 0
+
+
+def estado():
+    """Resume o conteúdo dos registros globais para comparação."""
+    return {entidade: {str(k): objeto.to_json() for k, objeto in registro.items()}
+            for entidade, registro in REGISTROS.items()}
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados(tmp_path):
+    """
+    Usa um armazenamento JSON temporário e limpa os registros globais antes e depois de cada teste.
+    """
+    arquivos = {entidade: str(tmp_path / f"{entidade}.json") for entidade in armazenamento.ENTIDADES}
+    armazenamento.definir_armazenamento(armazenamento.ArmazenamentoJSON(arquivos))
+    limpar()
+    yield
+    armazenamento.definir_armazenamento(None)
+    limpar()
+
+
+@pytest.fixture
+def dados_gravados():
+    """Grava uma unidade com estoque, um funcionário desligado, duas vendas e um carrinho vazio, e esvazia a memória."""
+    arroz = produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)["dados"]
+    cafe = produto.registrar_produto("Café; \"forte\"", "Melitta", "Bebidas", "7890000000024", 0.5, 12.5, 25.0)["dados"]
+    funcionario.adiciona_funcionario("Ana", 101, "Caixa", "2023/01/10")
+    funcionario.adiciona_funcionario("Bruno", 102, "Repositor", "2023/02/01")
+    funcionario._todos_funcionarios[102].desligar_funcionario("2024/03/01")
+
+    unidades.adiciona_Unidade(1, "Centro", (-23.5, -46.6), funcionarios=[funcionario._todos_funcionarios[101]])
+    unidade = unidades._unidades[1]
+    unidade.estoque.registrar_produto(arroz, 100, 20)
+    unidade.estoque.registrar_produto(cafe, 50, 10)
+    unidade.estoque.adicionar_produto(arroz, 40, "estoque")
+    unidade.estoque.adicionar_produto(cafe, 5, "exposicao")
+    for itens in ({arroz: 2, cafe: 1}, {cafe: 3}):
+        c = carrinho.criar_carrinho()["dados"]
+        for p, q in itens.items():
+            c.adiciona_no_carrinho(p, q)
+        c.finaliza_carrinho(funcionario=funcionario._todos_funcionarios[101])
+        unidade.registrar_venda(c)
+    carrinho.criar_carrinho()
+
+    for salvar in SALVAR:
+        salvar()
+    esperado = estado()
+    limpar()
+    return esperado
+
+
+class TestExportacao:
+
+    @pytest.mark.parametrize("formato", ["csv", "jsonl"])
+    def test_ida_e_volta(self, dados_gravados, formato, tmp_path):
+        """Testa que exportar e importar todas as entidades, na ordem de dependência, reconstrói o mesmo estado."""
+        for entidade in armazenamento.ENTIDADES:
+            assert exportar(entidade, str(tmp_path / f"{entidade}.{formato}"), formato)["retorno"] == 0
+        for entidade in armazenamento.ENTIDADES:
+            resultado = importar(entidade, str(tmp_path / f"{entidade}.{formato}"))
+            assert resultado["retorno"] == 0
+            assert resultado["dados"]["rejeitados"] == 0, resultado["dados"]["erros"]
+        assert estado() == dados_gravados
+
+    def test_linhas_por_item(self, dados_gravados, tmp_path):
+        """Testa que estoques geram uma linha por produto e carrinhos uma por item, com o cabeçalho das colunas."""
+        assert exportar("estoques", str(tmp_path / "e.csv"))["dados"] == 2
+        assert exportar("carrinhos", str(tmp_path / "c.csv"))["dados"] == 4
+        linhas = (tmp_path / "c.csv").read_text(encoding="utf-8").splitlines()
+        assert linhas[0] == ",".join(COLUNAS["carrinhos"])
+        assert linhas[-1].startswith("3,,,")
+
+    def test_lotes_nao_alteram_o_arquivo(self, dados_gravados, tmp_path):
+        """Testa que o tamanho do lote de escrita não muda o conteúdo exportado."""
+        exportar("carrinhos", str(tmp_path / "um.jsonl"), "jsonl", tamanho_lote=1)
+        exportar("carrinhos", str(tmp_path / "todos.jsonl"), "jsonl", tamanho_lote=1000)
+        assert (tmp_path / "um.jsonl").read_bytes() == (tmp_path / "todos.jsonl").read_bytes()
+
+    def test_parametros_invalidos(self, tmp_path):
+        """Testa a recusa de entidades e formatos desconhecidos."""
+        assert exportar("clientes", str(tmp_path / "x.csv"))["retorno"] == 1
+        assert exportar("produtos", str(tmp_path / "x.xml"), "xml")["retorno"] == 2
+        assert importar("clientes", str(tmp_path / "x.csv"))["retorno"] == 1
+        assert importar("produtos", str(tmp_path / "x.xml"))["retorno"] == 2
+
+
+class TestImportacao:
+
+    def test_validacao_por_linha(self, tmp_path):
+        """Testa que linhas inválidas são rejeitadas com o número da linha, sem interromper as demais."""
+        arquivo = tmp_path / "produtos.csv"
+        arquivo.write_text(",".join(COLUNAS["produtos"]) + "\n"
+                           "7890000000017,Arroz,Tio João,Grãos,1.0,5.0,\n"
+                           "7890000000018,Feijão,Camil,Grãos,1.0,8.0,\n"
+                           "7890000000017,Arroz,Tio João,Grãos,1.0,5.0,\n"
+                           "7890000000024,Café,Melitta,Bebidas,abc,12.5,\n", encoding="utf-8")
+        dados = importar("produtos", str(arquivo))["dados"]
+        assert dados["importados"] == 1 and dados["rejeitados"] == 3
+        assert [e["linha"] for e in dados["erros"]] == [3, 4, 5]
+        assert dados["erros"][0]["mensagem"] == "Código de barras inválido"
+        assert list(produto._todos_produtos) == ["7890000000017"]
+        assert rastreamento.obter_modificados("produtos")
+
+    def test_produtos_em_lotes(self, tmp_path):
+        """Testa que produtos são cadastrados de lote em lote, com os erros no número da linha do arquivo."""
+        arquivo = tmp_path / "produtos.jsonl"
+        arquivo.write_text('{"codigo": "7890000000017", "nome": "Arroz", "marca": "Tio João", "categoria": "Grãos", "peso": 1, "preco": 5, "preco_por_peso": null}\n'
+                           '{"codigo": "7890000000017", "nome": "Arroz", "marca": "Camil", "categoria": "Grãos", "peso": 1, "preco": 4, "preco_por_peso": null}\n'
+                           '{"codigo": "7890000000024", "nome": "Café", "marca": "Melitta", "categoria": "Bebidas", "peso": 1}\n'
+                           '{"codigo": "7890000000017", "nome": "Arroz", "marca": "Prato Fino", "categoria": "Grãos", "peso": 1, "preco": 6, "preco_por_peso": null}\n'
+                           '{"codigo": "7890000000031", "nome": "Sal", "marca": "Cisne", "categoria": "Mercearia", "peso": 1, "preco": 2, "preco_por_peso": null}\n',
+                           encoding="utf-8")
+        chamadas = []
+        dados = importar("produtos", str(arquivo), tamanho_lote=2,
+                         ao_concluir_lote=lambda: chamadas.append(len(produto._todos_produtos)))["dados"]
+        assert dados["importados"] == 2 and dados["rejeitados"] == 3
+        assert dados["erros"] == [{"linha": 2, "mensagem": "Código repetido no lote"},
+                                  {"linha": 3, "mensagem": "Coluna ausente: 'preco'"},
+                                  {"linha": 4, "mensagem": "Produto já cadastrado com este código"}]
+        assert chamadas == [1, 1, 2]
+        assert list(produto._todos_produtos) == ["7890000000017", "7890000000031"]
+
+    def test_estoque_acima_da_capacidade(self, tmp_path):
+        """Testa que uma quantidade acima da capacidade rejeita a linha sem deixar o produto registrado."""
+        produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)
+        arquivo = tmp_path / "estoques.jsonl"
+        arquivo.write_text('{"estoque": "E1", "produto": "7890000000017", "capacidade_estoque": 10, '
+                           '"capacidade_exposicao": 5, "quantidade_estoque": 11, "quantidade_exposicao": 0}\n',
+                           encoding="utf-8")
+        dados = importar("estoques", str(arquivo))["dados"]
+        assert dados["rejeitados"] == 1
+        assert estoque._todos_estoques["E1"].capacidades == {}
+
+    def test_carrinho_com_produto_ausente(self, tmp_path):
+        """Testa que um carrinho com um item inválido é rejeitado por inteiro e os seguintes são importados."""
+        produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)
+        arquivo = tmp_path / "carrinhos.csv"
+        arquivo.write_text(",".join(COLUNAS["carrinhos"]) + "\n"
+                           "1,2024/01/10,,5.0,7890000000017,1\n"
+                           "1,2024/01/10,,5.0,7890000000031,1\n"
+                           "2,2024/01/11,,10.0,7890000000017,2\n", encoding="utf-8")
+        dados = importar("carrinhos", str(arquivo))["dados"]
+        assert dados["importados"] == 1 and dados["erros"] == [{"linha": 2, "mensagem": "Produto não encontrado"}]
+        assert list(carrinho._todos_carrinhos) == [2]
+
+    def test_carrinho_ja_gravado_fora_da_memoria(self, tmp_path):
+        """
+        Testa que, com gravação parcial, um carrinho gravado que não está na memória não é sobrescrito pela
+        importação, e que os novos carrinhos não reutilizam os IDs importados.
+        """
+        banco = armazenamento.ArmazenamentoSQLite(str(tmp_path / "teste.db"))
+        armazenamento.definir_armazenamento(banco)
+        produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)
+        banco.salvar("carrinhos", {"1": {"id": 1, "data_hora": "2024/01/10", "itens": {"7890000000017": 1},
+                                         "total": 5.0, "funcionario": None}})
+        arquivo = tmp_path / "carrinhos.csv"
+        arquivo.write_text(",".join(COLUNAS["carrinhos"]) + "\n"
+                           "1,2024/02/10,,10.0,7890000000017,2\n"
+                           "7,2024/02/11,,5.0,7890000000017,1\n", encoding="utf-8")
+
+        dados = importar("carrinhos", str(arquivo), ao_concluir_lote=carrinho.salvar_carrinhos)["dados"]
+        assert dados["importados"] == 1
+        assert dados["erros"] == [{"linha": 2, "mensagem": "Carrinho já cadastrado com este ID"}]
+        assert banco.consultar("carrinhos", 1)["total"] == 5.0
+        carrinho._todos_carrinhos.clear()
+        assert carrinho.criar_carrinho()["dados"].id == 8
+        banco.fechar()
+
+    def test_lotes(self, tmp_path):
+        """Testa que a função de fim de lote é chamada a cada `tamanho_lote` registros e ao final."""
+        arquivo = tmp_path / "funcionarios.csv"
+        arquivo.write_text(",".join(COLUNAS["funcionarios"]) + "\n"
+                           + "".join(f"{100 + i},Func {i},Caixa,2023/01/10,\n" for i in range(5)), encoding="utf-8")
+        chamadas = []
+        dados = importar("funcionarios", str(arquivo), tamanho_lote=2,
+                         ao_concluir_lote=lambda: chamadas.append(len(funcionario._todos_funcionarios)))
+        assert dados["dados"]["importados"] == 5
+        assert chamadas == [2, 4, 5]
@@ -0,0 +1,245 @@
+import random
+import pytest
+from modulos import produto as modulo_produto
+from modulos.produto import Produto
+from modulos.indice_produtos import normalizar, tokenizar, IndiceTokens, IndiceTrigramas, IndiceFacetas, IndicePrefixos, \
+    IndiceRelevancia
+
+
+def produto(codigo, nome, marca="Marca", categoria="Categoria"):
+    """Cria um produto avulso, fora do registro global."""
+    return Produto(nome, marca, categoria, codigo, 1.0, 1.0)
+
+
+class TestNormalizacao:
+
+    def test_normalizar(self):
+        """Testa que acentos e maiúsculas não diferenciam textos."""
+        assert normalizar("LATICÍNIOS Pão") == normalizar("laticinios pao") == "laticinios pao"
+
+    def test_tokenizar(self):
+        """Testa a separação em palavras, com a pontuação como separador."""
+        assert tokenizar("Coca-Cola 2L, Zero Açúcar") == ["coca", "cola", "2l", "zero", "acucar"]
+        assert tokenizar("  ...  ") == []
+
+
+class TestIndiceTokens:
+
+    def test_buscar_intersecta(self):
+        """Testa que só são encontrados os produtos com todas as palavras do texto."""
+        indice = IndiceTokens()
+        indice.adicionar(produto("1", "Leite Integral", "Marca A"))
+        indice.adicionar(produto("2", "Leite Desnatado", "Marca B"))
+        indice.adicionar(produto("3", "Iogurte Integral", "Marca A"))
+        assert indice.buscar("leite") == {"1", "2"}
+        assert indice.buscar("integral marca a") == {"1", "3"}
+        assert indice.buscar("leite iogurte") == set()
+        assert indice.buscar("chocolate leite") == set()
+        assert indice.buscar("") == set()
+
+    def test_reindexar(self):
+        """Testa que reindexar um produto retira as palavras antigas e apaga as listas vazias."""
+        indice = IndiceTokens()
+        p = produto("1", "Café em Pó")
+        indice.adicionar(p)
+        object.__setattr__(p, "nome", "Café Torrado")
+        indice.adicionar(p)
+        assert len(indice) == 1
+        assert indice.buscar("po") == set() and "po" not in indice._ocorrencias
+        assert indice.buscar("cafe torrado") == {"1"}
+
+    def test_reconstruir(self):
+        """Testa que a reconstrução descarta o conteúdo anterior."""
+        indice = IndiceTokens()
+        indice.adicionar(produto("1", "Arroz"))
+        indice.reconstruir([produto("2", "Feijão")])
+        assert len(indice) == 1
+        assert indice.buscar("arroz") == set() and indice.buscar("feijao") == {"2"}
+
+
+class TestIndiceTrigramas:
+
+    def test_candidatos(self):
+        """Testa que os candidatos vêm na ordem de indexação e que trechos curtos não usam o índice."""
+        indice = IndiceTrigramas()
+        indice.adicionar(produto("2", "Iogurte Natural"))
+        indice.adicionar(produto("1", "Leite", "Nestlé"))
+        indice.adicionar(produto("3", "Iogurte Grego"))
+        assert indice.candidatos("gurt") == ["2", "3"]
+        assert indice.candidatos("stl") == ["1"]
+        assert indice.candidatos("xyz") == []
+        assert indice.candidatos("io") is None
+
+    def test_reindexar_mantem_posicao(self):
+        """Testa que reindexar troca os trigramas sem mudar a posição do produto."""
+        indice = IndiceTrigramas()
+        p = produto("1", "Café em Pó")
+        indice.adicionar(p)
+        indice.adicionar(produto("2", "Café Torrado"))
+        object.__setattr__(p, "nome", "Café Torrado")
+        indice.adicionar(p)
+        assert len(indice) == 2
+        assert indice.candidatos("em pó") == [] and "m p" not in indice._ocorrencias
+        assert indice.candidatos("torrado") == ["1", "2"]
+
+
+class TestIndiceFacetas:
+
+    def test_selecionar(self):
+        """Testa a interseção dos grupos filtrados, ignorando filtros fora das facetas."""
+        indice = IndiceFacetas()
+        indice.adicionar(produto("1", "Leite", "Marca A", "Laticínios"))
+        indice.adicionar(produto("2", "Queijo", "Marca B", "Laticínios"))
+        indice.adicionar(produto("3", "Café", "Marca A", "Mercearia"))
+        assert indice.selecionar({"categoria": "Laticínios"}) == {"1", "2"}
+        assert indice.selecionar({"categoria": "Laticínios", "marca": "Marca A", "peso": 1.0}) == {"1"}
+        assert indice.selecionar({"marca": "Marca C"}) == set()
+        assert indice.selecionar({"peso": 1.0}) is None
+
+    def test_reindexar_mantem_posicao(self):
+        """Testa que reindexar muda o produto de grupo, apaga os grupos vazios e não muda a sua posição."""
+        indice = IndiceFacetas()
+        p = produto("1", "Suco", "Marca A", "Bebidas")
+        indice.adicionar(p)
+        indice.adicionar(produto("2", "Leite", "Marca A", "Laticínios"))
+        object.__setattr__(p, "categoria", "Laticínios")
+        indice.adicionar(p)
+        assert "Bebidas" not in indice._grupos["categoria"]
+        assert indice.ordenar(indice.selecionar({"categoria": "Laticínios"})) == ["1", "2"]
+
+    def test_contar_e_posicao(self):
+        """Testa a contagem por valor, de todo o índice ou de um gerador de códigos, e a posição pública de cada código."""
+        indice = IndiceFacetas()
+        indice.adicionar(produto("1", "Leite", "Marca A", "Laticínios"))
+        indice.adicionar(produto("2", "Queijo", "Marca B", "Laticínios"))
+        indice.adicionar(produto("3", "Café", "Marca A", "Mercearia"))
+        assert indice.contar() == {"categoria": {"Laticínios": 2, "Mercearia": 1}, "marca": {"Marca A": 2, "Marca B": 1}}
+        assert list(indice.contar()["categoria"]) == ["Laticínios", "Mercearia"]
+        assert indice.contar(c for c in ("2", "3")) == {"categoria": {"Laticínios": 1, "Mercearia": 1},
+                                                       "marca": {"Marca B": 1, "Marca A": 1}}
+        assert indice.contar(()) == {"categoria": {}, "marca": {}}
+        assert [indice.posicao(c) for c in ("1", "3")] == [0, 2]
+        assert indice.posicao("9") is None and indice.posicao("9", -1) == -1
+
+
+class TestIndicePrefixos:
+
+    def test_completar(self):
+        """Testa o autocompletar em ordem alfabética, sem acentos, sem repetir o produto que completa pelo nome e pela marca."""
+        indice = IndicePrefixos()
+        indice.adicionar(produto("1", "Café em Pó", "Melitta"))
+        indice.adicionar(produto("2", "Cafeteira", "Cadence"))
+        indice.adicionar(produto("3", "Leite", "Camponesa"))
+        indice.adicionar(produto("4", "Camomila", "Camomila"))
+        assert indice.completar("CAFE", 10) == ["1", "2"]
+        assert indice.completar("ca", 10) == ["2", "1", "4", "3"]
+        assert indice.completar("ca", 2) == ["2", "1"]
+        assert indice.completar("x", 10) == []
+
+    def test_reindexar(self):
+        """Testa que reindexar troca as entradas do produto e que a reconstrução mantém a pontuação."""
+        indice = IndicePrefixos()
+        p = produto("1", "Café em Pó", "Melitta")
+        indice.adicionar(p)
+        object.__setattr__(p, "marca", "Pilão")
+        indice.adicionar(p)
+        assert indice.completar("mel", 10) == [] and indice.completar("pil", 10) == ["1"]
+        indice.definir_pontuacao({"2": 5})
+        indice.reconstruir([p, produto("2", "Pão", "Pullman")])
+        assert indice.completar("p", 10, ordenar=True) == ["2", "1"]
+
+    @pytest.mark.parametrize("n_pontuados", [5, 400])
+    def test_ordenar_igual_a_forca_bruta(self, n_pontuados):
+        """Testa que os dois percursos da ordenação (intervalo e ranking) coincidem com a ordenação direta."""
+        aleatorio = random.Random(n_pontuados)
+        silabas = ["ca", "fe", "le", "ite", "mo", "ra", "pa", "o"]
+        produtos = [produto(f"{i:04d}", "".join(aleatorio.choices(silabas, k=3)), "".join(aleatorio.choices(silabas, k=2)))
+                    for i in range(500)]
+        indice = IndicePrefixos()
+        indice.reconstruir(produtos)
+        indice.definir_pontuacao({p.codigo: aleatorio.randint(1, 5) for p in aleatorio.sample(produtos, n_pontuados)})
+        indice.somar_pontuacao(produtos[0].codigo, 10)
+        indice.somar_pontuacao(produtos[1].codigo, -100)
+        pontuacao = indice._pontuacao
+        for prefixo in ["", "c", "ca", "cafe", "lei", "pao", "x"]:
+            completam = [p for p in produtos if any(normalizar(getattr(p, c)).startswith(prefixo) for c in ("nome", "marca"))]
+            pontuados = sorted((-pontuacao[p.codigo], p.codigo) for p in completam if p.codigo in pontuacao)
+            demais = sorted((min(normalizar(getattr(p, c)) for c in ("nome", "marca") if normalizar(getattr(p, c)).startswith(prefixo)), p.codigo)
+                            for p in completam if p.codigo not in pontuacao)
+            esperado = [codigo for _, codigo in pontuados] + [codigo for _, codigo in demais]
+            assert indice.completar(prefixo, 8, ordenar=True) == esperado[:8]
+
+
+class TestIndiceRelevancia:
+
+    def test_pontuar(self):
+        """Testa que o nome vale mais que a categoria, que campos curtos valem mais e que palavras raras valem mais."""
+        indice = IndiceRelevancia()
+        indice.adicionar(produto("1", "Leite", categoria="Laticínios"))
+        indice.adicionar(produto("2", "Leite Integral Tradicional Longa Vida", categoria="Laticínios"))
+        indice.adicionar(produto("3", "Queijo", categoria="Leite e Derivados"))
+        indice.adicionar(produto("4", "Arroz", categoria="Grãos"))
+        pontuacao = indice.pontuar("LEITE")
+        assert set(pontuacao) == {"1", "2", "3"}
+        assert pontuacao["1"] > pontuacao["2"] > pontuacao["3"] > 0
+        pontuacao = indice.pontuar("leite integral")
+        assert max(pontuacao, key=pontuacao.get) == "2"
+        assert indice.pontuar("leite", selecionados={"3", "4"}).keys() == {"3"}
+        assert indice.pontuar("") == {} and indice.pontuar("xyz") == {}
+
+    def test_reindexar(self):
+        """Testa que reindexar retira as palavras antigas e que a reconstrução equivale à indexação um a um."""
+        indice = IndiceRelevancia()
+        p = produto("1", "Café em Pó", "Melitta")
+        indice.adicionar(p)
+        indice.adicionar(produto("2", "Café Solúvel", "Nescafé"))
+        object.__setattr__(p, "marca", "Pilão")
+        indice.adicionar(p)
+        assert indice.pontuar("melitta") == {} and indice.pontuar("pilao").keys() == {"1"}
+        reconstruido = IndiceRelevancia()
+        reconstruido.reconstruir([p, produto("2", "Café Solúvel", "Nescafé")])
+        assert reconstruido.pontuar("cafe po") == pytest.approx(indice.pontuar("cafe po"))
+
+
+class TestBuscaPorTrecho:
+
+    @pytest.fixture(autouse=True)
+    def catalogo(self):
+        """Registra produtos com acentos e trechos espalhados entre campos, com o índice de trigramas ativo."""
+        modulo_produto._todos_produtos.clear()
+        modulo_produto.definir_indice_trigramas(True)
+        for codigo, nome, marca, categoria in [("7890000000017", "Iogurte Natural", "Nestlé", "Laticínios"),
+                                               ("7890000000024", "Leite Integral", "Piracanjuba", "Laticínios"),
+                                               ("7890000000031", "Café em Pó", "Melitta", "Mercearia"),
+                                               ("7890000000048", "Bebida Láctea", "Gurt", "Iogurtes")]:
+            assert modulo_produto.registrar_produto(nome, marca, categoria, codigo, 1.0, 1.0)["retorno"] == 0
+        yield
+        modulo_produto.definir_indice_trigramas(False)
+        modulo_produto._todos_produtos.clear()
+
+    def varredura(self, texto, filtros={}):
+        """Executa a mesma busca com a varredura sequencial."""
+        indice = modulo_produto._indice_trigramas
+        modulo_produto._indice_trigramas = None
+        try:
+            return modulo_produto.pesquisar_produto(texto, filtros)["dados"]
+        finally:
+            modulo_produto._indice_trigramas = indice
+
+    @pytest.mark.parametrize("texto", ["gurt", "GURT", "laticínios", "laticinios", "é em", "te n", "a", "", "xyz"])
+    def test_igual_a_varredura(self, texto):
+        """Testa que o índice retorna exatamente os produtos da varredura, na mesma ordem."""
+        assert modulo_produto.pesquisar_produto(texto)["dados"] == self.varredura(texto)
+
+    def test_trigramas_em_campos_diferentes(self):
+        """Testa que candidatos com os trigramas espalhados entre campos são descartados na verificação."""
+        assert modulo_produto._indice_trigramas.candidatos("urte n") == ["7890000000017"]
+        assert modulo_produto.pesquisar_produto("urtes n")["dados"] == []
+
+    def test_atualizacao(self):
+        """Testa que o índice acompanha `atualizar_produto` e os filtros continuam valendo."""
+        modulo_produto.atualizar_produto("7890000000031", {"nome": "Iogurte de Café"})
+        assert [p.codigo for p in modulo_produto.pesquisar_produto("gurt")["dados"]] == \
+            ["7890000000017", "7890000000031", "7890000000048"]
+        assert [p.codigo for p in modulo_produto.pesquisar_produto("gurt", {"marca": "Melitta"})["dados"]] == \
+            ["7890000000031"]
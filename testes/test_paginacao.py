@@ -0,0 +1,116 @@
+import pytest
+from modulos import produto
+from modulos import funcionario
+from modulos import carrinho
+from modulos.estoque import Estoque
+from modulos.paginacao import iterar_registro, paginar, parametro_invalido
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados():
+    """Limpa os registros globais antes e depois de cada teste."""
+    for registro in (produto._todos_produtos, funcionario._todos_funcionarios, carrinho._todos_carrinhos):
+        registro.clear()
+    yield
+    for registro in (produto._todos_produtos, funcionario._todos_funcionarios, carrinho._todos_carrinhos):
+        registro.clear()
+
+
+def percorrer(listar, limite, **parametros):
+    """Percorre todas as páginas de uma listagem, seguindo os cursores, e retorna as páginas obtidas."""
+    paginas = []
+    cursor = None
+    while True:
+        resultado = listar(limite=limite, cursor=cursor, **parametros)
+        assert resultado['retorno'] == 0
+        paginas.append(resultado['dados'])
+        cursor = resultado['cursor']
+        if cursor is None:
+            return paginas
+
+
+class TestPaginacao:
+
+    def test_paginar(self):
+        """Testa que a última página cheia não deixa cursor e que o deslocamento é aplicado antes da página."""
+        registro = {i: i * 10 for i in range(6)}
+        assert paginar(iterar_registro(registro), 3) == ([0, 10, 20], (2, 2))
+        assert paginar(iterar_registro(registro, (2, 2)), 3) == ([30, 40, 50], None)
+        assert paginar(iterar_registro(registro), 3, deslocamento=4) == ([40, 50], None)
+
+    def test_cursor_apos_remocao(self):
+        """Testa que o cursor continua depois do mesmo item quando um item anterior ou o próprio item é removido."""
+        registro = {i: i for i in range(6)}
+        _, cursor = paginar(iterar_registro(registro), 3)
+        del registro[0]
+        assert [v for _, v in iterar_registro(registro, cursor)] == [3, 4, 5]
+        registro = {i: i for i in range(6)}
+        del registro[2]
+        assert [v for _, v in iterar_registro(registro, cursor)] == [3, 4, 5]
+
+    def test_parametro_invalido(self):
+        """Testa a validação dos parâmetros de paginação."""
+        assert parametro_invalido(None, 0, None) is None
+        assert parametro_invalido(0, 0, None) == "limite"
+        assert parametro_invalido(5, -1, None) == "deslocamento"
+        assert parametro_invalido(5, 0, "abc") == "cursor"
+
+
+class TestListagensPaginadas:
+
+    def test_produtos(self):
+        """Testa que as páginas de produtos cobrem o catálogo na ordem do registro, e a variante sob demanda."""
+        codigos = ["7890000000017", "7890000000024", "7890000000031", "7890000000048", "7890000000055"]
+        for i, codigo in enumerate(codigos):
+            produto.registrar_produto(f"Produto {i}", "Marca", "Categoria", codigo, 1.0, 1.0)
+        paginas = percorrer(produto.listar_todos_produtos, 2)
+        assert [[p.codigo for p in pagina] for pagina in paginas] == [codigos[:2], codigos[2:4], codigos[4:]]
+        assert [p.codigo for p in produto.iterar_todos_produtos(limite=2, deslocamento=1)] == codigos[1:3]
+        assert produto.listar_todos_produtos(limite=0)['retorno'] == 3
+        with pytest.raises(ValueError):
+            produto.iterar_todos_produtos(deslocamento=-1)
+
+    @pytest.mark.parametrize("modo, trigramas", [("trecho", False), ("trecho", True), ("palavras", False)])
+    def test_pesquisa(self, modo, trigramas):
+        """Testa que as páginas de uma busca juntas dão o resultado completo, com e sem índices, e que as facetas contam tudo."""
+        codigos = ["7890000000017", "7890000000024", "7890000000031", "7890000000048", "7890000000055"]
+        produto.definir_indice_trigramas(trigramas)
+        try:
+            for i, codigo in enumerate(codigos):
+                produto.registrar_produto(f"Leite {i}", "Marca A" if i % 2 else "Marca B", "Laticínios", codigo, 1.0, 1.0)
+            for filtros in ({}, {"marca": "Marca B"}):
+                completo = produto.pesquisar_produto("leite", filtros, modo=modo)['dados']
+                paginas = percorrer(produto.pesquisar_produto, 2, texto="leite", filtros=filtros, modo=modo)
+                assert [p for pagina in paginas for p in pagina] == completo
+                assert list(produto.iterar_pesquisa_produto("leite", filtros, modo, limite=2, deslocamento=1)) == completo[1:3]
+            pagina = produto.pesquisar_produto("leite", modo=modo, limite=2, facetas=True)
+            assert len(pagina['dados']) == 2 and pagina['facetas']['marca'] == {"Marca B": 3, "Marca A": 2}
+        finally:
+            produto.definir_indice_trigramas(False)
+
+    def test_funcionarios(self):
+        """Testa que o deslocamento e as páginas de funcionários contam apenas os ativos."""
+        for codigo in range(1, 6):
+            funcionario.adiciona_funcionario(f"Funcionário {codigo}", codigo, "Caixa", "2023/01/10")
+        funcionario._todos_funcionarios[2].desligar_funcionario()
+        paginas = percorrer(funcionario.listar_todos_funcionarios, 2)
+        assert [[f.codigo for f in pagina] for pagina in paginas] == [[1, 3], [4, 5]]
+        assert [f.codigo for f in funcionario.iterar_todos_funcionarios(incluir_inativos=True, deslocamento=3)] == [4, 5]
+        assert funcionario.listar_todos_funcionarios(limite=2, deslocamento=10)['retorno'] == 0
+
+    def test_carrinhos(self):
+        """Testa as páginas de carrinhos."""
+        ids = [carrinho.criar_carrinho()['dados'].id for _ in range(3)]
+        paginas = percorrer(carrinho.listar_todos_carrinhos, 2)
+        assert [[c.id for c in pagina] for pagina in paginas] == [ids[:2], ids[2:]]
+        assert [c.id for c in carrinho.iterar_todos_carrinhos(cursor=(0, ids[0]))] == ids[1:]
+
+    def test_estoque(self):
+        """Testa as páginas detalhadas dos produtos de um estoque."""
+        estoque = Estoque("EST1")
+        for i, codigo in enumerate(["7890000000017", "7890000000024", "7890000000031"]):
+            estoque.registrar_produto(produto.Produto(f"Produto {i}", "Marca", "Categoria", codigo, 1.0, 1.0), 10, 5)
+        paginas = percorrer(estoque.listar_produtos, 2, detalhado=True)
+        assert [[item['codigo'] for item in pagina] for pagina in paginas] == [["7890000000017", "7890000000024"], ["7890000000031"]]
+        assert paginas[0][0]['capacidade_estoque'] == 10
+        assert list(estoque.iterar_produtos(deslocamento=2)) == ["7890000000031"]
@@ -12,6 +12,7 @@ def limpar_bases_de_dados(): # Nome do fixture atualizado para maior clareza
     funcionario._todos_funcionarios.clear()
     # ALTERAÇÃO: Adicionada a limpeza da base de produtos
     produto._todos_produtos.clear()
+    produto._agendas_precos.clear()
 
 # --- Testes para a função auxiliar _valida_codigo_barras ---
 class TestValidaCodigoBarras:
@@ -224,4 +225,361 @@ class TestPesquisarProduto:
         """
         resultado = produto.pesquisar_produto(None)
         assert resultado['retorno'] == 4
-        assert resultado['mensagem'] == "Parâmetro nulo"
\ No newline at end of file
+        assert resultado['mensagem'] == "Parâmetro nulo"
+
+    def test_pesquisa_por_palavras(self, setup_produtos_pesquisa):
+        """
+        Testa a busca pelo índice de palavras: todas as palavras precisam aparecer, sem diferenciar acentos.
+        """
+        resultado = produto.pesquisar_produto("LATICINIOS leite", modo="palavras")
+        assert [p.codigo for p in resultado['dados']] == ["7890000000017", "7890000000024"]
+        assert produto.pesquisar_produto("leite marca", modo="palavras", filtros={"marca": "Marca B"})['dados'][0].nome == "Leite Desnatado"
+        assert produto.pesquisar_produto("lei", modo="palavras")['dados'] == []
+        assert produto.pesquisar_produto("leite bebidas", modo="palavras")['dados'] == []
+
+    def test_pesquisa_por_palavras_apos_atualizacao(self, setup_produtos_pesquisa):
+        """
+        Testa que o índice acompanha as alterações feitas por `atualizar_produto`.
+        """
+        produto.atualizar_produto("7890000000031", {"nome": "Café Torrado"})
+        assert produto.pesquisar_produto("po", modo="palavras")['dados'] == []
+        assert [p.codigo for p in produto.pesquisar_produto("torrado", modo="palavras")['dados']] == ["7890000000031"]
+
+    def test_pesquisa_por_palavras_apos_carga(self, setup_produtos_pesquisa):
+        """
+        Testa que produtos postos diretamente no registro, como numa carga, também são encontrados.
+        """
+        produto._todos_produtos["7890000000055"] = produto.Produto("Leite Condensado", "Marca C", "Doces", "7890000000055", 0.4, 6.0)
+        assert len(produto.pesquisar_produto("leite", modo="palavras")['dados']) == 3
+
+    def test_pesquisa_modo_invalido(self, setup_produtos_pesquisa):
+        """
+        Testa a recusa de um modo de busca desconhecido.
+        (Retorno esperado: 3)
+        """
+        assert produto.pesquisar_produto("leite", modo="regex")['retorno'] == 3
+    def test_pesquisa_so_com_filtros(self, setup_produtos_pesquisa):
+        """
+        Testa uma busca sem texto, só com filtros de faceta, que mantém a ordem do registro e combina os filtros.
+        """
+        resultado = produto.pesquisar_produto("", filtros={"marca": "Marca A"})
+        assert [p.codigo for p in resultado['dados']] == ["7890000000017", "7890000000031"]
+        assert produto.pesquisar_produto("", filtros={"marca": "Marca A", "categoria": "Laticínios"})['dados'][0].nome == "Leite Integral"
+        assert produto.pesquisar_produto("", filtros={"marca": "Marca A", "preco": 12.00})['dados'][0].nome == "Café em Pó"
+        assert produto.pesquisar_produto("", filtros={"categoria": ["Bebidas"]})['dados'] == []
+
+    def test_pesquisa_com_facetas(self, setup_produtos_pesquisa):
+        """
+        Testa a contagem de resultados por categoria e por marca, e que ela acompanha `atualizar_produto`.
+        """
+        produto.atualizar_produto("7890000000048", {"categoria": "Laticínios"})
+        resultado = produto.pesquisar_produto("", facetas=True)
+        assert resultado['facetas'] == {"categoria": {"Laticínios": 3, "Mercearia": 1},
+                                        "marca": {"Marca A": 2, "Marca B": 1, "Marca C": 1}}
+        assert len(produto.pesquisar_produto("", filtros={"categoria": "Laticínios"})['dados']) == 3
+        assert produto.pesquisar_produto("", filtros={"categoria": "Bebidas"})['dados'] == []
+        assert produto.pesquisar_produto("leite", modo="palavras", filtros={"categoria": "Laticínios"}, facetas=True)['facetas']['marca'] == \
+            {"Marca A": 1, "Marca B": 1}
+        assert "facetas" not in produto.pesquisar_produto("leite")
+
+    def test_facetas_com_limite(self, setup_produtos_pesquisa):
+        """
+        Testa que, com `limite`, as facetas continuam contando a busca inteira, e não apenas a página.
+        """
+        for texto, filtros in [("", {}), ("", {"marca": "Marca A"}), ("leite", {}), ("", {"preco": 5.00})]:
+            esperado = produto.pesquisar_produto(texto, filtros, facetas=True)['facetas']
+            for deslocamento in (0, 1):
+                paginado = produto.pesquisar_produto(texto, filtros, facetas=True, limite=1, deslocamento=deslocamento)
+                assert paginado['facetas'] == esperado
+
+    def test_registro_substituido_com_mesmo_tamanho(self, setup_produtos_pesquisa):
+        """
+        Testa que os índices são reconstruídos quando o registro é trocado por outro com o mesmo número de produtos.
+        """
+        assert len(produto.pesquisar_produto("leite", modo="palavras")['dados']) == 2
+        substitutos = {codigo: produto.Produto(f"Biscoito {i}", "Marca D", "Mercearia", codigo, 0.2, 3.00)
+                       for i, codigo in enumerate(list(produto._todos_produtos))}
+        produto._todos_produtos.clear()
+        produto._todos_produtos.update(substitutos)
+        assert produto.pesquisar_produto("leite", modo="palavras")['dados'] == []
+        assert len(produto.pesquisar_produto("biscoito", modo="palavras")['dados']) == 4
+        assert produto.pesquisar_produto("", facetas=True)['facetas']['marca'] == {"Marca D": 4}
+
+
+# --- Testes para a função completar_produto ---
+class TestCompletarProduto:
+
+    @pytest.fixture
+    def setup_produtos_autocompletar(self):
+        """Cria produtos para o autocompletar e descarta o volume de vendas ao final."""
+        produto.registrar_produto("Leite Integral", "Itambé", "Laticínios", "7890000000017", 1.0, 5.00)
+        produto.registrar_produto("Leite Desnatado", "Italac", "Laticínios", "7890000000024", 1.0, 5.50)
+        produto.registrar_produto("Café em Pó", "Melitta", "Mercearia", "7890000000031", 0.5, 12.00)
+        produto.registrar_produto("Iogurte Natural", "Nestlé", "Laticínios", "7890000000048", 0.2, 3.00)
+        yield
+        produto.definir_volume_vendas({})
+
+    def test_completar_nome_e_marca(self, setup_produtos_autocompletar):
+        """
+        Testa sugestões pelo início do nome ou da marca, ignorando acentos, em ordem alfabética e limitadas a `k`.
+        """
+        resultado = produto.completar_produto("i")
+        assert resultado['retorno'] == 0
+        assert [p.nome for p in resultado['dados']] == ["Iogurte Natural", "Leite Desnatado", "Leite Integral"]
+        assert [p.nome for p in produto.completar_produto("ITAMBE")['dados']] == ["Leite Integral"]
+        assert len(produto.completar_produto("lei", k=1)['dados']) == 1
+
+    def test_completar_apos_atualizacao(self, setup_produtos_autocompletar):
+        """
+        Testa que as sugestões acompanham `atualizar_produto`.
+        """
+        produto.atualizar_produto("7890000000031", {"nome": "Cappuccino"})
+        assert produto.completar_produto("cafe")['dados'] == []
+        assert [p.codigo for p in produto.completar_produto("capp")['dados']] == ["7890000000031"]
+
+    def test_completar_por_vendas(self, setup_produtos_autocompletar):
+        """
+        Testa a ordenação pelo volume de vendas, com os produtos sem vendas ao final.
+        """
+        produto.definir_volume_vendas({"7890000000017": 3})
+        produto.somar_volume_vendas({"7890000000024": 5})
+        nomes = [p.nome for p in produto.completar_produto("i", por_vendas=True)['dados']]
+        assert nomes == ["Leite Desnatado", "Leite Integral", "Iogurte Natural"]
+
+    def test_completar_parametros_invalidos(self):
+        """
+        Testa a recusa de prefixo nulo e de quantidade inválida.
+        """
+        assert produto.completar_produto(None)['retorno'] == 4
+        assert produto.completar_produto("lei", k=0)['retorno'] == 3
+
+
+class TestPesquisarPorRelevancia:
+
+    @pytest.fixture
+    def setup_produtos_relevancia(self):
+        """Cria produtos com a palavra "leite" em campos diferentes e descarta o volume de vendas ao final."""
+        produto.registrar_produto("Leite Integral", "Itambé", "Laticínios", "7890000000017", 1.0, 5.00)
+        produto.registrar_produto("Doce de Leite", "Aviação", "Doces", "7890000000024", 0.4, 9.00)
+        produto.registrar_produto("Queijo Minas", "Leite Bom", "Laticínios", "7890000000031", 0.5, 20.00)
+        produto.registrar_produto("Leite Condensado", "Moça", "Doces", "7890000000048", 0.4, 7.00)
+        produto.registrar_produto("Arroz", "Tio João", "Mercearia", "7890000000055", 5.0, 25.00)
+        yield
+        produto.definir_volume_vendas({})
+
+    def test_ordem_de_relevancia(self, setup_produtos_relevancia):
+        """
+        Testa que a palavra no nome vale mais que na marca e que basta uma das palavras do texto.
+        """
+        resultado = produto.pesquisar_produto("leite", modo="relevancia")
+        assert resultado['retorno'] == 0
+        codigos = [p.codigo for p in resultado['dados']]
+        assert len(codigos) == 4 and codigos[-1] == "7890000000031"
+        assert produto.pesquisar_produto("leite integral", modo="relevancia")['dados'][0].codigo == "7890000000017"
+        assert [p.codigo for p in produto.pesquisar_produto("arroz leite", modo="relevancia", filtros={"categoria": "Doces"})['dados']] == \
+            ["7890000000048", "7890000000024"]
+
+    def test_paginas_iguais_a_ordem_completa(self, setup_produtos_relevancia):
+        """
+        Testa que as páginas, selecionadas por heap, seguem a ordenação completa.
+        """
+        completa = produto.pesquisar_produto("leite doce", modo="relevancia")['dados']
+        paginas, cursor = [], None
+        while True:
+            resultado = produto.pesquisar_produto("leite doce", modo="relevancia", limite=1, cursor=cursor)
+            paginas += resultado['dados']
+            cursor = resultado['cursor']
+            if cursor is None:
+                break
+        assert paginas == completa
+        assert list(produto.iterar_pesquisa_produto("leite doce", modo="relevancia", limite=2, deslocamento=1)) == completa[1:3]
+
+    def test_aumento_por_vendas(self, setup_produtos_relevancia):
+        """
+        Testa que o volume de vendas só altera a ordem com `por_vendas=True`.
+        """
+        produto.definir_volume_vendas({"7890000000031": 10000})
+        assert produto.pesquisar_produto("leite", modo="relevancia")['dados'][0].codigo != "7890000000031"
+        assert produto.pesquisar_produto("leite", modo="relevancia", por_vendas=True)['dados'][0].codigo == "7890000000031"
+
+
+class TestRegistrarProdutosEmLote:
+
+    def test_mesmas_regras_de_registrar_produto(self):
+        """
+        Testa que cada linha é aceita ou recusada com o mesmo código e mensagem de `registrar_produto`.
+        """
+        produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000055", 5.0, 25.00)
+        resultado = produto.registrar_produtos_em_lote([
+            ("Leite", "Itambé", "Laticínios", "7890000000017", 1.0, 5.00),
+            {"nome": "Café", "marca": "Melitta", "categoria": "Mercearia", "codigo": "7890000000024", "peso": 0.5, "preco": 12.00},
+            ("Feijão", "Camil", "Grãos", "7890000000018", 1.0, 8.00),
+            ("Sal", "Cisne", "Mercearia", None, 1.0, 2.00),
+            ("Sal", "Cisne", "Mercearia", 7890000000031, 1.0, 2.00),
+            ("Arroz", "Camil", "Grãos", "7890000000055", 5.0, 20.00),
+            ("Leite", "Italac", "Laticínios", "7890000000017", 1.0, 4.50),
+            "linha solta",
+            ("Queijo", "Tirolez", "Laticínios", "7890000000048", 0.5, 30.00, 60.00),
+        ])
+        assert resultado['retorno'] == 0
+        assert resultado['dados']['registrados'] == 3
+        assert resultado['dados']['erros'] == [
+            (2, 3, "Código de barras inválido"),
+            (3, 4, "Parâmetro nulo"),
+            (4, 3, "Parâmetro 'codigo' errado"),
+            (5, 5, "Produto já cadastrado com este código"),
+            (6, 5, "Código repetido no lote"),
+            (7, 3, "Linha inválida"),
+        ]
+        assert list(produto._todos_produtos) == ["7890000000055", "7890000000017", "7890000000024", "7890000000048"]
+        assert produto._todos_produtos["7890000000017"].marca == "Itambé"
+        assert produto._todos_produtos["7890000000048"].preco_por_peso == 60.00
+        assert produto.registrar_produtos_em_lote(None)['retorno'] == 4
+
+    def test_verificacao_em_lote_igual_a_individual(self):
+        """
+        Testa que a verificação do dígito em lote concorda com `_valida_codigo_barras` em códigos aleatórios.
+        """
+        import random
+        aleatorio = random.Random(13)
+        codigos = ["".join(aleatorio.choices("0123456789", k=13)) for _ in range(2000)]
+        invalidos = set(produto._codigos_invalidos(codigos))
+        assert [i not in invalidos for i in range(len(codigos))] == [produto._valida_codigo_barras(c) for c in codigos]
+        assert produto._codigos_invalidos([]) == []
+
+    def test_busca_encontra_produtos_do_lote(self):
+        """
+        Testa que os produtos do lote entram nas buscas, indexados na hora ou na reconstrução dos índices.
+        """
+        produto.registrar_produtos_em_lote([("Leite Integral", "Itambé", "Laticínios", "7890000000017", 1.0, 5.00),
+                                            ("Café em Pó", "Melitta", "Mercearia", "7890000000024", 0.5, 12.00)])
+        assert [p.codigo for p in produto.pesquisar_produto("leite", modo="palavras")['dados']] == ["7890000000017"]
+        produto.registrar_produtos_em_lote([("Leite Desnatado", "Italac", "Laticínios", "7890000000031", 1.0, 5.50)])
+        assert [p.codigo for p in produto.pesquisar_produto("leite", modo="palavras")['dados']] == \
+            ["7890000000017", "7890000000031"]
+        assert [p.codigo for p in produto.completar_produto("ita")['dados']] == ["7890000000031", "7890000000017"]
+
+    def test_restaura_estado_do_coletor(self):
+        """
+        Testa que o coletor de ciclos volta ao estado anterior ao lote, inclusive após uma exceção.
+        """
+        import gc
+
+        def linhas_com_falha():
+            yield ("Leite", "Itambé", "Laticínios", "7890000000017", 1.0, 5.00)
+            raise RuntimeError("falha na leitura")
+
+        assert gc.isenabled()
+        with pytest.raises(RuntimeError):
+            produto.registrar_produtos_em_lote(linhas_com_falha())
+        assert gc.isenabled()
+        gc.disable()
+        try:
+            produto.registrar_produtos_em_lote([("Café", "Melitta", "Mercearia", "7890000000024", 0.5, 12.00)])
+            assert not gc.isenabled()
+        finally:
+            gc.enable()
+
+
+class TestCalculaPrecos:
+
+    @pytest.fixture(params=[False, True], ids=["produto_a_produto", "catalogo_colunar"])
+    def produtos(self, request):
+        """Registra dois produtos, com e sem o catálogo colunar ativado."""
+        produto.definir_catalogo_colunar(request.param)
+        produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)
+        produto.registrar_produto("Queijo", "Tirolez", "Laticínios", "7890000000024", 0.5, 30.00, 60.00)
+        yield
+        produto.definir_catalogo_colunar(False)
+
+    def test_calcula_precos(self, produtos):
+        """Testa que cada preço é o de `calcula_preco` do produto registrado."""
+        resultado = produto.calcula_precos(["7890000000024", "7890000000017", "7890000000017"], [0.25, 2, 1])
+        assert resultado['retorno'] == 0
+        assert resultado['dados'] == [15.0, 10.0, 5.0]
+
+    def test_acompanha_atualizacoes(self, produtos):
+        """Testa que os preços refletem `atualizar_produto` e os produtos registrados depois."""
+        produto.calcula_precos(["7890000000017"], [1])
+        produto.atualizar_produto("7890000000017", {"preco": 6.00})
+        produto.registrar_produto("Feijão", "Camil", "Grãos", "7890000000031", 1.0, 8.00)
+        assert produto.calcula_precos(["7890000000017", "7890000000031"], [1, 1])['dados'] == [6.0, 8.0]
+
+    def test_erros(self, produtos):
+        """Testa os retornos de erro: nulo, tamanhos diferentes, quantidade inválida e produto não encontrado."""
+        assert produto.calcula_precos(None, [1])['retorno'] == 4
+        assert produto.calcula_precos(["7890000000017"], [1, 2])['retorno'] == 3
+        assert produto.calcula_precos(["7890000000017", "7890000000024"], [1, 0])['retorno'] == 1
+        assert produto.calcula_precos(["7890000000048"], [1])['retorno'] == 2
+        assert produto.calcula_precos([], []) == {"retorno": 0, "mensagem": "Preços calculados com sucesso.", "dados": []}
+
+
+class TestAgendaDePrecos:
+
+    @pytest.fixture
+    def arroz(self):
+        """Registra um produto com preço unitário de 5.00."""
+        return produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)['dados']
+
+    def test_agendar_nao_altera_preco_atual(self, arroz):
+        """Testa que agendar guarda a mudança sem alterar o preço, e que a consulta por data a encontra."""
+        assert produto.agendar_preco("7890000000017", "2024/03/01", 6.00) == \
+            {"retorno": 0, "mensagem": "Preço agendado com sucesso", "dados": 1}
+        assert arroz.preco == 5.00
+        assert produto.consultar_preco_vigente("7890000000017", "2024/02/29")['dados'] == {"preco": 5.00, "preco_por_peso": None}
+        assert produto.consultar_preco_vigente("7890000000017", "2024/03/01")['dados'] == {"preco": 6.00, "preco_por_peso": None}
+
+    def test_erros(self, arroz):
+        """Testa os retornos de erro do agendamento e da consulta."""
+        assert produto.agendar_preco(None, "2024/03/01", 6.00)['retorno'] == 4
+        assert produto.agendar_preco("7890000000017", "2024-03-01", 6.00)['mensagem'] == "Parâmetro 'data' errado"
+        assert produto.agendar_preco("7890000000017", "2024/3/1", 6.00)['mensagem'] == "Parâmetro 'data' errado"
+        assert produto.agendar_preco("7890000000017", "2024/03/01", "6")['mensagem'] == "Parâmetro 'preco' errado"
+        assert produto.agendar_preco("7890000000024", "2024/03/01", 6.00)['retorno'] == 2
+        assert produto.consultar_preco_vigente("7890000000017", "ontem")['retorno'] == 3
+        assert produto.consultar_preco_vigente("7890000000024", "2024/03/01")['retorno'] == 2
+        assert produto.aplicar_precos_agendados("2024/13/01")['retorno'] == 3
+
+    def test_aplicar_precos_agendados(self, arroz):
+        """Testa que a aplicação atualiza apenas os produtos com mudanças vencidas, uma única vez."""
+        queijo = produto.registrar_produto("Queijo", "Tirolez", "Laticínios", "7890000000024", 0.5, 30.00, 60.00)['dados']
+        produto.agendar_preco("7890000000017", "2024/03/01", 6.00)
+        produto.agendar_preco("7890000000024", "2024/04/01", 32.00, 64.00)
+
+        assert produto.aplicar_precos_agendados("2024/03/15")['dados'] == 1
+        assert (arroz.preco, queijo.preco_por_peso) == (6.00, 60.00)
+        assert produto.aplicar_precos_agendados("2024/03/15")['dados'] == 0
+        assert produto.aplicar_precos_agendados("2024/04/01")['dados'] == 1
+        assert (queijo.preco, queijo.preco_por_peso) == (32.00, 64.00)
+
+    def test_alteracao_manual_entra_na_agenda(self, arroz):
+        """Testa que `atualizar_produto` registra o novo preço na agenda e não é desfeito por uma mudança já vencida."""
+        from datetime import date
+        produto.agendar_preco("7890000000017", "2000/01/01", 6.00)
+        produto.atualizar_produto("7890000000017", {"preco": 7.00})
+        assert produto.aplicar_precos_agendados()['dados'] == 0
+        assert arroz.preco == 7.00
+        hoje = date.today().strftime("%Y/%m/%d")
+        assert produto.consultar_preco_vigente("7890000000017", hoje)['dados']['preco'] == 7.00
+        assert produto.consultar_preco_vigente("7890000000017", "2000/01/02")['dados']['preco'] == 6.00
+
+    def test_calcula_precos_por_data(self, arroz):
+        """Testa que, com datas, os produtos com agenda são cobrados pelo preço vigente em cada data."""
+        produto.registrar_produto("Feijão", "Camil", "Grãos", "7890000000031", 1.0, 8.00)
+        produto.agendar_preco("7890000000017", "2024/03/01", 6.00)
+        codigos = ["7890000000017", "7890000000017", "7890000000031"]
+        assert produto.calcula_precos(codigos, [2, 2, 1])['dados'] == [10.00, 10.00, 8.00]
+        assert produto.calcula_precos(codigos, [2, 2, 1], ["2024/02/01", "2024/03/01", "2024/03/01"])['dados'] == \
+            [10.00, 12.00, 8.00]
+        assert produto.calcula_precos(codigos, [2, 2, 1], ["2024/02/01"])['retorno'] == 3
+
+    def test_agenda_gravada_com_o_produto(self, arroz):
+        """Testa que a agenda é gravada no registro do produto e recriada na carga."""
+        produto.agendar_preco("7890000000017", "2024/03/01", 6.00)
+        registros = {"7890000000017": arroz.to_json()}
+        assert "agenda_precos" in registros["7890000000017"]
+        produto._todos_produtos.clear()
+        produto._agendas_precos.clear()
+        produto.carregar_produtos(registros)
+        assert produto.consultar_preco_vigente("7890000000017", "2024/03/01")['dados']['preco'] == 6.00
+        assert "agenda_precos" not in produto.Produto("Feijão", "Camil", "Grãos", "7890000000031", 1.0, 8.00).to_json()
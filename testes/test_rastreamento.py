@@ -0,0 +1,200 @@
+import json
+import pytest
+from modulos import armazenamento
+from modulos import rastreamento
+from modulos import produto
+from modulos import funcionario
+from modulos import estoque
+from modulos import carrinho
+from modulos import unidades
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados():
+    """
+    Limpa os registros globais, as marcações de modificação e o armazenamento
+    antes e depois de cada teste.
+    """
+    for registro in (produto._todos_produtos, funcionario._todos_funcionarios, estoque._todos_estoques,
+                     carrinho._todos_carrinhos, unidades._unidades):
+        registro.clear()
+    rastreamento.limpar_modificados()
+    yield
+    armazenamento.definir_armazenamento(None)
+    for registro in (produto._todos_produtos, funcionario._todos_funcionarios, estoque._todos_estoques,
+                     carrinho._todos_carrinhos, unidades._unidades):
+        registro.clear()
+    rastreamento.limpar_modificados()
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """Define um ArmazenamentoSQLite temporário como armazenamento atual."""
+    a = armazenamento.ArmazenamentoSQLite(str(tmp_path / "teste.db"))
+    armazenamento.definir_armazenamento(a)
+    yield a
+    a.fechar()
+
+
+@pytest.fixture
+def nescau():
+    """Registra um produto e o retorna."""
+    return produto.registrar_produto("Nescau", "Nestlé", "Achocolatados", "7894900011517", 0.4, 8.50)["dados"]
+
+
+# --- Testes de marcação ---
+class TestMarcacao:
+
+    def test_registro_marca_objeto_novo(self, nescau):
+        """Testa que objetos registrados nascem marcados."""
+        assert rastreamento.obter_modificados("produtos") == [nescau]
+
+    def test_construtor_nao_marca(self):
+        """Testa que apenas construir um objeto (ex: ao carregar) não o marca."""
+        produto.Produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)
+        assert rastreamento.obter_modificados("produtos") == []
+
+    def test_reatribuicao_marca_com_a_entidade_da_classe(self):
+        """Testa que `Rastreavel` marca cada classe de domínio na sua própria entidade."""
+        f = funcionario.Funcionario("Ana", 101, "Caixa", "2023/01/10")
+        c = carrinho.Carrinho(id=1)
+        f.cargo = "Gerente"
+        c.total = 10.0
+        assert rastreamento.obter_modificados("funcionarios") == [f]
+        assert rastreamento.obter_modificados("carrinhos") == [c]
+        assert all(isinstance(o, rastreamento.Rastreavel) for o in (f, c))
+
+    def test_atualizar_produto_marca(self, nescau):
+        """Testa que atualizar_produto marca o produto."""
+        rastreamento.limpar_modificados()
+        produto.atualizar_produto("7894900011517", {"preco": 9.90})
+        assert rastreamento.obter_modificados("produtos") == [nescau]
+
+    def test_operacoes_de_estoque_marcam(self, nescau):
+        """Testa que as operações que alteram os dicionários internos marcam o estoque."""
+        e = estoque.Estoque("E1")
+        e.registrar_produto(nescau, 10, 10)
+        rastreamento.limpar_modificados()
+        e.adicionar_produto(nescau, 5, "exposicao")
+        assert rastreamento.obter_modificados("estoques") == [e]
+
+    def test_finalizar_carrinho_marca(self):
+        """Testa que a finalização de um carrinho o marca."""
+        c = carrinho.Carrinho(1)
+        c.finaliza_carrinho()
+        assert rastreamento.obter_modificados("carrinhos") == [c]
+
+    def test_registrar_venda_marca_unidade(self):
+        """Testa que registrar uma venda marca a unidade."""
+        unidades.adiciona_Unidade(1, "Centro", (0.0, 0.0))
+        rastreamento.limpar_modificados()
+        unidade = unidades._unidades[1]
+        unidade.registrar_venda(carrinho.Carrinho(1))
+        assert rastreamento.obter_modificados("unidades") == [unidade]
+        assert len(unidade.vendas) == 1
+
+    def test_observador_recebe_estado_anterior(self, nescau):
+        """Testa que o observador é chamado antes da alteração."""
+        vistos = []
+
+        def observador(entidade, objeto):
+            vistos.append((entidade, objeto.preco))
+
+        rastreamento.adicionar_observador(observador)
+        try:
+            produto.atualizar_produto("7894900011517", {"preco": 9.90})
+        finally:
+            rastreamento.remover_observador(observador)
+        assert vistos == [("produtos", 8.50)]
+
+    def test_marcar_em_lote(self, nescau):
+        """Testa que a marcação em lote equivale a marcar cada objeto, em ordem, avisando os observadores."""
+        vistos = []
+        rastreamento.adicionar_observador(lambda entidade, objeto: vistos.append(objeto.codigo))
+        try:
+            resultado = produto.registrar_produtos_em_lote([("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00),
+                                                            ("Café", "Melitta", "Mercearia", "7890000000024", 0.5, 12.00)])
+        finally:
+            rastreamento._observadores.clear()
+        assert resultado["dados"]["registrados"] == 2
+        assert vistos == ["7890000000017", "7890000000024"]
+        assert [p.codigo for p in rastreamento.obter_modificados("produtos")] == \
+            ["7894900011517", "7890000000017", "7890000000024"]
+
+    def test_limpar_ate_geracao_preserva_marcas_posteriores(self, nescau):
+        """Testa que limpar até uma geração mantém as marcações feitas depois dela."""
+        geracao = rastreamento.geracao_atual()
+        arroz = produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)["dados"]
+        rastreamento.limpar_modificados("produtos", ate=geracao)
+        assert rastreamento.obter_modificados("produtos") == [arroz]
+
+    def test_marca_durante_gravacao_nao_se_perde(self, banco, nescau):
+        """Testa que um objeto alterado enquanto a gravação está em andamento continua marcado."""
+        original = banco.salvar
+
+        def salvar_e_alterar(entidade, registros):
+            original(entidade, registros)
+            produto.atualizar_produto("7894900011517", {"preco": 9.90})
+
+        banco.salvar = salvar_e_alterar
+        produto.salvar_produtos()
+        assert rastreamento.obter_modificados("produtos") == [nescau]
+
+
+# --- Testes de gravação incremental ---
+class TestGravacaoIncremental:
+
+    def test_sem_alteracoes_nao_grava(self, tmp_path):
+        """Testa que nada é gravado quando nada mudou."""
+        arquivo = tmp_path / "produtos.json"
+        armazenamento.definir_armazenamento(armazenamento.ArmazenamentoJSON({"produtos": str(arquivo)}))
+        assert produto.salvar_produtos() == 0
+        assert not arquivo.exists()
+
+    def test_json_reescreve_arquivo_inteiro(self, tmp_path, nescau):
+        """Testa que, em JSON, uma alteração reescreve todos os registros da entidade."""
+        arquivo = tmp_path / "produtos.json"
+        armazenamento.definir_armazenamento(armazenamento.ArmazenamentoJSON({"produtos": str(arquivo)}))
+        produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)
+        produto.salvar_produtos()
+
+        produto.atualizar_produto("7894900011517", {"preco": 9.90})
+        assert produto.salvar_produtos() == 2
+        dados = json.loads(arquivo.read_text(encoding="utf-8"))
+        assert dados["7894900011517"]["preco"] == 9.90
+        assert "7890000000017" in dados
+
+    def test_sqlite_grava_apenas_alterados(self, banco, nescau):
+        """Testa que, em SQLite, apenas os registros marcados são gravados."""
+        produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)
+        assert produto.salvar_produtos() == 2
+
+        produto.atualizar_produto("7894900011517", {"preco": 9.90})
+        assert produto.salvar_produtos() == 1
+        assert produto.salvar_produtos() == 0
+        assert banco.consultar("produtos", "7894900011517")["preco"] == 9.90
+
+    def test_objetos_fora_do_registro_sao_ignorados(self, banco, nescau):
+        """Testa que objetos marcados mas removidos do registro não são gravados."""
+        produto._todos_produtos.clear()
+        assert produto.salvar_produtos() == 0
+
+    def test_estoque_da_unidade_gravado_sem_a_unidade(self, banco, nescau):
+        """Testa que alterar o estoque de uma unidade grava apenas o estoque, que a unidade só referencia."""
+        unidades.adiciona_Unidade(1, "Centro", (0.0, 0.0))
+        estoque.salvar_estoques()
+        unidades.salvar_unidades()
+        unidades._unidades[1].estoque.registrar_produto(nescau, 10, 10)
+        assert estoque.salvar_estoques() == 1
+        assert unidades.salvar_unidades() == 0
+
+    def test_carrinhos_carregados_com_chave_inteira(self, banco):
+        """Testa que carrinhos recarregados podem ser gravados novamente após alterações."""
+        c = carrinho.criar_carrinho()["dados"]
+        carrinho.salvar_carrinhos()
+        carrinho._todos_carrinhos.clear()
+        carrinho.carregar_carrinhos()
+
+        recarregado = carrinho._todos_carrinhos[c.id]
+        recarregado.finaliza_carrinho()
+        assert carrinho.salvar_carrinhos() == 1
@@ -0,0 +1,146 @@
+import threading
+import pytest
+from modulos import armazenamento
+from modulos import rastreamento
+from modulos import produto
+from modulos.salvamento_automatico import SalvamentoAutomatico
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados():
+    """
+    Limpa o registro de produtos e as marcações de modificação antes e depois de cada teste.
+    """
+    produto._todos_produtos.clear()
+    rastreamento.limpar_modificados()
+    yield
+    armazenamento.definir_armazenamento(None)
+    produto._todos_produtos.clear()
+    rastreamento.limpar_modificados()
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """Define um ArmazenamentoSQLite temporário como armazenamento atual."""
+    a = armazenamento.ArmazenamentoSQLite(str(tmp_path / "teste.db"))
+    armazenamento.definir_armazenamento(a)
+    yield a
+    a.fechar()
+
+
+@pytest.fixture
+def gravacoes():
+    """Função de gravação que grava os produtos e guarda quantos foram gravados a cada chamada."""
+    chamadas = []
+
+    def salvar():
+        chamadas.append(produto.salvar_produtos())
+
+    salvar.chamadas = chamadas
+    return salvar
+
+
+def ean13(i):
+    """Monta um código EAN-13 válido a partir de um número sequencial."""
+    base = [int(d) for d in f"789{i:09d}"]
+    soma = sum(base[0::2]) + 3 * sum(base[1::2])
+    return "".join(map(str, base + [(10 - soma % 10) % 10]))
+
+
+def registrar(n):
+    """Registra `n` produtos com códigos sequenciais."""
+    for i in range(n):
+        assert produto.registrar_produto(f"Produto {i}", "Marca", "Categoria", ean13(i), 1.0, 1.0)["retorno"] == 0
+
+
+class TestSalvamentoAutomatico:
+
+    def test_rajada_agrupada_em_uma_gravacao(self, banco, gravacoes):
+        """Testa que várias alterações seguidas resultam em uma única gravação."""
+        salvamento = SalvamentoAutomatico(gravacoes, intervalo=0.05, espera_silencio=0.05)
+        salvamento.iniciar()
+        try:
+            registrar(20)
+            assert salvamento.aguardar_gravacao(timeout=5)
+        finally:
+            salvamento.parar(timeout=5)
+        assert gravacoes.chamadas[0] == 20
+        assert sum(gravacoes.chamadas) == 20
+        assert banco.consultar("produtos", ean13(19)) is not None
+
+    def test_limite_de_alteracoes_antecipa_gravacao(self, banco, gravacoes):
+        """Testa que atingir o limite de alterações grava sem esperar o intervalo."""
+        salvamento = SalvamentoAutomatico(gravacoes, intervalo=60, limite_alteracoes=5, espera_silencio=0.01)
+        salvamento.iniciar()
+        try:
+            registrar(5)
+            with salvamento._condicao:
+                assert salvamento._condicao.wait_for(lambda: salvamento.gravacoes > 0, timeout=5)
+        finally:
+            salvamento.parar(timeout=5)
+        assert gravacoes.chamadas[0] == 5
+
+    def test_sem_gatilho_nao_grava(self, banco, gravacoes):
+        """Testa que, antes do intervalo e do limite, nada é gravado."""
+        salvamento = SalvamentoAutomatico(gravacoes, intervalo=60, espera_silencio=0.01)
+        salvamento.iniciar()
+        try:
+            registrar(3)
+            with salvamento._condicao:
+                assert not salvamento._condicao.wait_for(lambda: salvamento.gravacoes > 0, timeout=0.2)
+        finally:
+            salvamento.parar(timeout=5)
+
+    def test_parar_grava_pendentes(self, banco, gravacoes):
+        """Testa que encerrar o salvamento grava as alterações pendentes sem esperar o intervalo."""
+        salvamento = SalvamentoAutomatico(gravacoes, intervalo=60)
+        salvamento.iniciar()
+        registrar(3)
+        assert salvamento.parar(timeout=5)
+        assert sum(gravacoes.chamadas) == 3
+        assert rastreamento.obter_modificados("produtos") == []
+
+    def test_aguardar_sem_alteracoes(self, gravacoes):
+        """Testa que aguardar sem alterações pendentes retorna imediatamente."""
+        salvamento = SalvamentoAutomatico(gravacoes, intervalo=60)
+        salvamento.iniciar()
+        try:
+            assert salvamento.aguardar_gravacao(timeout=0.1)
+        finally:
+            salvamento.parar(timeout=5)
+
+    def test_grava_apenas_entre_operacoes(self, banco, gravacoes):
+        """Testa que a gravação aguarda a operação que mantém `trava_registros` terminar."""
+        salvamento = SalvamentoAutomatico(gravacoes, intervalo=60, espera_silencio=0.01)
+        salvamento.iniciar()
+        try:
+            with rastreamento.trava_registros:
+                registrar(2)
+                assert not salvamento.aguardar_gravacao(timeout=0.2)
+                assert gravacoes.chamadas == []
+            assert salvamento.aguardar_gravacao(timeout=5)
+        finally:
+            salvamento.parar(timeout=5)
+        assert gravacoes.chamadas[0] == 2 and sum(gravacoes.chamadas) == 2
+
+    def test_falha_e_repetida(self, banco, gravacoes):
+        """Testa que uma gravação que falha é repetida e nada se perde."""
+        falhou = threading.Event()
+
+        def salvar():
+            if not falhou.is_set():
+                falhou.set()
+                raise RuntimeError("dictionary changed size during iteration")
+            gravacoes()
+
+        salvamento = SalvamentoAutomatico(salvar, intervalo=60, espera_silencio=0.01)
+        salvamento.iniciar()
+        try:
+            registrar(2)
+            assert not salvamento.aguardar_gravacao(timeout=5)
+            assert isinstance(salvamento.ultimo_erro, RuntimeError)
+            assert salvamento.aguardar_gravacao(timeout=5)
+        finally:
+            salvamento.parar(timeout=5)
+        assert sum(gravacoes.chamadas) == 2
+        assert salvamento.falhas == 1
@@ -0,0 +1,97 @@
+import json
+import pytest
+from modulos import armazenamento
+from modulos import serializacao
+from modulos.serializacao import (SerializadorCompacto, SerializadorLegivel, criar_serializador,
+                                  definir_serializador, obter_serializador)
+
+
+DADOS = {"7890000000017": {"nome": "Açúcar", "preco": 4.99, "itens": [1, 2], "ativo": True, "peso": None}}
+
+
+@pytest.fixture(autouse=True)
+def restaurar_serializador():
+    """Restaura o serializador padrão depois de cada teste."""
+    yield
+    definir_serializador(None)
+
+
+MODOS = ["compacto", "legivel"] + (["orjson"] if serializacao.orjson is not None else [])
+
+
+class TestSerializadores:
+
+    @pytest.mark.parametrize("modo", MODOS)
+    def test_ida_e_volta(self, modo, tmp_path):
+        """Testa que os dados gravados e lidos são iguais aos originais, em memória e em arquivo."""
+        s = criar_serializador(modo)
+        assert s.decodificar(s.codificar(DADOS)) == DADOS
+        s.gravar(str(tmp_path / "dados.json"), DADOS)
+        assert s.ler(str(tmp_path / "dados.json")) == DADOS
+
+    def test_compacto_sem_espacos(self):
+        """Testa que o modo compacto não gera indentação nem espaços entre os elementos."""
+        texto = SerializadorCompacto().codificar(DADOS)
+        assert "\n" not in texto
+        assert ", " not in texto and ": " not in texto
+        assert "Açúcar" in texto
+
+    def test_legivel_indentado(self):
+        """Testa que o modo legível mantém o formato indentado original."""
+        assert SerializadorLegivel().codificar(DADOS) == json.dumps(DADOS, ensure_ascii=False, indent=4)
+
+    @pytest.mark.skipif(serializacao.orjson is None, reason="orjson não instalado")
+    def test_orjson_equivale_ao_compacto(self):
+        """Testa que o orjson gera o mesmo texto do modo compacto."""
+        assert criar_serializador("orjson").codificar(DADOS) == SerializadorCompacto().codificar(DADOS)
+
+    def test_auto_sem_orjson(self, monkeypatch):
+        """Testa que, sem o orjson instalado, o modo automático usa o compacto da biblioteca padrão."""
+        monkeypatch.setattr(serializacao, "orjson", None)
+        assert criar_serializador().nome == "compacto"
+        with pytest.raises(ValueError):
+            criar_serializador("orjson")
+
+    def test_modo_desconhecido(self):
+        """Testa que um modo inválido é recusado."""
+        with pytest.raises(ValueError):
+            criar_serializador("xml")
+
+    def test_definir_serializador(self):
+        """Testa que o serializador definido passa a ser o atual."""
+        legivel = SerializadorLegivel()
+        definir_serializador(legivel)
+        assert obter_serializador() is legivel
+
+
+class TestArmazenamentoComSerializador:
+
+    def test_json_grava_compacto_e_le_legado(self, tmp_path):
+        """Testa que o armazenamento JSON grava no formato do serializador e lê arquivos indentados antigos."""
+        arquivo = tmp_path / "produtos.json"
+        arquivo.write_text(json.dumps(DADOS, ensure_ascii=False, indent=4), encoding="utf-8")
+        a = armazenamento.ArmazenamentoJSON({"produtos": str(arquivo)}, serializador=SerializadorCompacto())
+        assert a.carregar("produtos") == DADOS
+
+        a.salvar("produtos", DADOS)
+        assert arquivo.read_text(encoding="utf-8") == SerializadorCompacto().codificar(DADOS)
+        assert dict(a.iterar("produtos")) == DADOS
+
+    def test_json_usa_serializador_atual(self, tmp_path):
+        """Testa que, sem serializador próprio, o armazenamento usa o definido globalmente."""
+        arquivo = tmp_path / "produtos.json"
+        definir_serializador(SerializadorLegivel())
+        armazenamento.ArmazenamentoJSON({"produtos": str(arquivo)}).salvar("produtos", DADOS)
+        assert arquivo.read_text(encoding="utf-8").startswith("{\n    ")
+
+    @pytest.mark.parametrize("modo", MODOS)
+    def test_sqlite(self, modo, tmp_path):
+        """Testa a gravação e a leitura de registros no SQLite com cada serializador."""
+        a = armazenamento.ArmazenamentoSQLite(str(tmp_path / "teste.db"), serializador=criar_serializador(modo))
+        try:
+            a.salvar("produtos", DADOS)
+            assert a.carregar("produtos") == DADOS
+            assert a.consultar("produtos", "7890000000017") == DADOS["7890000000017"]
+            assert a.consultar_varios("produtos", ["7890000000017"]) == DADOS
+        finally:
+            a.fechar()
@@ -0,0 +1,161 @@
+import pytest
+from modulos import rastreamento
+from modulos import produto
+from modulos import funcionario
+from modulos import estoque
+from modulos import carrinho
+from modulos import unidades
+from modulos import snapshot_binario
+
+
+REGISTROS = (produto._todos_produtos, funcionario._todos_funcionarios, estoque._todos_estoques,
+             carrinho._todos_carrinhos, unidades._unidades)
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados():
+    """
+    Limpa os registros globais e as marcações de modificação antes e depois de cada teste.
+    """
+    for registro in REGISTROS:
+        registro.clear()
+    produto._agendas_precos.clear()
+    rastreamento.limpar_modificados()
+    yield
+    for registro in REGISTROS:
+        registro.clear()
+    produto._agendas_precos.clear()
+    rastreamento.limpar_modificados()
+
+
+@pytest.fixture
+def dados():
+    """Monta um pequeno conjunto com todas as entidades e retorna a unidade criada."""
+    nescau = produto.registrar_produto("Nescau", "Nestlé", "Achocolatados", "7894900011517", 0.4, 8.50)["dados"]
+    banana = produto.registrar_produto("Banana", "Sítio", "Hortifruti", "2000000000015", 1.0, 6.0, 6.0)["dados"]
+    funcionario.adiciona_funcionario("Ana", 101, "Caixa", "2023/01/10")
+    ana = funcionario._todos_funcionarios[101]
+    ana.desligar_funcionario("2024/02/01")
+
+    unidades.adiciona_Unidade(1, "Centro", (-22.9068, -43.1729), funcionarios=[ana])
+    unidade = unidades._unidades[1]
+    unidade.estoque.registrar_produto(nescau, 50, 20)
+    unidade.estoque.registrar_produto(banana, 30.0, 10.0)
+    unidade.estoque.adicionar_produto(nescau, 7, "exposicao")
+    unidade.estoque.adicionar_produto(banana, 2.5)
+
+    for dia, itens in (("2024/01/05", {nescau: 2}), ("2024/01/07", {nescau: 1, banana: 1.25})):
+        c = carrinho.criar_carrinho()["dados"]
+        for p, q in itens.items():
+            c.adiciona_no_carrinho(p, q)
+        c.finaliza_carrinho(ana)
+        c.data_hora = dia
+        unidade.registrar_venda(c)
+    carrinho.criar_carrinho()  # carrinho aberto, sem data nem total
+    return unidade
+
+
+def recarregar(caminho):
+    """Esvazia os registros, as agendas de preços e as marcações e carrega o snapshot gravado em `caminho`."""
+    for registro in REGISTROS:
+        registro.clear()
+    produto._agendas_precos.clear()
+    rastreamento.limpar_modificados()
+    return snapshot_binario.carregar_snapshot(str(caminho))
+
+
+class TestSnapshotBinario:
+
+    def test_ida_e_volta_preserva_dados(self, tmp_path, dados):
+        """Testa que todas as entidades voltam com os mesmos valores serializados."""
+        caminho = tmp_path / "mercado.snap"
+        esperado = {
+            "produtos": {k: p.to_json() for k, p in produto._todos_produtos.items()},
+            "funcionarios": {k: f.to_json() for k, f in funcionario._todos_funcionarios.items()},
+            "estoques": {k: e.to_json() for k, e in estoque._todos_estoques.items()},
+            "carrinhos": {k: c.to_json() for k, c in carrinho._todos_carrinhos.items()},
+            "unidades": {k: u.to_json() for k, u in unidades._unidades.items()},
+        }
+        gravado = snapshot_binario.salvar_snapshot(str(caminho))
+        assert gravado["retorno"] == 0
+        assert gravado["dados"]["carrinhos"] == 3
+
+        resultado = recarregar(caminho)
+        assert resultado["retorno"] == 0
+        assert resultado["dados"] == gravado["dados"]
+        obtido = {
+            "produtos": {k: p.to_json() for k, p in produto._todos_produtos.items()},
+            "funcionarios": {k: f.to_json() for k, f in funcionario._todos_funcionarios.items()},
+            "estoques": {k: e.to_json() for k, e in estoque._todos_estoques.items()},
+            "carrinhos": {k: c.to_json() for k, c in carrinho._todos_carrinhos.items()},
+            "unidades": {k: u.to_json() for k, u in unidades._unidades.items()},
+        }
+        assert obtido == esperado
+
+    def test_agenda_de_precos_preservada(self, tmp_path, dados):
+        """Testa que as mudanças de preço agendadas, aplicadas ou não, voltam com o produto."""
+        produto.agendar_preco("7894900011517", "2024/02/01", 9.0)
+        produto.agendar_preco("7894900011517", "2024/05/01", 9.5)
+        produto.agendar_preco("2000000000015", "2024/03/01", 6.5, 6.5)
+        produto.aplicar_precos_agendados("2024/02/15")
+        caminho = tmp_path / "mercado.snap"
+        esperado = {k: p.to_json() for k, p in produto._todos_produtos.items()}
+        snapshot_binario.salvar_snapshot(str(caminho))
+
+        assert recarregar(caminho)["retorno"] == 0
+        assert {k: p.to_json() for k, p in produto._todos_produtos.items()} == esperado
+        assert produto.aplicar_precos_agendados("2024/02/16")["dados"] == 0
+        assert produto.aplicar_precos_agendados("2024/05/01")["dados"] == 2
+        assert produto._todos_produtos["7894900011517"].preco == 9.5
+
+    def test_tipos_numericos_preservados(self, tmp_path, dados):
+        """Testa que quantidades inteiras continuam inteiras e reais continuam reais."""
+        caminho = tmp_path / "mercado.snap"
+        snapshot_binario.salvar_snapshot(str(caminho))
+        recarregar(caminho)
+        e = estoque._todos_estoques["EST1"]
+        nescau = produto._todos_produtos["7894900011517"]
+        assert type(e.exposicao[nescau]) is int
+        assert type(e.capacidades[produto._todos_produtos["2000000000015"]]["estoque"]) is float
+
+    def test_objetos_compartilhados(self, tmp_path, dados):
+        """Testa que unidades e carrinhos recarregados referenciam os objetos dos registros."""
+        caminho = tmp_path / "mercado.snap"
+        snapshot_binario.salvar_snapshot(str(caminho))
+        recarregar(caminho)
+        unidade = unidades._unidades[1]
+        assert unidade.estoque is estoque._todos_estoques["EST1"]
+        assert unidade.funcionarios[0] is funcionario._todos_funcionarios[101]
+        venda = unidade.vendas[0]
+        assert venda is carrinho._todos_carrinhos[venda.id]
+        assert venda.funcionario is funcionario._todos_funcionarios[101]
+        assert rastreamento.obter_modificados("unidades") == []
+
+    def test_menor_que_json(self, tmp_path, dados):
+        """Testa que o snapshot é menor que os mesmos dados em JSON indentado."""
+        import json
+        caminho = tmp_path / "mercado.snap"
+        snapshot_binario.salvar_snapshot(str(caminho))
+        tamanho_json = sum(
+            len(json.dumps({str(k): o.to_json() for k, o in registro.items()}, ensure_ascii=False, indent=4))
+            for registro in REGISTROS)
+        assert caminho.stat().st_size < tamanho_json / 3
+
+    def test_arquivo_inexistente(self, tmp_path):
+        """Testa o retorno para um snapshot que não existe."""
+        assert snapshot_binario.carregar_snapshot(str(tmp_path / "nada.snap"))["retorno"] == 1
+
+    def test_arquivo_invalido_nao_altera_registros(self, tmp_path, dados):
+        """Testa que um arquivo truncado ou de outra versão é recusado sem alterar a memória."""
+        caminho = tmp_path / "mercado.snap"
+        snapshot_binario.salvar_snapshot(str(caminho))
+        conteudo = caminho.read_bytes()
+
+        truncado = tmp_path / "truncado.snap"
+        truncado.write_bytes(conteudo[:len(conteudo) // 2])
+        assert recarregar(truncado)["retorno"] == 2
+        assert produto._todos_produtos == {}
+
+        outra_versao = tmp_path / "v99.snap"
+        outra_versao.write_bytes(conteudo[:4] + b"\x63\x00" + conteudo[6:])
+        assert recarregar(outra_versao)["retorno"] == 2
@@ -8,6 +8,7 @@ from modulos import produto
 from modulos import funcionario
 from modulos import carrinho
 from modulos import estoque
+from modulos.vendas_paginadas import VendasPaginadas
 
 # --- INÍCIO DAS MODIFICAÇÕES PARA GERAR ARQUIVO DE RESULTADO ---
 
@@ -80,6 +81,7 @@ def clean_unidades_module():
     """
     unidades._unidades.clear()
     produto._todos_produtos.clear()
+    produto._agendas_precos.clear()
     funcionario._todos_funcionarios.clear()
 
 
@@ -366,6 +368,40 @@ class TestRelatorioUnidade:
         assert any(m['evento'] == 'Desligamento' and m['codigo'] == 102 for m in mov_funcs)
 
 
+    def test_relatorio_calcula_totais_ausentes(self):
+        """
+        Testa que as vendas sem total registrado são totalizadas pelo relatório, sem que o total seja gravado no carrinho.
+        """
+        venda = carrinho.Carrinho(id=1003, data_hora="2023/04/20")
+        venda.adiciona_no_carrinho(self.p1, 3)
+        unidades._unidades[1].vendas.append(venda)
+        assert venda.total is None
+
+        resultado = unidades.relatorio_Unidade(1, ("2023/03/01", "2023/05/30"))
+        totais = {v['id_venda']: v['total'] for v in resultado['dados']['vendas_no_periodo']}
+        assert totais == {1001: 10.0, 1003: 15.0}
+        assert venda.total is None
+
+
+    def test_relatorio_usa_preco_da_data_da_venda(self):
+        """
+        Testa que uma venda sem total é cobrada pelo preço vigente na sua data, e não pelo preço atual.
+        """
+        produto.agendar_preco("7890000000017", "2023/05/01", 8.0)
+        produto.aplicar_precos_agendados("2023/05/01")
+        assert self.p1.preco == 8.0
+        antiga = carrinho.Carrinho(id=1004, data_hora="2023/04/20")
+        antiga.adiciona_no_carrinho(self.p1, 3)
+        nova = carrinho.Carrinho(id=1005, data_hora="2023/05/02")
+        nova.adiciona_no_carrinho(self.p1, 3)
+        unidades._unidades[1].vendas.append(antiga)
+        unidades._unidades[1].vendas.append(nova)
+
+        resultado = unidades.relatorio_Unidade(1, ("2023/03/01", "2023/05/30"))
+        totais = {v['id_venda']: v['total'] for v in resultado['dados']['vendas_no_periodo']}
+        assert totais == {1001: 10.0, 1004: 15.0, 1005: 24.0}
+
+
     def test_relatorio_sem_dados_no_periodo(self):
         """
         Testa a geração de um relatório para um período sem movimentações.
@@ -421,4 +457,145 @@ class TestRelatorioUnidade:
         """
         assert unidades.relatorio_Unidade("1", ("2023/01/01", "2023/01/31"))['retorno'] == 5
         assert unidades.relatorio_Unidade(1, ["2023/01/01", "2023/01/31"])['retorno'] == 5
-        assert unidades.relatorio_Unidade(1, ("2023-01-01", "2023-01-31"))['retorno'] == 5 # Formato de data errado
\ No newline at end of file
+        assert unidades.relatorio_Unidade(1, ("2023-01-01", "2023-01-31"))['retorno'] == 5 # Formato de data errado
+
+# Testes para o formato normalizado de unidades (referências aos registros globais)
+class TestFormatoNormalizado:
+
+    @pytest.fixture(autouse=True)
+    def armazenamento_temporario(self, tmp_path):
+        """
+        Usa um armazenamento JSON em diretório temporário e limpa os demais registros.
+        """
+        from modulos import armazenamento
+        estoque._todos_estoques.clear()
+        carrinho._todos_carrinhos.clear()
+        arquivos = {nome: str(tmp_path / f"{nome}.json") for nome in armazenamento.ENTIDADES}
+        self.armazenamento = armazenamento.ArmazenamentoJSON(arquivos)
+        armazenamento.definir_armazenamento(self.armazenamento)
+        yield
+        armazenamento.definir_armazenamento(None)
+        estoque._todos_estoques.clear()
+        carrinho._todos_carrinhos.clear()
+
+    def criar_unidade(self):
+        """Cria uma unidade com um funcionário e uma venda registrados."""
+        p = produto.registrar_produto("Arroz", "MarcaA", "Grãos", "7890000000017", 1.0, 5.0)['dados']
+        funcionario.adiciona_funcionario("João", 101, "Caixa", "2023/01/10")
+        f = funcionario._todos_funcionarios[101]
+        c = carrinho.criar_carrinho()['dados']
+        c.adiciona_no_carrinho(p, 2)
+        c.finaliza_carrinho(f)
+        unidades.adiciona_Unidade(1, "Centro", (-10.0, -10.0), funcionarios=[f], vendas=[c])
+        return unidades._unidades[1]
+
+    def test_to_json_guarda_referencias(self):
+        """
+        Testa que a unidade é serializada apenas com códigos e IDs.
+        """
+        unidade = self.criar_unidade()
+        dados = unidade.to_json()
+        assert dados['estoque'] == "EST1"
+        assert dados['funcionarios'] == [101]
+        assert dados['vendas'] == [unidade.vendas[0].id]
+        assert dados['datas_vendas'] == [unidade.vendas[0].data_hora]
+
+    def test_adiciona_unidade_registra_estoque(self):
+        """
+        Testa que o estoque criado para a unidade entra no registro global.
+        """
+        unidade = self.criar_unidade()
+        assert estoque._todos_estoques["EST1"] is unidade.estoque
+
+    def test_from_json_compartilha_objetos(self):
+        """
+        Testa que a unidade recarregada usa os mesmos objetos dos registros globais.
+        """
+        id_venda = self.criar_unidade().vendas[0].id
+        unidades.salvar_unidades()
+        unidades._unidades.clear()
+        unidades.carregar_unidades()
+
+        unidade = unidades._unidades[1]
+        assert unidade.estoque is estoque._todos_estoques["EST1"]
+        assert unidade.funcionarios[0] is funcionario._todos_funcionarios[101]
+        assert unidade.vendas[0] is carrinho._todos_carrinhos[id_venda]
+
+    def test_volume_vendas_atualizado_sem_percorrer_historico(self, monkeypatch):
+        """
+        Testa que `registrar_venda` soma as quantidades ao volume já conhecido, sem ler o histórico de novo.
+        """
+        unidade = self.criar_unidade()
+        p = produto._todos_produtos["7890000000017"]
+        assert unidade.volume_vendas() == {p.codigo: 2}
+
+        c = carrinho.criar_carrinho()['dados']
+        c.adiciona_no_carrinho(p, 3)
+        c.finaliza_carrinho(funcionario._todos_funcionarios[101])
+        monkeypatch.setattr(VendasPaginadas, "__iter__", lambda self: pytest.fail("o histórico foi percorrido"))
+        unidade.registrar_venda(c)
+        assert unidade.volume_vendas() == {p.codigo: 5}
+
+    def test_volume_vendas_persistido(self):
+        """
+        Testa que o volume de vendas é gravado com a unidade e recarregado sem percorrer o histórico.
+        """
+        self.criar_unidade()
+        unidades.salvar_unidades()
+        unidades._unidades.clear()
+        unidades.carregar_unidades()
+
+        unidade = unidades._unidades[1]
+        assert unidade._volume_vendas == {"7890000000017": 2}
+        assert unidade.to_json()['volume_vendas'] == {"7890000000017": 2}
+
+    def test_volume_vendas_calculado_em_registro_antigo(self):
+        """
+        Testa que, num registro gravado sem o volume de vendas, ele é calculado a partir do histórico, sem marcar a
+        unidade como modificada.
+        """
+        from modulos import rastreamento
+        dados = self.criar_unidade().to_json()
+        del dados['volume_vendas']
+        unidade = unidades.Localidade.from_json(dados)
+        rastreamento.limpar_modificados()
+        assert unidade.volume_vendas() == {"7890000000017": 2}
+        assert rastreamento.obter_modificados("unidades") == []
+
+    def test_from_json_referencia_inexistente(self):
+        """
+        Testa que uma referência sem objeto correspondente gera erro.
+        """
+        dados = {"nome": "X", "codigo": 9, "localizacao": [0.0, 0.0], "estoque": "NAO_EXISTE",
+                 "funcionarios": [], "vendas": []}
+        with pytest.raises(ValueError):
+            unidades.Localidade.from_json(dados)
+
+    def test_migrar_unidades_formato_antigo(self):
+        """
+        Testa a migração de um registro com cópias embutidas para o formato normalizado.
+        """
+        p = produto.registrar_produto("Arroz", "MarcaA", "Grãos", "7890000000017", 1.0, 5.0)['dados']
+        antigo = {
+            "nome": "Antiga", "codigo": 5, "localizacao": [0.0, 0.0], "ativo": True,
+            "estoque": {"codigo": "EST05", "estoque": {p.codigo: 3}, "exposicao": {p.codigo: 1},
+                        "capacidades": {p.codigo: {"estoque": 10, "exposicao": 10}}},
+            "funcionarios": [{"nome": "Ana", "codigo": 200, "cargo": "Caixa",
+                              "data_contratacao": "2023/01/01", "data_desligamento": None}],
+            "vendas": [{"id": 7, "data_hora": "2023/02/01", "itens": {p.codigo: 1}, "total": 5.0,
+                        "funcionario": 200}]
+        }
+        self.armazenamento.salvar("unidades", {"5": antigo})
+
+        resultado = unidades.migrar_unidades()
+        assert resultado['retorno'] == 0
+        assert resultado['dados'] == 1
+
+        gravado = self.armazenamento.consultar("unidades", "5")
+        assert gravado['estoque'] == "EST05"
+        assert gravado['funcionarios'] == [200]
+        assert gravado['vendas'] == [7]
+        assert self.armazenamento.consultar("estoques", "EST05")['estoque'] == {p.codigo: 3}
+        assert self.armazenamento.consultar("carrinhos", "7")['total'] == 5.0
+
+        assert unidades.migrar_unidades()['retorno'] == 1
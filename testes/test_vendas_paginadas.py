@@ -0,0 +1,170 @@
+import pytest
+from modulos import armazenamento
+from modulos import rastreamento
+from modulos import produto
+from modulos import funcionario
+from modulos import carrinho
+from modulos import unidades
+from modulos.vendas_paginadas import VendasPaginadas
+
+
+@pytest.fixture(autouse=True)
+def limpar_bases_de_dados():
+    """
+    Limpa os registros globais e as marcações de modificação antes e depois de cada teste.
+    """
+    for registro in (produto._todos_produtos, funcionario._todos_funcionarios,
+                     carrinho._todos_carrinhos, unidades._unidades):
+        registro.clear()
+    rastreamento.limpar_modificados()
+    carrinho._ultimo_id = 0
+    yield
+    armazenamento.definir_armazenamento(None)
+    for registro in (produto._todos_produtos, funcionario._todos_funcionarios,
+                     carrinho._todos_carrinhos, unidades._unidades):
+        registro.clear()
+    rastreamento.limpar_modificados()
+
+
+class ArmazenamentoContador(armazenamento.ArmazenamentoSQLite):
+    """ArmazenamentoSQLite que registra as chaves de cada chamada a consultar_varios."""
+
+    def __init__(self, caminho):
+        super().__init__(caminho)
+        self.consultas = []
+
+    def consultar_varios(self, entidade, chaves):
+        chaves = list(chaves)
+        self.consultas.append(chaves)
+        return super().consultar_varios(entidade, chaves)
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """Define um armazenamento SQLite temporário que conta as consultas."""
+    a = ArmazenamentoContador(str(tmp_path / "teste.db"))
+    armazenamento.definir_armazenamento(a)
+    yield a
+    a.fechar()
+
+
+@pytest.fixture
+def historico(banco):
+    """
+    Grava dez vendas (uma por dia, de 2024/01/01 a 2024/01/10) apenas no armazenamento
+    e retorna seus IDs.
+    """
+    p = produto.registrar_produto("Arroz", "Tio João", "Grãos", "7890000000017", 1.0, 5.00)["dados"]
+    ids = []
+    for dia in range(1, 11):
+        c = carrinho.Carrinho(dia, data_hora=f"2024/01/{dia:02d}", itens={p: dia}, total=5.0 * dia)
+        rastreamento.marcar_modificado("carrinhos", c)
+        carrinho._todos_carrinhos[dia] = c
+        ids.append(dia)
+    carrinho.salvar_carrinhos()
+    carrinho._todos_carrinhos.clear()
+    return ids
+
+
+class TestVendasPaginadas:
+
+    def test_len_nao_carrega(self, historico, banco):
+        """Testa que o tamanho do histórico é conhecido sem consultar o armazenamento."""
+        vendas = VendasPaginadas(historico)
+        assert len(vendas) == 10
+        assert banco.consultas == []
+
+    def test_iteracao_por_paginas(self, historico, banco):
+        """Testa que a iteração busca os carrinhos em páginas, na ordem do histórico."""
+        vendas = VendasPaginadas(historico, tamanho_pagina=4)
+        assert [c.id for c in vendas] == historico
+        assert banco.consultas == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+        assert carrinho._todos_carrinhos == {}
+
+    def test_indice_e_fatia(self, historico):
+        """Testa o acesso por posição, inclusive negativa, e por fatia."""
+        vendas = VendasPaginadas(historico)
+        assert vendas[-1].id == 10
+        assert [c.id for c in vendas[2:5]] == [3, 4, 5]
+
+    def test_periodo_com_datas_conhecidas(self, historico, banco):
+        """Testa que, com as datas conhecidas, só as vendas do período são buscadas."""
+        datas = [f"2024/01/{dia:02d}" for dia in range(1, 11)]
+        vendas = VendasPaginadas(historico, datas, tamanho_pagina=3)
+        assert [c.id for c in vendas.iterar_periodo("2024/01/04", "2024/01/05")] == [4, 5]
+        assert banco.consultas == [[4, 5]]
+
+    def test_periodo_com_datas_desconhecidas(self, historico):
+        """Testa que vendas sem data conhecida são buscadas e filtradas pela data do carrinho."""
+        vendas = VendasPaginadas(historico)
+        assert [c.id for c in vendas.iterar_periodo("2024/01/09", "2024/01/31")] == [9, 10]
+
+    def test_append_mantem_residente(self, historico, banco):
+        """Testa que vendas novas são acrescentadas sem ler o histórico e ficam na memória."""
+        vendas = VendasPaginadas(historico)
+        novo = carrinho.Carrinho(11)
+        vendas.append(novo)
+        assert len(vendas) == 11
+        assert vendas[-1] is novo
+        assert banco.consultas == []
+
+        novo.finaliza_carrinho()
+        assert vendas.datas()[-1] == novo.data_hora
+
+    def test_json_lido_uma_vez(self, historico, banco, tmp_path, monkeypatch):
+        """Testa que, em JSON, o histórico é lido uma única vez, e não a cada página."""
+        registros = dict(banco.iterar("carrinhos"))
+        json = armazenamento.ArmazenamentoJSON({"carrinhos": str(tmp_path / "carrinhos.json")})
+        json.salvar("carrinhos", registros)
+        armazenamento.definir_armazenamento(json)
+        leituras = []
+        original = json.consultar_varios
+        monkeypatch.setattr(json, "consultar_varios", lambda e, c: leituras.append(list(c)) or original(e, c))
+
+        vendas = VendasPaginadas(historico, tamanho_pagina=3)
+        assert [v.id for v in vendas] == historico
+        assert [v.id for v in vendas] == historico
+        assert len(leituras) == 1
+
+    def test_venda_inexistente(self, banco):
+        """Testa que uma venda ausente do armazenamento gera erro ao ser acessada."""
+        vendas = VendasPaginadas([99])
+        with pytest.raises(ValueError):
+            vendas[0]
+
+
+class TestUnidadeComHistorico:
+
+    def test_unidade_recarregada_nao_carrega_vendas(self, historico, banco):
+        """Testa que carregar uma unidade não busca o seu histórico de vendas."""
+        datas = [f"2024/01/{dia:02d}" for dia in range(1, 11)]
+        banco.salvar("unidades", {"1": {"nome": "Centro", "codigo": 1, "localizacao": [0.0, 0.0],
+                                        "estoque": "EST1", "funcionarios": [], "vendas": historico,
+                                        "datas_vendas": datas, "ativo": True}})
+        from modulos import estoque
+        estoque._todos_estoques["EST1"] = estoque.Estoque("EST1")
+        try:
+            unidades.carregar_unidades()
+        finally:
+            estoque._todos_estoques.clear()
+
+        unidade = unidades._unidades[1]
+        assert len(unidade.vendas) == 10
+        assert banco.consultas == []
+        assert unidade.to_json()["datas_vendas"] == datas
+
+    def test_relatorio_busca_apenas_o_periodo(self, historico, banco):
+        """Testa que o relatório da unidade só busca as vendas do período pedido."""
+        datas = [f"2024/01/{dia:02d}" for dia in range(1, 11)]
+        unidades.adiciona_Unidade(1, "Centro", (0.0, 0.0))
+        unidades._unidades[1].vendas = VendasPaginadas(historico, datas)
+
+        resultado = unidades.relatorio_Unidade(1, ("2024/01/02", "2024/01/03"))
+        assert resultado["retorno"] == 0
+        assert [v["id_venda"] for v in resultado["dados"]["vendas_no_periodo"]] == [2, 3]
+        assert banco.consultas == [[2, 3]]
+
+    def test_criar_carrinho_nao_reutiliza_id(self, historico):
+        """Testa que, com o histórico fora da memória, novos carrinhos recebem IDs inéditos."""
+        assert carrinho.carregar_carrinhos(manter_em_memoria=False) == 10
+        assert carrinho.criar_carrinho()["dados"].id == 11